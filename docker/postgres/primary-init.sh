@@ -0,0 +1,5 @@
+#!/bin/sh
+# Allows the db-replica service to stream WAL from this server. Runs from
+# /docker-entrypoint-initdb.d, i.e. only when the data directory is created.
+set -e
+echo "host replication all all scram-sha-256" >> "$PGDATA/pg_hba.conf"
@@ -0,0 +1,31 @@
+#!/bin/sh
+# Hot standby for local testing: clones PRIMARY_HOST with pg_basebackup on
+# first start, then streams WAL from it. Read-only; point
+# DATABASE_REPLICA_URL at it.
+set -e
+
+PGDATA=${PGDATA:-/var/lib/postgresql/data}
+PRIMARY_PORT=${PRIMARY_PORT:-5432}
+
+if [ ! -s "$PGDATA/PG_VERSION" ]; then
+  until pg_isready -q -h "$PRIMARY_HOST" -p "$PRIMARY_PORT"; do
+    echo "Waiting for primary $PRIMARY_HOST:$PRIMARY_PORT..."
+    sleep 1
+  done
+
+  mkdir -p "$PGDATA"
+  rm -rf "${PGDATA:?}"/*
+  PGPASSWORD="$POSTGRES_PASSWORD" pg_basebackup \
+    -h "$PRIMARY_HOST" -p "$PRIMARY_PORT" -U "$POSTGRES_USER" \
+    -D "$PGDATA" -X stream
+
+  touch "$PGDATA/standby.signal"
+  cat >> "$PGDATA/postgresql.auto.conf" <<CONF
+primary_conninfo = 'host=$PRIMARY_HOST port=$PRIMARY_PORT user=$POSTGRES_USER password=$POSTGRES_PASSWORD'
+hot_standby = on
+CONF
+  chown -R postgres:postgres "$PGDATA"
+  chmod 700 "$PGDATA"
+fi
+
+exec su-exec postgres postgres
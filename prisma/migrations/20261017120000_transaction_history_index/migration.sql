@@ -0,0 +1,2 @@
+-- CreateIndex
+CREATE INDEX "Transaction_effectedWalletId_createdAt_id_idx" ON "Transaction"("effectedWalletId", "createdAt" DESC, "id");
@@ -0,0 +1,36 @@
+-- CreateEnum
+CREATE TYPE "DebinStatus" AS ENUM ('PENDING', 'PROCESSING', 'SETTLED', 'REJECTED', 'FAILED');
+
+-- CreateTable
+CREATE TABLE "DebinRequest" (
+    "id" TEXT NOT NULL,
+    "walletId" TEXT NOT NULL,
+    "amount" DOUBLE PRECISION NOT NULL,
+    "idempotencyKey" TEXT NOT NULL,
+    "status" "DebinStatus" NOT NULL DEFAULT 'PENDING',
+    "attempts" INTEGER NOT NULL DEFAULT 0,
+    "nextAttemptAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "lockedUntil" TIMESTAMP(3),
+    "debinId" TEXT,
+    "transactionId" TEXT,
+    "lastError" TEXT,
+    "createdAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "updatedAt" TIMESTAMP(3) NOT NULL,
+
+    CONSTRAINT "DebinRequest_pkey" PRIMARY KEY ("id")
+);
+
+-- CreateIndex
+CREATE UNIQUE INDEX "DebinRequest_debinId_key" ON "DebinRequest"("debinId");
+
+-- CreateIndex
+CREATE UNIQUE INDEX "DebinRequest_transactionId_key" ON "DebinRequest"("transactionId");
+
+-- CreateIndex
+CREATE INDEX "DebinRequest_status_nextAttemptAt_idx" ON "DebinRequest"("status", "nextAttemptAt");
+
+-- CreateIndex
+CREATE UNIQUE INDEX "DebinRequest_walletId_idempotencyKey_key" ON "DebinRequest"("walletId", "idempotencyKey");
+
+-- AddForeignKey
+ALTER TABLE "DebinRequest" ADD CONSTRAINT "DebinRequest_walletId_fkey" FOREIGN KEY ("walletId") REFERENCES "Wallet"("id") ON DELETE CASCADE ON UPDATE CASCADE;
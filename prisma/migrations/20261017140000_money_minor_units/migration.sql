@@ -0,0 +1,13 @@
+-- Amounts move from DOUBLE PRECISION major units to BIGINT minor units
+-- (cents). Existing values are rounded to the nearest cent.
+
+-- AlterTable
+ALTER TABLE "Wallet" ALTER COLUMN "balance" DROP DEFAULT,
+ALTER COLUMN "balance" SET DATA TYPE BIGINT USING ROUND("balance" * 100)::BIGINT,
+ALTER COLUMN "balance" SET DEFAULT 0;
+
+-- AlterTable
+ALTER TABLE "Transaction" ALTER COLUMN "amount" SET DATA TYPE BIGINT USING ROUND("amount" * 100)::BIGINT;
+
+-- AlterTable
+ALTER TABLE "DebinRequest" ALTER COLUMN "amount" SET DATA TYPE BIGINT USING ROUND("amount" * 100)::BIGINT;
@@ -0,0 +1,13 @@
+-- CreateTable
+CREATE TABLE "BalanceCheckpoint" (
+    "walletId" TEXT NOT NULL,
+    "balance" BIGINT NOT NULL,
+    "lastTransactionId" TEXT,
+    "lastTransactionAt" TIMESTAMP(3),
+    "createdAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "BalanceCheckpoint_pkey" PRIMARY KEY ("walletId")
+);
+
+-- AddForeignKey
+ALTER TABLE "BalanceCheckpoint" ADD CONSTRAINT "BalanceCheckpoint_walletId_fkey" FOREIGN KEY ("walletId") REFERENCES "Wallet"("id") ON DELETE CASCADE ON UPDATE CASCADE;
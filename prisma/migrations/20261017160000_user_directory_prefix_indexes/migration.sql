@@ -0,0 +1,10 @@
+-- Case-insensitive prefix search over aliases and emails (GET /users/aliases).
+-- The "C" collation orders by bytes, so a prefix is one contiguous range of
+-- the index and the same index serves the ORDER BY of each page. Prisma
+-- cannot express expression indexes; they live only in this migration.
+
+-- CreateIndex
+CREATE INDEX "User_alias_prefix_idx" ON "User"((lower("alias") COLLATE "C"), "alias");
+
+-- CreateIndex
+CREATE INDEX "User_email_prefix_idx" ON "User"((lower("email") COLLATE "C"), "email");
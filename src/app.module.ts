@@ -1,7 +1,7 @@
 import { Module } from '@nestjs/common';
+import { APP_INTERCEPTOR } from '@nestjs/core';
 import { AppController } from './app.controller';
 import { AppService } from './app.service';
-import { PrismaService } from './prisma/prisma.service';
 import { PrismaModule } from './prisma/prisma.module';
 import { AuthModule } from './auth/auth.module';
 import { WalletModule } from './wallet/wallet.module';
@@ -9,10 +9,15 @@ import { TransactionsModule } from './transactions/transactions.module';
 import { UsersModule } from './users/users.module';
 import { ConfigModule } from '@nestjs/config';
 import { ExternalBankModule } from './external-bank/external-bank.module';
+import { MinorUnitsInterceptor } from './common/interceptors/minor-units.interceptor';
+import { MetricsModule } from './metrics/metrics.module';
+import { TracingModule } from './tracing/tracing.module';
 
 @Module({
   imports: [
     ConfigModule.forRoot({ isGlobal: true }),
+    MetricsModule,
+    TracingModule,
     PrismaModule,
     AuthModule,
     WalletModule,
@@ -21,6 +26,9 @@ import { ExternalBankModule } from './external-bank/external-bank.module';
     ExternalBankModule,
   ],
   controllers: [AppController],
-  providers: [AppService, PrismaService],
+  providers: [
+    AppService,
+    { provide: APP_INTERCEPTOR, useClass: MinorUnitsInterceptor },
+  ],
 })
 export class AppModule {}
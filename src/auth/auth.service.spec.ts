@@ -11,6 +11,7 @@ describe('AuthService', () => {
 
   const mockUsersService = {
     findByEmail: jest.fn(),
+    findByEmailWithWallet: jest.fn(),
     findByAlias: jest.fn(),
     create: jest.fn(),
   };
@@ -59,6 +60,7 @@ describe('AuthService', () => {
       alias: registerDto.alias,
       createdAt: new Date(),
       updatedAt: new Date(),
+      wallet: { id: 'wallet-id', userId: 'user-id', balance: 0 },
     };
 
     beforeEach(() => {
@@ -83,6 +85,7 @@ describe('AuthService', () => {
       expect(mockJwtService.sign).toHaveBeenCalledWith({
         email: mockCreatedUser.email,
         userId: mockCreatedUser.id,
+        walletId: 'wallet-id',
       });
       expect(result.accessToken).toEqual('jwt-token');
     });
@@ -131,6 +134,7 @@ describe('AuthService', () => {
       alias: 'testuser',
       createdAt: new Date(),
       updatedAt: new Date(),
+      wallet: { id: 'wallet-id', userId: 'user-id', balance: 0 },
     };
 
     beforeEach(() => {
@@ -138,26 +142,31 @@ describe('AuthService', () => {
     });
 
     it('should login user successfully when credentials are correct', async () => {
-      mockUsersService.findByEmail.mockResolvedValue(mockUser);
+      mockUsersService.findByEmailWithWallet.mockResolvedValue(mockUser);
 
       const result = await service.login(loginDto);
 
-      expect(mockUsersService.findByEmail).toHaveBeenCalledWith(loginDto.email);
+      expect(mockUsersService.findByEmailWithWallet).toHaveBeenCalledWith(
+        loginDto.email,
+      );
       expect(mockJwtService.sign).toHaveBeenCalledWith({
         email: mockUser.email,
         userId: mockUser.id,
+        walletId: 'wallet-id',
       });
       expect(result.accessToken).toEqual('jwt-token');
     });
 
     it('should throw UnauthorizedException if user is not found', async () => {
-      mockUsersService.findByEmail.mockResolvedValue(null);
+      mockUsersService.findByEmailWithWallet.mockResolvedValue(null);
 
       await expect(service.login(loginDto)).rejects.toThrow(
         new UnauthorizedException('Please check your login credentials'),
       );
 
-      expect(mockUsersService.findByEmail).toHaveBeenCalledWith(loginDto.email);
+      expect(mockUsersService.findByEmailWithWallet).toHaveBeenCalledWith(
+        loginDto.email,
+      );
     });
 
     it('should throw UnauthorizedException if password is incorrect', async () => {
@@ -165,13 +174,17 @@ describe('AuthService', () => {
         ...mockUser,
         password: 'wrong-password',
       };
-      mockUsersService.findByEmail.mockResolvedValue(userWithWrongPassword);
+      mockUsersService.findByEmailWithWallet.mockResolvedValue(
+        userWithWrongPassword,
+      );
 
       await expect(service.login(loginDto)).rejects.toThrow(
         new UnauthorizedException('Please check your login credentials'),
       );
 
-      expect(mockUsersService.findByEmail).toHaveBeenCalledWith(loginDto.email);
+      expect(mockUsersService.findByEmailWithWallet).toHaveBeenCalledWith(
+        loginDto.email,
+      );
       expect(mockJwtService.sign).not.toHaveBeenCalled();
     });
   });
@@ -8,9 +8,10 @@ import {
 import { UsersService } from '../users/users.service';
 import { CreateUserDto } from './dto/create-user.dto';
 import { JwtService } from '@nestjs/jwt';
-import { User } from '../../generated/prisma';
+import { User, Wallet } from '../../generated/prisma';
 import { LoginDto } from './dto/login.dto';
 import { Response } from 'express';
+import { JwtPayload } from './jwt.strategy';
 
 export interface AuthResponse {
   accessToken: string;
@@ -49,14 +50,13 @@ export class AuthService {
         }
       }
 
-      const user: User = await this.usersService.create({
+      const user = await this.usersService.create({
         email,
         password,
         alias,
       });
 
-      const payload = { email: user.email, userId: user.id };
-      const accessToken = this.jwtService.sign(payload);
+      const accessToken = this.jwtService.sign(buildJwtPayload(user));
 
       return { accessToken };
     } catch (error) {
@@ -80,7 +80,7 @@ export class AuthService {
     const { email, password } = loginDto;
 
     try {
-      const user = await this.usersService.findByEmail(email);
+      const user = await this.usersService.findByEmailWithWallet(email);
 
       if (!user) {
         throw new UnauthorizedException('Please check your login credentials');
@@ -89,8 +89,7 @@ export class AuthService {
       const isPasswordValid = user.password === password;
 
       if (isPasswordValid) {
-        const payload = { email: user.email, userId: user.id };
-        const accessToken = this.jwtService.sign(payload);
+        const accessToken = this.jwtService.sign(buildJwtPayload(user));
         return { accessToken };
       }
 
@@ -111,3 +110,9 @@ export class AuthService {
     return { success: true };
   }
 }
+
+// The wallet id rides along in the token so wallet endpoints can read the
+// wallet by primary key instead of resolving it from the user on each request
+function buildJwtPayload(user: User & { wallet: Wallet | null }): JwtPayload {
+  return { email: user.email, userId: user.id, walletId: user.wallet?.id };
+}
@@ -0,0 +1,103 @@
+import { Test, TestingModule } from '@nestjs/testing';
+import { ConfigService } from '@nestjs/config';
+import { UnauthorizedException } from '@nestjs/common';
+import { JwtStrategy } from './jwt.strategy';
+import { UsersService } from '../users/users.service';
+import { PrincipalCacheService } from '../users/principal-cache.service';
+
+describe('JwtStrategy', () => {
+  let strategy: JwtStrategy;
+  let principalCache: PrincipalCacheService;
+
+  const mockUsersService = {
+    findOne: jest.fn(),
+  };
+
+  const mockConfigService = {
+    get: jest.fn((key: string) =>
+      key === 'JWT_SECRET' ? 'test-secret' : undefined,
+    ),
+  };
+
+  const mockUser = {
+    id: 'user-id',
+    email: 'test@example.com',
+    alias: 'testuser',
+    password: 'password123',
+  };
+
+  const payload = {
+    userId: 'user-id',
+    email: 'test@example.com',
+    walletId: 'wallet-id',
+  };
+
+  beforeEach(async () => {
+    jest.clearAllMocks();
+
+    const module: TestingModule = await Test.createTestingModule({
+      providers: [
+        JwtStrategy,
+        PrincipalCacheService,
+        {
+          provide: UsersService,
+          useValue: mockUsersService,
+        },
+        {
+          provide: ConfigService,
+          useValue: mockConfigService,
+        },
+      ],
+    }).compile();
+
+    strategy = module.get<JwtStrategy>(JwtStrategy);
+    principalCache = module.get<PrincipalCacheService>(PrincipalCacheService);
+  });
+
+  it('should serve repeat validations from the principal cache', async () => {
+    mockUsersService.findOne.mockResolvedValue(mockUser);
+
+    const first = await strategy.validate(payload);
+    const second = await strategy.validate(payload);
+
+    const principal = {
+      id: 'user-id',
+      email: 'test@example.com',
+      alias: 'testuser',
+      walletId: 'wallet-id',
+    };
+    expect(first).toEqual(principal);
+    expect(second).toEqual(principal);
+    expect(mockUsersService.findOne).toHaveBeenCalledTimes(1);
+    expect(principalCache.stats()).toEqual({ hits: 1, misses: 1, size: 1 });
+  });
+
+  it('should reload the user after invalidation', async () => {
+    mockUsersService.findOne.mockResolvedValue(mockUser);
+
+    await strategy.validate(payload);
+    principalCache.invalidate('user-id');
+    await strategy.validate(payload);
+
+    expect(mockUsersService.findOne).toHaveBeenCalledTimes(2);
+  });
+
+  it('should accept tokens issued without a walletId', async () => {
+    mockUsersService.findOne.mockResolvedValue(mockUser);
+
+    const result = await strategy.validate({
+      userId: 'user-id',
+      email: 'test@example.com',
+    });
+
+    expect(result.id).toBe('user-id');
+    expect(result.walletId).toBeUndefined();
+  });
+
+  it('should reject a payload without userId', async () => {
+    await expect(strategy.validate({} as any)).rejects.toThrow(
+      UnauthorizedException,
+    );
+    expect(mockUsersService.findOne).not.toHaveBeenCalled();
+  });
+});
@@ -4,11 +4,16 @@ import { Strategy } from 'passport-jwt';
 import { Request } from 'express';
 import { UsersService } from '../users/users.service'; // Adjust path if needed
 import { ConfigService } from '@nestjs/config'; // For securely accessing JWT_SECRET
+import {
+  AuthenticatedPrincipal,
+  PrincipalCacheService,
+} from '../users/principal-cache.service';
 
 export interface JwtPayload {
   userId: string;
   email: string;
-  walletId: string;
+  // Absent on tokens issued before the wallet id was added to the payload
+  walletId?: string;
 }
 
 // Custom extractor function to get token from cookie
@@ -24,6 +29,7 @@ const cookieExtractor = (req: Request): string | null => {
 export class JwtStrategy extends PassportStrategy(Strategy) {
   constructor(
     private usersService: UsersService,
+    private principalCache: PrincipalCacheService,
     private configService: ConfigService,
   ) {
     const secret = configService.get<string>('JWT_SECRET');
@@ -39,15 +45,22 @@ export class JwtStrategy extends PassportStrategy(Strategy) {
     });
   }
 
-  async validate(payload: JwtPayload): Promise<any> {
+  async validate(payload: JwtPayload): Promise<AuthenticatedPrincipal> {
     if (!payload || !payload.userId) {
       throw new UnauthorizedException('Invalid token payload');
     }
-    const user = await this.usersService.findOne(payload.userId);
-    if (!user) {
-      throw new UnauthorizedException('User not found or deactivated');
+
+    let principal = this.principalCache.get(payload.userId);
+    if (!principal) {
+      const user = await this.usersService.findOne(payload.userId);
+      if (!user) {
+        throw new UnauthorizedException('User not found or deactivated');
+      }
+
+      principal = { id: user.id, email: user.email, alias: user.alias };
+      this.principalCache.set(principal);
     }
 
-    return { id: user.id, email: user.email, alias: user.alias };
+    return { ...principal, walletId: payload.walletId };
   }
 }
@@ -0,0 +1,79 @@
+import {
+  ClusterBalanceEventBus,
+  InProcessBalanceEventBus,
+} from './balance-event-bus';
+import { ClusterBus } from '../common/cluster/cluster-bus';
+
+describe('InProcessBalanceEventBus', () => {
+  let bus: InProcessBalanceEventBus;
+
+  beforeEach(() => {
+    bus = new InProcessBalanceEventBus();
+  });
+
+  it('should notify only subscribers of the changed wallets', () => {
+    const walletA: string[] = [];
+    const walletB: string[] = [];
+    bus.changes('wallet-a').subscribe((id) => walletA.push(id));
+    bus.changes('wallet-b').subscribe((id) => walletB.push(id));
+
+    bus.publish('wallet-a');
+    bus.publish(['wallet-a', 'wallet-c']);
+
+    expect(walletA).toEqual(['wallet-a', 'wallet-a']);
+    expect(walletB).toEqual([]);
+  });
+
+  it('should drop a channel when its last subscriber leaves', () => {
+    const first = bus.changes('wallet-a').subscribe();
+    const second = bus.changes('wallet-a').subscribe();
+    expect(bus.channelCount).toBe(1);
+
+    first.unsubscribe();
+    expect(bus.channelCount).toBe(1);
+    second.unsubscribe();
+    expect(bus.channelCount).toBe(0);
+  });
+});
+
+describe('ClusterBalanceEventBus', () => {
+  let relayed: (payload: string) => void;
+  const clusterBus = {
+    publish: jest.fn(),
+    subscribe: jest.fn(
+      (topic: string, handler: (payload: string) => void) => {
+        relayed = handler;
+        return () => undefined;
+      },
+    ),
+  };
+  let bus: ClusterBalanceEventBus;
+
+  beforeEach(() => {
+    jest.clearAllMocks();
+    bus = new ClusterBalanceEventBus(clusterBus as unknown as ClusterBus);
+  });
+
+  it('should notify local subscribers and relay to the other workers', () => {
+    const received: string[] = [];
+    bus.changes('wallet-a').subscribe((id) => received.push(id));
+
+    bus.publish(['wallet-a', 'wallet-b']);
+
+    expect(received).toEqual(['wallet-a']);
+    expect(clusterBus.publish).toHaveBeenCalledWith(
+      'balance-changed',
+      'wallet-a,wallet-b',
+    );
+  });
+
+  it('should notify local subscribers of changes from other workers', () => {
+    const received: string[] = [];
+    bus.changes('wallet-b').subscribe((id) => received.push(id));
+
+    relayed('wallet-a,wallet-b');
+
+    expect(received).toEqual(['wallet-b']);
+    expect(clusterBus.publish).not.toHaveBeenCalled();
+  });
+});
@@ -0,0 +1,70 @@
+import { Injectable } from '@nestjs/common';
+import { Observable, Subject } from 'rxjs';
+import { ClusterBus } from '../common/cluster/cluster-bus';
+
+const BALANCE_TOPIC = 'balance-changed';
+
+// Notifies that a wallet's balance changed after a commit. Events carry only
+// the wallet id: subscribers read the committed balance themselves, so
+// out-of-order delivery can never leave a stale value on screen. The
+// in-process bus reaches subscribers of this process only; cluster workers
+// use ClusterBalanceEventBus. Fanning out across containers would take a
+// Postgres LISTEN/NOTIFY bus (NOTIFY payload = wallet id).
+export abstract class BalanceEventBus {
+  abstract publish(walletIds: string | string[]): void;
+  abstract changes(walletId: string): Observable<string>;
+}
+
+@Injectable()
+export class InProcessBalanceEventBus extends BalanceEventBus {
+  private readonly channels = new Map<string, Subject<string>>();
+
+  publish(walletIds: string | string[]) {
+    for (const walletId of ([] as string[]).concat(walletIds)) {
+      this.channels.get(walletId)?.next(walletId);
+    }
+  }
+
+  changes(walletId: string): Observable<string> {
+    return new Observable<string>((subscriber) => {
+      let channel = this.channels.get(walletId);
+      if (!channel) {
+        channel = new Subject<string>();
+        this.channels.set(walletId, channel);
+      }
+      const subscription = channel.subscribe(subscriber);
+
+      return () => {
+        subscription.unsubscribe();
+        // Drop the channel once its last listener is gone
+        if (!channel.observed) {
+          this.channels.delete(walletId);
+        }
+      };
+    });
+  }
+
+  get channelCount(): number {
+    return this.channels.size;
+  }
+}
+
+// In cluster mode a balance stream is served by whichever worker accepted
+// the connection, while the transfer may commit on another. Changes are
+// delivered locally and relayed through the primary to the other workers.
+export class ClusterBalanceEventBus extends InProcessBalanceEventBus {
+  constructor(private readonly bus: ClusterBus) {
+    super();
+    this.bus.subscribe(BALANCE_TOPIC, (payload) =>
+      super.publish(payload.split(',')),
+    );
+  }
+
+  publish(walletIds: string | string[]) {
+    const ids = ([] as string[]).concat(walletIds);
+    super.publish(ids);
+    if (ids.length > 0) {
+      this.bus.publish(BALANCE_TOPIC, ids.join(','));
+    }
+  }
+}
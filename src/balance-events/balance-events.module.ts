@@ -0,0 +1,21 @@
+import { Module } from '@nestjs/common';
+import {
+  BalanceEventBus,
+  ClusterBalanceEventBus,
+  InProcessBalanceEventBus,
+} from './balance-event-bus';
+import { clusterBus } from '../common/cluster/cluster-bus';
+
+@Module({
+  providers: [
+    {
+      provide: BalanceEventBus,
+      useFactory: () =>
+        clusterBus.enabled
+          ? new ClusterBalanceEventBus(clusterBus)
+          : new InProcessBalanceEventBus(),
+    },
+  ],
+  exports: [BalanceEventBus],
+})
+export class BalanceEventsModule {}
@@ -0,0 +1,74 @@
+import { availableParallelism } from 'os';
+import { clusterWorkerCount, poolSizePerWorker } from './cluster';
+import { pooledDatabaseUrl } from './prisma/prisma.service';
+
+describe('cluster settings', () => {
+  describe('clusterWorkerCount', () => {
+    it('should run a single process unless asked otherwise', () => {
+      expect(clusterWorkerCount({})).toBe(1);
+      expect(clusterWorkerCount({ CLUSTER_WORKERS: '0' })).toBe(1);
+      expect(clusterWorkerCount({ CLUSTER_WORKERS: 'lots' })).toBe(1);
+    });
+
+    it('should honour a fixed count or one worker per core', () => {
+      expect(clusterWorkerCount({ CLUSTER_WORKERS: '4' })).toBe(4);
+      expect(clusterWorkerCount({ CLUSTER_WORKERS: 'max' })).toBe(
+        availableParallelism(),
+      );
+    });
+  });
+
+  describe('poolSizePerWorker', () => {
+    it('should split the connection budget across workers', () => {
+      expect(poolSizePerWorker(4, { DATABASE_MAX_CONNECTIONS: '50' })).toBe(12);
+      expect(poolSizePerWorker(4, {})).toBe(20);
+      expect(poolSizePerWorker(200, { DATABASE_MAX_CONNECTIONS: '50' })).toBe(
+        1,
+      );
+    });
+  });
+
+  describe('pooledDatabaseUrl', () => {
+    const url = 'postgresql://user:pass@db:5432/walle';
+
+    it('should add the per-worker connection limit', () => {
+      expect(
+        pooledDatabaseUrl({ DATABASE_URL: url, DATABASE_POOL_SIZE: '12' }),
+      ).toBe(`${url}?connection_limit=12`);
+      expect(
+        pooledDatabaseUrl({
+          DATABASE_URL: `${url}?schema=public`,
+          DATABASE_POOL_SIZE: '12',
+        }),
+      ).toBe(`${url}?schema=public&connection_limit=12`);
+    });
+
+    it('should keep an explicit connection_limit', () => {
+      const explicit = `${url}?connection_limit=5`;
+      expect(
+        pooledDatabaseUrl({ DATABASE_URL: explicit, DATABASE_POOL_SIZE: '12' }),
+      ).toBe(explicit);
+      expect(pooledDatabaseUrl({ DATABASE_URL: url })).toBe(url);
+    });
+
+    it('should add the pool and statement timeouts', () => {
+      expect(
+        pooledDatabaseUrl({
+          DATABASE_URL: url,
+          DATABASE_POOL_SIZE: '12',
+          DATABASE_POOL_TIMEOUT_S: '2',
+          DATABASE_STATEMENT_TIMEOUT_MS: '5000',
+        }),
+      ).toBe(
+        `${url}?connection_limit=12&pool_timeout=2` +
+          '&options=-c%20statement_timeout%3D5000',
+      );
+      expect(
+        pooledDatabaseUrl({
+          DATABASE_URL: `${url}?pool_timeout=10`,
+          DATABASE_POOL_TIMEOUT_S: '2',
+        }),
+      ).toBe(`${url}?pool_timeout=10`);
+    });
+  });
+});
@@ -0,0 +1,95 @@
+import * as clusterModule from 'cluster';
+import type { Cluster, Worker } from 'cluster';
+import { availableParallelism } from 'os';
+import { relayClusterMessages } from './common/cluster/cluster-bus';
+
+// Without esModuleInterop the required module is the cluster object itself
+const cluster = clusterModule as unknown as Cluster;
+
+// Leaves room under Postgres' default max_connections (100) for migrations,
+// the reconciliation job and admin sessions.
+const DEFAULT_MAX_CONNECTIONS = 80;
+
+// A worker that dies this soon after starting is not restarted, so a broken
+// build does not fork in a tight loop.
+const MIN_WORKER_UPTIME_MS = 5000;
+
+// CLUSTER_WORKERS: unset/1 runs a single process, `max` one worker per core.
+export function clusterWorkerCount(env = process.env): number {
+  const setting = env.CLUSTER_WORKERS?.trim();
+  if (setting === 'max') {
+    return availableParallelism();
+  }
+  const workers = Number(setting);
+  return Number.isInteger(workers) && workers > 1 ? workers : 1;
+}
+
+// Splits DATABASE_MAX_CONNECTIONS across the workers, so the whole container
+// never opens more connections than Postgres allows.
+export function poolSizePerWorker(workers: number, env = process.env): number {
+  const total = Number(env.DATABASE_MAX_CONNECTIONS);
+  const budget =
+    Number.isFinite(total) && total > 0 ? total : DEFAULT_MAX_CONNECTIONS;
+  return Math.max(1, Math.floor(budget / workers));
+}
+
+// Runs `bootstrap` directly, or forks CLUSTER_WORKERS copies of this process
+// that share the listening port. The primary supervises: it restarts
+// workers that crash and forwards SIGTERM/SIGINT so each one drains before
+// the container exits. It also relays ClusterBus messages, so balance
+// events and cache invalidations reach every worker and /metrics covers
+// all of them.
+export function runClustered(bootstrap: () => Promise<void>) {
+  const workers = clusterWorkerCount();
+  if (workers === 1 || !cluster.isPrimary) {
+    void bootstrap();
+    return;
+  }
+
+  const poolSize = poolSizePerWorker(workers);
+  const startedAt = new Map<Worker, number>();
+  let stopping = false;
+
+  const fork = () => {
+    const worker = cluster.fork({ DATABASE_POOL_SIZE: String(poolSize) });
+    startedAt.set(worker, Date.now());
+  };
+
+  console.log(
+    `Starting ${workers} workers with ${poolSize} database connections each`,
+  );
+  relayClusterMessages(cluster);
+  for (let i = 0; i < workers; i++) {
+    fork();
+  }
+
+  cluster.on('exit', (worker, code, signal) => {
+    const uptime = Date.now() - (startedAt.get(worker) ?? 0);
+    startedAt.delete(worker);
+
+    if (stopping) {
+      if (startedAt.size === 0) {
+        process.exit(0);
+      }
+      return;
+    }
+    console.error(`Worker ${worker.process.pid} exited (${signal ?? code})`);
+    if (uptime >= MIN_WORKER_UPTIME_MS) {
+      fork();
+    } else if (startedAt.size === 0) {
+      process.exit(1);
+    }
+  });
+
+  const stop = (signal: NodeJS.Signals) => {
+    if (stopping) {
+      return;
+    }
+    stopping = true;
+    for (const worker of startedAt.keys()) {
+      worker.process.kill(signal);
+    }
+  };
+  process.once('SIGTERM', stop);
+  process.once('SIGINT', stop);
+}
@@ -0,0 +1,71 @@
+import { LruCache } from './lru-cache';
+
+describe('LruCache', () => {
+  beforeEach(() => {
+    jest.useFakeTimers();
+  });
+
+  afterEach(() => {
+    jest.useRealTimers();
+  });
+
+  it('should return cached values and count hits and misses', () => {
+    const cache = new LruCache<string, number>({ maxEntries: 10, ttlMs: 1000 });
+
+    expect(cache.get('a')).toBeUndefined();
+    cache.set('a', 1);
+    expect(cache.get('a')).toBe(1);
+
+    expect(cache.stats()).toEqual({ hits: 1, misses: 1, size: 1 });
+  });
+
+  it('should expire entries after the TTL', () => {
+    const cache = new LruCache<string, number>({ maxEntries: 10, ttlMs: 1000 });
+    cache.set('a', 1);
+
+    jest.advanceTimersByTime(1001);
+
+    expect(cache.get('a')).toBeUndefined();
+    expect(cache.stats().size).toBe(0);
+  });
+
+  it('should evict the least recently used entry when full', () => {
+    const cache = new LruCache<string, number>({ maxEntries: 2, ttlMs: 1000 });
+    cache.set('a', 1);
+    cache.set('b', 2);
+    cache.get('a'); // 'b' is now the least recently used
+    cache.set('c', 3);
+
+    expect(cache.get('a')).toBe(1);
+    expect(cache.get('b')).toBeUndefined();
+    expect(cache.get('c')).toBe(3);
+  });
+
+  it('should support explicit invalidation', () => {
+    const cache = new LruCache<string, number>({ maxEntries: 10, ttlMs: 1000 });
+    cache.set('a', 1);
+    cache.delete('a');
+
+    expect(cache.get('a')).toBeUndefined();
+  });
+
+  it('should invalidate entries by value', () => {
+    const cache = new LruCache<string, number>({ maxEntries: 10, ttlMs: 1000 });
+    cache.set('a', 1);
+    cache.set('b', 2);
+    cache.set('c', 1);
+
+    expect(cache.deleteWhere((value) => value === 1)).toBe(2);
+    expect(cache.get('a')).toBeUndefined();
+    expect(cache.get('b')).toBe(2);
+    expect(cache.get('c')).toBeUndefined();
+  });
+
+  it('should not store anything when the TTL is 0', () => {
+    const cache = new LruCache<string, number>({ maxEntries: 10, ttlMs: 0 });
+    cache.set('a', 1);
+
+    expect(cache.enabled).toBe(false);
+    expect(cache.get('a')).toBeUndefined();
+  });
+});
@@ -0,0 +1,89 @@
+export interface LruCacheOptions {
+  // Upper bound on entries; the least recently used entry is evicted first
+  maxEntries: number;
+  // Time to live per entry in milliseconds; 0 disables the cache
+  ttlMs: number;
+}
+
+export interface CacheStats {
+  hits: number;
+  misses: number;
+  size: number;
+}
+
+interface CacheEntry<V> {
+  value: V;
+  expiresAt: number;
+}
+
+// Small in-process LRU with per-entry TTL. A Map keeps insertion order, so
+// re-inserting on read moves an entry to the most recently used end.
+export class LruCache<K, V> {
+  private readonly entries = new Map<K, CacheEntry<V>>();
+  private hits = 0;
+  private misses = 0;
+
+  constructor(private readonly options: LruCacheOptions) {}
+
+  get enabled(): boolean {
+    return this.options.ttlMs > 0 && this.options.maxEntries > 0;
+  }
+
+  get(key: K): V | undefined {
+    const entry = this.entries.get(key);
+    if (!entry || entry.expiresAt <= Date.now()) {
+      if (entry) {
+        this.entries.delete(key);
+      }
+      this.misses++;
+      return undefined;
+    }
+
+    this.entries.delete(key);
+    this.entries.set(key, entry);
+    this.hits++;
+    return entry.value;
+  }
+
+  set(key: K, value: V): void {
+    if (!this.enabled) {
+      return;
+    }
+
+    this.entries.delete(key);
+    this.entries.set(key, {
+      value,
+      expiresAt: Date.now() + this.options.ttlMs,
+    });
+
+    while (this.entries.size > this.options.maxEntries) {
+      const oldest = this.entries.keys().next().value as K;
+      this.entries.delete(oldest);
+    }
+  }
+
+  delete(key: K): void {
+    this.entries.delete(key);
+  }
+
+  // Drops every entry whose value matches; a full scan, meant for rare
+  // invalidations by something other than the key
+  deleteWhere(predicate: (value: V, key: K) => boolean): number {
+    let deleted = 0;
+    for (const [key, entry] of this.entries) {
+      if (predicate(entry.value, key)) {
+        this.entries.delete(key);
+        deleted++;
+      }
+    }
+    return deleted;
+  }
+
+  clear(): void {
+    this.entries.clear();
+  }
+
+  stats(): CacheStats {
+    return { hits: this.hits, misses: this.misses, size: this.entries.size };
+  }
+}
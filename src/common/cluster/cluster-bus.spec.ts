@@ -0,0 +1,81 @@
+import { EventEmitter } from 'events';
+import type { Cluster } from 'cluster';
+import {
+  ClusterBus,
+  ClusterTransport,
+  relayClusterMessages,
+} from './cluster-bus';
+
+// A primary and its workers wired together in one process: what a worker
+// sends is emitted on the fake cluster, what the primary sends to a worker
+// reaches that worker's bus.
+function fakeCluster(count: number) {
+  const primary = new EventEmitter() as EventEmitter & {
+    workers: Record<number, unknown>;
+  };
+  primary.workers = {};
+
+  const buses = Array.from({ length: count }, (_, i) => {
+    const id = i + 1;
+    let deliver: (message: unknown) => void = () => undefined;
+    const worker = {
+      id,
+      isConnected: () => true,
+      send: (message: unknown) => setImmediate(() => deliver(message)),
+    };
+    primary.workers[id] = worker;
+
+    const transport: ClusterTransport = {
+      send: (message) =>
+        setImmediate(() => primary.emit('message', worker, message)),
+      onMessage: (handler) => {
+        deliver = handler;
+      },
+    };
+    return new ClusterBus(transport);
+  });
+
+  relayClusterMessages(primary as unknown as Cluster);
+  return buses;
+}
+
+const flush = () => new Promise((resolve) => setImmediate(resolve));
+
+describe('ClusterBus', () => {
+  it('should deliver a broadcast to every other worker', async () => {
+    const [first, second, third] = fakeCluster(3);
+    const received: string[] = [];
+    first.subscribe('topic', (payload) => received.push(`1:${payload}`));
+    second.subscribe('topic', (payload) => received.push(`2:${payload}`));
+    third.subscribe('topic', (payload) => received.push(`3:${payload}`));
+
+    first.publish('topic', 'user-1');
+    await flush();
+    await flush();
+
+    expect(received.sort()).toEqual(['2:user-1', '3:user-1']);
+  });
+
+  it('should gather an answer from every worker', async () => {
+    const buses = fakeCluster(3);
+    buses.forEach((bus, i) => bus.provide('metrics', () => `worker ${i + 1}`));
+
+    await expect(buses[1].gather('metrics')).resolves.toEqual([
+      { worker: 1, value: 'worker 1' },
+      { worker: 2, value: 'worker 2' },
+      { worker: 3, value: 'worker 3' },
+    ]);
+  });
+
+  it('should do nothing outside cluster mode', async () => {
+    const bus = new ClusterBus(null);
+    const received: string[] = [];
+    bus.subscribe('topic', (payload) => received.push(payload));
+
+    bus.publish('topic', 'user-1');
+
+    expect(bus.enabled).toBe(false);
+    expect(received).toEqual([]);
+    await expect(bus.gather('metrics')).resolves.toEqual([]);
+  });
+});
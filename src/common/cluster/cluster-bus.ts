@@ -0,0 +1,226 @@
+import * as clusterModule from 'cluster';
+import type { Cluster, Worker } from 'cluster';
+
+// Without esModuleInterop the required module is the cluster object itself
+const cluster = clusterModule as unknown as Cluster;
+
+// How long the primary waits for every worker to answer a gather
+const GATHER_TIMEOUT_MS = 2000;
+
+export interface WorkerReport {
+  worker: number;
+  value: string;
+}
+
+// Messages exchanged over the cluster IPC channel. Workers never talk to
+// each other directly: the primary relays broadcasts and runs gathers.
+type ClusterMessage =
+  | { walle: 'broadcast'; topic: string; payload: string }
+  | { walle: 'gather'; id: number; topic: string }
+  | { walle: 'collect'; id: number; topic: string }
+  | { walle: 'report'; id: number; value?: string }
+  | { walle: 'gathered'; id: number; reports: WorkerReport[] };
+
+export interface ClusterTransport {
+  send(message: ClusterMessage): void;
+  onMessage(handler: (message: unknown) => void): void;
+}
+
+type Provider = () => string | Promise<string>;
+
+function isClusterMessage(message: unknown): message is ClusterMessage {
+  return (
+    typeof message === 'object' &&
+    message !== null &&
+    typeof (message as { walle?: unknown }).walle === 'string'
+  );
+}
+
+// Cluster workers share the port but not memory. State one worker changes
+// that others hold a copy of (SSE subscribers, caches) is announced here,
+// and values every worker owns a share of (metrics) are gathered here.
+// Outside cluster mode there is no transport and both are local no-ops.
+export class ClusterBus {
+  private readonly handlers = new Map<
+    string,
+    Set<(payload: string) => void>
+  >();
+  private readonly providers = new Map<string, Provider>();
+  private readonly pending = new Map<
+    number,
+    (reports: WorkerReport[]) => void
+  >();
+  private nextId = 0;
+  private listening = false;
+
+  constructor(
+    private readonly transport: ClusterTransport | null = workerTransport(),
+  ) {}
+
+  get enabled(): boolean {
+    return this.transport !== null;
+  }
+
+  // Delivered to every other worker; the caller handles its own copy
+  publish(topic: string, payload: string) {
+    this.transport?.send({ walle: 'broadcast', topic, payload });
+  }
+
+  subscribe(topic: string, handler: (payload: string) => void): () => void {
+    this.listen();
+    const handlers =
+      this.handlers.get(topic) ?? new Set<(payload: string) => void>();
+    this.handlers.set(topic, handlers);
+    handlers.add(handler);
+    return () => handlers.delete(handler);
+  }
+
+  // What this worker answers when any worker gathers `topic`
+  provide(topic: string, provider: Provider) {
+    this.listen();
+    this.providers.set(topic, provider);
+  }
+
+  // Every worker's answer for `topic`, this one's included. A worker that
+  // does not answer in time is left out rather than failing the call.
+  gather(topic: string): Promise<WorkerReport[]> {
+    if (!this.transport) {
+      return Promise.resolve([]);
+    }
+    this.listen();
+    const id = ++this.nextId;
+    return new Promise<WorkerReport[]>((resolve) => {
+      const timer = setTimeout(() => {
+        this.pending.delete(id);
+        resolve([]);
+      }, GATHER_TIMEOUT_MS * 2);
+      this.pending.set(id, (reports) => {
+        clearTimeout(timer);
+        resolve(reports);
+      });
+      this.transport?.send({ walle: 'gather', id, topic });
+    });
+  }
+
+  private listen() {
+    if (this.listening || !this.transport) {
+      return;
+    }
+    this.listening = true;
+    this.transport.onMessage((message) => void this.receive(message));
+  }
+
+  private async receive(message: unknown) {
+    if (!isClusterMessage(message)) {
+      return;
+    }
+    switch (message.walle) {
+      case 'broadcast':
+        for (const handler of this.handlers.get(message.topic) ?? []) {
+          handler(message.payload);
+        }
+        break;
+      case 'collect': {
+        const provider = this.providers.get(message.topic);
+        let value: string | undefined;
+        try {
+          value = provider ? await provider() : undefined;
+        } catch (error) {
+          console.error(`Cluster gather of ${message.topic} failed:`, error);
+        }
+        this.transport?.send({ walle: 'report', id: message.id, value });
+        break;
+      }
+      case 'gathered':
+        this.pending.get(message.id)?.(message.reports);
+        this.pending.delete(message.id);
+        break;
+    }
+  }
+}
+
+function workerTransport(): ClusterTransport | null {
+  if (!cluster.isWorker || typeof process.send !== 'function') {
+    return null;
+  }
+  return {
+    send: (message) => process.send?.(message),
+    onMessage: (handler) => process.on('message', handler),
+  };
+}
+
+export const clusterBus = new ClusterBus();
+
+// Primary side: forwards broadcasts to the other workers, and answers a
+// worker's gather by collecting from every live worker.
+export function relayClusterMessages(primary: Cluster = cluster) {
+  const gathers = new Map<
+    number,
+    { waiting: Set<number>; reports: WorkerReport[]; finish: () => void }
+  >();
+  let nextGather = 0;
+
+  const workers = () =>
+    Object.values(primary.workers ?? {}).filter(
+      (worker): worker is Worker => !!worker && worker.isConnected(),
+    );
+
+  primary.on('message', (sender: Worker, message: unknown) => {
+    if (!isClusterMessage(message)) {
+      return;
+    }
+
+    if (message.walle === 'broadcast') {
+      for (const worker of workers()) {
+        if (worker !== sender) {
+          worker.send(message);
+        }
+      }
+      return;
+    }
+
+    if (message.walle === 'gather') {
+      const id = ++nextGather;
+      const requestId = message.id;
+      const targets = workers();
+      const reports: WorkerReport[] = [];
+      const finish = () => {
+        clearTimeout(timer);
+        gathers.delete(id);
+        if (sender.isConnected()) {
+          sender.send({
+            walle: 'gathered',
+            id: requestId,
+            reports: reports.sort((a, b) => a.worker - b.worker),
+          });
+        }
+      };
+      const timer = setTimeout(finish, GATHER_TIMEOUT_MS);
+      gathers.set(id, {
+        waiting: new Set(targets.map((worker) => worker.id)),
+        reports,
+        finish,
+      });
+      for (const worker of targets) {
+        worker.send({ walle: 'collect', id, topic: message.topic });
+      }
+      if (targets.length === 0) {
+        finish();
+      }
+      return;
+    }
+
+    if (message.walle === 'report') {
+      const gather = gathers.get(message.id);
+      if (!gather || !gather.waiting.delete(sender.id)) {
+        return;
+      }
+      if (message.value !== undefined) {
+        gather.reports.push({ worker: sender.id, value: message.value });
+      }
+      if (gather.waiting.size === 0) {
+        gather.finish();
+      }
+    }
+  });
+}
@@ -3,6 +3,7 @@ import {
   Catch,
   ArgumentsHost,
   HttpException,
+  HttpStatus,
 } from '@nestjs/common';
 import { Response } from 'express';
 
@@ -24,6 +25,14 @@ export class HttpExceptionFilter implements ExceptionFilter {
       statusCode: status,
     };
 
+    // Overload and open circuits are temporary; tell clients when to retry
+    if (
+      status === HttpStatus.SERVICE_UNAVAILABLE &&
+      !response.getHeader('Retry-After')
+    ) {
+      response.setHeader('Retry-After', '1');
+    }
+
     response.status(status).json(errorResponse);
   }
 }
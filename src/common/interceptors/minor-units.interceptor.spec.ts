@@ -0,0 +1,24 @@
+import { toMajorUnits } from './minor-units.interceptor';
+
+describe('toMajorUnits', () => {
+  it('should render nested bigint amounts as major units', () => {
+    const createdAt = new Date('2026-01-01T00:00:00.000Z');
+
+    expect(
+      toMajorUnits({
+        balance: 520000n,
+        allTransactions: [{ id: 'tx-1', amount: 1999n, createdAt }],
+        nextCursor: null,
+      }),
+    ).toEqual({
+      balance: 5200,
+      allTransactions: [{ id: 'tx-1', amount: 19.99, createdAt }],
+      nextCursor: null,
+    });
+  });
+
+  it('should leave non-bigint values untouched', () => {
+    expect(toMajorUnits('ok')).toBe('ok');
+    expect(toMajorUnits(undefined)).toBeUndefined();
+  });
+});
@@ -0,0 +1,43 @@
+import {
+  CallHandler,
+  ExecutionContext,
+  Injectable,
+  NestInterceptor,
+} from '@nestjs/common';
+import { Observable, map } from 'rxjs';
+import { fromMinorUnits } from '../money/money';
+
+// Every BigInt column in the schema is a minor-unit amount, so any bigint in
+// a response body is rendered back as decimal major units. This also keeps
+// JSON.stringify from throwing on BigInt values.
+@Injectable()
+export class MinorUnitsInterceptor implements NestInterceptor {
+  intercept(_context: ExecutionContext, next: CallHandler): Observable<any> {
+    return next.handle().pipe(map((body) => toMajorUnits(body)));
+  }
+}
+
+export function toMajorUnits(value: unknown): unknown {
+  if (typeof value === 'bigint') {
+    return fromMinorUnits(value);
+  }
+  if (Array.isArray(value)) {
+    return value.map(toMajorUnits);
+  }
+  if (isPlainObject(value)) {
+    const result: Record<string, unknown> = {};
+    for (const [key, entry] of Object.entries(value)) {
+      result[key] = toMajorUnits(entry);
+    }
+    return result;
+  }
+  return value;
+}
+
+function isPlainObject(value: unknown): value is Record<string, unknown> {
+  if (value === null || typeof value !== 'object') {
+    return false;
+  }
+  const prototype = Object.getPrototypeOf(value);
+  return prototype === Object.prototype || prototype === null;
+}
@@ -0,0 +1,25 @@
+import { fromMinorUnits, toMinorUnits } from './money';
+
+describe('money', () => {
+  it('should convert major units to rounded minor units', () => {
+    expect(toMinorUnits(100)).toBe(10000n);
+    expect(toMinorUnits(0.1 + 0.2)).toBe(30n);
+    expect(toMinorUnits(123.456)).toBe(12346n);
+    expect(toMinorUnits(0.004)).toBe(0n);
+  });
+
+  it('should convert minor units back to major units', () => {
+    expect(fromMinorUnits(12346n)).toBe(123.46);
+    expect(fromMinorUnits(0n)).toBe(0);
+  });
+
+  it('should sum exactly in minor units', () => {
+    const total = Array.from({ length: 1000 }, () => toMinorUnits(0.1)).reduce(
+      (sum, amount) => sum + amount,
+      0n,
+    );
+
+    expect(total).toBe(10000n);
+    expect(fromMinorUnits(total)).toBe(100);
+  });
+});
@@ -0,0 +1,13 @@
+// Money is stored as BigInt minor units (cents). The HTTP API keeps speaking
+// decimal major units, so conversion happens where DTOs enter a service and
+// where responses leave the app (see MinorUnitsInterceptor).
+export const MINOR_UNITS_PER_MAJOR = 100;
+
+// Rounds to the nearest minor unit, e.g. 123.456 -> 12346n
+export function toMinorUnits(amount: number): bigint {
+  return BigInt(Math.round(amount * MINOR_UNITS_PER_MAJOR));
+}
+
+export function fromMinorUnits(amount: bigint): number {
+  return Number(amount) / MINOR_UNITS_PER_MAJOR;
+}
@@ -0,0 +1,52 @@
+import { INestApplication } from '@nestjs/common';
+import { Server } from 'http';
+
+const DEFAULT_SHUTDOWN_TIMEOUT_MS = 25000;
+
+export function shutdownTimeoutMs(env = process.env): number {
+  const value = Number(env.SHUTDOWN_TIMEOUT_MS);
+  return Number.isFinite(value) && value > 0
+    ? value
+    : DEFAULT_SHUTDOWN_TIMEOUT_MS;
+}
+
+// On SIGTERM/SIGINT: stop accepting connections, let in-flight requests
+// finish, then close the app so providers run their destroy hooks (the DEBIN
+// worker finishes its batch, Prisma waits for open transactions). Nest's own
+// shutdown hooks run those before closing the server, which would pull the
+// database out from under requests still being served.
+export function enableGracefulShutdown(
+  app: INestApplication,
+  timeoutMs = shutdownTimeoutMs(),
+) {
+  const server = app.getHttpServer() as Server;
+  let closing = false;
+
+  const shutdown = async () => {
+    if (closing) {
+      return;
+    }
+    closing = true;
+
+    // Long-lived connections (balance streams) never end on their own
+    const deadline = setTimeout(() => server.closeAllConnections(), timeoutMs);
+    deadline.unref();
+
+    await new Promise<void>((resolve) => {
+      server.close(() => resolve());
+      server.closeIdleConnections();
+    });
+    clearTimeout(deadline);
+
+    try {
+      await app.close();
+      process.exit(0);
+    } catch (error) {
+      console.error('Error during shutdown:', error);
+      process.exit(1);
+    }
+  };
+
+  process.once('SIGTERM', () => void shutdown());
+  process.once('SIGINT', () => void shutdown());
+}
@@ -13,6 +13,10 @@ export interface BankTransferResponse {
 export interface DebinRequest {
   amount: number;
   toWalletId: string;
+  // Same value on every attempt for one debit (the DebinRequest id). The
+  // bank answers a repeated key with the original outcome instead of
+  // debiting the account again, so a retry after a lost reply is safe.
+  idempotencyKey?: string;
 }
 
 export interface DebinResponse {
@@ -0,0 +1,188 @@
+import { ConfigService } from '@nestjs/config';
+import { AxiosError } from 'axios';
+import * as http from 'http';
+import { AddressInfo } from 'net';
+import { BankHttpClient } from './bank-http.client';
+import { BANK_API_ENDPOINTS } from './bank-api.interface';
+import { CircuitOpenError } from './circuit-breaker';
+import { LimiterRejectedError } from './concurrency-limiter';
+import { MetricsService } from '../metrics/metrics.service';
+
+// Local stand-in for the external bank serving the BANK_API_ENDPOINTS routes.
+// `behaviour` lets each test decide how the next requests are answered.
+type Behaviour = 'ok' | 'decline' | 'error' | 'slow';
+
+describe('BankHttpClient', () => {
+  let server: http.Server;
+  let baseUrl: string;
+  let behaviour: Behaviour;
+  let client: BankHttpClient;
+
+  const createClient = (
+    settings: Record<string, string | number> = {},
+    metricsService?: MetricsService,
+  ) =>
+    new BankHttpClient(
+      {
+        get: (key: string) =>
+          key === 'BANK_API_URL' ? baseUrl : settings[key],
+      } as unknown as ConfigService,
+      metricsService,
+    );
+
+  beforeAll(async () => {
+    server = http.createServer((req, res) => {
+      const reply = (status: number, body: unknown) => {
+        res.writeHead(status, { 'Content-Type': 'application/json' });
+        res.end(JSON.stringify(body));
+      };
+
+      req.resume();
+      req.on('end', () => {
+        if (behaviour === 'slow') {
+          setTimeout(() => reply(200, { success: true }), 200);
+        } else if (behaviour === 'error') {
+          reply(503, { error: 'Bank unavailable' });
+        } else if (behaviour === 'decline') {
+          reply(400, { success: false, error: 'Transaction declined' });
+        } else if (req.url === BANK_API_ENDPOINTS.debin) {
+          reply(200, { approved: true, debinId: 'debin-1' });
+        } else {
+          reply(200, { success: true, transactionId: 'tx-1' });
+        }
+      });
+    });
+    await new Promise<void>((resolve) => server.listen(0, resolve));
+    baseUrl = `http://127.0.0.1:${(server.address() as AddressInfo).port}`;
+  });
+
+  afterAll(async () => {
+    await new Promise<void>((resolve) => server.close(() => resolve()));
+  });
+
+  beforeEach(() => {
+    behaviour = 'ok';
+  });
+
+  afterEach(() => {
+    client?.onModuleDestroy();
+  });
+
+  it('should post to the bank and reuse keep-alive sockets', async () => {
+    client = createClient();
+
+    const transfer = await client.post(BANK_API_ENDPOINTS.transfer, {
+      amount: 10,
+    });
+    const debin = await client.post(BANK_API_ENDPOINTS.debin, { amount: 10 });
+
+    expect(transfer).toEqual({ success: true, transactionId: 'tx-1' });
+    expect(debin).toEqual({ approved: true, debinId: 'debin-1' });
+    expect(client.metrics()).toMatchObject({
+      requests: 2,
+      reusedSockets: 1,
+      failures: 0,
+      breakerState: 'CLOSED',
+    });
+  });
+
+  it('should not count a business rejection as a bank failure', async () => {
+    client = createClient({ BANK_BREAKER_FAILURE_THRESHOLD: 1 });
+    behaviour = 'decline';
+
+    await expect(
+      client.post(BANK_API_ENDPOINTS.transfer, {}),
+    ).rejects.toBeInstanceOf(AxiosError);
+
+    expect(client.metrics()).toMatchObject({
+      failures: 0,
+      breakerState: 'CLOSED',
+    });
+  });
+
+  it('should time out slow bank calls', async () => {
+    client = createClient({ BANK_API_TIMEOUT_MS: 50 });
+    behaviour = 'slow';
+
+    await expect(
+      client.post(BANK_API_ENDPOINTS.transfer, {}),
+    ).rejects.toMatchObject({ code: 'ECONNABORTED' });
+
+    expect(client.metrics()).toMatchObject({ timeouts: 1, failures: 1 });
+  });
+
+  it('should open the breaker and fail fast after repeated 5xx', async () => {
+    client = createClient({
+      BANK_BREAKER_FAILURE_THRESHOLD: 2,
+      BANK_BREAKER_RESET_MS: 60000,
+    });
+    behaviour = 'error';
+
+    for (let i = 0; i < 2; i++) {
+      await expect(
+        client.post(BANK_API_ENDPOINTS.transfer, {}),
+      ).rejects.toBeInstanceOf(AxiosError);
+    }
+    await expect(
+      client.post(BANK_API_ENDPOINTS.transfer, {}),
+    ).rejects.toBeInstanceOf(CircuitOpenError);
+
+    expect(client.metrics()).toMatchObject({
+      requests: 2,
+      failures: 2,
+      rejected: 1,
+      breakerState: 'OPEN',
+      breakerOpenedCount: 1,
+    });
+  });
+
+  it('should export socket reuse and breaker state on /metrics', async () => {
+    const metricsService = new MetricsService();
+    client = createClient(
+      { BANK_BREAKER_FAILURE_THRESHOLD: 1, BANK_BREAKER_RESET_MS: 60000 },
+      metricsService,
+    );
+
+    await client.post(BANK_API_ENDPOINTS.transfer, {});
+    await client.post(BANK_API_ENDPOINTS.transfer, {});
+    behaviour = 'error';
+    await expect(
+      client.post(BANK_API_ENDPOINTS.transfer, {}),
+    ).rejects.toBeInstanceOf(AxiosError);
+
+    const lines = metricsService.render().split('\n');
+    expect(lines).toEqual(
+      expect.arrayContaining([
+        'bank_client_requests_total{socket="reused"} 2',
+        'bank_client_requests_total{socket="new"} 1',
+        'bank_client_errors_total{kind="failure"} 1',
+        'bank_client_slots{state="in_flight"} 0',
+        'bank_circuit_breaker_state{state="OPEN"} 1',
+        'bank_circuit_breaker_state{state="CLOSED"} 0',
+        'bank_circuit_breaker_opened_total 1',
+      ]),
+    );
+  });
+
+  it('should shed calls beyond the queue bound', async () => {
+    client = createClient({
+      BANK_API_MAX_CONCURRENCY: 1,
+      BANK_API_MAX_QUEUED: 1,
+    });
+    behaviour = 'slow';
+
+    const calls = [1, 2, 3].map(() =>
+      client.post(BANK_API_ENDPOINTS.transfer, {}),
+    );
+    const results = await Promise.allSettled(calls);
+
+    expect(results.map((r) => r.status)).toEqual([
+      'fulfilled',
+      'fulfilled',
+      'rejected',
+    ]);
+    expect((results[2] as PromiseRejectedResult).reason).toBeInstanceOf(
+      LimiterRejectedError,
+    );
+  });
+});
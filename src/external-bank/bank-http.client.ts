@@ -0,0 +1,192 @@
+import { Injectable, OnModuleDestroy, Optional } from '@nestjs/common';
+import { ConfigService } from '@nestjs/config';
+import axios, { AxiosInstance } from 'axios';
+import * as http from 'http';
+import * as https from 'https';
+import { CircuitBreaker, CircuitState } from './circuit-breaker';
+import { ConcurrencyLimiter } from './concurrency-limiter';
+import { MetricsService } from '../metrics/metrics.service';
+import { tracer } from '../tracing/tracer';
+
+export interface BankClientMetrics {
+  requests: number;
+  reusedSockets: number;
+  failures: number;
+  timeouts: number;
+  rejected: number;
+  inFlight: number;
+  queued: number;
+  openSockets: number;
+  freeSockets: number;
+  breakerState: CircuitState;
+  breakerOpenedCount: number;
+}
+
+// Dedicated HTTP client for the external bank: keep-alive agents with a
+// bounded socket pool, a per-call deadline that covers queueing and the
+// request itself, a concurrency limiter and a circuit breaker.
+@Injectable()
+export class BankHttpClient implements OnModuleDestroy {
+  private readonly http: AxiosInstance;
+  private readonly httpAgent: http.Agent;
+  private readonly httpsAgent: https.Agent;
+  private readonly breaker: CircuitBreaker;
+  private readonly limiter: ConcurrencyLimiter;
+  private readonly timeoutMs: number;
+
+  private requests = 0;
+  private reusedSockets = 0;
+  private failures = 0;
+  private timeouts = 0;
+  private rejected = 0;
+
+  constructor(
+    private readonly configService: ConfigService,
+    @Optional() private readonly metricsService?: MetricsService,
+  ) {
+    const maxSockets = this.numberSetting('BANK_API_MAX_SOCKETS', 50);
+    const agentOptions = {
+      keepAlive: true,
+      maxSockets,
+      maxFreeSockets: Math.max(1, Math.floor(maxSockets / 2)),
+    };
+    this.httpAgent = new http.Agent(agentOptions);
+    this.httpsAgent = new https.Agent(agentOptions);
+
+    this.timeoutMs = this.numberSetting('BANK_API_TIMEOUT_MS', 5000);
+    this.http = axios.create({
+      baseURL:
+        this.configService.get<string>('BANK_API_URL') ||
+        'http://eva-bank:3001',
+      timeout: this.timeoutMs,
+      httpAgent: this.httpAgent,
+      httpsAgent: this.httpsAgent,
+    });
+
+    this.limiter = new ConcurrencyLimiter(
+      this.numberSetting('BANK_API_MAX_CONCURRENCY', maxSockets),
+      this.numberSetting('BANK_API_MAX_QUEUED', maxSockets * 2),
+    );
+    this.breaker = new CircuitBreaker({
+      failureThreshold: this.numberSetting(
+        'BANK_BREAKER_FAILURE_THRESHOLD',
+        5,
+      ),
+      resetTimeoutMs: this.numberSetting('BANK_BREAKER_RESET_MS', 10000),
+    });
+
+    this.metricsService?.watchBankClient(() => this.metrics());
+  }
+
+  // Rejects with CircuitOpenError / LimiterRejectedError when the bank is
+  // considered unhealthy or saturated, and with the AxiosError otherwise.
+  post<T>(path: string, body: unknown): Promise<T> {
+    return tracer.trace(`bank POST ${path}`, () => this.send<T>(path, body), {
+      kind: 'client',
+      attributes: { 'http.request.method': 'POST', 'url.path': path },
+    });
+  }
+
+  private async send<T>(path: string, body: unknown): Promise<T> {
+    const deadline = Date.now() + this.timeoutMs;
+    const stop = this.metricsService?.bankRequestDuration.startTimer({ path });
+
+    try {
+      // The limiter wraps the breaker so that local queue rejections never
+      // count for or against the bank's health.
+      const data = await this.limiter.run(
+        () =>
+          this.breaker.execute(async () => {
+            const remaining = Math.max(1, deadline - Date.now());
+            this.requests++;
+            const response = await this.http.post<T>(path, body, {
+              timeout: remaining,
+            });
+            if (response.request?.reusedSocket) {
+              this.reusedSockets++;
+            }
+            return response.data;
+          }, isBankFailure),
+        this.timeoutMs,
+      );
+      stop?.({ outcome: 'success' });
+      return data;
+    } catch (error) {
+      stop?.({ outcome: bankOutcome(error) });
+      if (axios.isAxiosError(error)) {
+        if (isBankTimeout(error)) {
+          this.timeouts++;
+        }
+        if (isBankFailure(error)) {
+          this.failures++;
+        }
+      } else {
+        this.rejected++;
+      }
+      throw error;
+    }
+  }
+
+  metrics(): BankClientMetrics {
+    return {
+      requests: this.requests,
+      reusedSockets: this.reusedSockets,
+      failures: this.failures,
+      timeouts: this.timeouts,
+      rejected: this.rejected,
+      inFlight: this.limiter.inFlight,
+      queued: this.limiter.queued,
+      openSockets:
+        countSockets(this.httpAgent.sockets) +
+        countSockets(this.httpsAgent.sockets),
+      freeSockets:
+        countSockets(this.httpAgent.freeSockets) +
+        countSockets(this.httpsAgent.freeSockets),
+      breakerState: this.breaker.getState(),
+      breakerOpenedCount: this.breaker.getTimesOpened(),
+    };
+  }
+
+  onModuleDestroy() {
+    this.httpAgent.destroy();
+    this.httpsAgent.destroy();
+  }
+
+  private numberSetting(key: string, fallback: number): number {
+    const value = Number(this.configService.get(key));
+    return Number.isFinite(value) && value > 0 ? value : fallback;
+  }
+}
+
+// Only transport errors, timeouts and 5xx count against the bank's health;
+// a 4xx is a business answer (e.g. a declined transfer).
+function isBankFailure(error: unknown): boolean {
+  if (!axios.isAxiosError(error)) {
+    return false;
+  }
+  return !error.response || error.response.status >= 500;
+}
+
+function bankOutcome(error: unknown): string {
+  if (!axios.isAxiosError(error)) {
+    return 'rejected';
+  }
+  if (isBankTimeout(error)) {
+    return 'timeout';
+  }
+  return error.response ? `http_${error.response.status}` : 'network_error';
+}
+
+export function isBankTimeout(error: unknown): boolean {
+  return (
+    axios.isAxiosError(error) &&
+    (error.code === 'ECONNABORTED' || error.code === 'ETIMEDOUT')
+  );
+}
+
+function countSockets(pool: NodeJS.ReadOnlyDict<unknown[]>): number {
+  return Object.values(pool).reduce<number>(
+    (total, sockets) => total + (sockets?.length ?? 0),
+    0,
+  );
+}
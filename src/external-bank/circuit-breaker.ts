@@ -0,0 +1,91 @@
+export type CircuitState = 'CLOSED' | 'OPEN' | 'HALF_OPEN';
+
+export interface CircuitBreakerOptions {
+  // Consecutive failures that trip the breaker
+  failureThreshold: number;
+  // How long the breaker stays open before letting a trial call through
+  resetTimeoutMs: number;
+}
+
+export class CircuitOpenError extends Error {
+  constructor() {
+    super('Circuit breaker is open');
+    this.name = 'CircuitOpenError';
+  }
+}
+
+// Classic three-state breaker: CLOSED counts consecutive failures, OPEN fails
+// fast until resetTimeoutMs elapses, then HALF_OPEN lets a single trial call
+// decide whether to close again or re-open.
+export class CircuitBreaker {
+  private state: CircuitState = 'CLOSED';
+  private consecutiveFailures = 0;
+  private openedAt = 0;
+  private trialInFlight = false;
+  private timesOpened = 0;
+
+  constructor(private readonly options: CircuitBreakerOptions) {}
+
+  getState(): CircuitState {
+    if (
+      this.state === 'OPEN' &&
+      Date.now() - this.openedAt >= this.options.resetTimeoutMs
+    ) {
+      this.state = 'HALF_OPEN';
+    }
+    return this.state;
+  }
+
+  getTimesOpened(): number {
+    return this.timesOpened;
+  }
+
+  async execute<T>(
+    fn: () => Promise<T>,
+    isFailure: (error: unknown) => boolean = () => true,
+  ): Promise<T> {
+    const state = this.getState();
+    if (state === 'OPEN' || (state === 'HALF_OPEN' && this.trialInFlight)) {
+      throw new CircuitOpenError();
+    }
+
+    const isTrial = state === 'HALF_OPEN';
+    if (isTrial) {
+      this.trialInFlight = true;
+    }
+
+    try {
+      const result = await fn();
+      this.onSuccess();
+      return result;
+    } catch (error) {
+      if (isFailure(error)) {
+        this.onFailure();
+      } else {
+        this.onSuccess();
+      }
+      throw error;
+    } finally {
+      if (isTrial) {
+        this.trialInFlight = false;
+      }
+    }
+  }
+
+  private onSuccess() {
+    this.consecutiveFailures = 0;
+    this.state = 'CLOSED';
+  }
+
+  private onFailure() {
+    this.consecutiveFailures++;
+    if (
+      this.state === 'HALF_OPEN' ||
+      this.consecutiveFailures >= this.options.failureThreshold
+    ) {
+      this.state = 'OPEN';
+      this.openedAt = Date.now();
+      this.timesOpened++;
+    }
+  }
+}
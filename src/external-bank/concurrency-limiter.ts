@@ -0,0 +1,79 @@
+export class LimiterRejectedError extends Error {
+  constructor(reason: 'queue_full' | 'deadline_exceeded') {
+    super(
+      reason === 'queue_full'
+        ? 'Too many pending requests'
+        : 'Deadline exceeded while waiting for a free slot',
+    );
+    this.name = 'LimiterRejectedError';
+  }
+}
+
+interface Waiter {
+  grant: () => void;
+  timer?: NodeJS.Timeout;
+}
+
+// Caps in-flight work at maxConcurrent and queues at most maxQueued callers;
+// anything beyond that is rejected immediately instead of piling up.
+export class ConcurrencyLimiter {
+  private active = 0;
+  private readonly waiters: Waiter[] = [];
+
+  constructor(
+    private readonly maxConcurrent: number,
+    private readonly maxQueued: number,
+  ) {}
+
+  get inFlight(): number {
+    return this.active;
+  }
+
+  get queued(): number {
+    return this.waiters.length;
+  }
+
+  async run<T>(fn: () => Promise<T>, waitTimeoutMs?: number): Promise<T> {
+    await this.acquire(waitTimeoutMs);
+    try {
+      return await fn();
+    } finally {
+      this.release();
+    }
+  }
+
+  private acquire(waitTimeoutMs?: number): Promise<void> {
+    if (this.active < this.maxConcurrent) {
+      this.active++;
+      return Promise.resolve();
+    }
+    if (this.waiters.length >= this.maxQueued) {
+      return Promise.reject(new LimiterRejectedError('queue_full'));
+    }
+
+    return new Promise<void>((resolve, reject) => {
+      const waiter: Waiter = { grant: resolve };
+      if (waitTimeoutMs !== undefined) {
+        waiter.timer = setTimeout(() => {
+          const index = this.waiters.indexOf(waiter);
+          if (index !== -1) {
+            this.waiters.splice(index, 1);
+            reject(new LimiterRejectedError('deadline_exceeded'));
+          }
+        }, waitTimeoutMs);
+      }
+      this.waiters.push(waiter);
+    });
+  }
+
+  private release() {
+    const next = this.waiters.shift();
+    if (next) {
+      // Hand the slot straight to the next waiter; `active` stays the same
+      clearTimeout(next.timer);
+      next.grant();
+    } else {
+      this.active--;
+    }
+  }
+}
@@ -13,7 +13,10 @@ export class ExternalBankController {
   }
 
   @Post('/debin-request')
-  async simulateDebin(@Body() data: { amount: number; toWalletId: string }) {
+  async simulateDebin(
+    @Body()
+    data: { amount: number; toWalletId: string; idempotencyKey?: string },
+  ) {
     return this.externalBankService.ExecuteDebin(data);
   }
 
@@ -1,14 +1,23 @@
 import { Module } from '@nestjs/common';
 import { ConfigModule } from '@nestjs/config';
 import { ExternalBankService } from './external-bank.service';
+import { BankHttpClient } from './bank-http.client';
 import { ExternalBankController } from './external-bank.controller';
 import { UsersModule } from '../users/users.module';
 import { PrismaModule } from '../prisma/prisma.module';
+import { SystemAccountsModule } from '../system-accounts/system-accounts.module';
+import { WalletCommandsModule } from '../wallet-commands/wallet-commands.module';
 
 @Module({
-  imports: [ConfigModule, UsersModule, PrismaModule],
+  imports: [
+    ConfigModule,
+    UsersModule,
+    PrismaModule,
+    SystemAccountsModule,
+    WalletCommandsModule,
+  ],
   controllers: [ExternalBankController],
-  providers: [ExternalBankService],
+  providers: [ExternalBankService, BankHttpClient],
   exports: [ExternalBankService],
 })
 export class ExternalBankModule {}
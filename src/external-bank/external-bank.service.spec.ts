@@ -1,21 +1,28 @@
 import { Test, TestingModule } from '@nestjs/testing';
-import axios from 'axios';
-import { ConfigService } from '@nestjs/config';
+import { AxiosError, AxiosResponse } from 'axios';
 import { ExternalBankService } from './external-bank.service';
-import { HttpException } from '@nestjs/common';
+import { HttpException, HttpStatus } from '@nestjs/common';
 import { BANK_API_ENDPOINTS } from './bank-api.interface';
 import { UsersService } from '../users/users.service';
 import { PrismaService } from '../prisma/prisma.service';
-
-// Mock axios
-jest.mock('axios');
-const mockedAxios = axios as jest.Mocked<typeof axios>;
+import { SystemAccountsService } from '../system-accounts/system-accounts.service';
+import { BankHttpClient } from './bank-http.client';
+import { CircuitOpenError } from './circuit-breaker';
+import { LimiterRejectedError } from './concurrency-limiter';
+import { WalletCommandQueue } from '../wallet-commands/wallet-command-queue';
+
+function bankError(status: number, data: unknown): AxiosError {
+  return new AxiosError('Request failed', 'ERR_BAD_REQUEST', undefined, null, {
+    status,
+    data,
+  } as AxiosResponse);
+}
 
 describe('ExternalBankService', () => {
   let service: ExternalBankService;
 
-  const mockConfigService = {
-    get: jest.fn().mockReturnValue('http://bank-service:3001'),
+  const mockBankClient = {
+    post: jest.fn(),
   };
 
   const mockUsersService = {
@@ -37,13 +44,21 @@ describe('ExternalBankService', () => {
     $transaction: jest.fn(),
   };
 
+  const mockSystemAccountsService = {
+    withSystemWallet: jest.fn((fn) => fn('system-wallet-id')),
+  };
+
+  const mockWalletCommandQueue = {
+    credit: jest.fn(),
+  };
+
   beforeEach(async () => {
     const module: TestingModule = await Test.createTestingModule({
       providers: [
         ExternalBankService,
         {
-          provide: ConfigService,
-          useValue: mockConfigService,
+          provide: BankHttpClient,
+          useValue: mockBankClient,
         },
         {
           provide: UsersService,
@@ -53,6 +68,14 @@ describe('ExternalBankService', () => {
           provide: PrismaService,
           useValue: mockPrismaService,
         },
+        {
+          provide: SystemAccountsService,
+          useValue: mockSystemAccountsService,
+        },
+        {
+          provide: WalletCommandQueue,
+          useValue: mockWalletCommandQueue,
+        },
       ],
     }).compile();
 
@@ -69,40 +92,48 @@ describe('ExternalBankService', () => {
 
     it('should successfully process a transfer', async () => {
       const mockResponse = {
-        data: {
-          success: true,
-          transactionId: 'test-tx-id',
-        },
+        success: true,
+        transactionId: 'test-tx-id',
       };
 
-      mockedAxios.post.mockResolvedValue(mockResponse);
+      mockBankClient.post.mockResolvedValue(mockResponse);
 
       const result = await service.Transfer(transferRequest);
 
-      expect(result).toEqual(mockResponse.data);
-      expect(mockedAxios.post).toHaveBeenCalledWith(
-        `http://bank-service:3001${BANK_API_ENDPOINTS.transfer}`,
+      expect(result).toEqual(mockResponse);
+      expect(mockBankClient.post).toHaveBeenCalledWith(
+        BANK_API_ENDPOINTS.transfer,
         transferRequest,
       );
     });
 
     it('should handle transfer failure', async () => {
-      const errorResponse = {
-        response: {
-          data: {
-            success: false,
-            error: 'Transaction declined',
-          },
-          status: 400,
-        },
-      };
+      mockBankClient.post.mockRejectedValue(
+        bankError(400, { success: false, error: 'Transaction declined' }),
+      );
 
-      mockedAxios.post.mockRejectedValue(errorResponse);
-      mockedAxios.isAxiosError.mockReturnValue(true);
+      await expect(service.Transfer(transferRequest)).rejects.toMatchObject({
+        message: 'Transaction declined',
+        status: HttpStatus.BAD_REQUEST,
+      });
+    });
 
-      await expect(() => service.Transfer(transferRequest)).rejects.toThrow(
-        HttpException,
+    it('should map a bank timeout to 504', async () => {
+      mockBankClient.post.mockRejectedValue(
+        new AxiosError('timeout exceeded', 'ECONNABORTED'),
       );
+
+      await expect(service.Transfer(transferRequest)).rejects.toMatchObject({
+        status: HttpStatus.GATEWAY_TIMEOUT,
+      });
+    });
+
+    it('should map an open circuit to 503', async () => {
+      mockBankClient.post.mockRejectedValue(new CircuitOpenError());
+
+      await expect(service.Transfer(transferRequest)).rejects.toMatchObject({
+        status: HttpStatus.SERVICE_UNAVAILABLE,
+      });
     });
   });
 
@@ -114,39 +145,78 @@ describe('ExternalBankService', () => {
 
     it('should successfully process a DEBIN request', async () => {
       const mockResponse = {
-        data: {
-          approved: true,
-          debinId: 'test-debin-id',
-        },
+        approved: true,
+        debinId: 'test-debin-id',
       };
 
-      mockedAxios.post.mockResolvedValue(mockResponse);
+      mockBankClient.post.mockResolvedValue(mockResponse);
 
       const result = await service.ExecuteDebin(debinRequest);
 
-      expect(result).toEqual(mockResponse.data);
-      expect(mockedAxios.post).toHaveBeenCalledWith(
-        `http://bank-service:3001${BANK_API_ENDPOINTS.debin}`,
+      expect(result).toEqual(mockResponse);
+      expect(mockBankClient.post).toHaveBeenCalledWith(
+        BANK_API_ENDPOINTS.debin,
         debinRequest,
       );
     });
 
     it('should handle DEBIN failure', async () => {
-      const errorResponse = {
-        response: {
-          data: {
-            approved: false,
-            error: 'DEBIN request rejected',
-          },
-          status: 400,
-        },
-      };
-
-      mockedAxios.post.mockRejectedValue(errorResponse);
-      mockedAxios.isAxiosError.mockReturnValue(true);
+      mockBankClient.post.mockRejectedValue(
+        bankError(400, { approved: false, error: 'DEBIN request rejected' }),
+      );
 
       const debinPromise = () => service.ExecuteDebin(debinRequest);
       await expect(debinPromise()).rejects.toThrow(HttpException);
     });
+
+    it('should map a saturated bank client to 503', async () => {
+      mockBankClient.post.mockRejectedValue(
+        new LimiterRejectedError('queue_full'),
+      );
+
+      await expect(service.ExecuteDebin(debinRequest)).rejects.toMatchObject({
+        status: HttpStatus.SERVICE_UNAVAILABLE,
+      });
+    });
+  });
+
+  describe('depositMoney', () => {
+    const deposit = { amount: 25.5, alias: 'bank.user', source: 'eva-bank' };
+
+    it('should credit the wallet through the command queue', async () => {
+      mockUsersService.findByAlias.mockResolvedValue({ id: 'user-1' });
+      mockPrismaService.wallet.findUnique.mockResolvedValue({
+        id: 'wallet-1',
+        userId: 'user-1',
+      });
+      mockWalletCommandQueue.credit.mockResolvedValue({
+        transaction: { id: 'tx-1' },
+        balance: 12550n,
+      });
+
+      const result = await service.depositMoney(deposit);
+
+      expect(result).toEqual({
+        success: true,
+        message: 'Money deposited successfully',
+        balance: 12550n,
+      });
+      expect(mockWalletCommandQueue.credit).toHaveBeenCalledWith('wallet-1', {
+        amount: 2550n,
+        description: 'External transfer from eva-bank',
+        senderWalletId: 'system-wallet-id',
+      });
+      // The system wallet's balance is never written
+      expect(mockPrismaService.wallet.update).not.toHaveBeenCalled();
+    });
+
+    it('should report an unknown alias without crediting', async () => {
+      mockUsersService.findByAlias.mockResolvedValue(null);
+
+      const result = await service.depositMoney(deposit);
+
+      expect(result.success).toBe(false);
+      expect(mockWalletCommandQueue.credit).not.toHaveBeenCalled();
+    });
   });
 });
@@ -1,12 +1,5 @@
-import {
-  Injectable,
-  HttpException,
-  HttpStatus,
-  Inject,
-  forwardRef,
-} from '@nestjs/common';
+import { Injectable, HttpException, HttpStatus } from '@nestjs/common';
 import axios from 'axios';
-import { ConfigService } from '@nestjs/config';
 import {
   BankTransferRequest,
   BankTransferResponse,
@@ -16,69 +9,62 @@ import {
 } from './bank-api.interface';
 import { UsersService } from '../users/users.service';
 import { PrismaService } from '../prisma/prisma.service';
+import { SystemAccountsService } from '../system-accounts/system-accounts.service';
+import { BankHttpClient, isBankTimeout } from './bank-http.client';
+import { CircuitOpenError } from './circuit-breaker';
+import { LimiterRejectedError } from './concurrency-limiter';
+import { toMinorUnits } from '../common/money/money';
+import { WalletCommandQueue } from '../wallet-commands/wallet-command-queue';
+import { Traced } from '../tracing/tracer';
 
 @Injectable()
 export class ExternalBankService {
-  private readonly bankApiUrl: string;
-
   constructor(
-    private readonly configService: ConfigService,
+    private readonly bankClient: BankHttpClient,
     private readonly usersService: UsersService,
     private readonly prisma: PrismaService,
-  ) {
-    this.bankApiUrl =
-      this.configService.get<string>('BANK_API_URL') || 'http://eva-bank:3001';
-  }
+    private readonly systemAccountsService: SystemAccountsService,
+    private readonly walletCommands: WalletCommandQueue,
+  ) {}
 
+  @Traced()
   async Transfer(data: BankTransferRequest): Promise<BankTransferResponse> {
     try {
-      const url = `${this.bankApiUrl}${BANK_API_ENDPOINTS.transfer}`;
-      console.log('🔍 Transfer URL:', url);
-      console.log('🔍 bankApiUrl:', this.bankApiUrl);
-      console.log(
-        '🔍 BANK_API_ENDPOINTS.transfer:',
+      return await this.bankClient.post<BankTransferResponse>(
         BANK_API_ENDPOINTS.transfer,
+        data,
       );
-
-      const response = await axios.post<BankTransferResponse>(url, data);
-      return response.data;
     } catch (error) {
-      if (axios.isAxiosError(error)) {
-        throw new HttpException(
-          error.response?.data?.error || 'External bank service error',
-          error.response?.status || HttpStatus.INTERNAL_SERVER_ERROR,
-        );
-      }
-      throw error;
+      throw toHttpException(error);
     }
   }
 
+  @Traced()
   async ExecuteDebin(data: DebinRequest): Promise<DebinResponse> {
     try {
-      const url = `${this.bankApiUrl}${BANK_API_ENDPOINTS.debin}`;
-      console.log('🔍 Debin URL:', url);
-      console.log('🔍 bankApiUrl:', this.bankApiUrl);
-      console.log('🔍 BANK_API_ENDPOINTS.debin:', BANK_API_ENDPOINTS.debin);
-
-      const response = await axios.post<DebinResponse>(url, data);
-      return response.data;
+      return await this.bankClient.post<DebinResponse>(
+        BANK_API_ENDPOINTS.debin,
+        data,
+      );
     } catch (error) {
-      if (axios.isAxiosError(error)) {
-        throw new HttpException(
-          error.response?.data?.error || 'External bank service error',
-          error.response?.status || HttpStatus.INTERNAL_SERVER_ERROR,
-        );
-      }
-      throw error;
+      throw toHttpException(error);
     }
   }
 
+  @Traced()
   async depositMoney(data: {
     amount: number;
     alias: string;
     source: string;
-  }): Promise<{ success: boolean; message?: string; error?: string }> {
+  }): Promise<{
+    success: boolean;
+    message?: string;
+    error?: string;
+    balance?: bigint;
+  }> {
     try {
+      const amount = toMinorUnits(data.amount);
+
       // Find user by alias
       const user = await this.usersService.findByAlias(data.alias);
       if (!user) {
@@ -99,70 +85,51 @@ export class ExternalBankService {
         };
       }
 
-      // Use a database transaction to ensure consistency
-      const result = await this.prisma.$transaction(async (prisma) => {
-        // Create or find system user
-        const systemUser = await prisma.user.upsert({
-          where: { email: 'system@walle.internal' },
-          update: {},
-          create: {
-            email: 'system@walle.internal',
-            alias: 'SYSTEM',
-            password: 'N/A',
-          },
-        });
-
-        // Create or find system wallet
-        const systemWallet =
-          (await prisma.wallet.findFirst({
-            where: { userId: systemUser.id },
-          })) ||
-          (await prisma.wallet.create({
-            data: {
-              userId: systemUser.id,
-              balance: 0,
-            },
-          }));
-
-        // Create the transaction
-        const transaction = await prisma.transaction.create({
-          data: {
-            amount: data.amount,
-            type: 'IN',
+      // Every external transfer can target the same account, so credits go
+      // through the per-wallet queue and are applied in batches. The system
+      // wallet is only the ledger counterparty; its balance is not written.
+      const { balance } = await this.systemAccountsService.withSystemWallet(
+        (systemWalletId) =>
+          this.walletCommands.credit(wallet.id, {
+            amount,
             description: `External transfer from ${data.source}`,
-            effectedWallet: {
-              connect: { id: wallet.id },
-            },
-            senderWallet: {
-              connect: { id: systemWallet.id },
-            },
-            receiverWallet: {
-              connect: { id: wallet.id },
-            },
-          },
-        });
-
-        // Update the wallet balance
-        const updatedWallet = await prisma.wallet.update({
-          where: { id: wallet.id },
-          data: {
-            balance: {
-              increment: data.amount,
-            },
-          },
-        });
-
-        return {
-          success: true,
-          message: 'Money deposited successfully',
-          balance: updatedWallet.balance,
-        };
-      });
+            senderWalletId: systemWalletId,
+          }),
+      );
 
-      return result;
+      return {
+        success: true,
+        message: 'Money deposited successfully',
+        balance,
+      };
     } catch (error) {
       console.error('Error depositing money:', error);
       return { success: false, error: 'Failed to deposit money' };
     }
   }
 }
+
+function toHttpException(error: unknown): unknown {
+  if (
+    error instanceof CircuitOpenError ||
+    error instanceof LimiterRejectedError
+  ) {
+    return new HttpException(
+      'External bank service unavailable',
+      HttpStatus.SERVICE_UNAVAILABLE,
+    );
+  }
+  if (axios.isAxiosError(error)) {
+    if (isBankTimeout(error)) {
+      return new HttpException(
+        'External bank service timed out',
+        HttpStatus.GATEWAY_TIMEOUT,
+      );
+    }
+    return new HttpException(
+      error.response?.data?.error || 'External bank service error',
+      error.response?.status || HttpStatus.INTERNAL_SERVER_ERROR,
+    );
+  }
+  return error;
+}
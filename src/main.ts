@@ -3,6 +3,8 @@ import { AppModule } from './app.module';
 import * as cookieParser from 'cookie-parser';
 import { ValidationPipe } from '@nestjs/common';
 import { HttpExceptionFilter } from './common/filters/http-exception.filter';
+import { enableGracefulShutdown } from './common/shutdown/graceful-shutdown';
+import { runClustered } from './cluster';
 
 async function bootstrap() {
   const app = await NestFactory.create(AppModule);
@@ -25,6 +27,8 @@ async function bootstrap() {
     credentials: true,
   });
 
+  enableGracefulShutdown(app);
+
   await app.listen(process.env.PORT ?? 3000);
 }
-void bootstrap();
+runClustered(bootstrap);
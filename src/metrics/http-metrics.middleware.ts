@@ -0,0 +1,25 @@
+import { Injectable, NestMiddleware } from '@nestjs/common';
+import { NextFunction, Request, Response } from 'express';
+import { MetricsService } from './metrics.service';
+
+// A middleware rather than an interceptor, so requests rejected by guards
+// and pipes are measured too. Routes are labelled by their template
+// (`/transactions/:id`), never by the raw URL, to keep cardinality bounded.
+@Injectable()
+export class HttpMetricsMiddleware implements NestMiddleware {
+  constructor(private readonly metricsService: MetricsService) {}
+
+  use(req: Request, res: Response, next: NextFunction) {
+    const stop = this.metricsService.httpRequestDuration.startTimer({
+      method: req.method,
+    });
+    res.once('finish', () => {
+      const route = req.route as { path?: string } | undefined;
+      stop({
+        route: route?.path ? `${req.baseUrl}${route.path}` : 'unmatched',
+        status: res.statusCode,
+      });
+    });
+    next();
+  }
+}
@@ -0,0 +1,40 @@
+import { Controller, Get, Header, OnModuleInit } from '@nestjs/common';
+import { MetricsService } from './metrics.service';
+import { mergeExpositions } from './metrics.registry';
+import { PrismaService } from '../prisma/prisma.service';
+import { clusterBus } from '../common/cluster/cluster-bus';
+
+const METRICS_TOPIC = 'metrics';
+
+@Controller('metrics')
+export class MetricsController implements OnModuleInit {
+  constructor(
+    private readonly metricsService: MetricsService,
+    private readonly prisma: PrismaService,
+  ) {}
+
+  onModuleInit() {
+    clusterBus.provide(METRICS_TOPIC, () => this.render());
+  }
+
+  // In cluster mode whichever worker takes the scrape gathers every
+  // worker's metrics through the primary, labelled by `worker`, so a
+  // scrape never jumps between per-process registries.
+  @Get()
+  @Header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+  async scrape(): Promise<string> {
+    if (!clusterBus.enabled) {
+      return this.render();
+    }
+    const reports = await clusterBus.gather(METRICS_TOPIC);
+    return reports.length > 0 ? mergeExpositions(reports) : this.render();
+  }
+
+  // Application histograms followed by Prisma's engine metrics, which
+  // include connection pool usage and the time queries wait for a
+  // connection (prisma_client_queries_wait_histogram_ms).
+  private async render(): Promise<string> {
+    const engine = await this.prisma.$metrics.prometheus();
+    return `${this.metricsService.render()}${engine}`;
+  }
+}
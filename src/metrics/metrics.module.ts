@@ -0,0 +1,23 @@
+import {
+  Global,
+  MiddlewareConsumer,
+  Module,
+  NestModule,
+} from '@nestjs/common';
+import { PrismaModule } from '../prisma/prisma.module';
+import { MetricsService } from './metrics.service';
+import { MetricsController } from './metrics.controller';
+import { HttpMetricsMiddleware } from './http-metrics.middleware';
+
+@Global()
+@Module({
+  imports: [PrismaModule],
+  controllers: [MetricsController],
+  providers: [MetricsService],
+  exports: [MetricsService],
+})
+export class MetricsModule implements NestModule {
+  configure(consumer: MiddlewareConsumer) {
+    consumer.apply(HttpMetricsMiddleware).forRoutes('{*splat}');
+  }
+}
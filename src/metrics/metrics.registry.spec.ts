@@ -0,0 +1,137 @@
+import { MetricsRegistry, mergeExpositions } from './metrics.registry';
+
+describe('MetricsRegistry', () => {
+  let registry: MetricsRegistry;
+
+  beforeEach(() => {
+    registry = new MetricsRegistry();
+  });
+
+  it('should render counters per label set', () => {
+    const counter = registry.counter({
+      name: 'conflicts_total',
+      help: 'Conflicts',
+      labelNames: ['model'],
+    });
+
+    counter.inc({ model: 'Wallet' });
+    counter.inc({ model: 'Wallet' }, 2);
+    counter.inc({ model: 'Transaction' });
+
+    expect(registry.render()).toBe(
+      [
+        '# HELP conflicts_total Conflicts',
+        '# TYPE conflicts_total counter',
+        'conflicts_total{model="Wallet"} 3',
+        'conflicts_total{model="Transaction"} 1',
+        '',
+      ].join('\n'),
+    );
+  });
+
+  it('should render cumulative histogram buckets', () => {
+    const histogram = registry.histogram({
+      name: 'latency_seconds',
+      help: 'Latency',
+      labelNames: ['route'],
+      buckets: [0.1, 1],
+    });
+
+    histogram.observe({ route: '/wallet' }, 0.05);
+    histogram.observe({ route: '/wallet' }, 0.5);
+    histogram.observe({ route: '/wallet' }, 3);
+
+    const lines = registry.render().split('\n');
+    expect(lines).toEqual(
+      expect.arrayContaining([
+        'latency_seconds_bucket{route="/wallet",le="0.1"} 1',
+        'latency_seconds_bucket{route="/wallet",le="1"} 2',
+        'latency_seconds_bucket{route="/wallet",le="+Inf"} 3',
+        'latency_seconds_sum{route="/wallet"} 3.55',
+        'latency_seconds_count{route="/wallet"} 3',
+      ]),
+    );
+  });
+
+  it('should order labels by declaration and escape their values', () => {
+    const histogram = registry.histogram({
+      name: 'latency_seconds',
+      help: 'Latency',
+      labelNames: ['method', 'route'],
+      buckets: [1],
+    });
+
+    const stop = histogram.startTimer({ route: '/say "hi"' });
+    stop({ method: 'GET' });
+
+    expect(registry.render()).toContain(
+      'latency_seconds_count{method="GET",route="/say \\"hi\\""} 1',
+    );
+  });
+
+  it('should collect gauges at scrape time', () => {
+    let queued = 0;
+    registry.gauge({
+      name: 'queued',
+      help: 'Queued',
+      collect: (gauge) => gauge.set({}, queued),
+    });
+
+    queued = 7;
+
+    expect(registry.render()).toContain('queued 7');
+  });
+
+  it('should copy collected totals into counters at scrape time', () => {
+    let sent = 0;
+    registry.counter({
+      name: 'sent_total',
+      help: 'Sent',
+      collect: (counter) => counter.set({}, sent),
+    });
+
+    sent = 12;
+
+    expect(registry.render()).toContain('sent_total 12');
+  });
+
+  it('should merge worker expositions under a worker label', () => {
+    const exposition = (count: number) =>
+      [
+        '# HELP requests_total Requests',
+        '# TYPE requests_total counter',
+        `requests_total{route="/{*splat}"} ${count}`,
+        '# HELP up Up',
+        '# TYPE up gauge',
+        'up 1',
+        '',
+      ].join('\n');
+
+    expect(
+      mergeExpositions([
+        { worker: 1, value: exposition(3) },
+        { worker: 2, value: exposition(5) },
+      ]),
+    ).toBe(
+      [
+        '# HELP requests_total Requests',
+        '# TYPE requests_total counter',
+        'requests_total{worker="1",route="/{*splat}"} 3',
+        'requests_total{worker="2",route="/{*splat}"} 5',
+        '# HELP up Up',
+        '# TYPE up gauge',
+        'up{worker="1"} 1',
+        'up{worker="2"} 1',
+        '',
+      ].join('\n'),
+    );
+  });
+
+  it('should refuse duplicate metric names', () => {
+    registry.counter({ name: 'dup_total', help: 'Dup' });
+
+    expect(() => registry.counter({ name: 'dup_total', help: 'Dup' })).toThrow(
+      'already registered',
+    );
+  });
+});
@@ -0,0 +1,282 @@
+import type { WorkerReport } from '../common/cluster/cluster-bus';
+
+// Minimal Prometheus text-format registry: counters, gauges and histograms
+// with labels, rendered on demand. Values live in this process only;
+// mergeExpositions combines the output of several cluster workers.
+
+export type Labels = Record<string, string | number>;
+
+export const DEFAULT_BUCKETS = [
+  0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+];
+
+interface MetricOptions {
+  name: string;
+  help: string;
+  labelNames?: string[];
+}
+
+abstract class Metric<T> {
+  protected readonly series = new Map<string, { labels: Labels; value: T }>();
+  readonly name: string;
+  readonly help: string;
+  readonly labelNames: string[];
+
+  constructor(options: MetricOptions) {
+    this.name = options.name;
+    this.help = options.help;
+    this.labelNames = options.labelNames ?? [];
+  }
+
+  abstract readonly type: string;
+
+  protected abstract render(): string[];
+
+  protected entry(labels: Labels, initial: () => T) {
+    const values = this.labelNames.map((name) => String(labels[name] ?? ''));
+    const key = values.join('\u0000');
+    let entry = this.series.get(key);
+    if (!entry) {
+      entry = {
+        labels: Object.fromEntries(
+          this.labelNames.map((name, i) => [name, values[i]]),
+        ),
+        value: initial(),
+      };
+      this.series.set(key, entry);
+    }
+    return entry;
+  }
+
+  protected line(suffix: string, labels: Labels, value: number): string {
+    const pairs = Object.entries(labels).map(
+      ([name, label]) => `${name}="${escapeLabel(String(label))}"`,
+    );
+    const labelText = pairs.length > 0 ? `{${pairs.join(',')}}` : '';
+    return `${this.name}${suffix}${labelText} ${value}`;
+  }
+
+  expose(): string {
+    return [
+      `# HELP ${this.name} ${this.help}`,
+      `# TYPE ${this.name} ${this.type}`,
+      ...this.render(),
+    ].join('\n');
+  }
+
+  reset() {
+    this.series.clear();
+  }
+}
+
+// A counter with `collect` reports totals another component already keeps
+// (requests sent, breaker trips): `set` copies them in before every scrape.
+export class Counter extends Metric<number> {
+  readonly type = 'counter';
+  private readonly collect?: (counter: Counter) => void;
+
+  constructor(
+    options: MetricOptions & { collect?: (counter: Counter) => void },
+  ) {
+    super(options);
+    this.collect = options.collect;
+  }
+
+  inc(labels: Labels = {}, value = 1) {
+    this.entry(labels, () => 0).value += value;
+  }
+
+  set(labels: Labels, total: number) {
+    this.entry(labels, () => 0).value = total;
+  }
+
+  protected render(): string[] {
+    this.collect?.(this);
+    return [...this.series.values()].map(({ labels, value }) =>
+      this.line('', labels, value),
+    );
+  }
+}
+
+// `collect` runs before every scrape, for values read from somewhere else
+// (pool sizes, queue lengths) rather than tracked as they change.
+export class Gauge extends Metric<number> {
+  readonly type = 'gauge';
+  private readonly collect?: (gauge: Gauge) => void;
+
+  constructor(options: MetricOptions & { collect?: (gauge: Gauge) => void }) {
+    super(options);
+    this.collect = options.collect;
+  }
+
+  set(labels: Labels, value: number) {
+    this.entry(labels, () => 0).value = value;
+  }
+
+  protected render(): string[] {
+    this.collect?.(this);
+    return [...this.series.values()].map(({ labels, value }) =>
+      this.line('', labels, value),
+    );
+  }
+}
+
+interface HistogramValue {
+  counts: number[];
+  sum: number;
+  count: number;
+}
+
+export class Histogram extends Metric<HistogramValue> {
+  readonly type = 'histogram';
+  readonly buckets: number[];
+
+  constructor(options: MetricOptions & { buckets?: number[] }) {
+    super(options);
+    this.buckets = [...(options.buckets ?? DEFAULT_BUCKETS)].sort(
+      (a, b) => a - b,
+    );
+  }
+
+  observe(labels: Labels, value: number) {
+    const entry = this.entry(labels, () => ({
+      counts: this.buckets.map(() => 0),
+      sum: 0,
+      count: 0,
+    })).value;
+    const bucket = this.buckets.findIndex((bound) => value <= bound);
+    if (bucket >= 0) {
+      entry.counts[bucket]++;
+    }
+    entry.sum += value;
+    entry.count++;
+  }
+
+  // Returns a function that records the elapsed seconds when called;
+  // labels known only at the end (status, outcome) can be passed then.
+  startTimer(labels: Labels = {}): (endLabels?: Labels) => number {
+    const start = process.hrtime.bigint();
+    return (endLabels = {}) => {
+      const seconds = Number(process.hrtime.bigint() - start) / 1e9;
+      this.observe({ ...labels, ...endLabels }, seconds);
+      return seconds;
+    };
+  }
+
+  protected render(): string[] {
+    const lines: string[] = [];
+    for (const { labels, value } of this.series.values()) {
+      let cumulative = 0;
+      this.buckets.forEach((bound, i) => {
+        cumulative += value.counts[i];
+        lines.push(this.line('_bucket', { ...labels, le: bound }, cumulative));
+      });
+      lines.push(this.line('_bucket', { ...labels, le: '+Inf' }, value.count));
+      lines.push(this.line('_sum', labels, value.sum));
+      lines.push(this.line('_count', labels, value.count));
+    }
+    return lines;
+  }
+}
+
+export class MetricsRegistry {
+  private readonly metrics = new Map<string, Metric<any>>();
+
+  counter(
+    options: MetricOptions & { collect?: (counter: Counter) => void },
+  ): Counter {
+    return this.register(new Counter(options));
+  }
+
+  gauge(
+    options: MetricOptions & { collect?: (gauge: Gauge) => void },
+  ): Gauge {
+    return this.register(new Gauge(options));
+  }
+
+  histogram(options: MetricOptions & { buckets?: number[] }): Histogram {
+    return this.register(new Histogram(options));
+  }
+
+  render(): string {
+    return (
+      [...this.metrics.values()].map((metric) => metric.expose()).join('\n') +
+      '\n'
+    );
+  }
+
+  reset() {
+    for (const metric of this.metrics.values()) {
+      metric.reset();
+    }
+  }
+
+  private register<M extends Metric<any>>(metric: M): M {
+    if (this.metrics.has(metric.name)) {
+      throw new Error(`Metric ${metric.name} is already registered`);
+    }
+    this.metrics.set(metric.name, metric);
+    return metric;
+  }
+}
+
+// Joins the text exposition of every cluster worker into one. Each sample
+// gets a `worker` label so series stay distinct (sum over it for the
+// process total), and each family keeps a single HELP/TYPE header.
+export function mergeExpositions(reports: WorkerReport[]): string {
+  const families = new Map<
+    string,
+    { header: Map<string, string>; samples: string[] }
+  >();
+  const family = (name: string) => {
+    let entry = families.get(name);
+    if (!entry) {
+      entry = { header: new Map(), samples: [] };
+      families.set(name, entry);
+    }
+    return entry;
+  };
+
+  for (const { worker, value } of reports) {
+    let current = family('');
+    for (const line of value.split('\n')) {
+      const comment = /^# (HELP|TYPE) (\S+)/.exec(line);
+      if (comment) {
+        current = family(comment[2]);
+        if (!current.header.has(comment[1])) {
+          current.header.set(comment[1], line);
+        }
+      } else if (line.trim() && !line.startsWith('#')) {
+        current.samples.push(withLabel(line, 'worker', String(worker)));
+      }
+    }
+  }
+
+  const lines: string[] = [];
+  for (const { header, samples } of families.values()) {
+    lines.push(...header.values(), ...samples);
+  }
+  return lines.length > 0 ? lines.join('\n') + '\n' : '';
+}
+
+// Adds a label right after the metric name, so label values that contain
+// braces (route templates) never need parsing
+function withLabel(sample: string, name: string, value: string): string {
+  const metricName = /^[a-zA-Z_:][a-zA-Z0-9_:]*/.exec(sample)?.[0] ?? '';
+  const rest = sample.slice(metricName.length);
+  const label = `${name}="${escapeLabel(value)}"`;
+  if (rest.startsWith('{}')) {
+    return `${metricName}{${label}}${rest.slice(2)}`;
+  }
+  if (rest.startsWith('{')) {
+    return `${metricName}{${label},${rest.slice(1)}`;
+  }
+  return `${metricName}{${label}}${rest}`;
+}
+
+function escapeLabel(value: string): string {
+  return value
+    .replace(/\\/g, '\\\\')
+    .replace(/"/g, '\\"')
+    .replace(/\n/g, '\\n');
+}
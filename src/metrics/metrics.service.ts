@@ -0,0 +1,166 @@
+import { Injectable } from '@nestjs/common';
+import { MetricsRegistry } from './metrics.registry';
+import type { PoolMonitor } from '../prisma/pool-monitor';
+import type { BankClientMetrics } from '../external-bank/bank-http.client';
+import type { CircuitState } from '../external-bank/circuit-breaker';
+
+const CIRCUIT_STATES: CircuitState[] = ['CLOSED', 'OPEN', 'HALF_OPEN'];
+
+// Server-side latency signals, scraped from GET /metrics. Histograms are in
+// seconds, following Prometheus conventions.
+@Injectable()
+export class MetricsService {
+  readonly registry = new MetricsRegistry();
+  private readonly pools = new Map<string, PoolMonitor>();
+  private bankClient?: () => BankClientMetrics;
+
+  readonly httpRequestDuration = this.registry.histogram({
+    name: 'http_request_duration_seconds',
+    help: 'HTTP request latency by route template and status',
+    labelNames: ['method', 'route', 'status'],
+  });
+
+  readonly prismaQueryDuration = this.registry.histogram({
+    name: 'prisma_query_duration_seconds',
+    help: 'Prisma query latency by model and action',
+    labelNames: ['model', 'action'],
+  });
+
+  readonly prismaTransactionDuration = this.registry.histogram({
+    name: 'prisma_transaction_duration_seconds',
+    help: 'Prisma $transaction latency, including waits for row locks',
+    labelNames: ['outcome'],
+  });
+
+  // Serialization failures and deadlocks (P2034): the transactions a caller
+  // would have to retry
+  readonly prismaTransactionConflicts = this.registry.counter({
+    name: 'prisma_transaction_conflicts_total',
+    help: 'Prisma transactions aborted by a write conflict or deadlock',
+  });
+
+  // Credits written per UPDATE by WalletCommandQueue; above 1 means a hot
+  // wallet is being batched instead of contended
+  readonly walletCreditBatchSize = this.registry.histogram({
+    name: 'wallet_credit_batch_size',
+    help: 'Credits applied to one wallet in a single balance update',
+    buckets: [1, 2, 5, 10, 25, 50, 100],
+  });
+
+  readonly bankRequestDuration = this.registry.histogram({
+    name: 'bank_request_duration_seconds',
+    help: 'External bank call latency, including limiter queueing',
+    labelNames: ['path', 'outcome'],
+  });
+
+  // Totals kept by BankHttpClient. A low reused share means keep-alive is
+  // not working and every call pays for a new connection.
+  readonly bankClientRequests = this.registry.counter({
+    name: 'bank_client_requests_total',
+    help: 'Requests sent to the external bank by socket reuse',
+    labelNames: ['socket'],
+    collect: (counter) =>
+      this.collectBankClient((bank) => {
+        counter.set({ socket: 'reused' }, bank.reusedSockets);
+        counter.set({ socket: 'new' }, bank.requests - bank.reusedSockets);
+      }),
+  });
+
+  // `rejected` calls never reached the bank: the breaker was open or the
+  // limiter queue was full or past its deadline
+  readonly bankClientErrors = this.registry.counter({
+    name: 'bank_client_errors_total',
+    help: 'External bank calls that failed, by kind',
+    labelNames: ['kind'],
+    collect: (counter) =>
+      this.collectBankClient((bank) => {
+        counter.set({ kind: 'timeout' }, bank.timeouts);
+        counter.set({ kind: 'failure' }, bank.failures);
+        counter.set({ kind: 'rejected' }, bank.rejected);
+      }),
+  });
+
+  readonly bankClientSlots = this.registry.gauge({
+    name: 'bank_client_slots',
+    help: 'External bank concurrency limiter slots in flight and queued',
+    labelNames: ['state'],
+    collect: (gauge) =>
+      this.collectBankClient((bank) => {
+        gauge.set({ state: 'in_flight' }, bank.inFlight);
+        gauge.set({ state: 'queued' }, bank.queued);
+      }),
+  });
+
+  readonly bankClientSockets = this.registry.gauge({
+    name: 'bank_client_sockets',
+    help: 'Keep-alive sockets to the external bank, busy and idle',
+    labelNames: ['state'],
+    collect: (gauge) =>
+      this.collectBankClient((bank) => {
+        gauge.set({ state: 'open' }, bank.openSockets);
+        gauge.set({ state: 'free' }, bank.freeSockets);
+      }),
+  });
+
+  // One series per state, 1 for the current one
+  readonly bankBreakerState = this.registry.gauge({
+    name: 'bank_circuit_breaker_state',
+    help: 'External bank circuit breaker state',
+    labelNames: ['state'],
+    collect: (gauge) =>
+      this.collectBankClient((bank) => {
+        for (const state of CIRCUIT_STATES) {
+          gauge.set({ state }, bank.breakerState === state ? 1 : 0);
+        }
+      }),
+  });
+
+  readonly bankBreakerOpened = this.registry.counter({
+    name: 'bank_circuit_breaker_opened_total',
+    help: 'Times the external bank circuit breaker opened',
+    collect: (counter) =>
+      this.collectBankClient((bank) =>
+        counter.set({}, bank.breakerOpenedCount),
+      ),
+  });
+
+  // `waiting` above zero means requests are queueing for a connection;
+  // `peak` is the highest demand since the previous scrape
+  readonly dbPoolConnections = this.registry.gauge({
+    name: 'db_pool_connections',
+    help: 'Prisma connection pool size and demand by client',
+    labelNames: ['role', 'state'],
+    collect: (gauge) => {
+      for (const [role, pool] of this.pools) {
+        gauge.set({ role, state: 'size' }, pool.size);
+        gauge.set({ role, state: 'in_use' }, pool.inUse);
+        gauge.set({ role, state: 'waiting' }, pool.waiting);
+        gauge.set({ role, state: 'peak' }, pool.takePeak());
+      }
+    },
+  });
+
+  readonly requestsShed = this.registry.counter({
+    name: 'http_requests_shed_total',
+    help: 'Requests answered 503 because the database pool was saturated',
+    labelNames: ['reason'],
+  });
+
+  watchPool(role: string, pool: PoolMonitor) {
+    this.pools.set(role, pool);
+  }
+
+  watchBankClient(metrics: () => BankClientMetrics) {
+    this.bankClient = metrics;
+  }
+
+  render(): string {
+    return this.registry.render();
+  }
+
+  private collectBankClient(collect: (bank: BankClientMetrics) => void) {
+    if (this.bankClient) {
+      collect(this.bankClient());
+    }
+  }
+}
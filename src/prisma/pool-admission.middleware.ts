@@ -0,0 +1,25 @@
+import { Injectable, NestMiddleware, Optional } from '@nestjs/common';
+import { NextFunction, Request, Response } from 'express';
+import { MetricsService } from '../metrics/metrics.service';
+import { PrismaService } from './prisma.service';
+import { DatabaseBusyException } from './pool-monitor';
+
+// Turns requests away with a 503 while the primary's connection queue is
+// full. Admitting them would only add to the queue: every request behind it
+// waits out the pool timeout, and latency climbs for everyone. Shedding early
+// keeps the admitted ones fast and tells clients to back off.
+@Injectable()
+export class PoolAdmissionMiddleware implements NestMiddleware {
+  constructor(
+    private readonly prisma: PrismaService,
+    @Optional() private readonly metricsService?: MetricsService,
+  ) {}
+
+  use(req: Request, res: Response, next: NextFunction) {
+    if (this.prisma.pool.saturated) {
+      this.metricsService?.requestsShed.inc({ reason: 'saturated' });
+      throw new DatabaseBusyException();
+    }
+    next();
+  }
+}
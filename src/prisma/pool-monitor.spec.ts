@@ -0,0 +1,90 @@
+import { Prisma } from '../../generated/prisma';
+import {
+  PoolMonitor,
+  connectionLimitOf,
+  defaultPoolSize,
+  isPoolTimeout,
+} from './pool-monitor';
+
+describe('PoolMonitor', () => {
+  it('should count demand beyond the pool as waiting', () => {
+    const pool = new PoolMonitor(2, 3);
+    for (let i = 0; i < 4; i++) {
+      pool.acquire();
+    }
+
+    expect(pool.inUse).toBe(2);
+    expect(pool.waiting).toBe(2);
+    expect(pool.saturated).toBe(false);
+
+    pool.acquire();
+    expect(pool.saturated).toBe(true);
+
+    pool.release();
+    pool.release();
+    expect(pool.waiting).toBe(1);
+    expect(pool.saturated).toBe(false);
+  });
+
+  it("should trust the engine's pool readings while they are fresh", () => {
+    jest.useFakeTimers();
+    const pool = new PoolMonitor(2, 3, 1000);
+    for (let i = 0; i < 6; i++) {
+      pool.acquire();
+    }
+
+    // Connections are free even though callers are still counted
+    pool.observe(1, 0);
+    expect(pool.inUse).toBe(1);
+    expect(pool.saturated).toBe(false);
+
+    // Queries queue in the engine without any JS-side demand
+    const idle = new PoolMonitor(2, 3, 1000);
+    idle.observe(2, 4);
+    expect(idle.saturated).toBe(true);
+
+    jest.advanceTimersByTime(1001);
+    expect(pool.waiting).toBe(4);
+    expect(idle.saturated).toBe(false);
+    jest.useRealTimers();
+  });
+
+  it('should report the peak since the last read', () => {
+    const pool = new PoolMonitor(5, 10);
+    pool.acquire();
+    pool.acquire();
+    pool.acquire();
+    pool.release();
+    pool.release();
+
+    expect(pool.takePeak()).toBe(3);
+    expect(pool.takePeak()).toBe(1);
+  });
+
+  it('should read the pool size from the datasource URL', () => {
+    const url = 'postgresql://user:pass@db:5432/walle';
+    expect(connectionLimitOf(`${url}?connection_limit=12`)).toBe(12);
+    expect(connectionLimitOf(url)).toBe(defaultPoolSize());
+    expect(connectionLimitOf(undefined)).toBe(defaultPoolSize());
+  });
+
+  it('should recognise pool timeouts', () => {
+    const timeout = new Prisma.PrismaClientKnownRequestError(
+      'Timed out fetching a new connection from the connection pool.',
+      { code: 'P2024', clientVersion: 'test' },
+    );
+    const noTransactionSlot = new Prisma.PrismaClientKnownRequestError(
+      'Transaction API error: Unable to start a transaction in the given time.',
+      { code: 'P2028', clientVersion: 'test' },
+    );
+    const conflict = new Prisma.PrismaClientKnownRequestError('Conflict', {
+      code: 'P2034',
+      clientVersion: 'test',
+    });
+
+    expect(isPoolTimeout(timeout)).toBe(true);
+    expect(isPoolTimeout(noTransactionSlot)).toBe(true);
+    expect(isPoolTimeout(conflict)).toBe(false);
+    expect(isPoolTimeout(new Error('P2024'))).toBe(false);
+  });
+});
@@ -0,0 +1,98 @@
+import { ServiceUnavailableException } from '@nestjs/common';
+import { availableParallelism } from 'os';
+import { Prisma } from '../../generated/prisma';
+
+// Prisma's own default when the URL has no connection_limit
+export function defaultPoolSize(): number {
+  return availableParallelism() * 2 + 1;
+}
+
+export function connectionLimitOf(url: string | undefined): number {
+  const match = url && /[?&]connection_limit=(\d+)/.exec(url);
+  const limit = match ? Number(match[1]) : NaN;
+  return limit > 0 ? limit : defaultPoolSize();
+}
+
+// Tracks a client's connection pool. The source of truth is Prisma's own
+// pool, read from $metrics: connections busy and queries waiting for one.
+// Those readings are sampled, so between samples (or when $metrics fails)
+// the monitor falls back to counting the connections callers want right
+// now: queries outside a transaction plus open transactions, each of which
+// holds one connection until it ends. Once the queue is long enough that new
+// work would only time out behind it, the client reports itself saturated
+// so requests can be turned away up front.
+export class PoolMonitor {
+  private demand = 0;
+  private peak = 0;
+  private engine: { busy: number; waiting: number; at: number } | null =
+    null;
+
+  constructor(
+    readonly size: number,
+    readonly maxWaiting: number,
+    // How long an engine reading is trusted before falling back to demand
+    private readonly sampleTtlMs = 1000,
+  ) {}
+
+  acquire() {
+    this.demand++;
+    this.peak = Math.max(this.peak, this.demand);
+  }
+
+  release() {
+    this.demand = Math.max(0, this.demand - 1);
+  }
+
+  // prisma_pool_connections_busy and prisma_client_queries_wait
+  observe(busy: number, waiting: number) {
+    this.engine = { busy, waiting, at: Date.now() };
+  }
+
+  get inUse(): number {
+    const engine = this.engineReading();
+    return engine ? engine.busy : Math.min(this.demand, this.size);
+  }
+
+  get waiting(): number {
+    const engine = this.engineReading();
+    return engine ? engine.waiting : Math.max(0, this.demand - this.size);
+  }
+
+  get saturated(): boolean {
+    return this.waiting >= this.maxWaiting;
+  }
+
+  // Highest demand since the last call, so a scrape sees bursts that came
+  // and went between two scrapes
+  takePeak(): number {
+    const peak = this.peak;
+    this.peak = this.demand;
+    return peak;
+  }
+
+  private engineReading() {
+    if (!this.engine || Date.now() - this.engine.at > this.sampleTtlMs) {
+      return null;
+    }
+    return this.engine;
+  }
+}
+
+// P2024: no connection became free within pool_timeout. Interactive
+// transactions wait at most maxWait instead and fail with P2028.
+export function isPoolTimeout(error: unknown): boolean {
+  if (!(error instanceof Prisma.PrismaClientKnownRequestError)) {
+    return false;
+  }
+  return (
+    error.code === 'P2024' ||
+    (error.code === 'P2028' &&
+      error.message.includes('Unable to start a transaction'))
+  );
+}
+
+export class DatabaseBusyException extends ServiceUnavailableException {
+  constructor() {
+    super('The service is busy, please retry shortly');
+  }
+}
@@ -1,8 +1,17 @@
-import { Module } from '@nestjs/common';
+import { MiddlewareConsumer, Module, NestModule } from '@nestjs/common';
 import { PrismaService } from './prisma.service';
+import { PoolAdmissionMiddleware } from './pool-admission.middleware';
 
 @Module({
   providers: [PrismaService],
   exports: [PrismaService],
 })
-export class PrismaModule {}
+export class PrismaModule implements NestModule {
+  // Scrapes must get through precisely when the pool is saturated
+  configure(consumer: MiddlewareConsumer) {
+    consumer
+      .apply(PoolAdmissionMiddleware)
+      .exclude('metrics')
+      .forRoutes('{*splat}');
+  }
+}
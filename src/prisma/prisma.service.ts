@@ -1,20 +1,382 @@
-import { Injectable, OnModuleInit, OnModuleDestroy } from '@nestjs/common';
-import { PrismaClient } from '../../generated/prisma';
+import {
+  Injectable,
+  OnModuleInit,
+  OnModuleDestroy,
+  Optional,
+} from '@nestjs/common';
+import { AsyncLocalStorage } from 'async_hooks';
+import { Prisma, PrismaClient } from '../../generated/prisma';
+import { shutdownTimeoutMs } from '../common/shutdown/graceful-shutdown';
+import { MetricsService } from '../metrics/metrics.service';
+import { tracer } from '../tracing/tracer';
+import { LruCache } from '../common/cache/lru-cache';
+import {
+  DatabaseBusyException,
+  PoolMonitor,
+  connectionLimitOf,
+  isPoolTimeout,
+} from './pool-monitor';
+
+// Connection settings from the environment, appended to the datasource URL
+// unless the URL already sets them:
+// - DATABASE_POOL_SIZE caps this process's connection pool (set per worker
+//   in cluster mode) -> connection_limit
+// - DATABASE_POOL_TIMEOUT_S bounds the wait for a free connection before
+//   Prisma gives up with P2024 -> pool_timeout
+// - DATABASE_STATEMENT_TIMEOUT_MS has Postgres cancel runaway statements so
+//   they cannot hold a connection indefinitely -> options
+export function pooledDatabaseUrl(env = process.env): string | undefined {
+  const url = env.DATABASE_URL;
+  if (!url) {
+    return url;
+  }
+  const params: string[] = [];
+  const add = (name: string, value: string | undefined) => {
+    if (value !== undefined && !new RegExp(`[?&]${name}=`).test(url)) {
+      params.push(`${name}=${value}`);
+    }
+  };
+  add('connection_limit', positiveInteger(env.DATABASE_POOL_SIZE));
+  add('pool_timeout', positiveInteger(env.DATABASE_POOL_TIMEOUT_S));
+  const statementTimeout = positiveInteger(env.DATABASE_STATEMENT_TIMEOUT_MS);
+  add(
+    'options',
+    statementTimeout &&
+      encodeURIComponent(`-c statement_timeout=${statementTimeout}`),
+  );
+  if (params.length === 0) {
+    return url;
+  }
+  const separator = url.includes('?') ? '&' : '?';
+  return `${url}${separator}${params.join('&')}`;
+}
+
+export interface ReadOptions {
+  // After this user's own writes, their reads stay on the primary for
+  // READ_YOUR_WRITES_MS
+  userId?: string;
+  // Highest replica lag this read tolerates (default REPLICA_MAX_LAG_MS)
+  maxLagMs?: number;
+}
 
 @Injectable()
 export class PrismaService
   extends PrismaClient
   implements OnModuleInit, OnModuleDestroy
 {
-  constructor() {
-    super();
+  private readonly openTransactions = new Set<Promise<unknown>>();
+
+  // Connection demand on the primary, for load shedding and /metrics
+  readonly pool: PoolMonitor;
+
+  // Optional streaming replica for read-only queries (DATABASE_REPLICA_URL)
+  private readonly replica: PrismaClient | null = null;
+  private readonly replicaPool: PoolMonitor | null = null;
+  private readonly replicaMaxLagMs = envNumber('REPLICA_MAX_LAG_MS', 5000);
+  // Tighter bound for reads that show a balance
+  readonly balanceMaxLagMs = envNumber('BALANCE_MAX_STALENESS_MS', 1000);
+  private readonly lagPollMs = envNumber('REPLICA_LAG_POLL_MS', 1000);
+  private readonly recentWriters = new LruCache<string, true>({
+    maxEntries: 100000,
+    ttlMs: envNumber('READ_YOUR_WRITES_MS', 5000),
+  });
+  private replicaLagMs = Infinity;
+  private lagMeasuredAt = 0;
+  private lagTimer: NodeJS.Timeout | null = null;
+  // How often Prisma's pool gauges are read for admission decisions
+  private readonly poolSampleMs = poolSampleMs();
+  private poolSampleTimer: NodeJS.Timeout | null = null;
+
+  constructor(@Optional() metricsService?: MetricsService) {
+    const datasourceUrl = pooledDatabaseUrl();
+    super({ datasourceUrl });
+
+    this.pool = poolMonitor(datasourceUrl);
+    metricsService?.watchPool('primary', this.pool);
+
+    const replicaUrl = process.env.DATABASE_REPLICA_URL;
+    if (replicaUrl) {
+      const replicaDatasourceUrl = pooledDatabaseUrl({
+        ...process.env,
+        DATABASE_URL: replicaUrl,
+      });
+      const replicaPool = poolMonitor(replicaDatasourceUrl);
+      this.replicaPool = replicaPool;
+      metricsService?.watchPool('replica', replicaPool);
+      this.replica = new PrismaClient({
+        datasourceUrl: replicaDatasourceUrl,
+      }).$extends(
+        queryInstrumentation('replica', replicaPool, metricsService),
+      ) as unknown as PrismaClient;
+    }
+
+    // Track interactive and batch transactions so shutdown can wait for
+    // them. A plain function, so Prisma builds the transaction client from
+    // the extended client it was called on and its queries stay instrumented.
+    const transaction = this.$transaction;
+    const pool = this.pool;
+    const openTransactions = this.openTransactions;
+    this.$transaction = function (this: PrismaClient, ...args: unknown[]) {
+      const stop = metricsService?.prismaTransactionDuration.startTimer();
+      // A transaction holds one connection from start to commit
+      pool.acquire();
+      const pending: Promise<unknown> = tracer
+        .trace(
+          'prisma $transaction',
+          () => transactionScope.run(true, () => transaction.apply(this, args)),
+          {
+            kind: 'client',
+            attributes: { 'db.system': 'postgresql' },
+          },
+        )
+        .catch((error: unknown) => {
+          throw busyOnPoolTimeout(error, metricsService);
+        });
+      openTransactions.add(pending);
+      pending.then(
+        () => {
+          pool.release();
+          openTransactions.delete(pending);
+          stop?.({ outcome: 'committed' });
+        },
+        (error) => {
+          pool.release();
+          openTransactions.delete(pending);
+          stop?.({ outcome: 'rolled_back' });
+          if (
+            error instanceof Prisma.PrismaClientKnownRequestError &&
+            error.code === 'P2034'
+          ) {
+            metricsService?.prismaTransactionConflicts.inc();
+          }
+        },
+      );
+      return pending;
+    } as typeof this.$transaction;
+
+    // $extends returns a new client that delegates to this one, so the
+    // service hands out the extended client in its own place
+    return this.$extends(
+      queryInstrumentation('primary', this.pool, metricsService),
+    ) as unknown as PrismaService;
   }
 
   async onModuleInit() {
     await (this.$connect as any)();
+    if (this.replica) {
+      await this.replica.$connect();
+      await this.measureReplicaLag();
+      this.lagTimer = setInterval(
+        () => void this.measureReplicaLag(),
+        this.lagPollMs,
+      );
+      this.lagTimer.unref();
+    }
+    this.poolSampleTimer = setInterval(
+      () => void this.samplePools(),
+      this.poolSampleMs,
+    );
+    this.poolSampleTimer.unref();
   }
 
   async onModuleDestroy() {
+    if (this.lagTimer) {
+      clearInterval(this.lagTimer);
+      this.lagTimer = null;
+    }
+    if (this.poolSampleTimer) {
+      clearInterval(this.poolSampleTimer);
+      this.poolSampleTimer = null;
+    }
+    await this.settleOpenTransactions(shutdownTimeoutMs());
     await (this.$disconnect as any)();
+    await this.replica?.$disconnect();
+  }
+
+  // Client for read-only queries: the replica when it is close enough to
+  // the primary for this read, otherwise the primary itself. Never use it
+  // for reads that feed a write.
+  reader(options: ReadOptions = {}): PrismaClient {
+    if (!this.replica) {
+      return this;
+    }
+    if (options.userId && this.recentWriters.get(options.userId)) {
+      return this;
+    }
+    // Lag is only known as of the last measurement, so add the time since
+    const lagMs = this.replicaLagMs + (Date.now() - this.lagMeasuredAt);
+    if (lagMs > (options.maxLagMs ?? this.replicaMaxLagMs)) {
+      return this;
+    }
+    return this.replica;
+  }
+
+  // Pins the user's reads to the primary so they see their own write
+  markWrite(...userIds: string[]) {
+    for (const userId of userIds) {
+      this.recentWriters.set(userId, true);
+    }
+  }
+
+  get openTransactionCount(): number {
+    return this.openTransactions.size;
+  }
+
+  private async measureReplicaLag() {
+    if (!this.replica) {
+      return;
+    }
+    try {
+      // Caught up when everything received has been replayed; otherwise the
+      // age of the last replayed commit. A server that is not in recovery
+      // (e.g. the primary itself) has no lag.
+      const [row] = await this.replica.$queryRaw<{ lagMs: number | null }[]>`
+        SELECT CASE
+          WHEN NOT pg_is_in_recovery() THEN 0
+          WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+          ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+            * 1000
+        END::float8 AS "lagMs"
+      `;
+      this.replicaLagMs = row?.lagMs ?? Infinity;
+    } catch (error) {
+      console.error('Replica lag check failed:', error);
+      this.replicaLagMs = Infinity;
+    }
+    this.lagMeasuredAt = Date.now();
   }
+
+  // Feeds Prisma's own pool gauges to the monitors, so admission and
+  // db_pool_connections see connections actually busy and queries actually
+  // queued in the engine
+  private async samplePools() {
+    await Promise.all([
+      sampleEnginePool(this, this.pool),
+      this.replica &&
+        this.replicaPool &&
+        sampleEnginePool(this.replica, this.replicaPool),
+    ]);
+  }
+
+  private async settleOpenTransactions(timeoutMs: number) {
+    if (this.openTransactions.size === 0) {
+      return;
+    }
+    let timer: NodeJS.Timeout | undefined;
+    const timeout = new Promise<void>((resolve) => {
+      timer = setTimeout(resolve, timeoutMs);
+    });
+    await Promise.race([
+      Promise.allSettled([...this.openTransactions]),
+      timeout,
+    ]);
+    clearTimeout(timer);
+  }
+}
+
+// DATABASE_MAX_WAITING: how many callers may queue for a connection before
+// the client counts as saturated (default: two per pooled connection)
+function poolMonitor(datasourceUrl: string | undefined): PoolMonitor {
+  const size = connectionLimitOf(datasourceUrl);
+  return new PoolMonitor(
+    size,
+    envNumber('DATABASE_MAX_WAITING', size * 2),
+    poolSampleMs() * 4,
+  );
+}
+
+function poolSampleMs(): number {
+  return envNumber('DATABASE_POOL_SAMPLE_MS', 250);
+}
+
+// A failed read leaves the previous sample to expire, and the monitor falls
+// back to counting demand
+async function sampleEnginePool(client: PrismaClient, pool: PoolMonitor) {
+  try {
+    const { gauges } = await client.$metrics.json();
+    const gauge = (key: string) =>
+      gauges.find((metric) => metric.key === key)?.value;
+    const busy = gauge('prisma_pool_connections_busy');
+    const waiting = gauge('prisma_client_queries_wait');
+    if (busy !== undefined && waiting !== undefined) {
+      pool.observe(busy, waiting);
+    }
+  } catch {
+    // Keep serving; the sample goes stale on its own
+  }
+}
+
+// Prisma's pool timeout surfaces as a plain error that callers would turn
+// into a 400 or 500; report it as a retryable 503 instead.
+function busyOnPoolTimeout(
+  error: unknown,
+  metricsService?: MetricsService,
+): unknown {
+  if (!isPoolTimeout(error)) {
+    return error;
+  }
+  metricsService?.requestsShed.inc({ reason: 'pool_timeout' });
+  return new DatabaseBusyException();
+}
+
+// Set while a $transaction runs: its queries use the transaction's
+// connection instead of taking one from the pool
+const transactionScope = new AsyncLocalStorage<true>();
+
+// Records latency, connection demand and a tracing span for every query of
+// a client, raw queries included, in a single query extension.
+function queryInstrumentation(
+  role: 'primary' | 'replica',
+  pool: PoolMonitor,
+  metricsService?: MetricsService,
+) {
+  return Prisma.defineExtension({
+    name: `${role}-query-instrumentation`,
+    query: {
+      async $allOperations({ model, operation, args, query }) {
+        const collection = model ?? 'raw';
+        const stop = metricsService?.prismaQueryDuration.startTimer({
+          model: collection,
+          action: operation,
+        });
+        const holdsConnection = !transactionScope.getStore();
+        if (holdsConnection) {
+          pool.acquire();
+        }
+        try {
+          return await tracer.trace(
+            `prisma ${collection}.${operation}`,
+            () => query(args),
+            {
+              kind: 'client',
+              attributes: {
+                'db.system': 'postgresql',
+                'db.collection.name': collection,
+                'db.operation.name': operation,
+                'db.role': role,
+              },
+            },
+          );
+        } catch (error) {
+          throw busyOnPoolTimeout(error, metricsService);
+        } finally {
+          if (holdsConnection) {
+            pool.release();
+          }
+          stop?.();
+        }
+      },
+    },
+  });
+}
+
+function positiveInteger(raw: string | undefined): string | undefined {
+  const value = Number(raw);
+  return Number.isInteger(value) && value > 0 ? String(value) : undefined;
+}
+
+function envNumber(key: string, fallback: number): number {
+  const raw = process.env[key];
+  const value = Number(raw);
+  return raw && Number.isFinite(value) && value >= 0 ? value : fallback;
 }
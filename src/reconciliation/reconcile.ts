@@ -0,0 +1,68 @@
+import { NestFactory } from '@nestjs/core';
+import { ReconciliationModule } from './reconciliation.module';
+import {
+  DEFAULT_RECONCILE_OPTIONS,
+  ReconcileOptions,
+  ReconciliationService,
+} from './reconciliation.service';
+import { toMajorUnits } from '../common/interceptors/minor-units.interceptor';
+
+// Usage: npm run reconcile -- [--batch-size=1000] [--concurrency=4]
+//   [--settle-lag-seconds=300] [--dry-run]
+// Exits with 1 when any wallet drifted from its ledger, 2 on errors.
+function parseArgs(argv: string[]): Partial<ReconcileOptions> {
+  const options: Partial<ReconcileOptions> = {};
+  for (const arg of argv) {
+    const [flag, value] = arg.split('=');
+    switch (flag) {
+      case '--batch-size':
+        options.batchSize = positiveInt(flag, value);
+        break;
+      case '--concurrency':
+        options.concurrency = positiveInt(flag, value);
+        break;
+      case '--settle-lag-seconds':
+        options.settleLagMs = positiveInt(flag, value) * 1000;
+        break;
+      case '--dry-run':
+        options.dryRun = true;
+        break;
+      default:
+        throw new Error(`Unknown argument: ${arg}`);
+    }
+  }
+  return options;
+}
+
+function positiveInt(flag: string, value: string | undefined): number {
+  const parsed = Number(value);
+  if (!Number.isInteger(parsed) || parsed <= 0) {
+    throw new Error(`${flag} expects a positive integer`);
+  }
+  return parsed;
+}
+
+async function main() {
+  const options = {
+    ...DEFAULT_RECONCILE_OPTIONS,
+    ...parseArgs(process.argv.slice(2)),
+  };
+  const app = await NestFactory.createApplicationContext(
+    ReconciliationModule,
+    { logger: ['error', 'warn'] },
+  );
+
+  try {
+    const report = await app.get(ReconciliationService).reconcile(options);
+    // Amounts are printed in major units, like the HTTP API
+    console.log(JSON.stringify(toMajorUnits(report), null, 2));
+    process.exitCode = report.drifted.length > 0 ? 1 : 0;
+  } finally {
+    await app.close();
+  }
+}
+
+main().catch((error) => {
+  console.error('Reconciliation failed:', error);
+  process.exitCode = 2;
+});
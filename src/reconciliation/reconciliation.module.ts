@@ -0,0 +1,11 @@
+import { Module } from '@nestjs/common';
+import { PrismaModule } from '../prisma/prisma.module';
+import { ReconciliationRepository } from './reconciliation.repository';
+import { ReconciliationService } from './reconciliation.service';
+
+@Module({
+  imports: [PrismaModule],
+  providers: [ReconciliationRepository, ReconciliationService],
+  exports: [ReconciliationService],
+})
+export class ReconciliationModule {}
@@ -0,0 +1,123 @@
+import { Injectable } from '@nestjs/common';
+import { PrismaService } from '../prisma/prisma.service';
+import { Prisma } from '../../generated/prisma';
+
+export interface WalletLedgerState {
+  walletId: string;
+  balance: bigint;
+  checkpointBalance: bigint;
+  // Signed sum of every transaction after the checkpoint
+  delta: bigint;
+  // Same, restricted to transactions at or before the settle cutoff
+  settledDelta: bigint;
+  scanned: number;
+  lastCreatedAt: Date | null;
+  lastId: string | null;
+}
+
+export interface CheckpointUpdate {
+  walletId: string;
+  balance: bigint;
+  lastTransactionId: string;
+  lastTransactionAt: Date;
+}
+
+// IN/DEBIN credit the effected wallet, OUT/TRANSFER debit it
+const SIGNED_AMOUNT = Prisma.sql`
+  CASE WHEN t."type" IN ('IN', 'DEBIN') THEN t."amount" ELSE -t."amount" END
+`;
+
+const AFTER_CHECKPOINT = Prisma.sql`
+  t."effectedWalletId" = w."id"
+  AND (
+    c."lastTransactionAt" IS NULL
+    OR (t."createdAt", t."id") > (c."lastTransactionAt", c."lastTransactionId")
+  )
+`;
+
+@Injectable()
+export class ReconciliationRepository {
+  constructor(private prisma: PrismaService) {}
+
+  // Keyset over wallet ids, so each batch is an index range scan
+  async nextWalletIds(afterId: string, limit: number): Promise<string[]> {
+    const rows = await this.prisma.wallet.findMany({
+      where: { id: { gt: afterId } },
+      orderBy: { id: 'asc' },
+      take: limit,
+      select: { id: true },
+    });
+    return rows.map((row) => row.id);
+  }
+
+  // Reads balances and post-checkpoint ledger deltas from one snapshot, then
+  // lets `decide` pick which checkpoints to advance, written in the same
+  // transaction. Balance and ledger rows are always written together, so in
+  // a single snapshot they must agree.
+  async reconcileBatch(
+    walletIds: string[],
+    settleCutoff: Date,
+    decide: (states: WalletLedgerState[]) => CheckpointUpdate[],
+  ): Promise<{ states: WalletLedgerState[]; advanced: number }> {
+    return this.prisma.$transaction(
+      async (tx) => {
+        const states = await tx.$queryRaw<WalletLedgerState[]>`
+          SELECT
+            w."id" AS "walletId",
+            w."balance",
+            COALESCE(c."balance", 0::bigint) AS "checkpointBalance",
+            COALESCE(s."delta", 0::bigint) AS "delta",
+            COALESCE(s."settledDelta", 0::bigint) AS "settledDelta",
+            s."scanned",
+            l."createdAt" AS "lastCreatedAt",
+            l."id" AS "lastId"
+          FROM "Wallet" w
+          LEFT JOIN "BalanceCheckpoint" c ON c."walletId" = w."id"
+          LEFT JOIN LATERAL (
+            SELECT
+              SUM(${SIGNED_AMOUNT})::bigint AS "delta",
+              (SUM(${SIGNED_AMOUNT})
+                FILTER (WHERE t."createdAt" <= ${settleCutoff}))::bigint
+                AS "settledDelta",
+              COUNT(*)::int AS "scanned"
+            FROM "Transaction" t
+            WHERE ${AFTER_CHECKPOINT}
+          ) s ON true
+          LEFT JOIN LATERAL (
+            SELECT t."createdAt", t."id"
+            FROM "Transaction" t
+            WHERE ${AFTER_CHECKPOINT} AND t."createdAt" <= ${settleCutoff}
+            ORDER BY t."createdAt" DESC, t."id" DESC
+            LIMIT 1
+          ) l ON true
+          WHERE w."id" = ANY(${walletIds})
+        `;
+
+        const updates = decide(states);
+        if (updates.length > 0) {
+          await tx.$executeRaw`
+            INSERT INTO "BalanceCheckpoint"
+              ("walletId", "balance", "lastTransactionId", "lastTransactionAt")
+            VALUES ${Prisma.join(
+              updates.map(
+                (u) =>
+                  Prisma.sql`(${u.walletId}, ${u.balance}, ${u.lastTransactionId}, ${u.lastTransactionAt})`,
+              ),
+            )}
+            ON CONFLICT ("walletId") DO UPDATE SET
+              "balance" = EXCLUDED."balance",
+              "lastTransactionId" = EXCLUDED."lastTransactionId",
+              "lastTransactionAt" = EXCLUDED."lastTransactionAt",
+              "createdAt" = now()
+          `;
+        }
+
+        return { states, advanced: updates.length };
+      },
+      {
+        isolationLevel: Prisma.TransactionIsolationLevel.RepeatableRead,
+        timeout: 60000,
+      },
+    );
+  }
+}
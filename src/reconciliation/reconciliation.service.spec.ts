@@ -0,0 +1,119 @@
+import { Test, TestingModule } from '@nestjs/testing';
+import {
+  ReconciliationService,
+  checkpointUpdates,
+  findDrift,
+} from './reconciliation.service';
+import {
+  ReconciliationRepository,
+  WalletLedgerState,
+} from './reconciliation.repository';
+
+const state = (overrides: Partial<WalletLedgerState>): WalletLedgerState => ({
+  walletId: 'wallet-1',
+  balance: 15000n,
+  checkpointBalance: 10000n,
+  delta: 5000n,
+  settledDelta: 5000n,
+  scanned: 2,
+  lastCreatedAt: new Date('2026-01-01T00:00:00.000Z'),
+  lastId: 'tx-2',
+  ...overrides,
+});
+
+describe('ReconciliationService', () => {
+  let service: ReconciliationService;
+
+  const walletIds = ['w1', 'w2', 'w3', 'w4', 'w5'];
+
+  const mockReconciliationRepository = {
+    nextWalletIds: jest.fn((afterId: string, limit: number) =>
+      Promise.resolve(walletIds.filter((id) => id > afterId).slice(0, limit)),
+    ),
+    reconcileBatch: jest.fn(
+      (
+        ids: string[],
+        _cutoff: Date,
+        decide: (states: WalletLedgerState[]) => unknown[],
+      ) => {
+        const states = ids.map((walletId) =>
+          state({
+            walletId,
+            // w3 has 1.00 more than its ledger explains
+            balance: walletId === 'w3' ? 15100n : 15000n,
+          }),
+        );
+        return Promise.resolve({ states, advanced: decide(states).length });
+      },
+    ),
+  };
+
+  beforeEach(async () => {
+    jest.clearAllMocks();
+
+    const module: TestingModule = await Test.createTestingModule({
+      providers: [
+        ReconciliationService,
+        {
+          provide: ReconciliationRepository,
+          useValue: mockReconciliationRepository,
+        },
+      ],
+    }).compile();
+
+    service = module.get<ReconciliationService>(ReconciliationService);
+  });
+
+  it('should reconcile every wallet range once and report drift', async () => {
+    const report = await service.reconcile({ batchSize: 2, concurrency: 3 });
+
+    const reconciled = mockReconciliationRepository.reconcileBatch.mock.calls
+      .map(([ids]) => ids)
+      .flat()
+      .sort();
+    expect(reconciled).toEqual(walletIds);
+    expect(report).toMatchObject({
+      walletsChecked: 5,
+      transactionsScanned: 10,
+      checkpointsAdvanced: 4,
+      drifted: [
+        { walletId: 'w3', balance: 15100n, expected: 15000n, drift: 100n },
+      ],
+    });
+  });
+
+  it('should not advance checkpoints on a dry run', async () => {
+    const report = await service.reconcile({ dryRun: true });
+
+    expect(report.checkpointsAdvanced).toBe(0);
+    expect(report.drifted).toHaveLength(1);
+  });
+
+  describe('checkpointUpdates', () => {
+    it('should fold only settled activity into the checkpoint', () => {
+      expect(
+        checkpointUpdates([state({ delta: 7000n, balance: 17000n })]),
+      ).toEqual([
+        {
+          walletId: 'wallet-1',
+          balance: 15000n,
+          lastTransactionId: 'tx-2',
+          lastTransactionAt: new Date('2026-01-01T00:00:00.000Z'),
+        },
+      ]);
+    });
+
+    it('should keep the checkpoint of drifted or idle wallets', () => {
+      expect(
+        checkpointUpdates([
+          state({ balance: 1n }),
+          state({ lastId: null, lastCreatedAt: null }),
+        ]),
+      ).toEqual([]);
+    });
+  });
+
+  it('should report no drift when balance matches the ledger', () => {
+    expect(findDrift(state({}))).toBeNull();
+  });
+});
@@ -0,0 +1,155 @@
+import { Injectable } from '@nestjs/common';
+import {
+  CheckpointUpdate,
+  ReconciliationRepository,
+  WalletLedgerState,
+} from './reconciliation.repository';
+
+export interface ReconcileOptions {
+  // Wallets per snapshot query
+  batchSize: number;
+  // Batches reconciled at the same time
+  concurrency: number;
+  // Transactions newer than this are checked but not folded into the
+  // checkpoint yet, so rows from still-open transactions (whose createdAt
+  // can precede their commit) are never skipped by a later run.
+  settleLagMs: number;
+  // Report only; leave checkpoints where they are
+  dryRun: boolean;
+}
+
+export interface WalletDrift {
+  walletId: string;
+  balance: bigint;
+  expected: bigint;
+  drift: bigint;
+}
+
+export interface ReconcileReport {
+  walletsChecked: number;
+  transactionsScanned: number;
+  checkpointsAdvanced: number;
+  drifted: WalletDrift[];
+  durationMs: number;
+}
+
+export const DEFAULT_RECONCILE_OPTIONS: ReconcileOptions = {
+  batchSize: 1000,
+  concurrency: 4,
+  settleLagMs: 5 * 60 * 1000,
+  dryRun: false,
+};
+
+@Injectable()
+export class ReconciliationService {
+  constructor(private reconciliationRepository: ReconciliationRepository) {}
+
+  async reconcile(
+    options: Partial<ReconcileOptions> = {},
+  ): Promise<ReconcileReport> {
+    const { batchSize, concurrency, settleLagMs, dryRun } = {
+      ...DEFAULT_RECONCILE_OPTIONS,
+      ...options,
+    };
+    const startedAt = Date.now();
+    const settleCutoff = new Date(startedAt - settleLagMs);
+    const report: ReconcileReport = {
+      walletsChecked: 0,
+      transactionsScanned: 0,
+      checkpointsAdvanced: 0,
+      drifted: [],
+      durationMs: 0,
+    };
+
+    // Batches are handed out in wallet id order from a single keyset cursor;
+    // fetching the next range is serialized, reconciling it is not.
+    let afterId = '';
+    let exhausted = false;
+    let fetching: Promise<unknown> = Promise.resolve();
+    const nextBatch = (): Promise<string[]> => {
+      const batch = fetching.then(async () => {
+        if (exhausted) {
+          return [];
+        }
+        const ids = await this.reconciliationRepository.nextWalletIds(
+          afterId,
+          batchSize,
+        );
+        if (ids.length < batchSize) {
+          exhausted = true;
+        }
+        if (ids.length > 0) {
+          afterId = ids[ids.length - 1];
+        }
+        return ids;
+      });
+      fetching = batch.catch(() => undefined);
+      return batch;
+    };
+
+    const worker = async () => {
+      for (;;) {
+        const walletIds = await nextBatch();
+        if (walletIds.length === 0) {
+          return;
+        }
+        const { states, advanced } =
+          await this.reconciliationRepository.reconcileBatch(
+            walletIds,
+            settleCutoff,
+            (rows) => (dryRun ? [] : checkpointUpdates(rows)),
+          );
+
+        report.walletsChecked += states.length;
+        report.checkpointsAdvanced += advanced;
+        for (const state of states) {
+          report.transactionsScanned += state.scanned ?? 0;
+          const drift = findDrift(state);
+          if (drift) {
+            report.drifted.push(drift);
+          }
+        }
+      }
+    };
+
+    await Promise.all(
+      Array.from({ length: Math.max(1, concurrency) }, () => worker()),
+    );
+
+    report.durationMs = Date.now() - startedAt;
+    return report;
+  }
+}
+
+export function findDrift(state: WalletLedgerState): WalletDrift | null {
+  const expected = state.checkpointBalance + state.delta;
+  if (expected === state.balance) {
+    return null;
+  }
+  return {
+    walletId: state.walletId,
+    balance: state.balance,
+    expected,
+    drift: state.balance - expected,
+  };
+}
+
+// Only consistent wallets with settled activity move their checkpoint;
+// drifted wallets keep theirs so the next run reports them again.
+export function checkpointUpdates(
+  states: WalletLedgerState[],
+): CheckpointUpdate[] {
+  return states
+    .filter(
+      (state) =>
+        state.lastId !== null &&
+        state.lastCreatedAt !== null &&
+        !findDrift(state),
+    )
+    .map((state) => ({
+      walletId: state.walletId,
+      balance: state.checkpointBalance + state.settledDelta,
+      lastTransactionId: state.lastId as string,
+      lastTransactionAt: state.lastCreatedAt as Date,
+    }));
+}
@@ -0,0 +1,10 @@
+import { Module } from '@nestjs/common';
+import { PrismaModule } from '../prisma/prisma.module';
+import { SystemAccountsService } from './system-accounts.service';
+
+@Module({
+  imports: [PrismaModule],
+  providers: [SystemAccountsService],
+  exports: [SystemAccountsService],
+})
+export class SystemAccountsModule {}
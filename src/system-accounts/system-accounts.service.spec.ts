@@ -0,0 +1,115 @@
+import { Test, TestingModule } from '@nestjs/testing';
+import { SystemAccountsService } from './system-accounts.service';
+import { PrismaService } from '../prisma/prisma.service';
+import { Prisma } from '../../generated/prisma';
+
+describe('SystemAccountsService', () => {
+  let service: SystemAccountsService;
+
+  const mockPrismaService = {
+    user: {
+      upsert: jest.fn(),
+    },
+    wallet: {
+      upsert: jest.fn(),
+    },
+  };
+
+  beforeEach(async () => {
+    jest.clearAllMocks();
+
+    mockPrismaService.user.upsert.mockResolvedValue({
+      id: 'system-user-id',
+      email: 'system@walle.internal',
+      alias: 'SYSTEM',
+    });
+    mockPrismaService.wallet.upsert.mockResolvedValue({
+      id: 'system-wallet-id',
+      userId: 'system-user-id',
+      balance: 0,
+    });
+
+    const module: TestingModule = await Test.createTestingModule({
+      providers: [
+        SystemAccountsService,
+        {
+          provide: PrismaService,
+          useValue: mockPrismaService,
+        },
+      ],
+    }).compile();
+
+    service = module.get<SystemAccountsService>(SystemAccountsService);
+  });
+
+  it('should resolve the system wallet once and cache it', async () => {
+    await service.onModuleInit();
+
+    expect(await service.getSystemWalletId()).toBe('system-wallet-id');
+    expect(await service.getSystemWalletId()).toBe('system-wallet-id');
+    expect(mockPrismaService.user.upsert).toHaveBeenCalledTimes(1);
+    expect(mockPrismaService.wallet.upsert).toHaveBeenCalledWith({
+      where: { userId: 'system-user-id' },
+      update: {},
+      create: { userId: 'system-user-id', balance: 0 },
+    });
+  });
+
+  it('should share a single lookup between concurrent callers', async () => {
+    const ids = await Promise.all([
+      service.getSystemWalletId(),
+      service.getSystemWalletId(),
+    ]);
+
+    expect(ids).toEqual(['system-wallet-id', 'system-wallet-id']);
+    expect(mockPrismaService.user.upsert).toHaveBeenCalledTimes(1);
+  });
+
+  it('should not fail startup when the database is unavailable', async () => {
+    mockPrismaService.user.upsert.mockRejectedValueOnce(new Error('down'));
+    const consoleErrorSpy = jest
+      .spyOn(console, 'error')
+      .mockImplementation(() => {});
+
+    await expect(service.onModuleInit()).resolves.toBeUndefined();
+    expect(await service.getSystemWalletId()).toBe('system-wallet-id');
+    consoleErrorSpy.mockRestore();
+  });
+
+  describe('withSystemWallet', () => {
+    it('should pass the cached id to the callback', async () => {
+      const fn = jest.fn().mockResolvedValue('ok');
+
+      await expect(service.withSystemWallet(fn)).resolves.toBe('ok');
+      expect(fn).toHaveBeenCalledWith('system-wallet-id');
+    });
+
+    it('should re-resolve and retry once when the cached wallet is gone', async () => {
+      await service.onModuleInit();
+      mockPrismaService.wallet.upsert.mockResolvedValueOnce({
+        id: 'new-system-wallet-id',
+        userId: 'system-user-id',
+        balance: 0,
+      });
+      const missing = new Prisma.PrismaClientKnownRequestError(
+        'Foreign key constraint failed',
+        { code: 'P2003', clientVersion: 'test' },
+      );
+      const fn = jest
+        .fn()
+        .mockRejectedValueOnce(missing)
+        .mockResolvedValueOnce('ok');
+
+      await expect(service.withSystemWallet(fn)).resolves.toBe('ok');
+      expect(fn).toHaveBeenNthCalledWith(1, 'system-wallet-id');
+      expect(fn).toHaveBeenNthCalledWith(2, 'new-system-wallet-id');
+    });
+
+    it('should rethrow unrelated errors without retrying', async () => {
+      const fn = jest.fn().mockRejectedValue(new Error('boom'));
+
+      await expect(service.withSystemWallet(fn)).rejects.toThrow('boom');
+      expect(fn).toHaveBeenCalledTimes(1);
+    });
+  });
+});
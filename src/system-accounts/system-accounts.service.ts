@@ -0,0 +1,89 @@
+import { Injectable, OnModuleInit } from '@nestjs/common';
+import { PrismaService } from '../prisma/prisma.service';
+import { Prisma } from '../../generated/prisma';
+
+export const SYSTEM_USER_EMAIL = 'system@walle.internal';
+export const SYSTEM_USER_ALIAS = 'SYSTEM';
+
+interface SystemAccounts {
+  userId: string;
+  walletId: string;
+}
+
+@Injectable()
+export class SystemAccountsService implements OnModuleInit {
+  private accounts: SystemAccounts | null = null;
+  private resolving: Promise<SystemAccounts> | null = null;
+
+  constructor(private prisma: PrismaService) {}
+
+  async onModuleInit() {
+    try {
+      await this.resolve();
+    } catch (error) {
+      // Don't block boot on it; the first deposit will resolve it lazily
+      console.error('Could not resolve system accounts at startup:', error);
+    }
+  }
+
+  async getSystemWalletId(): Promise<string> {
+    const accounts = this.accounts ?? (await this.resolve());
+    return accounts.walletId;
+  }
+
+  // Runs `fn` with the cached system wallet id. If the cached row has been
+  // removed underneath us (e.g. a database reset), re-resolve once and retry.
+  async withSystemWallet<T>(fn: (systemWalletId: string) => Promise<T>) {
+    try {
+      return await fn(await this.getSystemWalletId());
+    } catch (error) {
+      if (!isMissingRecordError(error)) {
+        throw error;
+      }
+      this.accounts = null;
+      return fn(await this.getSystemWalletId());
+    }
+  }
+
+  private resolve(): Promise<SystemAccounts> {
+    if (!this.resolving) {
+      this.resolving = this.loadOrCreate()
+        .then((accounts) => {
+          this.accounts = accounts;
+          return accounts;
+        })
+        .finally(() => {
+          this.resolving = null;
+        });
+    }
+    return this.resolving;
+  }
+
+  private async loadOrCreate(): Promise<SystemAccounts> {
+    const systemUser = await this.prisma.user.upsert({
+      where: { email: SYSTEM_USER_EMAIL },
+      update: {},
+      create: {
+        email: SYSTEM_USER_EMAIL,
+        alias: SYSTEM_USER_ALIAS,
+        password: 'N/A', // Sistema no necesita password real
+      },
+    });
+
+    const systemWallet = await this.prisma.wallet.upsert({
+      where: { userId: systemUser.id },
+      update: {},
+      create: { userId: systemUser.id, balance: 0 },
+    });
+
+    return { userId: systemUser.id, walletId: systemWallet.id };
+  }
+}
+
+// P2025: record to connect not found, P2003: foreign key violation
+function isMissingRecordError(error: unknown): boolean {
+  return (
+    error instanceof Prisma.PrismaClientKnownRequestError &&
+    (error.code === 'P2025' || error.code === 'P2003')
+  );
+}
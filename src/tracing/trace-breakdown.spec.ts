@@ -0,0 +1,37 @@
+import { foldSpans, formatFolded } from './trace-breakdown';
+import { SpanData } from './tracer';
+
+const span = (
+  spanId: string,
+  name: string,
+  durationMs: number,
+  parentSpanId?: string,
+): SpanData => ({
+  traceId: 'trace',
+  spanId,
+  parentSpanId,
+  name,
+  kind: 'internal',
+  startTimeUnixNano: '0',
+  endTimeUnixNano: '0',
+  durationMs,
+  attributes: {},
+  status: { code: 'OK' },
+});
+
+describe('foldSpans', () => {
+  it('should attribute self time to each span path', () => {
+    const stacks = foldSpans([
+      span('a', 'POST /transactions/p2p', 10),
+      span('b', 'prisma $transaction', 6, 'a'),
+      span('c', 'prisma Wallet.updateMany', 4, 'b'),
+      span('d', 'prisma Wallet.updateMany', 1, 'b'),
+    ]);
+
+    expect(formatFolded(stacks).split('\n')).toEqual([
+      'POST /transactions/p2p;prisma $transaction;prisma Wallet.updateMany 5000',
+      'POST /transactions/p2p 4000',
+      'POST /transactions/p2p;prisma $transaction 1000',
+    ]);
+  });
+});
@@ -0,0 +1,46 @@
+import { SpanData } from './tracer';
+
+// Folds exported spans into flame graph "folded stacks": one line per
+// distinct span path (`POST /transactions/p2p;prisma $transaction;...`)
+// with the total self time in microseconds spent at that path. The output
+// loads directly into speedscope or flamegraph.pl.
+export function foldSpans(spans: SpanData[]): Map<string, number> {
+  const byId = new Map(spans.map((span) => [span.spanId, span]));
+  const childTime = new Map<string, number>();
+  for (const span of spans) {
+    if (span.parentSpanId && byId.has(span.parentSpanId)) {
+      childTime.set(
+        span.parentSpanId,
+        (childTime.get(span.parentSpanId) ?? 0) + span.durationMs,
+      );
+    }
+  }
+
+  const stacks = new Map<string, number>();
+  for (const span of spans) {
+    const path: string[] = [];
+    let current: SpanData | undefined = span;
+    while (current) {
+      path.unshift(current.name.replace(/;/g, ','));
+      current = current.parentSpanId
+        ? byId.get(current.parentSpanId)
+        : undefined;
+    }
+    // Concurrent children can add up to more than their parent
+    const selfMs = Math.max(
+      0,
+      span.durationMs - (childTime.get(span.spanId) ?? 0),
+    );
+    const key = path.join(';');
+    stacks.set(key, (stacks.get(key) ?? 0) + Math.round(selfMs * 1000));
+  }
+  return stacks;
+}
+
+export function formatFolded(stacks: Map<string, number>): string {
+  return [...stacks.entries()]
+    .filter(([, micros]) => micros > 0)
+    .sort(([, a], [, b]) => b - a)
+    .map(([stack, micros]) => `${stack} ${micros}`)
+    .join('\n');
+}
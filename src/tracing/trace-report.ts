@@ -0,0 +1,29 @@
+import { createReadStream } from 'fs';
+import { createInterface } from 'readline';
+import { SpanData } from './tracer';
+import { foldSpans, formatFolded } from './trace-breakdown';
+
+// Usage: npm run trace:report -- traces.ndjson > stacks.folded
+// Turns the spans written with TRACE_EXPORTER=file into folded stacks
+// (self time in microseconds) for speedscope or flamegraph.pl.
+async function main() {
+  const [file] = process.argv.slice(2);
+  if (!file) {
+    throw new Error('Usage: trace-report <traces.ndjson>');
+  }
+
+  const spans: SpanData[] = [];
+  const lines = createInterface({ input: createReadStream(file) });
+  for await (const line of lines) {
+    if (line.trim()) {
+      spans.push(JSON.parse(line) as SpanData);
+    }
+  }
+
+  process.stdout.write(`${formatFolded(foldSpans(spans))}\n`);
+}
+
+main().catch((error) => {
+  console.error(error instanceof Error ? error.message : error);
+  process.exit(1);
+});
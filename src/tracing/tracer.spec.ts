@@ -0,0 +1,102 @@
+import {
+  InMemorySpanExporter,
+  Traced,
+  Tracer,
+  parseTraceparent,
+  tracer,
+} from './tracer';
+
+describe('Tracer', () => {
+  let exporter: InMemorySpanExporter;
+
+  beforeEach(() => {
+    exporter = new InMemorySpanExporter();
+    tracer.configure({ exporter, sampleRatio: 1 });
+  });
+
+  afterEach(async () => {
+    await tracer.shutdown();
+  });
+
+  it('should nest spans along the async call chain', async () => {
+    const root = tracer.startSpan('POST /transactions/p2p', { kind: 'server' });
+
+    await tracer.withSpan(root, () =>
+      tracer.trace('prisma $transaction', async () => {
+        await new Promise((resolve) => setTimeout(resolve, 1));
+        await tracer.trace('prisma Wallet.updateMany', () =>
+          Promise.resolve(),
+        );
+      }),
+    );
+    root.end();
+
+    const [query, transaction, request] = exporter.spans;
+    expect(request.name).toBe('POST /transactions/p2p');
+    expect(transaction.parentSpanId).toBe(request.spanId);
+    expect(query.parentSpanId).toBe(transaction.spanId);
+    expect(new Set(exporter.spans.map((span) => span.traceId)).size).toBe(1);
+  });
+
+  it('should not start traces outside a sampled request', async () => {
+    await tracer.trace('prisma Wallet.findUnique', () => Promise.resolve());
+
+    const unsampled = new Tracer();
+    unsampled.configure({ exporter, sampleRatio: 0 });
+    const root = unsampled.startSpan('GET /wallet/balance');
+    await unsampled.withSpan(root, () =>
+      unsampled.trace('prisma Wallet.findUnique', () => Promise.resolve()),
+    );
+    root.end();
+
+    expect(exporter.spans).toEqual([]);
+  });
+
+  it('should record failures and rethrow them', async () => {
+    const root = tracer.startSpan('GET /wallet');
+
+    await expect(
+      tracer.withSpan(root, () =>
+        tracer.trace('bank POST /transfer', () =>
+          Promise.reject(new Error('Bank unavailable')),
+        ),
+      ),
+    ).rejects.toThrow('Bank unavailable');
+
+    expect(exporter.spans[0].status).toEqual({
+      code: 'ERROR',
+      message: 'Bank unavailable',
+    });
+  });
+
+  it('should continue a remote trace from traceparent', () => {
+    const parent = parseTraceparent(
+      '00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01',
+    );
+    const span = tracer.startSpan('GET /wallet', { parent });
+
+    expect(span.traceId).toBe('4bf92f3577b34da6a3ce929d0e0e4736');
+    expect(span.parentSpanId).toBe('00f067aa0ba902b7');
+    expect(span.traceparent()).toMatch(
+      /^00-4bf92f3577b34da6a3ce929d0e0e4736-[\da-f]{16}-01$/,
+    );
+    expect(parseTraceparent('00-0000-bad-01')).toBeUndefined();
+  });
+
+  it('should wrap decorated methods in a child span', async () => {
+    class TransfersService {
+      @Traced()
+      async transfer(amount: number) {
+        return Promise.resolve(amount * 2);
+      }
+    }
+    const root = tracer.startSpan('POST /transactions/p2p');
+
+    const result = await tracer.withSpan(root, () =>
+      new TransfersService().transfer(21),
+    );
+
+    expect(result).toBe(42);
+    expect(exporter.spans[0].name).toBe('TransfersService.transfer');
+  });
+});
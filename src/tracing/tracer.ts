@@ -0,0 +1,235 @@
+import { AsyncLocalStorage } from 'async_hooks';
+import { randomBytes } from 'crypto';
+import { createWriteStream, WriteStream } from 'fs';
+
+export type SpanKind = 'server' | 'client' | 'internal';
+export type SpanAttributes = Record<string, string | number | boolean>;
+
+// Exported spans follow the OpenTelemetry data model: W3C-sized hex ids,
+// unix-nano timestamps and semantic-convention attribute names.
+export interface SpanData {
+  traceId: string;
+  spanId: string;
+  parentSpanId?: string;
+  name: string;
+  kind: SpanKind;
+  startTimeUnixNano: string;
+  endTimeUnixNano: string;
+  durationMs: number;
+  attributes: SpanAttributes;
+  status: { code: 'OK' | 'ERROR'; message?: string };
+}
+
+export interface SpanExporter {
+  export(span: SpanData): void;
+  shutdown(): Promise<void>;
+}
+
+export interface SpanContext {
+  traceId: string;
+  spanId: string;
+  sampled: boolean;
+}
+
+interface SpanOptions {
+  kind?: SpanKind;
+  attributes?: SpanAttributes;
+  // Remote parent, e.g. from an incoming traceparent header
+  parent?: SpanContext;
+}
+
+export class Span implements SpanContext {
+  readonly spanId = randomBytes(8).toString('hex');
+  readonly attributes: SpanAttributes;
+  private readonly startNs = process.hrtime.bigint();
+  private readonly startEpochNs = BigInt(Date.now()) * 1_000_000n;
+  private status: SpanData['status'] = { code: 'OK' };
+  private ended = false;
+
+  constructor(
+    readonly name: string,
+    readonly kind: SpanKind,
+    readonly traceId: string,
+    readonly parentSpanId: string | undefined,
+    readonly sampled: boolean,
+    attributes: SpanAttributes,
+    private readonly onEnd: (span: SpanData) => void,
+  ) {
+    this.attributes = { ...attributes };
+  }
+
+  setAttribute(key: string, value: string | number | boolean) {
+    this.attributes[key] = value;
+  }
+
+  recordError(error: unknown) {
+    this.status = {
+      code: 'ERROR',
+      message: error instanceof Error ? error.message : String(error),
+    };
+  }
+
+  // W3C Trace Context header value for this span
+  traceparent(): string {
+    return `00-${this.traceId}-${this.spanId}-${this.sampled ? '01' : '00'}`;
+  }
+
+  end() {
+    if (this.ended) {
+      return;
+    }
+    this.ended = true;
+    if (!this.sampled) {
+      return;
+    }
+    const elapsedNs = process.hrtime.bigint() - this.startNs;
+    this.onEnd({
+      traceId: this.traceId,
+      spanId: this.spanId,
+      parentSpanId: this.parentSpanId,
+      name: this.name,
+      kind: this.kind,
+      startTimeUnixNano: this.startEpochNs.toString(),
+      endTimeUnixNano: (this.startEpochNs + elapsedNs).toString(),
+      durationMs: Number(elapsedNs) / 1e6,
+      attributes: this.attributes,
+      status: this.status,
+    });
+  }
+}
+
+// Spans follow the async call chain through AsyncLocalStorage, so Prisma
+// queries and bank calls nest under the request that caused them without
+// passing a context around. Only the HTTP interceptor starts traces;
+// everything else adds child spans to a sampled trace or runs untouched.
+export class Tracer {
+  private readonly storage = new AsyncLocalStorage<Span>();
+  private exporter: SpanExporter | null = null;
+  private sampleRatio = 1;
+
+  configure(options: { exporter: SpanExporter | null; sampleRatio?: number }) {
+    this.exporter = options.exporter;
+    this.sampleRatio = Math.min(1, Math.max(0, options.sampleRatio ?? 1));
+  }
+
+  get enabled(): boolean {
+    return this.exporter !== null;
+  }
+
+  getExporter(): SpanExporter | null {
+    return this.exporter;
+  }
+
+  activeSpan(): Span | undefined {
+    return this.storage.getStore();
+  }
+
+  startSpan(name: string, options: SpanOptions = {}): Span {
+    const parent = options.parent ?? this.activeSpan();
+    return new Span(
+      name,
+      options.kind ?? 'internal',
+      parent?.traceId ?? randomBytes(16).toString('hex'),
+      parent?.spanId,
+      parent ? parent.sampled : Math.random() < this.sampleRatio,
+      options.attributes ?? {},
+      (span) => this.exporter?.export(span),
+    );
+  }
+
+  withSpan<T>(span: Span, fn: () => T): T {
+    return this.storage.run(span, fn);
+  }
+
+  // Runs `fn` in a child span of the active sampled span, or as is
+  async trace<T>(
+    name: string,
+    fn: (span?: Span) => Promise<T>,
+    options: Omit<SpanOptions, 'parent'> = {},
+  ): Promise<T> {
+    if (!this.activeSpan()?.sampled) {
+      return fn();
+    }
+    const span = this.startSpan(name, options);
+    try {
+      return await this.withSpan(span, () => fn(span));
+    } catch (error) {
+      span.recordError(error);
+      throw error;
+    } finally {
+      span.end();
+    }
+  }
+
+  async shutdown() {
+    await this.exporter?.shutdown();
+    this.exporter = null;
+  }
+}
+
+export const tracer = new Tracer();
+
+// Parses a W3C `traceparent` header into a remote parent context
+export function parseTraceparent(
+  header: string | string[] | undefined,
+): SpanContext | undefined {
+  const value = Array.isArray(header) ? header[0] : header;
+  const match = value?.match(
+    /^[\da-f]{2}-([\da-f]{32})-([\da-f]{16})-([\da-f]{2})$/,
+  );
+  if (!match || /^0+$/.test(match[1]) || /^0+$/.test(match[2])) {
+    return undefined;
+  }
+  return {
+    traceId: match[1],
+    spanId: match[2],
+    sampled: (parseInt(match[3], 16) & 1) === 1,
+  };
+}
+
+// Method decorator: wraps the call in a child span named Class.method
+export function Traced(name?: string): MethodDecorator {
+  return (target, propertyKey, descriptor: PropertyDescriptor) => {
+    const original = descriptor.value as (...args: unknown[]) => unknown;
+    const spanName =
+      name ?? `${target.constructor.name}.${String(propertyKey)}`;
+    descriptor.value = function (this: unknown, ...args: unknown[]) {
+      return tracer.trace(spanName, async () => original.apply(this, args));
+    };
+    return descriptor;
+  };
+}
+
+// Keeps finished spans for assertions in tests
+export class InMemorySpanExporter implements SpanExporter {
+  readonly spans: SpanData[] = [];
+
+  export(span: SpanData) {
+    this.spans.push(span);
+  }
+
+  reset() {
+    this.spans.length = 0;
+  }
+
+  shutdown(): Promise<void> {
+    return Promise.resolve();
+  }
+}
+
+// Appends one JSON span per line; see trace-report.ts for the breakdown
+export class FileSpanExporter implements SpanExporter {
+  private readonly stream: WriteStream;
+
+  constructor(path: string) {
+    this.stream = createWriteStream(path, { flags: 'a' });
+  }
+
+  export(span: SpanData) {
+    this.stream.write(`${JSON.stringify(span)}\n`);
+  }
+
+  shutdown(): Promise<void> {
+    return new Promise((resolve) => this.stream.end(resolve));
+  }
+}
@@ -0,0 +1,57 @@
+import {
+  CallHandler,
+  ExecutionContext,
+  Injectable,
+  NestInterceptor,
+} from '@nestjs/common';
+import { Request, Response } from 'express';
+import { Observable, tap } from 'rxjs';
+import { parseTraceparent, tracer } from './tracer';
+
+// Opens the server span of each HTTP request and runs the handler inside
+// it. Every response carries the trace id (X-Trace-Id and traceparent),
+// sampled or not, so a slow request can be looked up afterwards.
+@Injectable()
+export class TracingInterceptor implements NestInterceptor {
+  intercept(context: ExecutionContext, next: CallHandler): Observable<any> {
+    if (context.getType() !== 'http' || !tracer.enabled) {
+      return next.handle();
+    }
+    const http = context.switchToHttp();
+    const req = http.getRequest<Request>();
+    const res = http.getResponse<Response>();
+
+    const routePath = (req.route as { path?: string } | undefined)?.path;
+    const route = routePath ? `${req.baseUrl}${routePath}` : req.path;
+    const handler = `${context.getClass().name}.${context.getHandler().name}`;
+    const span = tracer.startSpan(`${req.method} ${route}`, {
+      kind: 'server',
+      parent: parseTraceparent(req.headers.traceparent),
+      attributes: {
+        'http.request.method': req.method,
+        'http.route': route,
+        'code.function': handler,
+      },
+    });
+    res.setHeader('traceparent', span.traceparent());
+    res.setHeader('X-Trace-Id', span.traceId);
+
+    // The status is only final once the response (or exception filter) has
+    // written it, after the handler's observable completes
+    const end = () => {
+      span.setAttribute('http.response.status_code', res.statusCode);
+      span.end();
+    };
+    res.once('finish', end);
+    res.once('close', end);
+
+    return new Observable((subscriber) =>
+      tracer.withSpan(span, () =>
+        next
+          .handle()
+          .pipe(tap({ error: (error: unknown) => span.recordError(error) }))
+          .subscribe(subscriber),
+      ),
+    );
+  }
+}
@@ -0,0 +1,46 @@
+import { Module, OnApplicationShutdown, OnModuleInit } from '@nestjs/common';
+import { APP_INTERCEPTOR } from '@nestjs/core';
+import { ConfigService } from '@nestjs/config';
+import { TracingInterceptor } from './tracing.interceptor';
+import {
+  FileSpanExporter,
+  InMemorySpanExporter,
+  SpanExporter,
+  tracer,
+} from './tracer';
+
+// TRACE_EXPORTER=file writes spans to TRACE_FILE (NDJSON); `memory` keeps
+// them in process for tests. Unset disables tracing entirely.
+@Module({
+  providers: [{ provide: APP_INTERCEPTOR, useClass: TracingInterceptor }],
+})
+export class TracingModule implements OnModuleInit, OnApplicationShutdown {
+  constructor(private readonly configService: ConfigService) {}
+
+  onModuleInit() {
+    const sampleRatio = Number(
+      this.configService.get<string>('TRACE_SAMPLE_RATIO') ?? 1,
+    );
+    tracer.configure({
+      exporter: this.createExporter(),
+      sampleRatio: Number.isFinite(sampleRatio) ? sampleRatio : 1,
+    });
+  }
+
+  async onApplicationShutdown() {
+    await tracer.shutdown();
+  }
+
+  private createExporter(): SpanExporter | null {
+    switch (this.configService.get<string>('TRACE_EXPORTER')) {
+      case 'file':
+        return new FileSpanExporter(
+          this.configService.get<string>('TRACE_FILE') || 'traces.ndjson',
+        );
+      case 'memory':
+        return new InMemorySpanExporter();
+      default:
+        return null;
+    }
+  }
+}
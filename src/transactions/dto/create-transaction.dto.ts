@@ -8,6 +8,7 @@ import {
 import { TransactionType } from '../../../generated/prisma'; // Adjust path if necessary
 
 export class CreateTransactionDto {
+  // Decimal major units; services convert with toMinorUnits()
   @IsNumber()
   @IsNotEmpty()
   amount: number;
@@ -0,0 +1,19 @@
+import { Type } from 'class-transformer';
+import {
+  ArrayMaxSize,
+  ArrayMinSize,
+  IsArray,
+  ValidateNested,
+} from 'class-validator';
+import { P2PTransferDto } from './p2p-transfer.dto';
+
+export const MAX_BATCH_TRANSFER_ITEMS = 500;
+
+export class P2PBatchTransferDto {
+  @IsArray()
+  @ArrayMinSize(1)
+  @ArrayMaxSize(MAX_BATCH_TRANSFER_ITEMS)
+  @ValidateNested({ each: true })
+  @Type(() => P2PTransferDto)
+  transfers: P2PTransferDto[];
+}
@@ -11,6 +11,7 @@ export class P2PTransferDto {
   @IsNotEmpty()
   recipientIdentifier: string;
 
+  // Decimal major units; services convert with toMinorUnits()
   @IsNumber()
   @Min(0.01)
   @IsPositive()
@@ -15,6 +15,7 @@ describe('TransactionsController', () => {
     update: jest.fn(),
     remove: jest.fn(),
     transferP2P: jest.fn(),
+    createP2PBatchTransfer: jest.fn(),
   };
 
   const mockTransaction = {
@@ -93,19 +94,57 @@ describe('TransactionsController', () => {
     });
   });
 
+  describe('p2pBatchTransfer', () => {
+    it('should pay the batch on behalf of the authenticated user', async () => {
+      const batchDto = {
+        transfers: [{ recipientIdentifier: 'recipient', amount: 10 }],
+      };
+      const batchResult = {
+        message: 'Batch transfer processed',
+        succeeded: 1,
+        failed: 0,
+        totalDebited: 1000n,
+        results: [],
+      };
+      mockTransactionsService.createP2PBatchTransfer.mockResolvedValue(
+        batchResult,
+      );
+
+      const result = await controller.p2pBatchTransfer(
+        { user: { id: 'user-id' } },
+        batchDto,
+      );
+
+      expect(result).toEqual(batchResult);
+      expect(
+        mockTransactionsService.createP2PBatchTransfer,
+      ).toHaveBeenCalledWith('user-id', batchDto);
+    });
+  });
+
   describe('findAll', () => {
-    it('should return all transactions for a wallet', async () => {
-      const mockTransactions = [
-        mockTransaction,
-        { ...mockTransaction, id: 'transaction-id-2' },
-      ];
+    const mockRequest = { user: { id: 'user-id', walletId: 'wallet-id' } };
+
+    it('should return a page of the caller wallet history', async () => {
+      const mockPage = {
+        items: [
+          mockTransaction,
+          { ...mockTransaction, id: 'transaction-id-2' },
+        ],
+        nextCursor: 'next-cursor',
+      };
+      const query = { limit: 2, type: TransactionType.IN };
 
-      mockTransactionsService.findAll.mockResolvedValue(mockTransactions);
+      mockTransactionsService.findAll.mockResolvedValue(mockPage);
 
-      const result = await controller.findAll();
+      const result = await controller.findAll(mockRequest, query);
 
-      expect(result).toEqual(mockTransactions);
-      expect(mockTransactionsService.findAll).toHaveBeenCalled();
+      expect(result).toEqual(mockPage);
+      expect(mockTransactionsService.findAll).toHaveBeenCalledWith(
+        'user-id',
+        query,
+        'wallet-id',
+      );
     });
 
     it('should handle errors from transactionService.findAll', async () => {
@@ -113,7 +152,9 @@ describe('TransactionsController', () => {
         new Error('Find all failed'),
       );
 
-      await expect(controller.findAll()).rejects.toThrow('Find all failed');
+      await expect(controller.findAll(mockRequest, {})).rejects.toThrow(
+        'Find all failed',
+      );
       expect(mockTransactionsService.findAll).toHaveBeenCalled();
     });
   });
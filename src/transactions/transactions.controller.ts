@@ -8,12 +8,19 @@ import {
   Delete,
   Request,
   UseGuards,
+  Query,
 } from '@nestjs/common';
 import { AuthGuard } from '@nestjs/passport';
-import { TransactionsService } from './transactions.service';
+import {
+  TransactionsService,
+  P2PBatchTransferResult,
+} from './transactions.service';
 import { CreateTransactionDto } from './dto/create-transaction.dto';
 import { UpdateTransactionDto } from './dto/update-transaction.dto';
 import { P2PTransferDto } from './dto/p2p-transfer.dto';
+import { P2PBatchTransferDto } from './dto/p2p-batch-transfer.dto';
+import { TransactionHistoryQueryDto } from './dto/transaction-history-query.dto';
+import { TransactionHistoryPage } from './transactions.repository';
 import { Transaction } from '../../generated/prisma';
 
 @Controller('transactions')
@@ -30,6 +37,18 @@ export class TransactionsController {
     return this.transactionsService.createP2PTransfer(senderId, p2pTransferDto);
   }
 
+  @Post('p2p/batch')
+  @UseGuards(AuthGuard('jwt'))
+  async p2pBatchTransfer(
+    @Request() req,
+    @Body() batchDto: P2PBatchTransferDto,
+  ): Promise<P2PBatchTransferResult> {
+    return this.transactionsService.createP2PBatchTransfer(
+      req.user.id,
+      batchDto,
+    );
+  }
+
   @Post()
   async create(
     @Body() createTransactionDto: CreateTransactionDto,
@@ -38,8 +57,16 @@ export class TransactionsController {
   }
 
   @Get()
-  async findAll(): Promise<Transaction[]> {
-    return this.transactionsService.findAll();
+  @UseGuards(AuthGuard('jwt'))
+  async findAll(
+    @Request() req,
+    @Query() query: TransactionHistoryQueryDto,
+  ): Promise<TransactionHistoryPage> {
+    return this.transactionsService.findAll(
+      req.user.id,
+      query,
+      req.user.walletId,
+    );
   }
 
   @Get(':id')
@@ -5,9 +5,10 @@ import { UsersModule } from '../users/users.module';
 import { WalletModule } from '../wallet/wallet.module';
 import { PrismaModule } from '../prisma/prisma.module';
 import { TransactionsRepository } from './transactions.repository';
+import { BalanceEventsModule } from '../balance-events/balance-events.module';
 
 @Module({
-  imports: [PrismaModule, UsersModule, WalletModule],
+  imports: [PrismaModule, UsersModule, WalletModule, BalanceEventsModule],
   controllers: [TransactionsController],
   providers: [TransactionsService, TransactionsRepository],
   exports: [TransactionsService, TransactionsRepository],
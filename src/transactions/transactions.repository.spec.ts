@@ -0,0 +1,124 @@
+import { Test, TestingModule } from '@nestjs/testing';
+import {
+  TransactionsRepository,
+  encodeHistoryCursor,
+  keysetAfter,
+} from './transactions.repository';
+import { PrismaService } from '../prisma/prisma.service';
+import { TransactionType } from '../../generated/prisma';
+import { BalanceEventBus } from '../balance-events/balance-event-bus';
+import { RecipientCacheService } from '../users/recipient-cache.service';
+
+describe('TransactionsRepository', () => {
+  let repository: TransactionsRepository;
+
+  const mockReader = {
+    transaction: {
+      findMany: jest.fn(),
+    },
+  };
+
+  const mockPrismaService = {
+    reader: jest.fn(() => mockReader),
+  };
+
+  beforeEach(async () => {
+    const module: TestingModule = await Test.createTestingModule({
+      providers: [
+        TransactionsRepository,
+        {
+          provide: PrismaService,
+          useValue: mockPrismaService,
+        },
+        {
+          provide: BalanceEventBus,
+          useValue: {},
+        },
+        {
+          provide: RecipientCacheService,
+          useValue: {},
+        },
+      ],
+    }).compile();
+
+    repository = module.get<TransactionsRepository>(TransactionsRepository);
+  });
+
+  afterEach(() => {
+    jest.clearAllMocks();
+  });
+
+  describe('keysetAfter', () => {
+    const cursor = {
+      createdAt: new Date('2026-10-17T12:00:00.000Z'),
+      id: 'transaction-id',
+    };
+
+    it('should bound the scan at the cursor next to the tie-break', () => {
+      expect(keysetAfter(cursor)).toEqual({
+        createdAt: { lte: cursor.createdAt },
+        OR: [
+          { createdAt: { lt: cursor.createdAt } },
+          { createdAt: cursor.createdAt, id: { gt: 'transaction-id' } },
+        ],
+      });
+    });
+
+    it('should keep an earlier upper bound from the date filter', () => {
+      const to = new Date('2026-10-01T00:00:00.000Z');
+
+      expect(keysetAfter(cursor, { lte: to }).createdAt).toEqual({ lte: to });
+    });
+  });
+
+  describe('findWalletHistory', () => {
+    it('should merge the keyset bound with the date filter', async () => {
+      const cursor = {
+        createdAt: new Date('2026-10-17T12:00:00.000Z'),
+        id: 'transaction-id',
+      };
+      const from = new Date('2026-10-01T00:00:00.000Z');
+      const to = new Date('2026-10-31T00:00:00.000Z');
+      mockReader.transaction.findMany.mockResolvedValue([]);
+
+      await repository.findWalletHistory('wallet-id', {
+        limit: 20,
+        cursor,
+        type: TransactionType.IN,
+        from,
+        to,
+      });
+
+      expect(mockReader.transaction.findMany).toHaveBeenCalledWith({
+        where: {
+          effectedWalletId: 'wallet-id',
+          type: TransactionType.IN,
+          createdAt: { gte: from, lte: cursor.createdAt },
+          OR: [
+            { createdAt: { lt: cursor.createdAt } },
+            { createdAt: cursor.createdAt, id: { gt: 'transaction-id' } },
+          ],
+        },
+        orderBy: [{ createdAt: 'desc' }, { id: 'asc' }],
+        take: 21,
+      });
+    });
+
+    it('should return a cursor to the last row when another page exists', async () => {
+      const rows = ['tx-1', 'tx-2', 'tx-3'].map((id) => ({
+        id,
+        createdAt: new Date('2026-10-17T12:00:00.000Z'),
+      }));
+      mockReader.transaction.findMany.mockResolvedValue(rows);
+
+      const page = await repository.findWalletHistory('wallet-id', {
+        limit: 2,
+      });
+
+      expect(page.items).toEqual(rows.slice(0, 2));
+      expect(page.nextCursor).toBe(
+        encodeHistoryCursor({ createdAt: rows[1].createdAt, id: 'tx-2' }),
+      );
+    });
+  });
+});
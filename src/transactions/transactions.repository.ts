@@ -1,70 +1,416 @@
 import { Injectable } from '@nestjs/common';
-import { PrismaService } from '../prisma/prisma.service';
-import { TransactionType, Wallet, Transaction } from '../../generated/prisma';
+import { PrismaService, ReadOptions } from '../prisma/prisma.service';
+import { TransactionType, Transaction } from '../../generated/prisma';
 import { Prisma } from '../../generated/prisma';
+import { randomUUID } from 'crypto';
+import { BalanceEventBus } from '../balance-events/balance-event-bus';
+import { Traced } from '../tracing/tracer';
+import {
+  RecipientCacheService,
+  identifierColumn,
+} from '../users/recipient-cache.service';
+
+export interface WalletHistoryFilter {
+  limit: number;
+  cursor?: HistoryCursor;
+  type?: TransactionType;
+  from?: Date;
+  to?: Date;
+}
+
+export interface HistoryCursor {
+  createdAt: Date;
+  id: string;
+}
+
+export interface TransactionHistoryPage {
+  items: Transaction[];
+  nextCursor: string | null;
+}
+
+export function encodeHistoryCursor(cursor: HistoryCursor): string {
+  return Buffer.from(
+    `${cursor.createdAt.toISOString()}|${cursor.id}`,
+  ).toString('base64url');
+}
+
+export function decodeHistoryCursor(value: string): HistoryCursor | null {
+  const [createdAt, id] = Buffer.from(value, 'base64url')
+    .toString('utf8')
+    .split('|');
+  const date = new Date(createdAt);
+  if (!id || Number.isNaN(date.getTime())) {
+    return null;
+  }
+  return { createdAt: date, id };
+}
+
+// Rows after `cursor` in (createdAt DESC, id ASC) order. Postgres cannot
+// bound an index scan with the OR alone, so the plain `lte` on createdAt is
+// what starts the range at the cursor instead of at the newest row. Any
+// date filter already on the query is merged in, and the tighter upper
+// bound wins.
+export function keysetAfter(
+  cursor: HistoryCursor,
+  within: { gte?: Date; lte?: Date } = {},
+): Prisma.TransactionWhereInput {
+  const upper =
+    within.lte && within.lte < cursor.createdAt ? within.lte : cursor.createdAt;
+  return {
+    createdAt: { ...within, lte: upper },
+    OR: [
+      { createdAt: { lt: cursor.createdAt } },
+      { createdAt: cursor.createdAt, id: { gt: cursor.id } },
+    ],
+  };
+}
 
 export interface P2PTransactionData {
-  amount: number;
-  senderWallet: Wallet;
-  recipientWallet: Wallet;
+  // Minor units
+  amount: bigint;
+  senderWalletId: string;
+  recipientWalletId: string;
+  senderDescription: string;
+  recipientDescription: string;
+}
+
+export interface TransferParty {
+  userId: string;
+  email: string;
+  alias: string;
+  walletId: string | null;
+}
+
+export interface TransferParties {
+  sender: TransferParty | null;
+  recipient: TransferParty | null;
+}
+
+export interface BatchTransferParties {
+  sender: TransferParty | null;
+  // Keyed by the identifier (email or alias) as given by the caller
+  recipients: Map<string, TransferParty>;
+}
+
+export interface P2PBatchItem {
+  recipientWalletId: string;
+  // Minor units
+  amount: bigint;
   senderDescription: string;
   recipientDescription: string;
 }
 
+export interface P2PBatchItemResult {
+  senderTransactionId: string;
+  recipientTransactionId: string;
+}
+
+// Raised inside the transfer transaction when the conditional debit matches
+// no row, so the whole transaction (including any credit) rolls back.
+export class InsufficientFundsError extends Error {
+  constructor(walletId: string) {
+    super(`Wallet ${walletId} has insufficient funds`);
+    this.name = 'InsufficientFundsError';
+  }
+}
+
 @Injectable()
 export class TransactionsRepository {
-  constructor(private prisma: PrismaService) {}
+  constructor(
+    private prisma: PrismaService,
+    private balanceEvents: BalanceEventBus,
+    private recipientCache: RecipientCacheService,
+  ) {}
+
+  // Keyset pagination over (createdAt DESC, id ASC) so every page is a range
+  // scan on the (effectedWalletId, createdAt DESC, id) index at any depth.
+  async findWalletHistory(
+    walletId: string,
+    filter: WalletHistoryFilter,
+    readOptions: ReadOptions = {},
+  ): Promise<TransactionHistoryPage> {
+    const { limit, cursor, type, from, to } = filter;
+
+    const where: Prisma.TransactionWhereInput = { effectedWalletId: walletId };
+    if (type) {
+      where.type = type;
+    }
+    if (cursor) {
+      Object.assign(where, keysetAfter(cursor, { gte: from, lte: to }));
+    } else if (from || to) {
+      where.createdAt = { gte: from, lte: to };
+    }
+
+    // Fetch one extra row to know whether another page exists
+    const rows = await this.prisma.reader(readOptions).transaction.findMany({
+      where,
+      orderBy: [{ createdAt: 'desc' }, { id: 'asc' }],
+      take: limit + 1,
+    });
 
+    const items = rows.slice(0, limit);
+    const last = items[items.length - 1];
+    const nextCursor =
+      rows.length > limit && last
+        ? encodeHistoryCursor({ createdAt: last.createdAt, id: last.id })
+        : null;
+
+    return { items, nextCursor };
+  }
+
+  // Resolves sender (by id) and recipient together with their wallet ids in
+  // a single joined query. The recipient is matched on the email or the
+  // alias index depending on the identifier's shape, and skipped entirely
+  // when already cached.
+  @Traced()
+  async findTransferParties(
+    senderUserId: string,
+    recipientIdentifier: string,
+  ): Promise<TransferParties> {
+    const cached = this.recipientCache.get(recipientIdentifier);
+    const rows = await this.findParties(
+      senderUserId,
+      cached ? [] : [recipientIdentifier],
+    );
+
+    const recipient =
+      cached ??
+      rows.find((row) => matchesIdentifier(row, recipientIdentifier)) ??
+      null;
+    if (!cached && recipient) {
+      this.cacheRecipient(recipient);
+    }
+
+    return {
+      sender: rows.find((row) => row.userId === senderUserId) ?? null,
+      recipient,
+    };
+  }
+
+  // Same as findTransferParties for many recipients: one query, with the
+  // uncached identifiers matched through IN lists on the email and alias
+  // indexes.
+  @Traced()
+  async findBatchTransferParties(
+    senderUserId: string,
+    recipientIdentifiers: string[],
+  ): Promise<BatchTransferParties> {
+    const recipients = new Map<string, TransferParty>();
+    const uncached: string[] = [];
+    for (const identifier of recipientIdentifiers) {
+      const cached = this.recipientCache.get(identifier);
+      if (cached) {
+        recipients.set(identifier, cached);
+      } else {
+        uncached.push(identifier);
+      }
+    }
+
+    const rows = await this.findParties(senderUserId, uncached);
+
+    const byEmail = new Map(rows.map((row) => [row.email, row]));
+    const byAlias = new Map(rows.map((row) => [row.alias, row]));
+    for (const identifier of uncached) {
+      const party =
+        identifierColumn(identifier) === 'email'
+          ? byEmail.get(identifier)
+          : byAlias.get(identifier);
+      if (party) {
+        recipients.set(identifier, party);
+        this.cacheRecipient(party);
+      }
+    }
+
+    return {
+      sender: rows.find((row) => row.userId === senderUserId) ?? null,
+      recipients,
+    };
+  }
+
+  @Traced()
   async createP2PTransfer(data: P2PTransactionData): Promise<{
     senderTransaction: Transaction;
     recipientTransaction: Transaction;
   }> {
     const {
       amount,
-      senderWallet,
-      recipientWallet,
+      senderWalletId,
+      recipientWalletId,
       senderDescription,
       recipientDescription,
     } = data;
 
-    return this.prisma.$transaction(async (tx) => {
-      // 1. Decrement sender's balance
-      await tx.wallet.update({
-        where: { id: senderWallet.id },
-        data: { balance: { decrement: amount } },
-      });
+    const result = await this.prisma.$transaction(async (tx) => {
+      const debit = async () => {
+        // Conditional debit: UPDATE ... WHERE balance >= amount
+        const { count } = await tx.wallet.updateMany({
+          where: { id: senderWalletId, balance: { gte: amount } },
+          data: { balance: { decrement: amount } },
+        });
+        if (count === 0) {
+          throw new InsufficientFundsError(senderWalletId);
+        }
+      };
+      const credit = () =>
+        tx.wallet.update({
+          where: { id: recipientWalletId },
+          data: { balance: { increment: amount } },
+        });
 
-      // 2. Increment recipient's balance
-      await tx.wallet.update({
-        where: { id: recipientWallet.id },
-        data: { balance: { increment: amount } },
-      });
+      // Lock both wallet rows in id order so opposing transfers between the
+      // same two wallets cannot deadlock.
+      if (senderWalletId < recipientWalletId) {
+        await debit();
+        await credit();
+      } else {
+        await credit();
+        await debit();
+      }
 
-      // 3. Create sender's transaction record (OUT)
-      const senderTransaction = await tx.transaction.create({
-        data: {
-          amount,
-          type: TransactionType.OUT,
-          description: senderDescription,
-          senderWalletId: senderWallet.id,
-          receiverWalletId: recipientWallet.id,
-          effectedWalletId: senderWallet.id,
-        },
+      const [first, second] = await tx.transaction.createManyAndReturn({
+        data: [
+          {
+            amount,
+            type: TransactionType.OUT,
+            description: senderDescription,
+            senderWalletId,
+            receiverWalletId: recipientWalletId,
+            effectedWalletId: senderWalletId,
+          },
+          {
+            amount,
+            type: TransactionType.IN,
+            description: recipientDescription,
+            senderWalletId,
+            receiverWalletId: recipientWalletId,
+            effectedWalletId: recipientWalletId,
+          },
+        ],
       });
 
-      // 4. Create recipient's transaction record (IN)
-      const recipientTransaction = await tx.transaction.create({
-        data: {
-          amount,
-          type: TransactionType.IN,
-          description: recipientDescription,
-          senderWalletId: senderWallet.id,
-          receiverWalletId: recipientWallet.id,
-          effectedWalletId: recipientWallet.id,
-        },
+      return first.type === TransactionType.OUT
+        ? { senderTransaction: first, recipientTransaction: second }
+        : { senderTransaction: second, recipientTransaction: first };
+    });
+
+    this.balanceEvents.publish([senderWalletId, recipientWalletId]);
+    return result;
+  }
+
+  // One sender paying many recipients in a single transaction: lock every
+  // wallet involved in id order, debit the sender once for the total, credit
+  // all recipients in one UPDATE ... FROM (VALUES ...) and bulk insert the
+  // ledger rows. Results come back in item order.
+  @Traced()
+  async createP2PBatchTransfer(
+    senderWalletId: string,
+    items: P2PBatchItem[],
+  ): Promise<P2PBatchItemResult[]> {
+    const total = items.reduce((sum, item) => sum + item.amount, 0n);
+    const credits = new Map<string, bigint>();
+    for (const item of items) {
+      credits.set(
+        item.recipientWalletId,
+        (credits.get(item.recipientWalletId) ?? 0n) + item.amount,
+      );
+    }
+    const walletIds = [senderWalletId, ...credits.keys()].sort();
+
+    const results = items.map(() => ({
+      senderTransactionId: randomUUID(),
+      recipientTransactionId: randomUUID(),
+    }));
+
+    await this.prisma.$transaction(async (tx) => {
+      await tx.$queryRaw`
+        SELECT "id" FROM "Wallet"
+        WHERE "id" IN (${Prisma.join(walletIds)})
+        ORDER BY "id"
+        FOR UPDATE
+      `;
+
+      const { count } = await tx.wallet.updateMany({
+        where: { id: senderWalletId, balance: { gte: total } },
+        data: { balance: { decrement: total } },
       });
+      if (count === 0) {
+        throw new InsufficientFundsError(senderWalletId);
+      }
+
+      await tx.$executeRaw`
+        UPDATE "Wallet" AS w
+        SET "balance" = w."balance" + v."amount"
+        FROM (VALUES ${Prisma.join(
+          [...credits].map(
+            ([walletId, amount]) => Prisma.sql`(${walletId}, ${amount})`,
+          ),
+        )}) AS v("id", "amount")
+        WHERE w."id" = v."id"
+      `;
 
-      return { senderTransaction, recipientTransaction };
+      await tx.transaction.createMany({
+        data: items.flatMap((item, index) => [
+          {
+            id: results[index].senderTransactionId,
+            amount: item.amount,
+            type: TransactionType.OUT,
+            description: item.senderDescription,
+            senderWalletId,
+            receiverWalletId: item.recipientWalletId,
+            effectedWalletId: senderWalletId,
+          },
+          {
+            id: results[index].recipientTransactionId,
+            amount: item.amount,
+            type: TransactionType.IN,
+            description: item.recipientDescription,
+            senderWalletId,
+            receiverWalletId: item.recipientWalletId,
+            effectedWalletId: item.recipientWalletId,
+          },
+        ]),
+      });
     });
+
+    this.balanceEvents.publish(walletIds);
+    return results;
   }
+
+  // The sender by primary key plus each identifier on its own unique index
+  private findParties(
+    senderUserId: string,
+    identifiers: string[],
+  ): Promise<TransferParty[]> {
+    const emails = identifiers.filter((id) => identifierColumn(id) === 'email');
+    const aliases = identifiers.filter(
+      (id) => identifierColumn(id) === 'alias',
+    );
+    const conditions = [Prisma.sql`u."id" = ${senderUserId}`];
+    if (emails.length > 0) {
+      conditions.push(Prisma.sql`u."email" IN (${Prisma.join(emails)})`);
+    }
+    if (aliases.length > 0) {
+      conditions.push(Prisma.sql`u."alias" IN (${Prisma.join(aliases)})`);
+    }
+
+    return this.prisma.$queryRaw<TransferParty[]>`
+      SELECT u."id" AS "userId", u."email", u."alias", w."id" AS "walletId"
+      FROM "User" u
+      LEFT JOIN "Wallet" w ON w."userId" = u."id"
+      WHERE ${Prisma.join(conditions, ' OR ')}
+    `;
+  }
+
+  // Only payable recipients are cached; a missing wallet may appear later
+  private cacheRecipient(party: TransferParty) {
+    if (party.walletId) {
+      this.recipientCache.set({ ...party, walletId: party.walletId });
+    }
+  }
+}
+
+function matchesIdentifier(party: TransferParty, identifier: string): boolean {
+  return identifierColumn(identifier) === 'email'
+    ? party.email === identifier
+    : party.alias === identifier;
 }
@@ -1,8 +1,11 @@
 import { Test, TestingModule } from '@nestjs/testing';
 import { TransactionsService } from './transactions.service';
-import { UsersService } from '../users/users.service';
 import { WalletService } from '../wallet/wallet.service';
-import { TransactionsRepository } from './transactions.repository';
+import {
+  TransactionsRepository,
+  InsufficientFundsError,
+  encodeHistoryCursor,
+} from './transactions.repository';
 import { TransactionType, Prisma } from '../../generated/prisma';
 import { NotFoundException, BadRequestException } from '@nestjs/common';
 import { P2PTransferDto } from './dto/p2p-transfer.dto';
@@ -12,7 +15,6 @@ import { PrismaService } from '../prisma/prisma.service';
 
 describe('TransactionsService', () => {
   let service: TransactionsService;
-  let usersService: UsersService;
   let walletService: WalletService;
   let transactionsRepository: TransactionsRepository;
   let prismaService: PrismaService;
@@ -40,7 +42,7 @@ describe('TransactionsService', () => {
   const mockSenderWallet = {
     id: 'sender-wallet-id',
     userId: 'sender-id',
-    balance: 1000,
+    balance: 100000n,
     createdAt: new Date(),
     updatedAt: new Date(),
   };
@@ -48,14 +50,14 @@ describe('TransactionsService', () => {
   const mockRecipientWallet = {
     id: 'recipient-wallet-id',
     userId: 'recipient-id',
-    balance: 500,
+    balance: 50000n,
     createdAt: new Date(),
     updatedAt: new Date(),
   };
 
   const mockSenderTransaction = {
     id: 'sender-transaction-id',
-    amount: 100,
+    amount: 10000n,
     type: TransactionType.OUT,
     description: 'Transfer to recipient@example.com',
     createdAt: new Date(),
@@ -66,7 +68,7 @@ describe('TransactionsService', () => {
 
   const mockRecipientTransaction = {
     id: 'recipient-transaction-id',
-    amount: 100,
+    amount: 10000n,
     type: TransactionType.IN,
     description: 'Transfer from sender@example.com',
     createdAt: new Date(),
@@ -77,7 +79,7 @@ describe('TransactionsService', () => {
 
   const mockTransaction = {
     id: 'transaction-id',
-    amount: 100,
+    amount: 10000n,
     type: TransactionType.IN,
     description: 'Test transaction',
     createdAt: new Date(),
@@ -98,29 +100,28 @@ describe('TransactionsService', () => {
     $transaction: jest.fn(),
     $use: jest.fn(),
     $extends: jest.fn(),
+    reader: jest.fn(() => mockPrismaService),
+    markWrite: jest.fn(),
   };
 
   beforeEach(async () => {
     const module: TestingModule = await Test.createTestingModule({
       providers: [
         TransactionsService,
-        {
-          provide: UsersService,
-          useValue: {
-            findOne: jest.fn(),
-            findByEmailOrAlias: jest.fn(),
-          },
-        },
         {
           provide: WalletService,
           useValue: {
-            getWalletByUserId: jest.fn(),
+            getWalletForUser: jest.fn(),
           },
         },
         {
           provide: TransactionsRepository,
           useValue: {
             createP2PTransfer: jest.fn(),
+            createP2PBatchTransfer: jest.fn(),
+            findTransferParties: jest.fn(),
+            findBatchTransferParties: jest.fn(),
+            findWalletHistory: jest.fn(),
           },
         },
         {
@@ -131,7 +132,6 @@ describe('TransactionsService', () => {
     }).compile();
 
     service = module.get<TransactionsService>(TransactionsService);
-    usersService = module.get<UsersService>(UsersService);
     walletService = module.get<WalletService>(WalletService);
     transactionsRepository = module.get<TransactionsRepository>(
       TransactionsRepository,
@@ -149,15 +149,24 @@ describe('TransactionsService', () => {
       amount: 100,
     };
 
+    const senderParty = {
+      userId: mockSender.id,
+      email: mockSender.email,
+      alias: mockSender.alias,
+      walletId: mockSenderWallet.id,
+    };
+
+    const recipientParty = {
+      userId: mockRecipient.id,
+      email: mockRecipient.email,
+      alias: mockRecipient.alias,
+      walletId: mockRecipientWallet.id,
+    };
+
     it('should successfully transfer funds between users', async () => {
-      jest.spyOn(usersService, 'findOne').mockResolvedValue(mockSender);
-      jest
-        .spyOn(usersService, 'findByEmailOrAlias')
-        .mockResolvedValue(mockRecipient);
       jest
-        .spyOn(walletService, 'getWalletByUserId')
-        .mockResolvedValueOnce(mockSenderWallet)
-        .mockResolvedValueOnce(mockRecipientWallet);
+        .spyOn(transactionsRepository, 'findTransferParties')
+        .mockResolvedValue({ sender: senderParty, recipient: recipientParty });
       jest
         .spyOn(transactionsRepository, 'createP2PTransfer')
         .mockResolvedValue({
@@ -176,29 +185,23 @@ describe('TransactionsService', () => {
         recipientTransaction: mockRecipientTransaction,
       });
 
-      expect(usersService.findOne).toHaveBeenCalledWith('sender-id');
-      expect(usersService.findByEmailOrAlias).toHaveBeenCalledWith(
-        'recipient@example.com',
-      );
-      expect(walletService.getWalletByUserId).toHaveBeenNthCalledWith(
-        1,
+      expect(transactionsRepository.findTransferParties).toHaveBeenCalledWith(
         'sender-id',
-      );
-      expect(walletService.getWalletByUserId).toHaveBeenNthCalledWith(
-        2,
-        'recipient-id',
+        'recipient@example.com',
       );
       expect(transactionsRepository.createP2PTransfer).toHaveBeenCalledWith({
-        amount: 100,
-        senderWallet: mockSenderWallet,
-        recipientWallet: mockRecipientWallet,
+        amount: 10000n,
+        senderWalletId: 'sender-wallet-id',
+        recipientWalletId: 'recipient-wallet-id',
         senderDescription: 'Transfer to recipient@example.com',
         recipientDescription: 'Transfer from sender@example.com',
       });
     });
 
     it('should throw NotFoundException when sender does not exist', async () => {
-      jest.spyOn(usersService, 'findOne').mockResolvedValue(null as any);
+      jest
+        .spyOn(transactionsRepository, 'findTransferParties')
+        .mockResolvedValue({ sender: null, recipient: recipientParty });
 
       await expect(
         service.createP2PTransfer('non-existent-id', p2pTransferDto),
@@ -206,16 +209,13 @@ describe('TransactionsService', () => {
         new NotFoundException('Sender with ID non-existent-id not found.'),
       );
 
-      expect(usersService.findOne).toHaveBeenCalledWith('non-existent-id');
+      expect(transactionsRepository.createP2PTransfer).not.toHaveBeenCalled();
     });
 
     it('should throw NotFoundException when recipient does not exist', async () => {
-      jest.spyOn(usersService, 'findOne').mockResolvedValue(mockSender);
-      jest.spyOn(usersService, 'findByEmailOrAlias').mockImplementation(() => {
-        throw new NotFoundException(
-          'Recipient with email non-existent@example.com not found.',
-        );
-      });
+      jest
+        .spyOn(transactionsRepository, 'findTransferParties')
+        .mockResolvedValue({ sender: senderParty, recipient: null });
 
       const dtoCopy = {
         ...p2pTransferDto,
@@ -229,17 +229,16 @@ describe('TransactionsService', () => {
         ),
       );
 
-      expect(usersService.findOne).toHaveBeenCalledWith('sender-id');
-      expect(usersService.findByEmailOrAlias).toHaveBeenCalledWith(
+      expect(transactionsRepository.findTransferParties).toHaveBeenCalledWith(
+        'sender-id',
         'non-existent@example.com',
       );
     });
 
     it('should throw BadRequestException when transferring to self', async () => {
-      jest.spyOn(usersService, 'findOne').mockResolvedValue(mockSender);
       jest
-        .spyOn(usersService, 'findByEmailOrAlias')
-        .mockResolvedValue(mockSender);
+        .spyOn(transactionsRepository, 'findTransferParties')
+        .mockResolvedValue({ sender: senderParty, recipient: senderParty });
 
       await expect(
         service.createP2PTransfer('sender-id', p2pTransferDto),
@@ -247,20 +246,16 @@ describe('TransactionsService', () => {
         new BadRequestException('Cannot transfer funds to yourself.'),
       );
 
-      expect(usersService.findOne).toHaveBeenCalledWith('sender-id');
-      expect(usersService.findByEmailOrAlias).toHaveBeenCalledWith(
-        'recipient@example.com',
-      );
+      expect(transactionsRepository.createP2PTransfer).not.toHaveBeenCalled();
     });
 
     it('should throw NotFoundException when sender wallet does not exist', async () => {
-      jest.spyOn(usersService, 'findOne').mockResolvedValue(mockSender);
-      jest
-        .spyOn(usersService, 'findByEmailOrAlias')
-        .mockResolvedValue(mockRecipient);
       jest
-        .spyOn(walletService, 'getWalletByUserId')
-        .mockResolvedValueOnce(null as any);
+        .spyOn(transactionsRepository, 'findTransferParties')
+        .mockResolvedValue({
+          sender: { ...senderParty, walletId: null },
+          recipient: recipientParty,
+        });
 
       await expect(
         service.createP2PTransfer('sender-id', p2pTransferDto),
@@ -269,23 +264,15 @@ describe('TransactionsService', () => {
           'Wallet for sender sender-id not found. Please ensure the sender has a wallet.',
         ),
       );
-
-      expect(usersService.findOne).toHaveBeenCalledWith('sender-id');
-      expect(usersService.findByEmailOrAlias).toHaveBeenCalledWith(
-        'recipient@example.com',
-      );
-      expect(walletService.getWalletByUserId).toHaveBeenCalledWith('sender-id');
     });
 
     it('should throw NotFoundException when recipient wallet does not exist', async () => {
-      jest.spyOn(usersService, 'findOne').mockResolvedValue(mockSender);
-      jest
-        .spyOn(usersService, 'findByEmailOrAlias')
-        .mockResolvedValue(mockRecipient);
       jest
-        .spyOn(walletService, 'getWalletByUserId')
-        .mockResolvedValueOnce(mockSenderWallet)
-        .mockResolvedValueOnce(null as any);
+        .spyOn(transactionsRepository, 'findTransferParties')
+        .mockResolvedValue({
+          sender: senderParty,
+          recipient: { ...recipientParty, walletId: null },
+        });
 
       await expect(
         service.createP2PTransfer('sender-id', p2pTransferDto),
@@ -294,52 +281,25 @@ describe('TransactionsService', () => {
           `Wallet for recipient ${mockRecipient.email} not found. Please ensure the recipient has a wallet.`,
         ),
       );
-
-      expect(usersService.findOne).toHaveBeenCalledWith('sender-id');
-      expect(usersService.findByEmailOrAlias).toHaveBeenCalledWith(
-        'recipient@example.com',
-      );
-      expect(walletService.getWalletByUserId).toHaveBeenNthCalledWith(
-        1,
-        'sender-id',
-      );
-      expect(walletService.getWalletByUserId).toHaveBeenNthCalledWith(
-        2,
-        'recipient-id',
-      );
     });
 
     it('should throw BadRequestException for insufficient funds', async () => {
-      const mockSenderWalletWithInsufficientFunds = {
-        ...mockSenderWallet,
-        balance: 50,
-      };
-
-      jest.spyOn(usersService, 'findOne').mockResolvedValue(mockSender);
       jest
-        .spyOn(usersService, 'findByEmailOrAlias')
-        .mockResolvedValue(mockRecipient);
+        .spyOn(transactionsRepository, 'findTransferParties')
+        .mockResolvedValue({ sender: senderParty, recipient: recipientParty });
       jest
-        .spyOn(walletService, 'getWalletByUserId')
-        .mockResolvedValueOnce(mockSenderWalletWithInsufficientFunds)
-        .mockResolvedValueOnce(mockRecipientWallet);
+        .spyOn(transactionsRepository, 'createP2PTransfer')
+        .mockRejectedValue(new InsufficientFundsError('sender-wallet-id'));
 
       await expect(
         service.createP2PTransfer('sender-id', p2pTransferDto),
       ).rejects.toThrow(new BadRequestException('Insufficient funds.'));
-
-      expect(transactionsRepository.createP2PTransfer).not.toHaveBeenCalled();
     });
 
     it('should throw BadRequestException when repository throws an error', async () => {
-      jest.spyOn(usersService, 'findOne').mockResolvedValue(mockSender);
       jest
-        .spyOn(usersService, 'findByEmailOrAlias')
-        .mockResolvedValue(mockRecipient);
-      jest
-        .spyOn(walletService, 'getWalletByUserId')
-        .mockResolvedValueOnce(mockSenderWallet)
-        .mockResolvedValueOnce(mockRecipientWallet);
+        .spyOn(transactionsRepository, 'findTransferParties')
+        .mockResolvedValue({ sender: senderParty, recipient: recipientParty });
       jest
         .spyOn(transactionsRepository, 'createP2PTransfer')
         .mockImplementation(() => {
@@ -364,6 +324,126 @@ describe('TransactionsService', () => {
     });
   });
 
+  describe('createP2PBatchTransfer', () => {
+    const senderParty = {
+      userId: mockSender.id,
+      email: mockSender.email,
+      alias: mockSender.alias,
+      walletId: 'sender-wallet-id',
+    };
+
+    const recipientParty = {
+      userId: mockRecipient.id,
+      email: mockRecipient.email,
+      alias: mockRecipient.alias,
+      walletId: 'recipient-wallet-id',
+    };
+
+    const batchDto = {
+      transfers: [
+        { recipientIdentifier: 'recipient@example.com', amount: 10.5 },
+        { recipientIdentifier: 'unknown', amount: 5 },
+        { recipientIdentifier: 'recipient', amount: 2 },
+      ],
+    };
+
+    beforeEach(() => {
+      jest
+        .spyOn(transactionsRepository, 'findBatchTransferParties')
+        .mockResolvedValue({
+          sender: senderParty,
+          recipients: new Map([
+            ['recipient@example.com', recipientParty],
+            ['recipient', recipientParty],
+          ]),
+        });
+    });
+
+    it('should debit once and report a result per item', async () => {
+      jest
+        .spyOn(transactionsRepository, 'createP2PBatchTransfer')
+        .mockResolvedValue([
+          { senderTransactionId: 'out-1', recipientTransactionId: 'in-1' },
+          { senderTransactionId: 'out-3', recipientTransactionId: 'in-3' },
+        ]);
+
+      const result = await service.createP2PBatchTransfer(
+        'sender-id',
+        batchDto,
+      );
+
+      expect(
+        transactionsRepository.findBatchTransferParties,
+      ).toHaveBeenCalledWith('sender-id', [
+        'recipient@example.com',
+        'unknown',
+        'recipient',
+      ]);
+      expect(
+        transactionsRepository.createP2PBatchTransfer,
+      ).toHaveBeenCalledWith('sender-wallet-id', [
+        expect.objectContaining({
+          recipientWalletId: 'recipient-wallet-id',
+          amount: 1050n,
+        }),
+        expect.objectContaining({
+          recipientWalletId: 'recipient-wallet-id',
+          amount: 200n,
+        }),
+      ]);
+      expect(result).toMatchObject({
+        succeeded: 2,
+        failed: 1,
+        totalDebited: 1250n,
+        results: [
+          { index: 0, status: 'SUCCESS', senderTransactionId: 'out-1' },
+          { index: 1, status: 'FAILED', error: 'Recipient unknown not found.' },
+          { index: 2, status: 'SUCCESS', recipientTransactionId: 'in-3' },
+        ],
+      });
+    });
+
+    it('should fail every payable item when funds do not cover the total', async () => {
+      jest
+        .spyOn(transactionsRepository, 'createP2PBatchTransfer')
+        .mockRejectedValue(new InsufficientFundsError('sender-wallet-id'));
+
+      const result = await service.createP2PBatchTransfer(
+        'sender-id',
+        batchDto,
+      );
+
+      expect(result.succeeded).toBe(0);
+      expect(result.totalDebited).toBe(0n);
+      expect(result.results.map((r) => r.error)).toEqual([
+        'Insufficient funds.',
+        'Recipient unknown not found.',
+        'Insufficient funds.',
+      ]);
+    });
+
+    it('should reject items paying the sender without touching balances', async () => {
+      jest
+        .spyOn(transactionsRepository, 'findBatchTransferParties')
+        .mockResolvedValue({
+          sender: senderParty,
+          recipients: new Map([['sender', senderParty]]),
+        });
+
+      const result = await service.createP2PBatchTransfer('sender-id', {
+        transfers: [{ recipientIdentifier: 'sender', amount: 1 }],
+      });
+
+      expect(result.results[0]).toMatchObject({
+        status: 'FAILED',
+        error: 'Cannot transfer funds to yourself.',
+      });
+      expect(
+        transactionsRepository.createP2PBatchTransfer,
+      ).not.toHaveBeenCalled();
+    });
+  });
+
   describe('create', () => {
     const createTransactionDto: CreateTransactionDto = {
       amount: 100,
@@ -388,7 +468,7 @@ describe('TransactionsService', () => {
       expect(result).toEqual(updatedMockTransaction);
       expect(mockPrismaService.transaction.create).toHaveBeenCalledWith({
         data: {
-          amount: 100,
+          amount: 10000n,
           type: TransactionType.IN,
           description: 'Test transaction',
           senderWalletId: 'wallet-id',
@@ -407,24 +487,86 @@ describe('TransactionsService', () => {
   });
 
   describe('findAll', () => {
-    it('should return all transactions', async () => {
-      const transactions = [
+    const page = {
+      items: [
         mockTransaction,
         { ...mockTransaction, id: 'transaction-id-2' },
-      ];
-      mockPrismaService.transaction.findMany.mockResolvedValue(transactions);
+      ],
+      nextCursor: null,
+    };
+
+    it('should return the first page of the caller wallet history', async () => {
+      jest
+        .spyOn(walletService, 'getWalletForUser')
+        .mockResolvedValue(mockSenderWallet);
+      jest
+        .spyOn(transactionsRepository, 'findWalletHistory')
+        .mockResolvedValue(page as any);
 
-      const result = await service.findAll();
+      const result = await service.findAll('sender-id', {});
 
-      expect(result).toEqual(transactions);
-      expect(mockPrismaService.transaction.findMany).toHaveBeenCalled();
+      expect(result).toEqual(page);
+      expect(walletService.getWalletForUser).toHaveBeenCalledWith(
+        'sender-id',
+        undefined,
+      );
+      expect(transactionsRepository.findWalletHistory).toHaveBeenCalledWith(
+        'sender-wallet-id',
+        {
+          limit: 20,
+          cursor: undefined,
+          type: undefined,
+          from: undefined,
+          to: undefined,
+        },
+        { userId: 'sender-id' },
+      );
     });
 
-    it('should propagate errors from prisma', async () => {
-      const error = new Error('Database error');
-      mockPrismaService.transaction.findMany.mockRejectedValue(error);
+    it('should decode the cursor and forward filters', async () => {
+      const createdAt = new Date('2025-06-01T10:00:00.000Z');
+      const cursor = encodeHistoryCursor({ createdAt, id: 'transaction-id' });
+      jest
+        .spyOn(walletService, 'getWalletForUser')
+        .mockResolvedValue(mockSenderWallet);
+      jest
+        .spyOn(transactionsRepository, 'findWalletHistory')
+        .mockResolvedValue(page as any);
+
+      await service.findAll('sender-id', {
+        cursor,
+        limit: 5,
+        type: TransactionType.OUT,
+        from: '2025-05-01T00:00:00.000Z',
+      });
 
-      await expect(service.findAll()).rejects.toThrow(error);
+      expect(transactionsRepository.findWalletHistory).toHaveBeenCalledWith(
+        'sender-wallet-id',
+        {
+          limit: 5,
+          cursor: { createdAt, id: 'transaction-id' },
+          type: TransactionType.OUT,
+          from: new Date('2025-05-01T00:00:00.000Z'),
+          to: undefined,
+        },
+        { userId: 'sender-id' },
+      );
+    });
+
+    it('should throw BadRequestException for a malformed cursor', async () => {
+      await expect(
+        service.findAll('sender-id', { cursor: 'not-a-cursor' }),
+      ).rejects.toThrow(new BadRequestException('Invalid pagination cursor.'));
+      expect(transactionsRepository.findWalletHistory).not.toHaveBeenCalled();
+    });
+
+    it('should throw BadRequestException when from is after to', async () => {
+      await expect(
+        service.findAll('sender-id', {
+          from: '2025-06-02T00:00:00.000Z',
+          to: '2025-06-01T00:00:00.000Z',
+        }),
+      ).rejects.toThrow(BadRequestException);
     });
   });
 
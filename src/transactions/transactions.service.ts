@@ -2,95 +2,113 @@ import {
   Injectable,
   NotFoundException,
   BadRequestException,
+  ServiceUnavailableException,
 } from '@nestjs/common';
 import { CreateTransactionDto } from './dto/create-transaction.dto';
 import { UpdateTransactionDto } from './dto/update-transaction.dto';
 import { P2PTransferDto } from './dto/p2p-transfer.dto';
-import { UsersService } from '../users/users.service';
 import { WalletService } from '../wallet/wallet.service';
-import { TransactionsRepository } from './transactions.repository';
-import { User } from '../../generated/prisma';
+import {
+  TransactionsRepository,
+  TransactionHistoryPage,
+  HistoryCursor,
+  InsufficientFundsError,
+  P2PBatchItem,
+  decodeHistoryCursor,
+} from './transactions.repository';
+import { P2PBatchTransferDto } from './dto/p2p-batch-transfer.dto';
+import {
+  TransactionHistoryQueryDto,
+  DEFAULT_HISTORY_PAGE_SIZE,
+} from './dto/transaction-history-query.dto';
 import { Transaction, Prisma } from '../../generated/prisma';
 import { PrismaService } from '../prisma/prisma.service';
+import { toMinorUnits } from '../common/money/money';
+import { Traced } from '../tracing/tracer';
+
+export interface P2PBatchItemOutcome {
+  // Position of the item in the request
+  index: number;
+  recipientIdentifier: string;
+  status: 'SUCCESS' | 'FAILED';
+  amount?: bigint;
+  senderTransactionId?: string;
+  recipientTransactionId?: string;
+  error?: string;
+}
+
+export interface P2PBatchTransferResult {
+  message: string;
+  succeeded: number;
+  failed: number;
+  totalDebited: bigint;
+  results: P2PBatchItemOutcome[];
+}
 
 @Injectable()
 export class TransactionsService {
   constructor(
     private prisma: PrismaService,
-    private usersService: UsersService,
     private walletService: WalletService,
     private transactionsRepository: TransactionsRepository,
   ) {}
 
+  @Traced()
   async createP2PTransfer(
     senderUserId: string,
     p2pTransferDto: P2PTransferDto,
   ) {
-    const { recipientIdentifier, amount } = p2pTransferDto;
+    const { recipientIdentifier } = p2pTransferDto;
+    const amount = toMinorUnits(p2pTransferDto.amount);
+    if (amount <= 0n) {
+      throw new BadRequestException('Amount must be at least 0.01');
+    }
+
+    // 1. Resolve sender, recipient and both wallets in one query
+    const { sender, recipient } =
+      await this.transactionsRepository.findTransferParties(
+        senderUserId,
+        recipientIdentifier,
+      );
 
-    // 1. Fetch sender
-    const sender = await this.usersService.findOne(senderUserId);
     if (!sender) {
       throw new NotFoundException(`Sender with ID ${senderUserId} not found.`);
     }
 
-    // 2. Fetch recipient by email (as per requirement)
-    let recipient: User | null = null;
-    try {
-      recipient =
-        await this.usersService.findByEmailOrAlias(recipientIdentifier);
-    } catch (error) {
-      if (error instanceof NotFoundException) {
-        throw new NotFoundException(
-          `Recipient with email ${recipientIdentifier} not found.`,
-        );
-      }
-      throw error; // Re-throw other errors
-    }
-
     if (!recipient) {
-      // Should be caught by findByEmail, but as a safeguard
       throw new NotFoundException(
         `Recipient with email ${recipientIdentifier} not found.`,
       );
     }
 
-    if (sender.id === recipient.id) {
+    if (sender.userId === recipient.userId) {
       throw new BadRequestException('Cannot transfer funds to yourself.');
     }
 
-    // 3. Fetch sender's wallet
-    const senderWallet = await this.walletService.getWalletByUserId(sender.id);
-    if (!senderWallet) {
+    if (!sender.walletId) {
       throw new NotFoundException(
-        `Wallet for sender ${sender.id} not found. Please ensure the sender has a wallet.`,
+        `Wallet for sender ${sender.userId} not found. Please ensure the sender has a wallet.`,
       );
     }
 
-    if (senderWallet.balance < amount) {
-      throw new BadRequestException('Insufficient funds.');
-    }
-
-    // 4. Fetch recipient's wallet
-    const recipientWallet = await this.walletService.getWalletByUserId(
-      recipient.id,
-    );
-    if (!recipientWallet) {
+    if (!recipient.walletId) {
       throw new NotFoundException(
         `Wallet for recipient ${recipient.email} not found. Please ensure the recipient has a wallet.`,
       );
     }
 
-    // 5. Perform the transfer using the repository
+    // 2. Debit (only if funds suffice), credit and write both ledger rows in
+    // one short transaction
     try {
       const { senderTransaction, recipientTransaction } =
         await this.transactionsRepository.createP2PTransfer({
           amount,
-          senderWallet,
-          recipientWallet,
+          senderWalletId: sender.walletId,
+          recipientWalletId: recipient.walletId,
           senderDescription: `Transfer to ${recipient.email}`,
           recipientDescription: `Transfer from ${sender.email}`,
         });
+      this.prisma.markWrite(senderUserId);
 
       return {
         message: 'Transfer successful',
@@ -98,6 +116,13 @@ export class TransactionsService {
         recipientTransaction,
       };
     } catch (error) {
+      if (error instanceof InsufficientFundsError) {
+        throw new BadRequestException('Insufficient funds.');
+      }
+      // Pool exhaustion is retryable, not a failed transfer
+      if (error instanceof ServiceUnavailableException) {
+        throw error;
+      }
       // Log the error for debugging
       console.error('P2P Transfer failed:', error);
       // Re-throw a generic error or a more specific one based on the type of error
@@ -107,6 +132,113 @@ export class TransactionsService {
     }
   }
 
+  // Pays many recipients from one sender. Items that cannot be paid (unknown
+  // recipient, no wallet, self transfer) fail individually; the rest are
+  // debited, credited and recorded together, or not at all when the sender
+  // cannot cover their total.
+  @Traced()
+  async createP2PBatchTransfer(
+    senderUserId: string,
+    batchDto: P2PBatchTransferDto,
+  ): Promise<P2PBatchTransferResult> {
+    const identifiers = [
+      ...new Set(batchDto.transfers.map((item) => item.recipientIdentifier)),
+    ];
+    const { sender, recipients } =
+      await this.transactionsRepository.findBatchTransferParties(
+        senderUserId,
+        identifiers,
+      );
+
+    if (!sender) {
+      throw new NotFoundException(`Sender with ID ${senderUserId} not found.`);
+    }
+    if (!sender.walletId) {
+      throw new NotFoundException(
+        `Wallet for sender ${sender.userId} not found. Please ensure the sender has a wallet.`,
+      );
+    }
+
+    const results: P2PBatchItemOutcome[] = [];
+    const accepted: { index: number; item: P2PBatchItem }[] = [];
+    batchDto.transfers.forEach(({ recipientIdentifier, amount }, index) => {
+      const minorAmount = toMinorUnits(amount);
+      const recipient = recipients.get(recipientIdentifier);
+      const fail = (error: string) =>
+        results.push({ index, recipientIdentifier, status: 'FAILED', error });
+
+      if (minorAmount <= 0n) {
+        fail('Amount must be at least 0.01');
+      } else if (!recipient) {
+        fail(`Recipient ${recipientIdentifier} not found.`);
+      } else if (recipient.userId === sender.userId) {
+        fail('Cannot transfer funds to yourself.');
+      } else if (!recipient.walletId) {
+        fail(`Wallet for recipient ${recipient.email} not found.`);
+      } else {
+        accepted.push({
+          index,
+          item: {
+            recipientWalletId: recipient.walletId,
+            amount: minorAmount,
+            senderDescription: `Transfer to ${recipient.email}`,
+            recipientDescription: `Transfer from ${sender.email}`,
+          },
+        });
+      }
+    });
+
+    let totalDebited = 0n;
+    if (accepted.length > 0) {
+      try {
+        const created =
+          await this.transactionsRepository.createP2PBatchTransfer(
+            sender.walletId,
+            accepted.map(({ item }) => item),
+          );
+        this.prisma.markWrite(senderUserId);
+        accepted.forEach(({ index, item }, position) => {
+          totalDebited += item.amount;
+          results.push({
+            index,
+            recipientIdentifier: batchDto.transfers[index].recipientIdentifier,
+            status: 'SUCCESS',
+            amount: item.amount,
+            ...created[position],
+          });
+        });
+      } catch (error) {
+        if (error instanceof ServiceUnavailableException) {
+          throw error;
+        }
+        if (!(error instanceof InsufficientFundsError)) {
+          console.error('P2P batch transfer failed:', error);
+          throw new BadRequestException(
+            'P2P batch transfer failed. Please try again later.',
+          );
+        }
+        for (const { index } of accepted) {
+          results.push({
+            index,
+            recipientIdentifier: batchDto.transfers[index].recipientIdentifier,
+            status: 'FAILED',
+            error: 'Insufficient funds.',
+          });
+        }
+      }
+    }
+
+    results.sort((a, b) => a.index - b.index);
+    const succeeded = results.filter((r) => r.status === 'SUCCESS').length;
+    return {
+      message: 'Batch transfer processed',
+      succeeded,
+      failed: results.length - succeeded,
+      totalDebited,
+      results,
+    };
+  }
+
   async create(
     createTransactionDto: CreateTransactionDto,
   ): Promise<Transaction> {
@@ -115,7 +247,7 @@ export class TransactionsService {
     // When creating a single transaction, we set the same wallet as sender, receiver, and effected
     return await this.prisma.transaction.create({
       data: {
-        amount,
+        amount: toMinorUnits(amount),
         type,
         description,
         senderWalletId: walletId,
@@ -125,12 +257,43 @@ export class TransactionsService {
     });
   }
 
-  async findAll(): Promise<Transaction[]> {
-    return await this.prisma.transaction.findMany();
+  async findAll(
+    userId: string,
+    query: TransactionHistoryQueryDto,
+    walletId?: string,
+  ): Promise<TransactionHistoryPage> {
+    let cursor: HistoryCursor | undefined;
+    if (query.cursor) {
+      const decoded = decodeHistoryCursor(query.cursor);
+      if (!decoded) {
+        throw new BadRequestException('Invalid pagination cursor.');
+      }
+      cursor = decoded;
+    }
+
+    const from = query.from ? new Date(query.from) : undefined;
+    const to = query.to ? new Date(query.to) : undefined;
+    if (from && to && from > to) {
+      throw new BadRequestException('`from` must be earlier than `to`.');
+    }
+
+    const wallet = await this.walletService.getWalletForUser(userId, walletId);
+
+    return this.transactionsRepository.findWalletHistory(
+      wallet.id,
+      {
+        limit: query.limit ?? DEFAULT_HISTORY_PAGE_SIZE,
+        cursor,
+        type: query.type,
+        from,
+        to,
+      },
+      { userId },
+    );
   }
 
   async findOne(id: string): Promise<Transaction> {
-    const transaction = await this.prisma.transaction.findUnique({
+    const transaction = await this.prisma.reader().transaction.findUnique({
       where: { id },
     });
     if (!transaction) {
@@ -144,9 +307,13 @@ export class TransactionsService {
     updateTransactionDto: UpdateTransactionDto,
   ): Promise<Transaction> {
     try {
+      const { amount, ...rest } = updateTransactionDto;
       return await this.prisma.transaction.update({
         where: { id },
-        data: updateTransactionDto,
+        data: {
+          ...rest,
+          ...(amount !== undefined && { amount: toMinorUnits(amount) }),
+        },
       });
     } catch (error) {
       if (
@@ -0,0 +1,32 @@
+import { Type } from 'class-transformer';
+import {
+  IsInt,
+  IsOptional,
+  IsString,
+  Max,
+  MaxLength,
+  Min,
+} from 'class-validator';
+
+export const DEFAULT_DIRECTORY_PAGE_SIZE = 20;
+export const MAX_DIRECTORY_PAGE_SIZE = 50;
+
+export class DirectorySearchQueryDto {
+  // Start of an alias, or of an email once it contains '@'
+  @IsOptional()
+  @IsString()
+  @MaxLength(254)
+  prefix?: string;
+
+  @IsOptional()
+  @Type(() => Number)
+  @IsInt()
+  @Min(1)
+  @Max(MAX_DIRECTORY_PAGE_SIZE)
+  limit?: number;
+
+  // Opaque cursor returned as `nextCursor` by the previous page
+  @IsOptional()
+  @IsString()
+  cursor?: string;
+}
@@ -0,0 +1,55 @@
+import { Injectable } from '@nestjs/common';
+import { ConfigService } from '@nestjs/config';
+import { CacheStats, LruCache } from '../common/cache/lru-cache';
+import { clusterBus } from '../common/cluster/cluster-bus';
+
+const INVALIDATE_TOPIC = 'principal-invalidated';
+
+// What JwtStrategy attaches to `req.user`
+export interface AuthenticatedPrincipal {
+  id: string;
+  email: string;
+  alias: string;
+  // Taken from the token, not cached; missing on pre-rollover tokens
+  walletId?: string;
+}
+
+// Short-lived cache of authenticated principals keyed by userId, so polling
+// endpoints don't pay a user lookup on every request. Entries are dropped on
+// any write to the user, in every cluster worker; the TTL bounds staleness
+// across instances.
+@Injectable()
+export class PrincipalCacheService {
+  private readonly cache: LruCache<string, AuthenticatedPrincipal>;
+
+  constructor(configService: ConfigService) {
+    this.cache = new LruCache({
+      ttlMs: Number(configService.get('PRINCIPAL_CACHE_TTL_MS') ?? 30_000),
+      maxEntries: Number(
+        configService.get('PRINCIPAL_CACHE_MAX_ENTRIES') ?? 10_000,
+      ),
+    });
+    clusterBus.subscribe(INVALIDATE_TOPIC, (userId) => this.drop(userId));
+  }
+
+  get(userId: string): AuthenticatedPrincipal | undefined {
+    return this.cache.get(userId);
+  }
+
+  set(principal: AuthenticatedPrincipal): void {
+    this.cache.set(principal.id, principal);
+  }
+
+  invalidate(userId: string): void {
+    this.drop(userId);
+    clusterBus.publish(INVALIDATE_TOPIC, userId);
+  }
+
+  stats(): CacheStats {
+    return this.cache.stats();
+  }
+
+  private drop(userId: string) {
+    this.cache.delete(userId);
+  }
+}
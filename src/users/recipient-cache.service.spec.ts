@@ -0,0 +1,54 @@
+import { ConfigService } from '@nestjs/config';
+import {
+  RecipientCacheService,
+  identifierColumn,
+} from './recipient-cache.service';
+
+describe('RecipientCacheService', () => {
+  let cache: RecipientCacheService;
+
+  const recipient = {
+    userId: 'user-1',
+    email: 'ana@example.com',
+    alias: 'ana_123',
+    walletId: 'wallet-1',
+  };
+
+  beforeEach(() => {
+    cache = new RecipientCacheService({
+      get: () => undefined,
+    } as unknown as ConfigService);
+  });
+
+  it('should tell emails from aliases', () => {
+    expect(identifierColumn('ana@example.com')).toBe('email');
+    expect(identifierColumn('ana_123')).toBe('alias');
+  });
+
+  it('should resolve a recipient by email or alias', () => {
+    cache.set(recipient);
+
+    expect(cache.get('ana@example.com')).toEqual(recipient);
+    expect(cache.get('ana_123')).toEqual(recipient);
+    expect(cache.get('bob_456')).toBeUndefined();
+  });
+
+  it('should drop every identifier of an invalidated user', () => {
+    cache.set(recipient);
+    cache.set({ ...recipient, email: 'ana@new.example.com' });
+    cache.set({
+      userId: 'user-2',
+      email: 'bob@example.com',
+      alias: 'bob_456',
+      walletId: 'wallet-2',
+    });
+
+    cache.invalidate('user-1');
+
+    expect(cache.get('ana@example.com')).toBeUndefined();
+    expect(cache.get('ana@new.example.com')).toBeUndefined();
+    expect(cache.get('ana_123')).toBeUndefined();
+    expect(cache.get('bob_456')).toBeDefined();
+    expect(cache.stats().size).toBe(2);
+  });
+});
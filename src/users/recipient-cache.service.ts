@@ -0,0 +1,63 @@
+import { Injectable } from '@nestjs/common';
+import { ConfigService } from '@nestjs/config';
+import { CacheStats, LruCache } from '../common/cache/lru-cache';
+import { clusterBus } from '../common/cluster/cluster-bus';
+
+const INVALIDATE_TOPIC = 'recipient-invalidated';
+
+// A transfer recipient resolved to the user and wallet it pays into
+export interface ResolvedRecipient {
+  userId: string;
+  email: string;
+  alias: string;
+  walletId: string;
+}
+
+// Aliases cannot contain '@' (see CreateUserDto), so the identifier's shape
+// says which unique index to probe; no OR across both columns is needed.
+export function identifierColumn(identifier: string): 'email' | 'alias' {
+  return identifier.includes('@') ? 'email' : 'alias';
+}
+
+// Recipient identifiers (email or alias) mapped to user and wallet, so
+// repeat payees skip the lookup on the transfer path. A user's entries are
+// dropped when the user changes or is removed, in every cluster worker; the
+// TTL bounds staleness across instances. Unknown identifiers are never cached.
+@Injectable()
+export class RecipientCacheService {
+  private readonly cache: LruCache<string, ResolvedRecipient>;
+
+  constructor(configService: ConfigService) {
+    this.cache = new LruCache({
+      ttlMs: Number(configService.get('RECIPIENT_CACHE_TTL_MS') ?? 60_000),
+      maxEntries: Number(
+        configService.get('RECIPIENT_CACHE_MAX_ENTRIES') ?? 50_000,
+      ),
+    });
+    clusterBus.subscribe(INVALIDATE_TOPIC, (userId) => this.drop(userId));
+  }
+
+  get(identifier: string): ResolvedRecipient | undefined {
+    return this.cache.get(identifier);
+  }
+
+  // Cached under both identifiers: payees are addressed either way
+  set(recipient: ResolvedRecipient): void {
+    this.cache.set(recipient.email, recipient);
+    this.cache.set(recipient.alias, recipient);
+  }
+
+  // Identifiers may be the user's old email or alias, so match by user
+  invalidate(userId: string): void {
+    this.drop(userId);
+    clusterBus.publish(INVALIDATE_TOPIC, userId);
+  }
+
+  stats(): CacheStats {
+    return this.cache.stats();
+  }
+
+  private drop(userId: string) {
+    this.cache.deleteWhere((recipient) => recipient.userId === userId);
+  }
+}
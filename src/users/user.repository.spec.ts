@@ -1,5 +1,9 @@
 import { Test, TestingModule } from '@nestjs/testing';
-import { UserRepository } from './user.repository';
+import {
+  UserRepository,
+  decodeDirectoryCursor,
+  encodeDirectoryCursor,
+} from './user.repository';
 import { PrismaService } from '../prisma/prisma.service';
 
 describe('UserRepository', () => {
@@ -181,4 +185,21 @@ describe('UserRepository', () => {
       ).rejects.toThrow('Database error');
     });
   });
+
+  describe('directory cursors', () => {
+    it('should round-trip a cursor', () => {
+      const cursor = { key: 'ana_2', value: 'Ana_2' };
+
+      expect(decodeDirectoryCursor(encodeDirectoryCursor(cursor))).toEqual(
+        cursor,
+      );
+    });
+
+    it('should reject anything else', () => {
+      expect(decodeDirectoryCursor('not-a-cursor')).toBeNull();
+      expect(
+        decodeDirectoryCursor(Buffer.from('[1,2]').toString('base64url')),
+      ).toBeNull();
+    });
+  });
 });
@@ -1,6 +1,49 @@
 import { Injectable } from '@nestjs/common';
 import { PrismaService } from '../prisma/prisma.service';
-import { User, Wallet } from '../../generated/prisma';
+import { Prisma, User, Wallet } from '../../generated/prisma';
+import { SYSTEM_USER_EMAIL } from '../system-accounts/system-accounts.service';
+
+// Sorts after any character a prefix can be followed by, so a prefix is the
+// key range [prefix, prefix + PREFIX_RANGE_END)
+const PREFIX_RANGE_END = '\u{10FFFF}';
+
+export interface DirectoryRow {
+  alias: string;
+  email: string;
+  // Lowercased alias or email the page is ordered by
+  key: string;
+}
+
+// Position after the last row of a page: its key plus the exact value,
+// which breaks ties between values that differ only in case
+export interface DirectoryCursor {
+  key: string;
+  value: string;
+}
+
+export function encodeDirectoryCursor(cursor: DirectoryCursor): string {
+  return Buffer.from(JSON.stringify([cursor.key, cursor.value])).toString(
+    'base64url',
+  );
+}
+
+export function decodeDirectoryCursor(value: string): DirectoryCursor | null {
+  try {
+    const decoded: unknown = JSON.parse(
+      Buffer.from(value, 'base64url').toString('utf8'),
+    );
+    if (
+      Array.isArray(decoded) &&
+      decoded.length === 2 &&
+      decoded.every((part) => typeof part === 'string')
+    ) {
+      return { key: decoded[0], value: decoded[1] };
+    }
+  } catch {
+    // fall through
+  }
+  return null;
+}
 
 @Injectable()
 export class UserRepository {
@@ -35,13 +78,31 @@ export class UserRepository {
     });
   }
 
-  findAllAliases(): Promise<string[]> {
-    return this.prisma.user
-      .findMany({
-        select: {
-          alias: true,
-        },
-      })
-      .then((users) => users.map((user) => user.alias));
+  // Case-insensitive prefix match on one column, in key order. The range
+  // and the ORDER BY both follow the (lower(column) COLLATE "C", column)
+  // index, so a page is one short index range scan at any table size.
+  searchDirectory(
+    column: 'alias' | 'email',
+    prefix: string,
+    limit: number,
+    after?: DirectoryCursor,
+  ): Promise<DirectoryRow[]> {
+    const field = Prisma.raw(`u."${column}"`);
+    const key = Prisma.sql`lower(${field}) COLLATE "C"`;
+    const from = prefix.toLowerCase();
+    const afterCursor = after
+      ? Prisma.sql`AND (${key}, ${field}) > (${after.key}, ${after.value})`
+      : Prisma.empty;
+
+    return this.prisma.reader().$queryRaw<DirectoryRow[]>`
+      SELECT u."alias", u."email", lower(${field}) AS "key"
+      FROM "User" u
+      WHERE ${key} >= ${from}
+        AND ${key} < ${from + PREFIX_RANGE_END}
+        AND u."email" <> ${SYSTEM_USER_EMAIL}
+        ${afterCursor}
+      ORDER BY ${key}, ${field}
+      LIMIT ${limit}
+    `;
   }
 }
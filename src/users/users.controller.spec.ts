@@ -10,6 +10,7 @@ describe('UsersController', () => {
 
   const mockUsersService = {
     findAll: jest.fn(),
+    searchDirectory: jest.fn(),
     findOne: jest.fn(),
     update: jest.fn(),
     remove: jest.fn(),
@@ -64,6 +65,20 @@ describe('UsersController', () => {
     });
   });
 
+  describe('searchDirectory', () => {
+    it('should return a page of matching aliases', async () => {
+      const page = { items: [{ alias: 'ana_1' }], nextCursor: null };
+      mockUsersService.searchDirectory.mockResolvedValue(page);
+
+      const result = await controller.searchDirectory({ prefix: 'ana' });
+
+      expect(result).toEqual(page);
+      expect(mockUsersService.searchDirectory).toHaveBeenCalledWith({
+        prefix: 'ana',
+      });
+    });
+  });
+
   describe('findOne', () => {
     it('should return a user when found', async () => {
       const userId = 'user-id';
@@ -1,6 +1,17 @@
-import { Controller, Get, Body, Patch, Param, Delete } from '@nestjs/common';
-import { UsersService } from './users.service';
+import {
+  Controller,
+  Get,
+  Body,
+  Patch,
+  Param,
+  Delete,
+  Query,
+  UseGuards,
+} from '@nestjs/common';
+import { AuthGuard } from '@nestjs/passport';
+import { DirectoryPage, UsersService } from './users.service';
 import { UpdateUserDto } from './dto/update-user.dto';
+import { DirectorySearchQueryDto } from './dto/directory-search-query.dto';
 
 @Controller('users')
 export class UsersController {
@@ -11,9 +22,13 @@ export class UsersController {
     return this.usersService.findAll();
   }
 
+  // Paginated prefix search; without a prefix it pages through every alias
   @Get('aliases')
-  findAllAliases() {
-    return this.usersService.findAllAliases();
+  @UseGuards(AuthGuard('jwt'))
+  searchDirectory(
+    @Query() query: DirectorySearchQueryDto,
+  ): Promise<DirectoryPage> {
+    return this.usersService.searchDirectory(query);
   }
 
   @Get(':id')
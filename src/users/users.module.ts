@@ -3,11 +3,23 @@ import { UsersService } from './users.service';
 import { UsersController } from './users.controller';
 import { PrismaModule } from '../prisma/prisma.module';
 import { UserRepository } from './user.repository';
+import { PrincipalCacheService } from './principal-cache.service';
+import { RecipientCacheService } from './recipient-cache.service';
 
 @Module({
   imports: [PrismaModule],
   controllers: [UsersController],
-  providers: [UsersService, UserRepository],
-  exports: [UsersService, UserRepository],
+  providers: [
+    UsersService,
+    UserRepository,
+    PrincipalCacheService,
+    RecipientCacheService,
+  ],
+  exports: [
+    UsersService,
+    UserRepository,
+    PrincipalCacheService,
+    RecipientCacheService,
+  ],
 })
 export class UsersModule {}
@@ -1,8 +1,10 @@
 import { Test, TestingModule } from '@nestjs/testing';
 import { UsersService } from './users.service';
 import { PrismaService } from '../prisma/prisma.service';
-import { UserRepository } from './user.repository';
-import { NotFoundException } from '@nestjs/common';
+import { UserRepository, decodeDirectoryCursor } from './user.repository';
+import { PrincipalCacheService } from './principal-cache.service';
+import { RecipientCacheService } from './recipient-cache.service';
+import { BadRequestException, NotFoundException } from '@nestjs/common';
 import { UpdateUserDto } from './dto/update-user.dto';
 
 describe('UsersService', () => {
@@ -19,10 +21,20 @@ describe('UsersService', () => {
       update: jest.fn(),
       delete: jest.fn(),
     },
+    markWrite: jest.fn(),
   };
 
   const mockUserRepository = {
-    findAllAliases: jest.fn(),
+    searchDirectory: jest.fn(),
+    findUserWithWallet: jest.fn(),
+  };
+
+  const mockPrincipalCache = {
+    invalidate: jest.fn(),
+  };
+
+  const mockRecipientCache = {
+    invalidate: jest.fn(),
   };
 
   const mockUser = {
@@ -48,6 +60,14 @@ describe('UsersService', () => {
           provide: UserRepository,
           useValue: mockUserRepository,
         },
+        {
+          provide: PrincipalCacheService,
+          useValue: mockPrincipalCache,
+        },
+        {
+          provide: RecipientCacheService,
+          useValue: mockRecipientCache,
+        },
       ],
     }).compile();
 
@@ -85,6 +105,7 @@ describe('UsersService', () => {
           alias: expect.stringMatching(/^test_[a-z0-9]{3}$/), // Generated alias pattern
           wallet: { create: { balance: 0 } },
         },
+        include: { wallet: true },
       });
     });
 
@@ -113,6 +134,7 @@ describe('UsersService', () => {
           alias: createUserDto.alias,
           wallet: { create: { balance: 0 } },
         },
+        include: { wallet: true },
       });
     });
   });
@@ -214,6 +236,38 @@ describe('UsersService', () => {
     });
   });
 
+  describe('findByEmailOrAlias', () => {
+    it('should probe the email index for an email', async () => {
+      mockPrismaService.user.findUnique.mockResolvedValue(mockUser);
+
+      const result = await service.findByEmailOrAlias('test@example.com');
+
+      expect(result).toEqual(mockUser);
+      expect(mockPrismaService.user.findUnique).toHaveBeenCalledWith({
+        where: { email: 'test@example.com' },
+      });
+    });
+
+    it('should probe the alias index for an alias', async () => {
+      mockPrismaService.user.findUnique.mockResolvedValue(mockUser);
+
+      await service.findByEmailOrAlias('testuser_123');
+
+      expect(mockPrismaService.user.findUnique).toHaveBeenCalledWith({
+        where: { alias: 'testuser_123' },
+      });
+      expect(mockPrismaService.user.findFirst).not.toHaveBeenCalled();
+    });
+
+    it('should throw NotFoundException when nobody matches', async () => {
+      mockPrismaService.user.findUnique.mockResolvedValue(null);
+
+      await expect(service.findByEmailOrAlias('ghost')).rejects.toThrow(
+        NotFoundException,
+      );
+    });
+  });
+
   describe('findByAlias', () => {
     it('should return a user when found by alias', async () => {
       const alias = 'testuser_123';
@@ -240,15 +294,76 @@ describe('UsersService', () => {
     });
   });
 
-  describe('findAllAliases', () => {
-    it('should return all aliases from repository', async () => {
-      const mockAliases = ['user1_123', 'user2_456', 'user3_789'];
-      mockUserRepository.findAllAliases.mockResolvedValue(mockAliases);
+  describe('searchDirectory', () => {
+    const rows = [
+      { alias: 'ana_1', email: 'ana@example.com', key: 'ana_1' },
+      { alias: 'Ana_2', email: 'ana2@example.com', key: 'ana_2' },
+      { alias: 'ana_3', email: 'ana3@example.com', key: 'ana_3' },
+    ];
+
+    it('should return a page of aliases and a cursor to the next', async () => {
+      mockUserRepository.searchDirectory.mockResolvedValue(rows);
+
+      const page = await service.searchDirectory({ prefix: 'ANA', limit: 2 });
+
+      expect(page.items).toEqual([{ alias: 'ana_1' }, { alias: 'Ana_2' }]);
+      expect(mockUserRepository.searchDirectory).toHaveBeenCalledWith(
+        'alias',
+        'ANA',
+        3,
+        undefined,
+      );
+      expect(decodeDirectoryCursor(page.nextCursor!)).toEqual({
+        key: 'ana_2',
+        value: 'Ana_2',
+      });
+
+      mockUserRepository.searchDirectory.mockResolvedValue(rows.slice(2));
+      const next = await service.searchDirectory({
+        prefix: 'ana',
+        limit: 2,
+        cursor: page.nextCursor!,
+      });
+
+      expect(next).toEqual({ items: [{ alias: 'ana_3' }], nextCursor: null });
+      expect(mockUserRepository.searchDirectory).toHaveBeenLastCalledWith(
+        'alias',
+        'ana',
+        3,
+        { key: 'ana_2', value: 'Ana_2' },
+      );
+    });
 
-      const result = await service.findAllAliases();
+    it('should search emails once the prefix contains @', async () => {
+      mockUserRepository.searchDirectory.mockResolvedValue(rows.slice(0, 1));
 
-      expect(result).toEqual(mockAliases);
-      expect(mockUserRepository.findAllAliases).toHaveBeenCalled();
+      const page = await service.searchDirectory({ prefix: 'ana@' });
+
+      expect(page.items).toEqual([
+        { alias: 'ana_1', email: 'ana@example.com' },
+      ]);
+      expect(mockUserRepository.searchDirectory).toHaveBeenCalledWith(
+        'email',
+        'ana@',
+        21,
+        undefined,
+      );
+    });
+
+    it('should serve a hot prefix from the cache', async () => {
+      mockUserRepository.searchDirectory.mockResolvedValue(rows);
+
+      await service.searchDirectory({ prefix: 'an' });
+      const again = await service.searchDirectory({ prefix: 'AN' });
+
+      expect(again.items).toHaveLength(3);
+      expect(mockUserRepository.searchDirectory).toHaveBeenCalledTimes(1);
+    });
+
+    it('should reject a malformed cursor', async () => {
+      await expect(
+        service.searchDirectory({ prefix: 'ana', cursor: 'not-a-cursor' }),
+      ).rejects.toThrow(BadRequestException);
     });
   });
 
@@ -275,6 +390,9 @@ describe('UsersService', () => {
         where: { id: userId },
         data: updateDto,
       });
+      expect(mockPrincipalCache.invalidate).toHaveBeenCalledWith(userId);
+      // The old email may still be cached as a transfer recipient
+      expect(mockRecipientCache.invalidate).toHaveBeenCalledWith(userId);
     });
 
     it('should handle database errors including non-existent user', async () => {
@@ -298,6 +416,21 @@ describe('UsersService', () => {
     });
   });
 
+  describe('updatePasswordHash', () => {
+    it('should update the password and invalidate the cached principal', async () => {
+      mockPrismaService.user.update.mockResolvedValue(mockUser);
+
+      const result = await service.updatePasswordHash('user-id', 'new-hash');
+
+      expect(result).toEqual(mockUser);
+      expect(mockPrismaService.user.update).toHaveBeenCalledWith({
+        where: { id: 'user-id' },
+        data: { password: 'new-hash' },
+      });
+      expect(mockPrincipalCache.invalidate).toHaveBeenCalledWith('user-id');
+    });
+  });
+
   describe('remove', () => {
     it('should delete and return a user', async () => {
       const userId = 'user-id';
@@ -309,6 +442,8 @@ describe('UsersService', () => {
       expect(mockPrismaService.user.delete).toHaveBeenCalledWith({
         where: { id: userId },
       });
+      expect(mockPrincipalCache.invalidate).toHaveBeenCalledWith(userId);
+      expect(mockRecipientCache.invalidate).toHaveBeenCalledWith(userId);
     });
 
     it('should handle database errors including non-existent user', async () => {
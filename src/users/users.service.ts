@@ -1,29 +1,76 @@
-import { Injectable, NotFoundException } from '@nestjs/common';
+import {
+  BadRequestException,
+  Injectable,
+  NotFoundException,
+} from '@nestjs/common';
 import { UpdateUserDto } from './dto/update-user.dto';
 import { PrismaService } from '../prisma/prisma.service';
-import { User } from '../../generated/prisma';
+import { User, Wallet } from '../../generated/prisma';
 import { CreateUserDto } from 'src/auth/dto/create-user.dto';
-import { UserRepository } from './user.repository';
+import {
+  DirectoryCursor,
+  UserRepository,
+  decodeDirectoryCursor,
+  encodeDirectoryCursor,
+} from './user.repository';
+import { PrincipalCacheService } from './principal-cache.service';
+import {
+  RecipientCacheService,
+  identifierColumn,
+} from './recipient-cache.service';
+import { LruCache } from '../common/cache/lru-cache';
+import {
+  DEFAULT_DIRECTORY_PAGE_SIZE,
+  DirectorySearchQueryDto,
+} from './dto/directory-search-query.dto';
+
+// Hot prefixes (the first letters users type) are served from memory for
+// this long; results can lag new or renamed users by as much
+export const DIRECTORY_CACHE_TTL_MS = 5000;
+
+export interface DirectoryEntry {
+  alias: string;
+  // Only when the search was by email
+  email?: string;
+}
+
+export interface DirectoryPage {
+  items: DirectoryEntry[];
+  nextCursor: string | null;
+}
 
 @Injectable()
 export class UsersService {
+  private readonly directoryCache = new LruCache<string, DirectoryPage>({
+    maxEntries: 1000,
+    ttlMs: DIRECTORY_CACHE_TTL_MS,
+  });
+
   constructor(
     private prisma: PrismaService,
     private userRepository: UserRepository,
+    private principalCache: PrincipalCacheService,
+    private recipientCache: RecipientCacheService,
   ) {}
 
-  async create(createUserDto: CreateUserDto): Promise<User> {
+  async create(
+    createUserDto: CreateUserDto,
+  ): Promise<User & { wallet: Wallet | null }> {
     const { email, password, alias: initialAlias } = createUserDto;
     const alias = initialAlias || generateAlias(email);
 
-    return this.prisma.user.create({
+    const user = await this.prisma.user.create({
       data: {
         email,
         password,
         alias,
         wallet: { create: { balance: 0 } },
       },
+      include: { wallet: true },
     });
+    // The replica may not have the new wallet yet
+    this.prisma.markWrite(user.id);
+    return user;
   }
 
   async findAll(): Promise<User[]> {
@@ -36,11 +83,13 @@ export class UsersService {
     return user;
   }
 
+  // One unique-index probe: the identifier's shape picks email or alias
   async findByEmailOrAlias(identifier: string): Promise<User | null> {
-    const user = await this.prisma.user.findFirst({
-      where: {
-        OR: [{ email: identifier }, { alias: identifier }],
-      },
+    const user = await this.prisma.user.findUnique({
+      where:
+        identifierColumn(identifier) === 'email'
+          ? { email: identifier }
+          : { alias: identifier },
     });
     if (!user) {
       throw new NotFoundException(
@@ -54,30 +103,89 @@ export class UsersService {
     return this.prisma.user.findUnique({ where: { email } });
   }
 
+  async findByEmailWithWallet(
+    email: string,
+  ): Promise<(User & { wallet: Wallet | null }) | null> {
+    return this.userRepository.findUserWithWallet(email);
+  }
+
   async findByAlias(alias: string): Promise<User | null> {
     return this.prisma.user.findUnique({ where: { alias } });
   }
 
-  async findAllAliases(): Promise<string[]> {
-    return this.userRepository.findAllAliases();
+  // Autocomplete for payees: aliases starting with the prefix, or emails
+  // once the prefix contains '@', a page at a time
+  async searchDirectory(
+    query: DirectorySearchQueryDto,
+  ): Promise<DirectoryPage> {
+    const prefix = query.prefix ?? '';
+    const limit = query.limit ?? DEFAULT_DIRECTORY_PAGE_SIZE;
+    const cacheKey = JSON.stringify([
+      prefix.toLowerCase(),
+      limit,
+      query.cursor ?? null,
+    ]);
+    const cached = this.directoryCache.get(cacheKey);
+    if (cached) {
+      return cached;
+    }
+
+    let after: DirectoryCursor | undefined;
+    if (query.cursor) {
+      const decoded = decodeDirectoryCursor(query.cursor);
+      if (!decoded) {
+        throw new BadRequestException('Invalid pagination cursor.');
+      }
+      after = decoded;
+    }
+
+    const column = identifierColumn(prefix);
+    // Fetch one extra row to know whether another page exists
+    const rows = await this.userRepository.searchDirectory(
+      column,
+      prefix,
+      limit + 1,
+      after,
+    );
+    const items = rows.slice(0, limit);
+    const last = items[items.length - 1];
+    const page: DirectoryPage = {
+      items: items.map(({ alias, email }) =>
+        column === 'email' ? { alias, email } : { alias },
+      ),
+      nextCursor:
+        rows.length > limit && last
+          ? encodeDirectoryCursor({ key: last.key, value: last[column] })
+          : null,
+    };
+    this.directoryCache.set(cacheKey, page);
+    return page;
   }
 
   async update(id: string, dto: UpdateUserDto) {
-    return this.prisma.user.update({
+    const user = await this.prisma.user.update({
       where: { id },
       data: { ...dto },
     });
+    this.principalCache.invalidate(id);
+    this.recipientCache.invalidate(id);
+    return user;
   }
 
   async updatePasswordHash(id: string, passwordHash: string): Promise<User> {
-    return this.prisma.user.update({
+    const user = await this.prisma.user.update({
       where: { id },
       data: { password: passwordHash },
     });
+    this.principalCache.invalidate(id);
+    return user;
   }
 
   async remove(id: string): Promise<User> {
-    return await (this.prisma.user as any).delete({ where: { id } });
+    const user = await (this.prisma.user as any).delete({ where: { id } });
+    this.principalCache.invalidate(id);
+    this.recipientCache.invalidate(id);
+    return user;
   }
 }
 
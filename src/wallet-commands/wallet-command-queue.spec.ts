@@ -0,0 +1,152 @@
+import { Test, TestingModule } from '@nestjs/testing';
+import { ConfigService } from '@nestjs/config';
+import { WalletCommandQueue } from './wallet-command-queue';
+import { PrismaService } from '../prisma/prisma.service';
+import { BalanceEventBus } from '../balance-events/balance-event-bus';
+
+describe('WalletCommandQueue', () => {
+  let queue: WalletCommandQueue;
+  let balance: bigint;
+  // Each $transaction waits until the test releases it
+  let releases: (() => void)[];
+
+  const mockTx = {
+    transaction: {
+      createManyAndReturn: jest.fn(({ data }) =>
+        Promise.resolve(data.map((row: object) => ({ ...row }))),
+      ),
+    },
+    wallet: {
+      update: jest.fn(({ data }) => {
+        balance += data.balance.increment;
+        return Promise.resolve({ balance });
+      }),
+    },
+  };
+
+  const mockPrismaService = {
+    $transaction: jest.fn(
+      (callback: (tx: typeof mockTx) => Promise<unknown>) =>
+        new Promise<void>((resolve) => releases.push(resolve)).then(() =>
+          callback(mockTx),
+        ),
+    ),
+  };
+
+  const mockBalanceEventBus = { publish: jest.fn(), changes: jest.fn() };
+
+  const credit = (amount: bigint, walletId = 'wallet-1') =>
+    queue.credit(walletId, {
+      amount,
+      description: `Deposit of ${amount}`,
+      senderWalletId: 'system-wallet-id',
+    });
+
+  const flush = () => new Promise((resolve) => setImmediate(resolve));
+
+  beforeEach(async () => {
+    jest.clearAllMocks();
+    balance = 1000n;
+    releases = [];
+
+    const module: TestingModule = await Test.createTestingModule({
+      providers: [
+        WalletCommandQueue,
+        { provide: PrismaService, useValue: mockPrismaService },
+        { provide: BalanceEventBus, useValue: mockBalanceEventBus },
+        {
+          provide: ConfigService,
+          useValue: {
+            get: (key: string) =>
+              key === 'WALLET_CREDIT_MAX_BATCH' ? '2' : undefined,
+          },
+        },
+      ],
+    }).compile();
+
+    queue = module.get<WalletCommandQueue>(WalletCommandQueue);
+  });
+
+  it('should batch credits that queue behind a write in flight', async () => {
+    const first = credit(100n);
+    const second = credit(200n);
+    const third = credit(300n);
+    await flush();
+
+    // Only the first credit is being written; the others wait for it
+    expect(mockPrismaService.$transaction).toHaveBeenCalledTimes(1);
+    releases[0]();
+    await expect(first).resolves.toMatchObject({ balance: 1100n });
+
+    await flush();
+    expect(mockPrismaService.$transaction).toHaveBeenCalledTimes(2);
+    releases[1]();
+
+    // One UPDATE for both, each caller sees the balance after its own credit
+    await expect(second).resolves.toMatchObject({
+      balance: 1300n,
+      transaction: expect.objectContaining({ amount: 200n }),
+    });
+    await expect(third).resolves.toMatchObject({
+      balance: 1600n,
+      transaction: expect.objectContaining({ amount: 300n }),
+    });
+    expect(mockTx.wallet.update).toHaveBeenLastCalledWith({
+      where: { id: 'wallet-1' },
+      data: { balance: { increment: 500n } },
+      select: { balance: true },
+    });
+    expect(mockTx.transaction.createManyAndReturn).toHaveBeenCalledTimes(2);
+    expect(mockBalanceEventBus.publish).toHaveBeenCalledTimes(2);
+    expect(queue.pendingWallets).toBe(0);
+  });
+
+  it('should cap a batch at WALLET_CREDIT_MAX_BATCH', async () => {
+    const credits = [credit(1n), credit(2n), credit(3n), credit(4n)];
+    await flush();
+    releases[0]();
+    await flush();
+    releases[1]();
+    await flush();
+    releases[2]();
+    await Promise.all(credits);
+
+    expect(mockTx.wallet.update).toHaveBeenCalledTimes(3);
+    expect(
+      mockTx.wallet.update.mock.calls.map(
+        ([args]) => args.data.balance.increment,
+      ),
+    ).toEqual([1n, 5n, 4n]);
+  });
+
+  it('should write different wallets independently', async () => {
+    const credits = [credit(100n, 'wallet-1'), credit(100n, 'wallet-2')];
+    await flush();
+
+    expect(mockPrismaService.$transaction).toHaveBeenCalledTimes(2);
+    releases.forEach((release) => release());
+    await Promise.all(credits);
+  });
+
+  it('should reject every credit of a failed batch', async () => {
+    const first = credit(100n);
+    const second = credit(200n);
+    const third = credit(300n);
+    await flush();
+    releases[0]();
+    await first;
+
+    mockTx.wallet.update.mockRejectedValueOnce(new Error('wallet removed'));
+    await flush();
+    releases[1]();
+
+    await expect(second).rejects.toThrow('wallet removed');
+    await expect(third).rejects.toThrow('wallet removed');
+
+    // The queue keeps working for later credits
+    const later = credit(50n);
+    await flush();
+    releases[2]();
+    await expect(later).resolves.toMatchObject({ balance: 1150n });
+  });
+});
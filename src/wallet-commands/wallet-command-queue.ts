@@ -0,0 +1,138 @@
+import { Injectable, Optional } from '@nestjs/common';
+import { ConfigService } from '@nestjs/config';
+import { randomUUID } from 'crypto';
+import { PrismaService } from '../prisma/prisma.service';
+import { Transaction, TransactionType } from '../../generated/prisma';
+import { BalanceEventBus } from '../balance-events/balance-event-bus';
+import { MetricsService } from '../metrics/metrics.service';
+import { Traced } from '../tracing/tracer';
+
+export interface WalletCredit {
+  // Minor units
+  amount: bigint;
+  description: string;
+  senderWalletId: string;
+}
+
+export interface WalletCreditResult {
+  transaction: Transaction;
+  // Balance right after this credit, as if it had been applied on its own
+  balance: bigint;
+}
+
+interface QueuedCredit extends WalletCredit {
+  resolve: (result: WalletCreditResult) => void;
+  reject: (error: unknown) => void;
+}
+
+// Serializes credits per wallet inside this process. While one batch for a
+// wallet is being written, new credits for it queue up; the next batch then
+// inserts all their ledger rows and applies their sum in a single UPDATE.
+// A hot wallet (the bank's collection account, a merchant) takes one row
+// lock per batch instead of one per credit, so concurrent deposits stop
+// queueing on that lock and holding a connection each while they wait.
+//
+// Only credits go through here: they cannot fail on the balance, so a batch
+// succeeds or fails as a whole. Debits stay conditional single UPDATEs.
+@Injectable()
+export class WalletCommandQueue {
+  private readonly queues = new Map<string, QueuedCredit[]>();
+  private readonly maxBatch: number;
+
+  constructor(
+    private prisma: PrismaService,
+    private balanceEvents: BalanceEventBus,
+    private configService: ConfigService,
+    @Optional() private metricsService?: MetricsService,
+  ) {
+    this.maxBatch = this.numberSetting('WALLET_CREDIT_MAX_BATCH', 100);
+  }
+
+  @Traced()
+  credit(
+    walletId: string,
+    credit: WalletCredit,
+  ): Promise<WalletCreditResult> {
+    return new Promise((resolve, reject) => {
+      const queued = { ...credit, resolve, reject };
+      const queue = this.queues.get(walletId);
+      if (queue) {
+        queue.push(queued);
+        return;
+      }
+      this.queues.set(walletId, [queued]);
+      void this.drain(walletId);
+    });
+  }
+
+  get pendingWallets(): number {
+    return this.queues.size;
+  }
+
+  // The queue entry exists for as long as a drain runs for the wallet, so a
+  // credit arriving mid-batch joins the next batch instead of starting a
+  // second drain.
+  private async drain(walletId: string) {
+    const queue = this.queues.get(walletId)!;
+    try {
+      while (queue.length > 0) {
+        await this.apply(walletId, queue.splice(0, this.maxBatch));
+      }
+    } finally {
+      this.queues.delete(walletId);
+    }
+  }
+
+  private async apply(walletId: string, batch: QueuedCredit[]) {
+    this.metricsService?.walletCreditBatchSize.observe({}, batch.length);
+    const ids = batch.map(() => randomUUID());
+
+    let written: { balance: bigint; transactions: Transaction[] };
+    try {
+      written = await this.write(walletId, batch, ids);
+    } catch (error) {
+      for (const credit of batch) {
+        credit.reject(error);
+      }
+      return;
+    }
+
+    this.balanceEvents.publish(walletId);
+    const byId = new Map(written.transactions.map((row) => [row.id, row]));
+    // Walk back from the final balance so each caller sees its own
+    let balance = written.balance;
+    for (let index = batch.length - 1; index >= 0; index--) {
+      batch[index].resolve({ transaction: byId.get(ids[index])!, balance });
+      balance -= batch[index].amount;
+    }
+  }
+
+  // Ledger rows first, then one increment for the whole batch
+  private write(walletId: string, batch: QueuedCredit[], ids: string[]) {
+    const total = batch.reduce((sum, credit) => sum + credit.amount, 0n);
+    return this.prisma.$transaction(async (tx) => {
+      const transactions = await tx.transaction.createManyAndReturn({
+        data: batch.map((credit, index) => ({
+          id: ids[index],
+          amount: credit.amount,
+          type: TransactionType.IN,
+          description: credit.description,
+          senderWalletId: credit.senderWalletId,
+          receiverWalletId: walletId,
+          effectedWalletId: walletId,
+        })),
+      });
+      const wallet = await tx.wallet.update({
+        where: { id: walletId },
+        data: { balance: { increment: total } },
+        select: { balance: true },
+      });
+      return { balance: wallet.balance, transactions };
+    });
+  }
+
+  private numberSetting(key: string, fallback: number): number {
+    const value = Number(this.configService.get(key));
+    return Number.isFinite(value) && value > 0 ? value : fallback;
+  }
+}
@@ -0,0 +1,12 @@
+import { Module } from '@nestjs/common';
+import { ConfigModule } from '@nestjs/config';
+import { PrismaModule } from '../prisma/prisma.module';
+import { BalanceEventsModule } from '../balance-events/balance-events.module';
+import { WalletCommandQueue } from './wallet-command-queue';
+
+@Module({
+  imports: [ConfigModule, PrismaModule, BalanceEventsModule],
+  providers: [WalletCommandQueue],
+  exports: [WalletCommandQueue],
+})
+export class WalletCommandsModule {}
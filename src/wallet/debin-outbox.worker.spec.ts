@@ -0,0 +1,204 @@
+import { Test, TestingModule } from '@nestjs/testing';
+import { ConfigService } from '@nestjs/config';
+import { HttpException, HttpStatus } from '@nestjs/common';
+import { DebinOutboxWorker } from './debin-outbox.worker';
+import { PrismaService } from '../prisma/prisma.service';
+import { ExternalBankService } from '../external-bank/external-bank.service';
+import { BalanceEventBus } from '../balance-events/balance-event-bus';
+import { Prisma } from '../../generated/prisma';
+
+const mockPrismaService = {
+  $queryRaw: jest.fn(),
+  debinRequest: {
+    updateMany: jest.fn(),
+  },
+  transaction: {
+    create: jest.fn(),
+  },
+  wallet: {
+    update: jest.fn(),
+  },
+  $transaction: jest.fn((callback) => callback(mockPrismaService)),
+};
+
+const mockExternalBankService = {
+  ExecuteDebin: jest.fn(),
+};
+
+const mockBalanceEventBus = {
+  publish: jest.fn(),
+  changes: jest.fn(),
+};
+
+const settings: Record<string, string> = {
+  DEBIN_WORKER_ENABLED: 'false',
+  DEBIN_MAX_ATTEMPTS: '3',
+  DEBIN_RETRY_BASE_MS: '1000',
+};
+
+describe('DebinOutboxWorker', () => {
+  let worker: DebinOutboxWorker;
+
+  const claimed = {
+    id: 'debin-request-id',
+    walletId: 'wallet-id',
+    amount: 15000n,
+    attempts: 1,
+  };
+
+  beforeEach(async () => {
+    jest.clearAllMocks();
+
+    const module: TestingModule = await Test.createTestingModule({
+      providers: [
+        DebinOutboxWorker,
+        { provide: PrismaService, useValue: mockPrismaService },
+        { provide: ExternalBankService, useValue: mockExternalBankService },
+        { provide: BalanceEventBus, useValue: mockBalanceEventBus },
+        {
+          provide: ConfigService,
+          useValue: { get: (key: string) => settings[key] },
+        },
+      ],
+    }).compile();
+
+    worker = module.get<DebinOutboxWorker>(DebinOutboxWorker);
+
+    // One claimed request, then the outbox is empty
+    mockPrismaService.$queryRaw
+      .mockResolvedValueOnce([claimed])
+      .mockResolvedValue([]);
+    mockPrismaService.debinRequest.updateMany.mockResolvedValue({ count: 1 });
+  });
+
+  it('should settle an approved request and credit the wallet', async () => {
+    mockExternalBankService.ExecuteDebin.mockResolvedValue({
+      approved: true,
+      debinId: 'DB123',
+    });
+
+    await expect(worker.drain()).resolves.toBe(1);
+
+    expect(mockExternalBankService.ExecuteDebin).toHaveBeenCalledWith({
+      amount: 150,
+      toWalletId: 'wallet-id',
+      idempotencyKey: 'debin-request-id',
+    });
+    expect(mockPrismaService.debinRequest.updateMany).toHaveBeenCalledWith({
+      where: { id: 'debin-request-id', status: 'PROCESSING', attempts: 1 },
+      data: expect.objectContaining({ status: 'SETTLED', debinId: 'DB123' }),
+    });
+    expect(mockPrismaService.wallet.update).toHaveBeenCalledWith({
+      where: { id: 'wallet-id' },
+      data: { balance: { increment: 15000n } },
+    });
+    expect(mockBalanceEventBus.publish).toHaveBeenCalledWith('wallet-id');
+  });
+
+  it('should not credit twice when the claim was taken over', async () => {
+    mockExternalBankService.ExecuteDebin.mockResolvedValue({
+      approved: true,
+      debinId: 'DB123',
+    });
+    mockPrismaService.debinRequest.updateMany.mockResolvedValue({ count: 0 });
+
+    await worker.drain();
+
+    expect(mockPrismaService.transaction.create).not.toHaveBeenCalled();
+    expect(mockPrismaService.wallet.update).not.toHaveBeenCalled();
+    expect(mockBalanceEventBus.publish).not.toHaveBeenCalled();
+  });
+
+  it('should not credit a DEBIN another request already settled', async () => {
+    mockExternalBankService.ExecuteDebin.mockResolvedValue({
+      approved: true,
+      debinId: 'DB123',
+    });
+    mockPrismaService.transaction.create.mockRejectedValueOnce(
+      new Prisma.PrismaClientKnownRequestError('Unique constraint failed', {
+        code: 'P2002',
+        clientVersion: 'test',
+        meta: { target: ['debinId'] },
+      }),
+    );
+
+    await worker.drain();
+
+    expect(
+      mockPrismaService.debinRequest.updateMany,
+    ).toHaveBeenLastCalledWith({
+      where: { id: 'debin-request-id', status: 'PROCESSING', attempts: 1 },
+      data: expect.objectContaining({ status: 'SETTLED' }),
+    });
+    expect(mockPrismaService.wallet.update).not.toHaveBeenCalled();
+    expect(mockBalanceEventBus.publish).not.toHaveBeenCalled();
+  });
+
+  it('should mark a declined request as REJECTED', async () => {
+    mockExternalBankService.ExecuteDebin.mockRejectedValue(
+      new HttpException('DEBIN request rejected', HttpStatus.BAD_REQUEST),
+    );
+
+    await worker.drain();
+
+    expect(mockPrismaService.debinRequest.updateMany).toHaveBeenCalledWith({
+      where: { id: 'debin-request-id', status: 'PROCESSING', attempts: 1 },
+      data: expect.objectContaining({ status: 'REJECTED' }),
+    });
+    expect(mockPrismaService.wallet.update).not.toHaveBeenCalled();
+  });
+
+  it('should put the request back with a backoff on bank outages', async () => {
+    mockExternalBankService.ExecuteDebin.mockRejectedValue(
+      new HttpException('unavailable', HttpStatus.SERVICE_UNAVAILABLE),
+    );
+
+    await worker.drain();
+
+    expect(mockPrismaService.debinRequest.updateMany).toHaveBeenCalledWith({
+      where: { id: 'debin-request-id', status: 'PROCESSING', attempts: 1 },
+      data: expect.objectContaining({
+        status: 'PENDING',
+        nextAttemptAt: expect.any(Date),
+      }),
+    });
+  });
+
+  it('should send the same idempotency key when retrying a timeout', async () => {
+    mockPrismaService.$queryRaw
+      .mockReset()
+      .mockResolvedValueOnce([claimed])
+      .mockResolvedValueOnce([{ ...claimed, attempts: 2 }])
+      .mockResolvedValue([]);
+    mockExternalBankService.ExecuteDebin
+      .mockRejectedValueOnce(
+        new HttpException('timed out', HttpStatus.GATEWAY_TIMEOUT),
+      )
+      .mockResolvedValueOnce({ approved: true, debinId: 'DB123' });
+
+    await expect(worker.drain()).resolves.toBe(2);
+
+    const keys = mockExternalBankService.ExecuteDebin.mock.calls.map(
+      ([request]) => request.idempotencyKey,
+    );
+    expect(keys).toEqual(['debin-request-id', 'debin-request-id']);
+    expect(mockPrismaService.wallet.update).toHaveBeenCalledTimes(1);
+  });
+
+  it('should give up after the last attempt', async () => {
+    mockPrismaService.$queryRaw
+      .mockReset()
+      .mockResolvedValueOnce([{ ...claimed, attempts: 3 }])
+      .mockResolvedValue([]);
+    mockExternalBankService.ExecuteDebin.mockRejectedValue(
+      new HttpException('unavailable', HttpStatus.SERVICE_UNAVAILABLE),
+    );
+
+    await worker.drain();
+
+    expect(mockPrismaService.debinRequest.updateMany).toHaveBeenCalledWith({
+      where: { id: 'debin-request-id', status: 'PROCESSING', attempts: 3 },
+      data: expect.objectContaining({ status: 'FAILED' }),
+    });
+  });
+});
@@ -0,0 +1,266 @@
+import {
+  HttpException,
+  Injectable,
+  OnModuleDestroy,
+  OnModuleInit,
+} from '@nestjs/common';
+import { ConfigService } from '@nestjs/config';
+import { randomUUID } from 'crypto';
+import { Prisma } from '../../generated/prisma';
+import { PrismaService } from '../prisma/prisma.service';
+import { ExternalBankService } from '../external-bank/external-bank.service';
+import { fromMinorUnits } from '../common/money/money';
+import { BalanceEventBus } from '../balance-events/balance-event-bus';
+
+interface ClaimedDebin {
+  id: string;
+  walletId: string;
+  amount: bigint;
+  attempts: number;
+}
+
+const MAX_BACKOFF_MS = 60000;
+
+// Drains accepted DEBIN requests: claims a batch (SKIP LOCKED, so several
+// instances can run side by side), asks the bank, then settles or schedules a
+// retry. Each claim bumps `attempts`, and settlement is conditional on it, so
+// a worker whose lease expired can never credit the same request twice.
+// Every attempt sends the request id as the bank's idempotency key, so a
+// retry after a timed-out reply cannot debit the customer twice either.
+@Injectable()
+export class DebinOutboxWorker implements OnModuleInit, OnModuleDestroy {
+  private timer: NodeJS.Timeout | null = null;
+  private draining: Promise<number> | null = null;
+
+  private readonly enabled: boolean;
+  private readonly intervalMs: number;
+  private readonly batchSize: number;
+  private readonly maxAttempts: number;
+  private readonly leaseMs: number;
+  private readonly retryBaseMs: number;
+
+  constructor(
+    private prisma: PrismaService,
+    private externalBankService: ExternalBankService,
+    private configService: ConfigService,
+    private balanceEvents: BalanceEventBus,
+  ) {
+    this.enabled =
+      this.configService.get<string>('DEBIN_WORKER_ENABLED') !== 'false';
+    this.intervalMs = this.numberSetting('DEBIN_WORKER_INTERVAL_MS', 500);
+    this.batchSize = this.numberSetting('DEBIN_WORKER_BATCH_SIZE', 20);
+    this.maxAttempts = this.numberSetting('DEBIN_MAX_ATTEMPTS', 5);
+    this.leaseMs = this.numberSetting('DEBIN_LEASE_MS', 30000);
+    this.retryBaseMs = this.numberSetting('DEBIN_RETRY_BASE_MS', 1000);
+  }
+
+  onModuleInit() {
+    if (!this.enabled) {
+      return;
+    }
+    this.timer = setInterval(() => void this.drain(), this.intervalMs);
+    this.timer.unref();
+  }
+
+  async onModuleDestroy() {
+    if (this.timer) {
+      clearInterval(this.timer);
+      this.timer = null;
+    }
+    await this.draining;
+  }
+
+  // Processes batches until nothing is due. Overlapping calls share the
+  // running drain. Resolves with the number of requests handled.
+  drain(): Promise<number> {
+    if (!this.draining) {
+      this.draining = this.drainBatches()
+        .catch((error) => {
+          console.error('DEBIN outbox drain failed:', error);
+          return 0;
+        })
+        .finally(() => {
+          this.draining = null;
+        });
+    }
+    return this.draining;
+  }
+
+  private async drainBatches(): Promise<number> {
+    let handled = 0;
+    for (;;) {
+      const batch = await this.claimBatch();
+      if (batch.length === 0) {
+        return handled;
+      }
+      await Promise.all(batch.map((debin) => this.process(debin)));
+      handled += batch.length;
+    }
+  }
+
+  private claimBatch(): Promise<ClaimedDebin[]> {
+    return this.prisma.$queryRaw<ClaimedDebin[]>`
+      UPDATE "DebinRequest"
+      SET "status" = 'PROCESSING',
+          "attempts" = "attempts" + 1,
+          "lockedUntil" = now() + ${this.leaseMs} * interval '1 millisecond',
+          "updatedAt" = now()
+      WHERE "id" IN (
+        SELECT "id" FROM "DebinRequest"
+        WHERE ("status" = 'PENDING' AND "nextAttemptAt" <= now())
+           OR ("status" = 'PROCESSING' AND "lockedUntil" < now())
+        ORDER BY "nextAttemptAt"
+        LIMIT ${this.batchSize}
+        FOR UPDATE SKIP LOCKED
+      )
+      RETURNING "id", "walletId", "amount", "attempts"
+    `;
+  }
+
+  private async process(debin: ClaimedDebin) {
+    try {
+      const response = await this.externalBankService.ExecuteDebin({
+        amount: fromMinorUnits(debin.amount),
+        toWalletId: debin.walletId,
+        idempotencyKey: debin.id,
+      });
+      if (response.approved) {
+        await this.settle(debin, response.debinId ?? null);
+      } else {
+        await this.finish(
+          debin,
+          'REJECTED',
+          response.error || 'DEBIN request was not approved',
+        );
+      }
+    } catch (error) {
+      // A 4xx from the bank is a final answer; anything else is retried
+      if (error instanceof HttpException && error.getStatus() < 500) {
+        await this.finish(debin, 'REJECTED', error.message);
+      } else {
+        await this.retryLater(debin, error);
+      }
+    }
+  }
+
+  private async settle(debin: ClaimedDebin, debinId: string | null) {
+    const transactionId = randomUUID();
+
+    let settled: boolean;
+    try {
+      settled = await this.credit(debin, debinId, transactionId);
+    } catch (error) {
+      if (!isDuplicateDebin(error)) {
+        throw error;
+      }
+      // The bank approved a debit another request already credited; it
+      // must not be credited again, and retrying would only fail the same way
+      await this.finish(
+        debin,
+        'SETTLED',
+        `DEBIN ${debinId} was already settled by another request`,
+      );
+      return;
+    }
+
+    if (settled) {
+      this.balanceEvents.publish(debin.walletId);
+    }
+  }
+
+  private credit(
+    debin: ClaimedDebin,
+    debinId: string | null,
+    transactionId: string,
+  ): Promise<boolean> {
+    return this.prisma.$transaction(async (prisma) => {
+      const claimed = await prisma.debinRequest.updateMany({
+        where: {
+          id: debin.id,
+          status: 'PROCESSING',
+          attempts: debin.attempts,
+        },
+        data: {
+          status: 'SETTLED',
+          debinId,
+          transactionId,
+          lockedUntil: null,
+          lastError: null,
+        },
+      });
+      if (claimed.count === 0) {
+        // Lease expired and another worker took over this request
+        return false;
+      }
+
+      await prisma.transaction.create({
+        data: {
+          id: transactionId,
+          amount: debin.amount,
+          type: 'IN',
+          description: `DEBIN transfer from external bank account`,
+          effectedWalletId: debin.walletId,
+          senderWalletId: debin.walletId,
+          receiverWalletId: debin.walletId,
+        },
+      });
+
+      await prisma.wallet.update({
+        where: { id: debin.walletId },
+        data: { balance: { increment: debin.amount } },
+      });
+      return true;
+    });
+  }
+
+  private async finish(
+    debin: ClaimedDebin,
+    status: 'SETTLED' | 'REJECTED' | 'FAILED',
+    reason: string,
+  ) {
+    await this.prisma.debinRequest.updateMany({
+      where: { id: debin.id, status: 'PROCESSING', attempts: debin.attempts },
+      data: { status, lastError: reason, lockedUntil: null },
+    });
+  }
+
+  private async retryLater(debin: ClaimedDebin, error: unknown) {
+    const reason = error instanceof Error ? error.message : String(error);
+    if (debin.attempts >= this.maxAttempts) {
+      await this.finish(debin, 'FAILED', reason);
+      return;
+    }
+
+    const backoffMs = Math.min(
+      this.retryBaseMs * 2 ** (debin.attempts - 1),
+      MAX_BACKOFF_MS,
+    );
+    await this.prisma.debinRequest.updateMany({
+      where: { id: debin.id, status: 'PROCESSING', attempts: debin.attempts },
+      data: {
+        status: 'PENDING',
+        nextAttemptAt: new Date(Date.now() + backoffMs),
+        lockedUntil: null,
+        lastError: reason,
+      },
+    });
+  }
+
+  private numberSetting(key: string, fallback: number): number {
+    const value = Number(this.configService.get(key));
+    return Number.isFinite(value) && value > 0 ? value : fallback;
+  }
+}
+
+function isDuplicateDebin(error: unknown): boolean {
+  if (
+    !(error instanceof Prisma.PrismaClientKnownRequestError) ||
+    error.code !== 'P2002'
+  ) {
+    return false;
+  }
+  const target = error.meta?.target;
+  return Array.isArray(target)
+    ? target.includes('debinId')
+    : String(target).includes('debinId');
+}
@@ -7,6 +7,7 @@ export enum PaymentMethod {
 }
 
 export class AddMoneyDto {
+  // Decimal major units; services convert with toMinorUnits()
   @IsNotEmpty()
   @IsNumber()
   amount: number;
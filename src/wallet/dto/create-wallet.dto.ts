@@ -1,6 +1,7 @@
 import { IsNotEmpty, IsNumber, IsString } from 'class-validator';
 
 export class CreateWalletDto {
+  // Decimal major units; services convert with toMinorUnits()
   @IsNotEmpty()
   @IsNumber()
   balance: number;
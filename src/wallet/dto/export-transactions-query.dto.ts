@@ -0,0 +1,10 @@
+import { IsIn, IsOptional } from 'class-validator';
+
+export const LEDGER_EXPORT_FORMATS = ['csv', 'ndjson'] as const;
+export type LedgerExportFormat = (typeof LEDGER_EXPORT_FORMATS)[number];
+
+export class ExportTransactionsQueryDto {
+  @IsOptional()
+  @IsIn(LEDGER_EXPORT_FORMATS)
+  format?: LedgerExportFormat;
+}
@@ -0,0 +1,9 @@
+import { IsNotEmpty, IsNumber, IsPositive } from 'class-validator';
+
+export class RequestDebinDto {
+  // Decimal major units; services convert with toMinorUnits()
+  @IsNotEmpty()
+  @IsNumber()
+  @IsPositive()
+  amount: number;
+}
@@ -0,0 +1,69 @@
+import { Transaction } from '../../generated/prisma';
+import { ledgerExportChunks } from './ledger-export';
+
+describe('ledgerExportChunks', () => {
+  const transaction = (overrides: Partial<Transaction> = {}): Transaction => ({
+    id: 'tx-1',
+    amount: 12550n,
+    type: 'IN',
+    description: 'Deposit',
+    createdAt: new Date('2026-10-17T12:00:00.000Z'),
+    senderWalletId: 'wallet-system',
+    receiverWalletId: 'wallet-1',
+    effectedWalletId: 'wallet-1',
+    ...overrides,
+  });
+
+  async function* batches(...items: Transaction[][]) {
+    yield* items;
+  }
+
+  const collect = async (chunks: AsyncIterable<string>) => {
+    const parts: string[] = [];
+    for await (const chunk of chunks) {
+      parts.push(chunk);
+    }
+    return parts;
+  };
+
+  it('should write a CSV header and one chunk per batch', async () => {
+    const parts = await collect(
+      ledgerExportChunks(
+        batches([transaction()], [transaction({ id: 'tx-2', amount: 5n })]),
+        'csv',
+      ),
+    );
+
+    expect(parts).toEqual([
+      'id,createdAt,type,amount,description,senderWalletId,receiverWalletId\r\n',
+      'tx-1,2026-10-17T12:00:00.000Z,IN,125.5,Deposit,wallet-system,wallet-1\r\n',
+      'tx-2,2026-10-17T12:00:00.000Z,IN,0.05,Deposit,wallet-system,wallet-1\r\n',
+    ]);
+  });
+
+  it('should quote CSV fields with delimiters, quotes or line breaks', async () => {
+    const [, row] = await collect(
+      ledgerExportChunks(
+        batches([transaction({ description: 'Rent, "May"\nthanks' })]),
+        'csv',
+      ),
+    );
+
+    expect(row).toContain(',"Rent, ""May""\nthanks",');
+  });
+
+  it('should write one JSON object per line for NDJSON', async () => {
+    const parts = await collect(
+      ledgerExportChunks(
+        batches([transaction(), transaction({ description: null })]),
+        'ndjson',
+      ),
+    );
+
+    const lines = parts.join('').trimEnd().split('\n');
+    expect(lines.map((line) => JSON.parse(line))).toEqual([
+      expect.objectContaining({ id: 'tx-1', amount: 125.5 }),
+      expect.objectContaining({ description: null }),
+    ]);
+  });
+});
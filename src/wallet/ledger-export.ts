@@ -0,0 +1,59 @@
+import { Transaction } from '../../generated/prisma';
+import { fromMinorUnits } from '../common/money/money';
+import { LedgerExportFormat } from './dto/export-transactions-query.dto';
+
+export const EXPORT_CONTENT_TYPES: Record<LedgerExportFormat, string> = {
+  csv: 'text/csv; charset=utf-8',
+  ndjson: 'application/x-ndjson',
+};
+
+const COLUMNS = [
+  'id',
+  'createdAt',
+  'type',
+  'amount',
+  'description',
+  'senderWalletId',
+  'receiverWalletId',
+] as const;
+
+// Amounts in major units, like every other response of the API
+function exportedFields(transaction: Transaction) {
+  return {
+    id: transaction.id,
+    createdAt: transaction.createdAt.toISOString(),
+    type: transaction.type,
+    amount: fromMinorUnits(transaction.amount),
+    description: transaction.description,
+    senderWalletId: transaction.senderWalletId,
+    receiverWalletId: transaction.receiverWalletId,
+  };
+}
+
+// RFC 4180: quote fields containing a delimiter, quote or line break
+function csvField(value: string | number | null): string {
+  const text = value === null ? '' : String(value);
+  return /[",\r\n]/.test(text) ? `"${text.replace(/"/g, '""')}"` : text;
+}
+
+// Turns batches of ledger rows into the text of the export, one chunk per
+// batch, so a consumer that stops reading also stops the batch queries.
+export async function* ledgerExportChunks(
+  batches: AsyncIterable<Transaction[]>,
+  format: LedgerExportFormat,
+): AsyncGenerator<string> {
+  if (format === 'csv') {
+    yield `${COLUMNS.join(',')}\r\n`;
+  }
+  for await (const batch of batches) {
+    let chunk = '';
+    for (const transaction of batch) {
+      const fields = exportedFields(transaction);
+      chunk +=
+        format === 'csv'
+          ? `${COLUMNS.map((column) => csvField(fields[column])).join(',')}\r\n`
+          : `${JSON.stringify(fields)}\n`;
+    }
+    yield chunk;
+  }
+}
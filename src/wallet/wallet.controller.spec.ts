@@ -2,7 +2,9 @@ import { Test, TestingModule } from '@nestjs/testing';
 import { WalletController } from './wallet.controller';
 import { WalletService } from './wallet.service';
 import { UpdateWalletDto } from './dto/update-wallet.dto';
-import { NotFoundException } from '@nestjs/common';
+import { NotFoundException, StreamableFile } from '@nestjs/common';
+import { Readable } from 'stream';
+import { firstValueFrom, of } from 'rxjs';
 
 // Import the RequestWithUser interface or define it locally
 interface RequestWithUser {
@@ -10,6 +12,7 @@ interface RequestWithUser {
     id: string;
     email: string;
     alias: string;
+    walletId?: string;
   };
 }
 
@@ -23,6 +26,9 @@ describe('WalletController', () => {
     findOne: jest.fn(),
     update: jest.fn(),
     remove: jest.fn(),
+    getWalletForUser: jest.fn(),
+    balanceUpdates: jest.fn(),
+    exportTransactions: jest.fn(),
   };
 
   const mockWallet = {
@@ -69,6 +75,7 @@ describe('WalletController', () => {
           id: 'user-id',
           email: 'test@example.com',
           alias: 'testuser',
+          walletId: 'wallet-id',
         },
       };
       mockWalletService.getWalletBalance.mockResolvedValue(100);
@@ -78,6 +85,7 @@ describe('WalletController', () => {
       expect(result).toEqual({ balance: 100 });
       expect(mockWalletService.getWalletBalance).toHaveBeenCalledWith(
         'user-id',
+        'wallet-id',
       );
     });
 
@@ -98,6 +106,7 @@ describe('WalletController', () => {
       );
       expect(mockWalletService.getWalletBalance).toHaveBeenCalledWith(
         'user-id',
+        undefined,
       );
     });
   });
@@ -118,6 +127,7 @@ describe('WalletController', () => {
       expect(result).toEqual(mockWallet);
       expect(mockWalletService.getWalletDetails).toHaveBeenCalledWith(
         'user-id',
+        undefined,
       );
     });
 
@@ -138,6 +148,7 @@ describe('WalletController', () => {
       );
       expect(mockWalletService.getWalletDetails).toHaveBeenCalledWith(
         'user-id',
+        undefined,
       );
     });
   });
@@ -228,4 +239,74 @@ describe('WalletController', () => {
       expect(mockWalletService.remove).toHaveBeenCalledWith(walletId);
     });
   });
+
+  describe('streamBalance', () => {
+    it('should stream balances of the caller wallet in major units', async () => {
+      const req: RequestWithUser = {
+        user: {
+          id: 'user-id',
+          email: 'test@example.com',
+          alias: 'test-alias',
+          walletId: 'wallet-id',
+        },
+      };
+      mockWalletService.getWalletForUser.mockResolvedValue(mockWallet);
+      mockWalletService.balanceUpdates.mockReturnValue(of(12550n));
+
+      const event = await firstValueFrom(controller.streamBalance(req));
+
+      expect(event).toEqual({ type: 'balance', data: { balance: 125.5 } });
+      expect(mockWalletService.getWalletForUser).toHaveBeenCalledWith(
+        'user-id',
+        'wallet-id',
+      );
+      expect(mockWalletService.balanceUpdates).toHaveBeenCalledWith(
+        'wallet-id',
+      );
+    });
+  });
+
+  describe('exportTransactions', () => {
+    const req: RequestWithUser = {
+      user: {
+        id: 'user-id',
+        email: 'test@example.com',
+        alias: 'test-alias',
+        walletId: 'wallet-id',
+      },
+    };
+
+    it('should stream a CSV export by default', async () => {
+      mockWalletService.exportTransactions.mockResolvedValue(
+        Readable.from(['id\r\n']),
+      );
+
+      const file = await controller.exportTransactions(req, {});
+
+      expect(file).toBeInstanceOf(StreamableFile);
+      expect(file.getHeaders()).toEqual(
+        expect.objectContaining({
+          type: 'text/csv; charset=utf-8',
+          disposition: 'attachment; filename="transactions.csv"',
+        }),
+      );
+      expect(mockWalletService.exportTransactions).toHaveBeenCalledWith(
+        'user-id',
+        'csv',
+        'wallet-id',
+      );
+    });
+
+    it('should stream NDJSON when asked to', async () => {
+      mockWalletService.exportTransactions.mockResolvedValue(
+        Readable.from([]),
+      );
+
+      const file = await controller.exportTransactions(req, {
+        format: 'ndjson',
+      });
+
+      expect(file.getHeaders().type).toBe('application/x-ndjson');
+    });
+  });
 });
@@ -8,21 +8,37 @@ import {
   Request,
   Post,
   UseGuards,
+  HttpCode,
+  HttpStatus,
+  Headers,
+  BadRequestException,
+  Sse,
+  MessageEvent,
+  Query,
+  StreamableFile,
 } from '@nestjs/common';
+import { Observable, defer, interval, map, merge, switchMap } from 'rxjs';
 import { WalletService } from './wallet.service';
 import { UpdateWalletDto } from './dto/update-wallet.dto';
 import { AddMoneyDto } from './dto/add-money.dto';
 import { AuthGuard } from '@nestjs/passport';
 import { WithdrawMoneyDto } from './dto/withdraw-money.dto';
+import { RequestDebinDto } from './dto/request-debin.dto';
+import { fromMinorUnits, toMinorUnits } from '../common/money/money';
+import { ExportTransactionsQueryDto } from './dto/export-transactions-query.dto';
+import { EXPORT_CONTENT_TYPES } from './ledger-export';
 
 interface RequestWithUser {
   user: {
     id: string;
     email: string;
     alias: string;
+    walletId?: string;
   };
 }
 
+export const BALANCE_STREAM_HEARTBEAT_MS = 25000;
+
 @Controller('wallet')
 export class WalletController {
   constructor(private readonly walletService: WalletService) {}
@@ -31,14 +47,63 @@ export class WalletController {
   @UseGuards(AuthGuard('jwt'))
   async getBalance(@Request() req: RequestWithUser) {
     return {
-      balance: await this.walletService.getWalletBalance(req.user.id),
+      balance: await this.walletService.getWalletBalance(
+        req.user.id,
+        req.user.walletId,
+      ),
     };
   }
 
+  // Reemplaza el polling de GET /wallet/balance: envía el saldo actual y
+  // luego uno nuevo cada vez que se confirma un cambio
+  @Sse('balance/stream')
+  @UseGuards(AuthGuard('jwt'))
+  streamBalance(@Request() req: RequestWithUser): Observable<MessageEvent> {
+    const balances = defer(() =>
+      this.walletService.getWalletForUser(req.user.id, req.user.walletId),
+    ).pipe(
+      switchMap((wallet) => this.walletService.balanceUpdates(wallet.id)),
+      map(
+        (balance): MessageEvent => ({
+          type: 'balance',
+          data: { balance: fromMinorUnits(balance) },
+        }),
+      ),
+    );
+    // Keeps proxies from closing idle connections
+    const heartbeats = interval(BALANCE_STREAM_HEARTBEAT_MS).pipe(
+      map((): MessageEvent => ({ type: 'heartbeat', data: {} })),
+    );
+    return merge(balances, heartbeats);
+  }
+
+  // Historial completo para contabilidad, en CSV o NDJSON, enviado a medida
+  // que el cliente lo lee
+  @Get('transactions/export')
+  @UseGuards(AuthGuard('jwt'))
+  async exportTransactions(
+    @Request() req: RequestWithUser,
+    @Query() query: ExportTransactionsQueryDto,
+  ): Promise<StreamableFile> {
+    const format = query.format ?? 'csv';
+    const stream = await this.walletService.exportTransactions(
+      req.user.id,
+      format,
+      req.user.walletId,
+    );
+    return new StreamableFile(stream, {
+      type: EXPORT_CONTENT_TYPES[format],
+      disposition: `attachment; filename="transactions.${format}"`,
+    });
+  }
+
   @Get()
   @UseGuards(AuthGuard('jwt'))
   async getWalletDetails(@Request() req: RequestWithUser) {
-    return this.walletService.getWalletDetails(req.user.id);
+    return this.walletService.getWalletDetails(
+      req.user.id,
+      req.user.walletId,
+    );
   }
 
   @Get(':id')
@@ -71,9 +136,38 @@ export class WalletController {
     return this.walletService.addMoney(req.user.id, addMoneyDto);
   }
 
+  // El DEBIN se procesa en segundo plano: 202 con el pedido y su estado,
+  // que se consulta en GET topup/debin/:id
   @Post('topup/debin')
+  @HttpCode(HttpStatus.ACCEPTED)
   @UseGuards(AuthGuard('jwt'))
-  async requestDebin(@Request() req, @Body() data: { amount: number }) {
-    return this.walletService.requestDebin(req.user.id, data.amount);
+  async requestDebin(
+    @Request() req: RequestWithUser,
+    @Body() data: RequestDebinDto,
+    @Headers('idempotency-key') idempotencyKey?: string,
+  ) {
+    const amount = toMinorUnits(data.amount);
+    if (amount <= 0n) {
+      throw new BadRequestException('Amount must be at least 0.01');
+    }
+    return this.walletService.requestDebin(
+      req.user.id,
+      amount,
+      req.user.walletId,
+      idempotencyKey || undefined,
+    );
+  }
+
+  @Get('topup/debin/:id')
+  @UseGuards(AuthGuard('jwt'))
+  async getDebinRequest(
+    @Request() req: RequestWithUser,
+    @Param('id') id: string,
+  ) {
+    return this.walletService.getDebinRequest(
+      req.user.id,
+      id,
+      req.user.walletId,
+    );
   }
 }
@@ -1,14 +1,25 @@
 import { Module } from '@nestjs/common';
 import { WalletService } from './wallet.service';
 import { WalletController } from './wallet.controller';
+import { DebinOutboxWorker } from './debin-outbox.worker';
 import { PrismaModule } from '../prisma/prisma.module';
 import { ExternalBankModule } from '../external-bank/external-bank.module';
 import { UsersModule } from '../users/users.module';
+import { SystemAccountsModule } from '../system-accounts/system-accounts.module';
+import { BalanceEventsModule } from '../balance-events/balance-events.module';
+import { WalletCommandsModule } from '../wallet-commands/wallet-commands.module';
 
 @Module({
-  imports: [PrismaModule, ExternalBankModule, UsersModule],
+  imports: [
+    PrismaModule,
+    ExternalBankModule,
+    UsersModule,
+    SystemAccountsModule,
+    BalanceEventsModule,
+    WalletCommandsModule,
+  ],
   controllers: [WalletController],
-  providers: [WalletService],
+  providers: [WalletService, DebinOutboxWorker],
   exports: [WalletService],
 })
 export class WalletModule {}
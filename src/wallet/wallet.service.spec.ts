@@ -1,15 +1,24 @@
 import { Test, TestingModule } from '@nestjs/testing';
-import { WalletService } from './wallet.service';
+import { LEDGER_EXPORT_BATCH_SIZE, WalletService } from './wallet.service';
 import { PrismaService } from '../prisma/prisma.service';
 import { ExternalBankService } from '../external-bank/external-bank.service';
 import { UsersService } from '../users/users.service';
-import { BadRequestException, NotFoundException } from '@nestjs/common';
+import {
+  BadRequestException,
+  ConflictException,
+  NotFoundException,
+} from '@nestjs/common';
 import { PaymentMethod } from './dto/add-money.dto';
+import { SystemAccountsService } from '../system-accounts/system-accounts.service';
+import { BalanceEventBus } from '../balance-events/balance-event-bus';
+import { WalletCommandQueue } from '../wallet-commands/wallet-command-queue';
+import { Subject, firstValueFrom, take, toArray } from 'rxjs';
 
 // Mock the PrismaService
 const mockPrismaService = {
   wallet: {
     findUnique: jest.fn(),
+    findUniqueOrThrow: jest.fn(),
     findFirst: jest.fn(),
     create: jest.fn(),
     update: jest.fn(),
@@ -19,8 +28,17 @@ const mockPrismaService = {
   },
   transaction: {
     create: jest.fn(),
+    findMany: jest.fn(),
+  },
+  debinRequest: {
+    upsert: jest.fn(),
+    findUnique: jest.fn(),
+    findUniqueOrThrow: jest.fn(),
   },
   $transaction: jest.fn((callback) => callback(mockPrismaService)),
+  reader: jest.fn(() => mockPrismaService),
+  markWrite: jest.fn(),
+  balanceMaxLagMs: 1000,
 };
 
 // Mock the ExternalBankService
@@ -35,6 +53,22 @@ const mockUsersService = {
   findByAlias: jest.fn(),
 };
 
+// Mock the SystemAccountsService with an already-resolved system wallet
+const mockSystemAccountsService = {
+  withSystemWallet: jest.fn((fn) => fn('system-wallet-id')),
+};
+
+// Mock the BalanceEventBus; each test wires its own change feed
+const mockBalanceEventBus = {
+  publish: jest.fn(),
+  changes: jest.fn(),
+};
+
+// Mock the WalletCommandQueue that applies credits
+const mockWalletCommandQueue = {
+  credit: jest.fn(),
+};
+
 describe('WalletService', () => {
   let service: WalletService;
   let prismaService: PrismaService;
@@ -58,6 +92,18 @@ describe('WalletService', () => {
           provide: UsersService,
           useValue: mockUsersService,
         },
+        {
+          provide: SystemAccountsService,
+          useValue: mockSystemAccountsService,
+        },
+        {
+          provide: BalanceEventBus,
+          useValue: mockBalanceEventBus,
+        },
+        {
+          provide: WalletCommandQueue,
+          useValue: mockWalletCommandQueue,
+        },
       ],
     }).compile();
 
@@ -109,21 +155,11 @@ describe('WalletService', () => {
         transactionId: 'test-tx-id',
       });
 
-      // Mock system user creation
-      const mockSystemUser = {
-        id: 'system-user-id',
-        email: 'system@walle.internal',
-        alias: 'SYSTEM',
-      };
-      mockPrismaService.user.upsert.mockResolvedValue(mockSystemUser);
-
       // Mock wallet lookup
       mockPrismaService.wallet.findUnique.mockResolvedValue(mockWallet);
-      mockPrismaService.wallet.findFirst.mockResolvedValue(mockSystemWallet);
-      mockPrismaService.transaction.create.mockResolvedValue(mockTransaction);
-      mockPrismaService.wallet.update.mockResolvedValue({
-        ...mockWallet,
-        balance: amount,
+      mockWalletCommandQueue.credit.mockResolvedValue({
+        transaction: mockTransaction,
+        balance: 10000n,
       });
 
       const result = await service.addMoney(userId, {
@@ -133,12 +169,28 @@ describe('WalletService', () => {
       });
 
       expect(result.success).toBe(true);
-      expect(result.balance).toBe(amount);
+      expect(result.balance).toBe(10000n);
       expect(mockExternalBankService.Transfer).toHaveBeenCalledWith({
         amount,
         alias: 'test-user-alias',
         source: sourceIdentifier,
       });
+
+      // The cached system wallet is used; no per-deposit upsert or lookup
+      expect(mockPrismaService.user.upsert).not.toHaveBeenCalled();
+      expect(mockPrismaService.wallet.findFirst).not.toHaveBeenCalled();
+      expect(mockWalletCommandQueue.credit).toHaveBeenCalledWith(
+        walletId,
+        expect.objectContaining({
+          amount: 10000n, // stored in minor units
+          senderWalletId: mockSystemWallet.id,
+        }),
+      );
+      expect(result.transaction).toBe(mockTransaction);
+      // Only the user's wallet is credited; the system wallet is not written
+      expect(mockPrismaService.wallet.update).not.toHaveBeenCalled();
+      // Their next balance read must not hit a lagging replica
+      expect(mockPrismaService.markWrite).toHaveBeenCalledWith(userId);
     });
 
     it('should throw BadRequestException when bank transfer is declined', async () => {
@@ -183,7 +235,7 @@ describe('WalletService', () => {
   describe('requestDebin', () => {
     const userId = 'test-user-id';
     const walletId = 'test-wallet-id';
-    const amount = 100;
+    const amount = 10000n;
 
     const mockWallet = {
       id: walletId,
@@ -191,72 +243,242 @@ describe('WalletService', () => {
       balance: 0,
     };
 
-    const mockSystemWallet = {
-      id: 'system-wallet-id',
-      userId: 'SYSTEM',
-      balance: 0,
-    };
-
-    const mockTransaction = {
-      id: 'test-transaction-id',
+    const mockDebinRequest = {
+      id: 'debin-request-id',
+      walletId,
       amount,
-      type: 'IN',
+      idempotencyKey: 'key-1',
+      status: 'PENDING',
+      attempts: 0,
+      debinId: null,
+      transactionId: null,
+      createdAt: new Date(),
     };
 
-    it('should successfully process DEBIN when approved', async () => {
-      // Mock successful DEBIN response
-      mockExternalBankService.ExecuteDebin.mockResolvedValue({
-        approved: true,
-        debinId: 'test-debin-id',
+    it('should persist a PENDING request without calling the bank', async () => {
+      mockPrismaService.wallet.findUnique.mockResolvedValue(mockWallet);
+      mockPrismaService.debinRequest.upsert.mockResolvedValue(
+        mockDebinRequest,
+      );
+
+      const result = await service.requestDebin(
+        userId,
+        amount,
+        undefined,
+        'key-1',
+      );
+
+      expect(result).toMatchObject({
+        id: 'debin-request-id',
+        status: 'PENDING',
+        amount,
+      });
+      expect(mockPrismaService.debinRequest.upsert).toHaveBeenCalledWith({
+        where: {
+          walletId_idempotencyKey: { walletId, idempotencyKey: 'key-1' },
+        },
+        update: {},
+        create: { walletId, amount, idempotencyKey: 'key-1' },
       });
+      expect(mockExternalBankService.ExecuteDebin).not.toHaveBeenCalled();
+    });
 
-      // Mock system user creation
-      const mockSystemUser = {
-        id: 'system-user-id',
-        email: 'system@walle.internal',
-        alias: 'SYSTEM',
-      };
-      mockPrismaService.user.upsert.mockResolvedValue(mockSystemUser);
+    it('should reject a reused idempotency key with another amount', async () => {
+      mockPrismaService.wallet.findUnique.mockResolvedValue(mockWallet);
+      mockPrismaService.debinRequest.upsert.mockResolvedValue(
+        mockDebinRequest,
+      );
+
+      await expect(
+        service.requestDebin(userId, amount + 1n, undefined, 'key-1'),
+      ).rejects.toThrow(ConflictException);
+    });
+
+    it('should throw NotFoundException when wallet is not found', async () => {
+      mockPrismaService.wallet.findUnique.mockResolvedValue(null);
+
+      await expect(service.requestDebin(userId, amount)).rejects.toThrow(
+        NotFoundException,
+      );
+    });
+  });
 
-      // Mock database operations
+  describe('getDebinRequest', () => {
+    const mockWallet = { id: 'test-wallet-id', userId: 'test-user-id' };
+
+    it('should not expose requests of another wallet', async () => {
       mockPrismaService.wallet.findUnique.mockResolvedValue(mockWallet);
-      mockPrismaService.wallet.findFirst.mockResolvedValue(mockSystemWallet);
-      mockPrismaService.transaction.create.mockResolvedValue(mockTransaction);
-      mockPrismaService.wallet.update.mockResolvedValue({
-        ...mockWallet,
-        balance: amount,
+      mockPrismaService.debinRequest.findUnique.mockResolvedValue({
+        id: 'debin-request-id',
+        walletId: 'other-wallet-id',
       });
 
-      const result = await service.requestDebin(userId, amount);
+      await expect(
+        service.getDebinRequest('test-user-id', 'debin-request-id'),
+      ).rejects.toThrow(NotFoundException);
+    });
+  });
 
-      expect(result.success).toBe(true);
-      expect(result.balance).toBe(amount);
-      expect(mockExternalBankService.ExecuteDebin).toHaveBeenCalledWith({
-        amount,
-        toWalletId: walletId,
+  describe('getWalletForUser', () => {
+    const mockWallet = {
+      id: 'test-wallet-id',
+      userId: 'test-user-id',
+      balance: 250,
+    };
+
+    it('should read the wallet by primary key when the token carries it', async () => {
+      mockPrismaService.wallet.findUnique.mockResolvedValueOnce(mockWallet);
+
+      const result = await service.getWalletForUser(
+        'test-user-id',
+        'test-wallet-id',
+      );
+
+      expect(result).toEqual(mockWallet);
+      expect(mockPrismaService.wallet.findUnique).toHaveBeenCalledTimes(1);
+      expect(mockPrismaService.wallet.findUnique).toHaveBeenCalledWith({
+        where: { id: 'test-wallet-id' },
       });
     });
 
-    it('should throw BadRequestException when DEBIN is not approved', async () => {
-      // Mock rejected DEBIN response
-      mockExternalBankService.ExecuteDebin.mockResolvedValue({
-        approved: false,
-        error: 'DEBIN request not approved',
+    it('should fall back to the userId lookup for tokens without walletId', async () => {
+      mockPrismaService.wallet.findUnique.mockResolvedValueOnce(mockWallet);
+
+      const result = await service.getWalletForUser('test-user-id');
+
+      expect(result).toEqual(mockWallet);
+      expect(mockPrismaService.wallet.findUnique).toHaveBeenCalledWith({
+        where: { userId: 'test-user-id' },
       });
+    });
 
-      mockPrismaService.wallet.findUnique.mockResolvedValue(mockWallet);
+    it('should ignore a walletId that belongs to another user', async () => {
+      mockPrismaService.wallet.findUnique
+        .mockResolvedValueOnce({ ...mockWallet, userId: 'someone-else' })
+        .mockResolvedValueOnce(mockWallet);
 
-      await expect(service.requestDebin(userId, amount)).rejects.toThrow(
-        BadRequestException,
+      const result = await service.getWalletForUser(
+        'test-user-id',
+        'test-wallet-id',
       );
+
+      expect(result).toEqual(mockWallet);
+      expect(mockPrismaService.wallet.findUnique).toHaveBeenLastCalledWith({
+        where: { userId: 'test-user-id' },
+      });
     });
+  });
 
-    it('should throw NotFoundException when wallet is not found', async () => {
-      mockPrismaService.wallet.findUnique.mockResolvedValue(null);
+  describe('getWalletBalance', () => {
+    it('should read through the balance reader of the user', async () => {
+      mockPrismaService.wallet.findUnique.mockResolvedValueOnce({
+        id: 'test-wallet-id',
+        userId: 'test-user-id',
+        balance: 25000n,
+      });
 
-      await expect(service.requestDebin(userId, amount)).rejects.toThrow(
-        NotFoundException,
+      await expect(
+        service.getWalletBalance('test-user-id', 'test-wallet-id'),
+      ).resolves.toBe(25000n);
+      expect(mockPrismaService.reader).toHaveBeenCalledWith({
+        userId: 'test-user-id',
+        maxLagMs: 1000,
+      });
+    });
+  });
+
+  describe('balanceUpdates', () => {
+    beforeEach(() => {
+      jest.useFakeTimers();
+    });
+
+    afterEach(() => {
+      jest.useRealTimers();
+    });
+
+    it('should emit the current balance, then one read per burst of changes', async () => {
+      const changes = new Subject<string>();
+      mockBalanceEventBus.changes.mockReturnValue(changes);
+      mockPrismaService.wallet.findUniqueOrThrow
+        .mockResolvedValueOnce({ balance: 10000n })
+        .mockResolvedValueOnce({ balance: 12500n });
+
+      const balances = firstValueFrom(
+        service.balanceUpdates('test-wallet-id').pipe(take(2), toArray()),
       );
+      await jest.advanceTimersByTimeAsync(0);
+
+      changes.next('test-wallet-id');
+      changes.next('test-wallet-id');
+      changes.next('test-wallet-id');
+      await jest.advanceTimersByTimeAsync(100);
+
+      await expect(balances).resolves.toEqual([10000n, 12500n]);
+      expect(mockBalanceEventBus.changes).toHaveBeenCalledWith(
+        'test-wallet-id',
+      );
+      expect(mockPrismaService.wallet.findUniqueOrThrow).toHaveBeenCalledTimes(
+        2,
+      );
+    });
+  });
+
+  describe('exportTransactions', () => {
+    const row = (id: string, createdAt: Date) => ({
+      id,
+      amount: 100n,
+      type: 'IN',
+      description: null,
+      createdAt,
+      senderWalletId: 'system-wallet-id',
+      receiverWalletId: 'wallet-id',
+      effectedWalletId: 'wallet-id',
+    });
+
+    it('should page through the ledger by keyset as the stream is read', async () => {
+      const createdAt = new Date('2026-10-17T12:00:00.000Z');
+      const fullBatch = Array.from(
+        { length: LEDGER_EXPORT_BATCH_SIZE },
+        (_, i) => row(`tx-${String(i).padStart(4, '0')}`, createdAt),
+      );
+      mockPrismaService.wallet.findUnique.mockResolvedValue({
+        id: 'wallet-id',
+        userId: 'user-id',
+      });
+      mockPrismaService.transaction.findMany
+        .mockResolvedValueOnce(fullBatch)
+        .mockResolvedValueOnce([row('tx-last', createdAt)]);
+
+      const stream = await service.exportTransactions(
+        'user-id',
+        'ndjson',
+        'wallet-id',
+      );
+      // Nothing is queried until the client starts reading
+      expect(mockPrismaService.transaction.findMany).not.toHaveBeenCalled();
+
+      let body = '';
+      for await (const chunk of stream) {
+        body += chunk;
+      }
+
+      expect(body.trimEnd().split('\n')).toHaveLength(
+        LEDGER_EXPORT_BATCH_SIZE + 1,
+      );
+      expect(mockPrismaService.transaction.findMany).toHaveBeenCalledTimes(2);
+      expect(
+        mockPrismaService.transaction.findMany.mock.calls[1][0],
+      ).toMatchObject({
+        where: {
+          effectedWalletId: 'wallet-id',
+          createdAt: { lte: createdAt },
+          OR: [
+            { createdAt: { lt: createdAt } },
+            { createdAt, id: { gt: fullBatch.at(-1)!.id } },
+          ],
+        },
+        take: LEDGER_EXPORT_BATCH_SIZE,
+      });
     });
   });
 });
@@ -2,14 +2,51 @@ import {
   Injectable,
   NotFoundException,
   BadRequestException,
+  ConflictException,
 } from '@nestjs/common';
+import { randomUUID } from 'crypto';
+import { Readable } from 'stream';
 import { UpdateWalletDto } from './dto/update-wallet.dto';
 import { PrismaService } from '../prisma/prisma.service';
-import { Wallet } from '../../generated/prisma';
+import {
+  DebinRequest,
+  Prisma,
+  PrismaClient,
+  Transaction,
+  Wallet,
+} from '../../generated/prisma';
 import { AddMoneyDto, PaymentMethod } from './dto/add-money.dto';
 import { WithdrawMoneyDto } from './dto/withdraw-money.dto';
 import { ExternalBankService } from '../external-bank/external-bank.service';
 import { UsersService } from '../users/users.service';
+import { SystemAccountsService } from '../system-accounts/system-accounts.service';
+import { toMinorUnits } from '../common/money/money';
+import { BalanceEventBus } from '../balance-events/balance-event-bus';
+import { WalletCommandQueue } from '../wallet-commands/wallet-command-queue';
+import {
+  Observable,
+  auditTime,
+  distinctUntilChanged,
+  map,
+  startWith,
+  switchMap,
+} from 'rxjs';
+import { Traced } from '../tracing/tracer';
+import { ledgerExportChunks } from './ledger-export';
+import { LedgerExportFormat } from './dto/export-transactions-query.dto';
+import { keysetAfter } from '../transactions/transactions.repository';
+
+export const BALANCE_STREAM_COALESCE_MS = 50;
+export const LEDGER_EXPORT_BATCH_SIZE = 1000;
+
+export interface DebinRequestView {
+  id: string;
+  status: DebinRequest['status'];
+  amount: bigint;
+  debinId: string | null;
+  transactionId: string | null;
+  createdAt: Date;
+}
 
 @Injectable()
 export class WalletService {
@@ -17,6 +54,9 @@ export class WalletService {
     private prisma: PrismaService,
     private usersService: UsersService,
     private externalBankService: ExternalBankService,
+    private systemAccountsService: SystemAccountsService,
+    private balanceEvents: BalanceEventBus,
+    private walletCommands: WalletCommandQueue,
   ) {}
 
   create(userId: string) {
@@ -35,6 +75,9 @@ export class WalletService {
   }
 
   async update(id: string, data: any): Promise<any> {
+    if (typeof data?.balance === 'number') {
+      data = { ...data, balance: toMinorUnits(data.balance) };
+    }
     return await (this.prisma.wallet as any).update({ where: { id }, data });
   }
 
@@ -52,21 +95,43 @@ export class WalletService {
     return wallet;
   }
 
-  async getWalletBalance(userId: string): Promise<number> {
-    const wallet = await this.getWalletByUserId(userId);
+  // Tokens carry the wallet id, so the wallet can be read by primary key.
+  // Tokens issued before that (or a stale id) fall back to the userId lookup.
+  async getWalletForUser(userId: string, walletId?: string): Promise<Wallet> {
+    return this.findWalletForUser(this.prisma, userId, walletId);
+  }
+
+  // Minor units; MinorUnitsInterceptor renders it as major units
+  async getWalletBalance(userId: string, walletId?: string): Promise<bigint> {
+    const wallet = await this.findWalletForUser(
+      this.balanceReader(userId),
+      userId,
+      walletId,
+    );
     return wallet.balance;
   }
 
-  async getWalletDetails(userId: string): Promise<Wallet> {
-    const wallet = await this.prisma.wallet.findUnique({
-      where: { userId },
-      include: {
-        allTransactions: {
-          orderBy: { createdAt: 'desc' },
-          take: 10, // Get last 10 transactions
-        },
+  async getWalletDetails(userId: string, walletId?: string): Promise<Wallet> {
+    const include = {
+      allTransactions: {
+        orderBy: { createdAt: 'desc' as const },
+        take: 10, // Get last 10 transactions
       },
-    });
+    };
+
+    const db = this.balanceReader(userId);
+    let wallet = walletId
+      ? await db.wallet.findUnique({
+          where: { id: walletId },
+          include,
+        })
+      : null;
+    if (!wallet || wallet.userId !== userId) {
+      wallet = await db.wallet.findUnique({
+        where: { userId },
+        include,
+      });
+    }
 
     if (!wallet) {
       throw new NotFoundException('Wallet not found');
@@ -77,7 +142,7 @@ export class WalletService {
 
   async updateWalletBalance(
     userId: string,
-    amount: number,
+    amount: bigint,
     operation: 'increment' | 'decrement',
   ): Promise<Wallet> {
     const wallet = await this.getWalletByUserId(userId);
@@ -87,17 +152,83 @@ export class WalletService {
         ? wallet.balance + amount
         : wallet.balance - amount;
 
-    if (newBalance < 0) {
+    if (newBalance < 0n) {
       throw new BadRequestException('Insufficient funds');
     }
 
-    return this.prisma.wallet.update({
+    const updated = await this.prisma.wallet.update({
       where: { userId },
       data: { balance: newBalance },
     });
+    this.prisma.markWrite(userId);
+    this.balanceEvents.publish(updated.id);
+    return updated;
+  }
+
+  // Current balance first, then the committed balance after every change.
+  // Bursts of changes are coalesced into a single read.
+  balanceUpdates(walletId: string): Observable<bigint> {
+    return this.balanceEvents.changes(walletId).pipe(
+      auditTime(BALANCE_STREAM_COALESCE_MS),
+      startWith(walletId),
+      switchMap(() =>
+        this.prisma.wallet.findUniqueOrThrow({
+          where: { id: walletId },
+          select: { balance: true },
+        }),
+      ),
+      map((wallet) => wallet.balance),
+      distinctUntilChanged(),
+    );
+  }
+
+  // Full ledger of the caller's wallet, newest first. The stream pulls one
+  // batch at a time as the client reads, so memory stays flat and the first
+  // bytes go out after a single batch, however long the history.
+  async exportTransactions(
+    userId: string,
+    format: LedgerExportFormat,
+    walletId?: string,
+  ): Promise<Readable> {
+    const wallet = await this.getWalletForUser(userId, walletId);
+    return Readable.from(
+      ledgerExportChunks(this.transactionBatches(wallet.id), format),
+    );
+  }
+
+  // Keyset walk over the (effectedWalletId, createdAt DESC, id) index, with
+  // the same bound as history pages: each batch is a short range scan that
+  // starts at the previous batch's last row, so no cursor or snapshot stays
+  // open between batches. Rows committed during the export may or may not
+  // be included.
+  private async *transactionBatches(
+    walletId: string,
+  ): AsyncGenerator<Transaction[]> {
+    const db = this.prisma.reader();
+    let last: Transaction | undefined;
+    do {
+      const batch = await db.transaction.findMany({
+        where: {
+          effectedWalletId: walletId,
+          ...(last && keysetAfter(last)),
+        },
+        orderBy: [{ createdAt: 'desc' }, { id: 'asc' }],
+        take: LEDGER_EXPORT_BATCH_SIZE,
+      });
+      if (batch.length > 0) {
+        yield batch;
+      }
+      last =
+        batch.length === LEDGER_EXPORT_BATCH_SIZE ? batch.at(-1) : undefined;
+    } while (last);
   }
 
+  @Traced()
   async addMoney(userId: string, addMoneyDto: AddMoneyDto) {
+    const amount = toMinorUnits(addMoneyDto.amount);
+    if (amount <= 0n) {
+      throw new BadRequestException('Amount must be at least 0.01');
+    }
     const wallet = await this.getWalletByUserId(userId);
     const user = await this.usersService.findOne(userId);
 
@@ -114,201 +245,144 @@ export class WalletService {
       );
     }
 
-    // Usar una transacción de base de datos para asegurar consistencia
-    const result = await this.prisma.$transaction(async (prisma) => {
-      // Primero creamos o buscamos un usuario del sistema
-      const systemUser = await prisma.user.upsert({
-        where: { email: 'system@walle.internal' },
-        update: {},
-        create: {
-          email: 'system@walle.internal',
-          alias: 'SYSTEM',
-          password: 'N/A', // Sistema no necesita password real
-        },
-      });
-
-      // Luego creamos o buscamos una wallet del sistema
-      const systemWallet =
-        (await prisma.wallet.findFirst({
-          where: { userId: systemUser.id },
-        })) ||
-        (await prisma.wallet.create({
-          data: {
-            userId: systemUser.id,
-            balance: 0,
-          },
-        }));
-
-      // Crear la transacción
-      const transaction = await prisma.transaction.create({
-        data: {
-          amount: addMoneyDto.amount,
-          type: 'IN',
-          description: `Deposit via ${addMoneyDto.method} - ${addMoneyDto.sourceIdentifier || 'Unknown source'}`,
-          effectedWallet: {
-            connect: { id: wallet.id },
-          },
-          senderWallet: {
-            connect: { id: systemWallet.id },
-          },
-          receiverWallet: {
-            connect: { id: wallet.id },
-          },
-        },
-      });
-
-      // Actualizar el balance de la wallet
-      const updatedWallet = await prisma.wallet.update({
-        where: { id: wallet.id },
-        data: {
-          balance: {
-            increment: addMoneyDto.amount,
-          },
-        },
-        include: {
-          allTransactions: {
-            orderBy: { createdAt: 'desc' },
-            take: 1,
-          },
-        },
-      });
-
-      return {
-        success: true,
-        balance: updatedWallet.balance,
-        transaction: transaction,
-      };
-    });
-
+    const result = await this.depositFromSystem(
+      wallet.id,
+      amount,
+      `Deposit via ${addMoneyDto.method} - ${addMoneyDto.sourceIdentifier || 'Unknown source'}`,
+    );
+    this.prisma.markWrite(userId);
     return result;
   }
 
-  async requestDebin(userId: string, amount: number) {
-    const wallet = await this.getWalletByUserId(userId);
-
-    // Solicitar DEBIN al servicio externo
-    const debinResponse = await this.externalBankService.ExecuteDebin({
-      amount,
-      toWalletId: wallet.id,
-    });
-
-    if (!debinResponse.approved) {
-      throw new BadRequestException('DEBIN request was not approved');
-    }
-
-    // Si el DEBIN fue aprobado, proceder con la transacción
-    const result = await this.prisma.$transaction(async (prisma) => {
-      const transaction = await prisma.transaction.create({
-        data: {
-          amount: amount,
-          type: 'IN',
-          description: `DEBIN transfer from external bank account`,
-          effectedWallet: {
-            connect: { id: wallet.id },
-          },
-          senderWallet: {
-            connect: { id: wallet.id },
-          },
-          receiverWallet: {
-            connect: { id: wallet.id },
-          },
-        },
+  // Solo registra el pedido (PENDING) y responde; DebinOutboxWorker llama al
+  // banco y acredita. Reintentar con la misma key devuelve el mismo pedido.
+  @Traced()
+  async requestDebin(
+    userId: string,
+    amount: bigint,
+    walletId?: string,
+    idempotencyKey: string = randomUUID(),
+  ): Promise<DebinRequestView> {
+    const wallet = await this.getWalletForUser(userId, walletId);
+    const where = {
+      walletId_idempotencyKey: { walletId: wallet.id, idempotencyKey },
+    };
+
+    let debin: DebinRequest;
+    try {
+      debin = await this.prisma.debinRequest.upsert({
+        where,
+        update: {},
+        create: { walletId: wallet.id, amount, idempotencyKey },
       });
+    } catch (error) {
+      // Two concurrent retries with the same key: the loser reads the winner
+      if (!isUniqueViolation(error)) {
+        throw error;
+      }
+      debin = await this.prisma.debinRequest.findUniqueOrThrow({ where });
+    }
 
-      const updatedWallet = await prisma.wallet.update({
-        where: { id: wallet.id },
-        data: {
-          balance: {
-            increment: amount,
-          },
-        },
-        include: {
-          allTransactions: {
-            orderBy: { createdAt: 'desc' },
-            take: 1,
-          },
-        },
-      });
+    if (debin.amount !== amount) {
+      throw new ConflictException(
+        'Idempotency key was already used with a different amount.',
+      );
+    }
+    return toDebinRequestView(debin);
+  }
 
-      return {
-        success: true,
-        balance: updatedWallet.balance,
-        transaction: transaction,
-      };
+  async getDebinRequest(
+    userId: string,
+    debinRequestId: string,
+    walletId?: string,
+  ): Promise<DebinRequestView> {
+    const wallet = await this.getWalletForUser(userId, walletId);
+    const debin = await this.prisma.debinRequest.findUnique({
+      where: { id: debinRequestId },
     });
-
-    return result;
+    if (!debin || debin.walletId !== wallet.id) {
+      throw new NotFoundException('DEBIN request not found');
+    }
+    return toDebinRequestView(debin);
   }
 
-  async addMoneyDirect(userId: string, data: { amount: number; description: string; source: string }) {
+  async addMoneyDirect(
+    userId: string,
+    data: { amount: bigint; description: string; source: string },
+  ) {
     const wallet = await this.getWalletByUserId(userId);
+    const result = await this.depositFromSystem(
+      wallet.id,
+      data.amount,
+      data.description,
+    );
+    this.prisma.markWrite(userId);
+    return result;
+  }
 
-    // Usar una transacción de base de datos para asegurar consistencia
-    const result = await this.prisma.$transaction(async (prisma) => {
-      // Primero creamos o buscamos un usuario del sistema
-      const systemUser = await prisma.user.upsert({
-        where: { email: 'system@walle.internal' },
-        update: {},
-        create: {
-          email: 'system@walle.internal',
-          alias: 'SYSTEM',
-          password: 'N/A', // Sistema no necesita password real
-        },
-      });
-
-      // Luego creamos o buscamos una wallet del sistema
-      const systemWallet =
-        (await prisma.wallet.findFirst({
-          where: { userId: systemUser.id },
-        })) ||
-        (await prisma.wallet.create({
-          data: {
-            userId: systemUser.id,
-            balance: 0,
-          },
-        }));
-
-      // Crear la transacción
-      const transaction = await prisma.transaction.create({
-        data: {
-          amount: data.amount,
-          type: 'IN',
-          description: data.description,
-          effectedWallet: {
-            connect: { id: wallet.id },
-          },
-          senderWallet: {
-            connect: { id: systemWallet.id },
-          },
-          receiverWallet: {
-            connect: { id: wallet.id },
-          },
-        },
-      });
-
-      // Actualizar el balance de la wallet
-      const updatedWallet = await prisma.wallet.update({
-        where: { id: wallet.id },
-        data: {
-          balance: {
-            increment: data.amount,
-          },
-        },
-        include: {
-          allTransactions: {
-            orderBy: { createdAt: 'desc' },
-            take: 1,
-          },
-        },
+  private async findWalletForUser(
+    db: PrismaClient,
+    userId: string,
+    walletId?: string,
+  ): Promise<Wallet> {
+    if (walletId) {
+      const wallet = await db.wallet.findUnique({
+        where: { id: walletId },
       });
+      if (wallet && wallet.userId === userId) {
+        return wallet;
+      }
+    }
+    const wallet = await db.wallet.findUnique({ where: { userId } });
+    if (!wallet) {
+      throw new NotFoundException(`Wallet for user ID ${userId} not found.`);
+    }
+    return wallet;
+  }
 
-      return {
-        success: true,
-        balance: updatedWallet.balance,
-        transaction: transaction,
-      };
+  // Replica when it lags less than the balance staleness bound and the user
+  // has not just written, so balances never go backwards for their owner
+  private balanceReader(userId: string): PrismaClient {
+    return this.prisma.reader({
+      userId,
+      maxLagMs: this.prisma.balanceMaxLagMs,
     });
+  }
 
-    return result;
+  // La wallet del sistema se resuelve una vez y queda cacheada; solo es la
+  // contraparte del movimiento, su balance no se escribe. Los créditos a una
+  // misma wallet se encolan y se aplican en lote (WalletCommandQueue).
+  private async depositFromSystem(
+    walletId: string,
+    amount: bigint,
+    description: string,
+  ) {
+    const { transaction, balance } =
+      await this.systemAccountsService.withSystemWallet((systemWalletId) =>
+        this.walletCommands.credit(walletId, {
+          amount,
+          description,
+          senderWalletId: systemWalletId,
+        }),
+      );
+    return { success: true, balance, transaction };
   }
-}
\ No newline at end of file
+}
+
+function toDebinRequestView(debin: DebinRequest): DebinRequestView {
+  return {
+    id: debin.id,
+    status: debin.status,
+    amount: debin.amount,
+    debinId: debin.debinId,
+    transactionId: debin.transactionId,
+    createdAt: debin.createdAt,
+  };
+}
+
+function isUniqueViolation(error: unknown): boolean {
+  return (
+    error instanceof Prisma.PrismaClientKnownRequestError &&
+    error.code === 'P2002'
+  );
+}
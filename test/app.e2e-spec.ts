@@ -22,4 +22,18 @@ describe('AppController (e2e)', () => {
       .expect(200)
       .expect('Hello World!');
   });
+
+  it('/metrics (GET) exposes latency histograms per route', async () => {
+    await request(app.getHttpServer()).get('/').expect(200);
+
+    const response = await request(app.getHttpServer())
+      .get('/metrics')
+      .expect(200)
+      .expect('Content-Type', /text\/plain/);
+
+    expect(response.text).toContain(
+      'http_request_duration_seconds_count{method="GET",route="/",status="200"} 1',
+    );
+    expect(response.text).toContain('prisma_client_queries_wait');
+  });
 });
@@ -8,12 +8,14 @@ import { TransactionType } from '../generated/prisma';
 import * as cookieParser from 'cookie-parser';
 import { ValidationPipe } from '@nestjs/common';
 import { ExternalBankService } from '../src/external-bank/external-bank.service';
+import { DebinOutboxWorker } from '../src/wallet/debin-outbox.worker';
 
 describe('External Bank Integration (e2e)', () => {
   let app: INestApplication;
   let prisma: PrismaService;
   let authService: AuthService;
   let externalBankService: ExternalBankService;
+  let debinWorker: DebinOutboxWorker;
   let userCookie: string;
   let testUserId: string;
   let testWalletId: string;
@@ -39,6 +41,7 @@ describe('External Bank Integration (e2e)', () => {
     authService = moduleFixture.get<AuthService>(AuthService);
     externalBankService =
       moduleFixture.get<ExternalBankService>(ExternalBankService);
+    debinWorker = moduleFixture.get<DebinOutboxWorker>(DebinOutboxWorker);
 
     // Mock the external bank service HTTP calls since eva-bank doesn't have the required endpoints
     jest.spyOn(externalBankService, 'Transfer').mockImplementation((data) => {
@@ -48,13 +51,18 @@ describe('External Bank Integration (e2e)', () => {
       });
     });
 
+    // Like the real bank, a repeated idempotency key gets the original debit
+    const debinsByKey = new Map<string, string>();
     jest
       .spyOn(externalBankService, 'ExecuteDebin')
       .mockImplementation((data) => {
-        return Promise.resolve({
-          approved: true,
-          debinId: `DB${Math.floor(Math.random() * 10000)}`,
-        });
+        const debinId =
+          (data.idempotencyKey && debinsByKey.get(data.idempotencyKey)) ||
+          `DB${Math.floor(Math.random() * 10000)}`;
+        if (data.idempotencyKey) {
+          debinsByKey.set(data.idempotencyKey, debinId);
+        }
+        return Promise.resolve({ approved: true, debinId });
       });
 
     await app.init();
@@ -87,7 +95,7 @@ describe('External Bank Integration (e2e)', () => {
     const testWallet = await prisma.wallet.create({
       data: {
         userId: testUserId,
-        balance: 5000, // Start with enough balance for tests
+        balance: 500000n, // 5000.00 in minor units
       },
     });
     testWalletId = testWallet.id;
@@ -191,23 +199,36 @@ describe('External Bank Integration (e2e)', () => {
         .post('/wallet/topup/debin')
         .set('Cookie', userCookie)
         .send(debinData)
-        .expect(201);
+        .expect(202);
 
       expect(response.body).toMatchObject({
-        success: true,
+        status: 'PENDING',
+        amount: 200,
+      });
+
+      // Settlement happens in the outbox worker
+      await debinWorker.drain();
+
+      const status = await request(app.getHttpServer())
+        .get(`/wallet/topup/debin/${response.body.id}`)
+        .set('Cookie', userCookie)
+        .expect(200);
+      expect(status.body).toMatchObject({
+        status: 'SETTLED',
+        debinId: expect.stringMatching(/^DB\d+$/),
       });
 
       // Verify wallet balance was updated (money added)
       const updatedWallet = await prisma.wallet.findUnique({
         where: { id: testWalletId },
       });
-      expect(updatedWallet?.balance).toBe(5200); // 5000 + 200
+      expect(updatedWallet?.balance).toBe(520000n); // 5000 + 200
 
       // Verify transaction record was created
       const transaction = await prisma.transaction.findFirst({
         where: {
           effectedWalletId: testWalletId,
-          amount: 200,
+          amount: 20000n,
           type: TransactionType.IN, // DEBIN creates IN transactions
         },
       });
@@ -238,18 +259,19 @@ describe('External Bank Integration (e2e)', () => {
           .post('/wallet/topup/debin')
           .set('Cookie', userCookie)
           .send(debinData)
-          .expect(201);
+          .expect(202);
 
-        expect(response.body.success).toBe(true);
+        expect(response.body.status).toBe('PENDING');
       }
+      await debinWorker.drain();
 
       // Verify total balance increase
       const finalWallet = await prisma.wallet.findUnique({
         where: { id: testWalletId },
       });
-      const expectedIncrease = 50 + 75 + 25; // 150
+      const expectedIncrease = 15000n; // 50 + 75 + 25, in minor units
       expect(finalWallet?.balance).toBe(
-        (initialBalance?.balance || 0) + expectedIncrease,
+        (initialBalance?.balance || 0n) + expectedIncrease,
       );
 
       // Verify all transactions were recorded
@@ -263,6 +285,35 @@ describe('External Bank Integration (e2e)', () => {
     });
   });
 
+  describe('DEBIN idempotency', () => {
+    it('should credit a retried DEBIN request only once', async () => {
+      const before = await prisma.wallet.findUnique({
+        where: { id: testWalletId },
+      });
+
+      const send = () =>
+        request(app.getHttpServer())
+          .post('/wallet/topup/debin')
+          .set('Cookie', userCookie)
+          .set('Idempotency-Key', 'debin-retry-key')
+          .send({ amount: 40 })
+          .expect(202);
+
+      const first = await send();
+      const retry = await send();
+      expect(retry.body.id).toBe(first.body.id);
+
+      await debinWorker.drain();
+      await send();
+      await debinWorker.drain();
+
+      const after = await prisma.wallet.findUnique({
+        where: { id: testWalletId },
+      });
+      expect(after?.balance).toBe((before?.balance || 0n) + 4000n);
+    });
+  });
+
   describe('External Bank Service Health Check', () => {
     it('should verify eva-bank service is reachable', async () => {
       // Test the external service directly through HTTP
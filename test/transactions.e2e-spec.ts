@@ -110,14 +110,43 @@ describe('TransactionsController (e2e)', () => {
   });
 
   describe('/transactions (GET)', () => {
-    it('should return all transactions', () => {
+    it('should return a page of the caller wallet history', () => {
       return request(app.getHttpServer())
         .get('/transactions')
+        .set('Cookie', authCookie)
         .expect(200)
         .expect((res) => {
-          expect(Array.isArray(res.body)).toBe(true);
+          expect(Array.isArray(res.body.items)).toBe(true);
+          expect(res.body.items[0].effectedWalletId).toBe(testWalletId);
+          expect(res.body.nextCursor).toBeNull();
         });
     });
+
+    it('should follow nextCursor to the following page', async () => {
+      await request(app.getHttpServer())
+        .post('/transactions')
+        .send({ amount: 10, type: 'IN', walletId: testWalletId })
+        .expect(201);
+
+      const first = await request(app.getHttpServer())
+        .get('/transactions?limit=1')
+        .set('Cookie', authCookie)
+        .expect(200);
+      expect(first.body.items).toHaveLength(1);
+      expect(first.body.nextCursor).toEqual(expect.any(String));
+
+      const second = await request(app.getHttpServer())
+        .get(`/transactions?limit=1&cursor=${first.body.nextCursor}`)
+        .set('Cookie', authCookie)
+        .expect(200);
+      expect(second.body.items).toHaveLength(1);
+      expect(second.body.items[0].id).not.toBe(first.body.items[0].id);
+      expect(second.body.nextCursor).toBeNull();
+    });
+
+    it('should return 401 without auth cookie', () => {
+      return request(app.getHttpServer()).get('/transactions').expect(401);
+    });
   });
 
   describe('/transactions/:id (GET)', () => {
@@ -221,7 +250,7 @@ describe('TransactionsController (e2e)', () => {
       if (testWalletId) {
         await prisma.wallet.update({
           where: { id: testWalletId },
-          data: { balance: 1000.0 }, // Add sufficient balance for transfers
+          data: { balance: 100000n }, // 1000.00 in minor units
         });
       }
     });
@@ -257,6 +286,40 @@ describe('TransactionsController (e2e)', () => {
         .expect(401);
     });
 
+    it('should pay several recipients in one batch', async () => {
+      const res = await request(app.getHttpServer())
+        .post('/transactions/p2p/batch')
+        .set('Cookie', authCookie)
+        .send({
+          transfers: [
+            { recipientIdentifier: recipientEmail, amount: 10.25 },
+            { recipientIdentifier: 'nobody@example.com', amount: 5 },
+            { recipientIdentifier: recipientEmail, amount: 4.75 },
+          ],
+        })
+        .expect(201);
+
+      expect(res.body).toMatchObject({
+        succeeded: 2,
+        failed: 1,
+        totalDebited: 15,
+      });
+      expect(res.body.results.map((r) => r.status)).toEqual([
+        'SUCCESS',
+        'FAILED',
+        'SUCCESS',
+      ]);
+
+      const sender = await prisma.wallet.findUnique({
+        where: { id: testWalletId },
+      });
+      expect(sender?.balance).toBe(98500n); // 1000.00 - 15.00
+      const recipient = await prisma.wallet.findUnique({
+        where: { userId: recipientUserId },
+      });
+      expect(recipient?.balance).toBe(1500n);
+    });
+
     it('should return 400 for invalid P2P transfer data', () => {
       const invalidP2pTransfer = {
         recipientIdentifier: '',
@@ -0,0 +1,290 @@
+"""
+Wall-E Breaking Point Finder
+Climbs the stress test load in steps, holds each step until latency settles
+and stops once BREAKING_POINT_INDICATORS trip, in a single unattended run
+"""
+
+import os
+import psutil
+from datetime import datetime, timezone
+from locust import LoadTestShape, events
+from locust.runners import WorkerRunner
+from locust.stats import calculate_response_time_percentile, diff_response_time_dicts
+from slo import check_thresholds, write_result
+from stress_test import (
+    BREAKING_POINT_INDICATORS,
+    StressTestUser,
+    StressTestDebinUser,
+    DatabaseStressUser,
+)
+
+# Step configuration
+STEP_CONFIG = {
+    'start_users': int(os.getenv('STEP_START_USERS', '50')),
+    'step_users': int(os.getenv('STEP_USERS', '50')),
+    'max_users': int(os.getenv('STEP_MAX_USERS', '2000')),
+    'spawn_rate': float(os.getenv('STEP_SPAWN_RATE', '50')),
+    # Every step is held at least min_hold and at most max_hold seconds
+    'min_hold': int(os.getenv('STEP_MIN_HOLD_S', '60')),
+    'max_hold': int(os.getenv('STEP_MAX_HOLD_S', '300')),
+    # Latency is stable once the p95 of the last `stable_windows` windows
+    # of `window` seconds stays within `tolerance` of their mean
+    'window': int(os.getenv('STEP_WINDOW_S', '15')),
+    'stable_windows': int(os.getenv('STEP_STABLE_WINDOWS', '3')),
+    'tolerance': float(os.getenv('STEP_STABILITY_TOLERANCE', '0.10')),
+    # Steps to keep climbing after the first breach, to see which other
+    # indicators trip next (0 stops right at the breaking point)
+    'overshoot_steps': int(os.getenv('STEP_OVERSHOOT', '1')),
+}
+
+# Host resource indicators, checked against CPU and memory sampled on the
+# machine running the Locust master (or standalone Locust). They describe
+# the system under test only when the API runs on that machine too, as with
+# docker-compose.load-test.yml.
+RESOURCE_CHECKS = [
+    ('max_cpu_threshold', 'cpu_percent', 'CPU usage'),
+    ('max_memory_threshold', 'memory_percent', 'Memory usage'),
+]
+
+
+def resource_breaches(usage, thresholds):
+    """Breached host resource thresholds for one step"""
+    breaches = []
+    for key, field, description in RESOURCE_CHECKS:
+        limit = thresholds.get(key)
+        if limit is not None and usage[field] > limit:
+            breaches.append({
+                'endpoint': 'Host',
+                'threshold': key,
+                'limit': limit,
+                'value': usage[field],
+                'message': f"{description} {usage[field]:.0f}% exceeds {limit}%",
+            })
+    return breaches
+
+
+class StatsSnapshot:
+    """Cumulative aggregate stats at one moment; two of them give a window"""
+
+    def __init__(self, entry, at):
+        self.at = at
+        self.num_requests = entry.num_requests
+        self.num_failures = entry.num_failures
+        self.total_response_time = entry.total_response_time
+        self.response_times = dict(entry.response_times)
+
+    def since(self, earlier):
+        """Summary of the requests between `earlier` and this snapshot"""
+        requests = self.num_requests - earlier.num_requests
+        failures = self.num_failures - earlier.num_failures
+        response_times = diff_response_time_dicts(self.response_times, earlier.response_times)
+        seconds = max(self.at - earlier.at, 0.001)
+
+        def percentile(percent):
+            return calculate_response_time_percentile(response_times, requests, percent)
+
+        return {
+            'requests': requests,
+            'failures': failures,
+            'failure_rate': failures / max(requests, 1),
+            'rps': requests / seconds,
+            'avg_ms': (self.total_response_time - earlier.total_response_time) / max(requests, 1),
+            'p50_ms': percentile(0.50),
+            'p95_ms': percentile(0.95),
+            'p99_ms': percentile(0.99),
+        }
+
+
+class StepLoadShape(LoadTestShape):
+    """Step load that finds the highest user count the system sustains.
+
+    Each step starts `step_users` more users, then holds until the p95 of
+    consecutive windows settles (or max_hold passes) and evaluates
+    BREAKING_POINT_INDICATORS over the hold. The last step without breaches
+    is the sustainable capacity.
+    """
+
+    # The step verdicts decide the exit code, not the whole-run SLO gate:
+    # this run overloads the system on purpose
+    reports_own_verdict = True
+
+    def __init__(self):
+        super().__init__()
+        self.config = STEP_CONFIG
+        self.target_users = self.config['start_users']
+        self.steps = []
+        self.first_tripped = {}
+        self.steps_after_breach = None
+        self.spawning = False
+        self.hold_start = None
+        self.window_start = None
+        self.window_p95 = []
+        self.memory_peak = 0.0
+        self.finished = False
+
+    def tick(self):
+        if self.finished:
+            return None
+
+        # Locust spawns a new target before calling tick() again, so the
+        # hold starts on the first tick after the step's users are all up
+        if self.hold_start is None:
+            if self.spawning:
+                self.spawning = False
+                self.start_hold()
+            else:
+                self.spawning = True
+            return self.target_users, self.config['spawn_rate']
+
+        now = self.get_run_time()
+        if now - self.window_start.at >= self.config['window']:
+            window = self.snapshot().since(self.window_start)
+            self.window_p95.append(window['p95_ms'])
+            self.window_start = self.snapshot()
+        self.memory_peak = max(self.memory_peak, psutil.virtual_memory().percent)
+
+        held = now - self.hold_start.at
+        stable = self.is_stable()
+        if held < self.config['min_hold'] or (not stable and held < self.config['max_hold']):
+            return self.target_users, self.config['spawn_rate']
+
+        self.finish_step(stable)
+        if self.should_stop():
+            self.finish()
+            return None
+
+        self.target_users = min(
+            self.target_users + self.config['step_users'], self.config['max_users']
+        )
+        self.hold_start = None
+        return self.target_users, self.config['spawn_rate']
+
+    def snapshot(self):
+        return StatsSnapshot(self.runner.environment.stats.total, self.get_run_time())
+
+    def start_hold(self):
+        self.hold_start = self.snapshot()
+        self.window_start = self.hold_start
+        self.window_p95 = []
+        # The next cpu_percent() call averages CPU over the whole hold
+        psutil.cpu_percent()
+        self.memory_peak = psutil.virtual_memory().percent
+
+    def is_stable(self):
+        recent = self.window_p95[-self.config['stable_windows']:]
+        if len(recent) < self.config['stable_windows']:
+            return False
+        mean = sum(recent) / len(recent)
+        if mean == 0:
+            return True
+        return (max(recent) - min(recent)) / mean <= self.config['tolerance']
+
+    def finish_step(self, stable):
+        summary = self.snapshot().since(self.hold_start)
+        # Average CPU and peak memory over the hold
+        usage = {
+            'cpu_percent': psutil.cpu_percent(),
+            'memory_percent': max(self.memory_peak, psutil.virtual_memory().percent),
+        }
+        breaches = check_thresholds(
+            {**summary, 'method': '', 'name': 'Aggregated'},
+            BREAKING_POINT_INDICATORS,
+            aggregate=True,
+        ) + resource_breaches(usage, BREAKING_POINT_INDICATORS)
+        step = {
+            'step': len(self.steps) + 1,
+            'users': self.target_users,
+            'held_s': round(self.get_run_time() - self.hold_start.at, 1),
+            'stable': stable,
+            **summary,
+            **usage,
+            'breaches': [breach['threshold'] for breach in breaches],
+        }
+        self.steps.append(step)
+
+        for breach in breaches:
+            self.first_tripped.setdefault(breach['threshold'], {
+                'step': step['step'],
+                'users': step['users'],
+                'value': breach['value'],
+                'limit': breach['limit'],
+            })
+
+        verdict = 'BREACH ' + ', '.join(step['breaches']) if breaches else 'ok'
+        print(f"Step {step['step']}: {step['users']} users, {step['rps']:.1f} RPS, "
+              f"p95 {step['p95_ms']:.0f}ms, p99 {step['p99_ms']:.0f}ms, "
+              f"failures {step['failure_rate']:.2%}, "
+              f"CPU {step['cpu_percent']:.0f}%, memory {step['memory_percent']:.0f}%"
+              f"{'' if stable else ' (latency never settled)'} -> {verdict}")
+
+        if breaches and self.steps_after_breach is None:
+            self.steps_after_breach = 0
+        elif self.steps_after_breach is not None:
+            self.steps_after_breach += 1
+
+    def should_stop(self):
+        if self.target_users >= self.config['max_users']:
+            return True
+        return (self.steps_after_breach is not None
+                and self.steps_after_breach >= self.config['overshoot_steps'])
+
+    def result(self):
+        # Capacity is the last step before the first breach
+        first_breach = next((step for step in self.steps if step['breaches']), None)
+        clean = self.steps[:first_breach['step'] - 1] if first_breach else self.steps
+        best = clean[-1] if clean else None
+        return {
+            'test': 'Breaking point',
+            'finishedAt': datetime.now(timezone.utc).isoformat(),
+            'config': self.config,
+            'indicators': BREAKING_POINT_INDICATORS,
+            'breaking_point_reached': first_breach is not None,
+            'breaking_step': first_breach['step'] if first_breach else None,
+            'max_sustainable_users': best['users'] if best else 0,
+            'max_sustainable_rps': best['rps'] if best else 0,
+            'first_tripped': self.first_tripped,
+            'steps': self.steps,
+        }
+
+    def finish(self):
+        self.finished = True
+        result = self.result()
+        path = result_path(self.runner.environment)
+        if path:
+            write_result(path, result)
+            print(f"Breaking point result written to {path}")
+
+        print("=== Breaking Point Report ===")
+        if result['breaking_point_reached']:
+            print(f"Breaking point at step {result['breaking_step']}")
+        else:
+            print(f"No breaking point up to {self.target_users} users")
+        print(f"Max sustainable users: {result['max_sustainable_users']}")
+        print(f"Max sustainable RPS: {result['max_sustainable_rps']:.1f}")
+        for indicator, tripped in self.first_tripped.items():
+            print(f"  {indicator} first tripped at step {tripped['step']} "
+                  f"({tripped['users']} users): {tripped['value']:.2f} vs {tripped['limit']}")
+
+
+def result_path(environment):
+    """BREAKING_POINT_RESULT_FILE, else <csv prefix>_breaking_point.json"""
+    path = os.getenv('BREAKING_POINT_RESULT_FILE')
+    if path:
+        return path
+    csv_prefix = getattr(environment.parsed_options, 'csv_prefix', None)
+    if csv_prefix:
+        return f"{csv_prefix}_breaking_point.json"
+    return None
+
+
+@events.quitting.add_listener
+def on_quitting(environment, **kwargs):
+    """Report even when the run is cut short, and set the exit code"""
+    shape = environment.shape_class
+    if isinstance(environment.runner, WorkerRunner) or not isinstance(shape, StepLoadShape):
+        return
+    if not shape.finished:
+        shape.finish()
+    # Finding the breaking point is the purpose of the run; only a run that
+    # never completed a step failed
+    environment.process_exit_code = 0 if shape.steps else 1
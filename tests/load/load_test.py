@@ -6,6 +6,7 @@ Simulates normal usage patterns (50-200 concurrent users)
 import os
 from locust import HttpUser, task, between
 from locustfile import WalletUser, NewUserJourney, ExistingUserJourney, FrequentUserJourney
+from slo import register_slo_gate
 
 # Load test configuration
 LOAD_TEST_CONFIG = {
@@ -34,33 +35,17 @@ class LoadTestFrequentUser(WalletUser):
     wait_time = between(1, 3)
 
 # Performance thresholds for load testing
+# Latency limits apply to the aggregate and to every endpoint
 PERFORMANCE_THRESHOLDS = {
-    'max_avg_response_time': 500,  # 500ms max average response time
-    'max_95th_percentile': 1000,   # 1s max 95th percentile
-    'max_failure_rate': 0.01,      # 1% max failure rate
-    'min_requests_per_second': 50  # Minimum 50 RPS
+    'max_avg_response_time': float(os.getenv('MAX_AVG_RESPONSE_TIME', '500')),  # 500ms max average response time
+    'max_95th_percentile': float(os.getenv('MAX_95TH_PERCENTILE', '1000')),     # 1s max 95th percentile
+    'max_99th_percentile': float(os.getenv('MAX_99TH_PERCENTILE', '2000')),     # 2s max 99th percentile
+    'max_failure_rate': float(os.getenv('MAX_FAILURE_RATE', '0.01')),           # 1% max failure rate
+    'min_requests_per_second': float(os.getenv('MIN_REQUESTS_PER_SECOND', '50'))  # Minimum 50 RPS over the whole run
 }
 
-def validate_performance_thresholds(environment):
-    """Validate that performance meets load test requirements"""
-    stats = environment.stats
-    
-    failures = []
-    
-    # Check average response time
-    if stats.total.avg_response_time > PERFORMANCE_THRESHOLDS['max_avg_response_time']:
-        failures.append(f"Average response time {stats.total.avg_response_time:.2f}ms exceeds threshold {PERFORMANCE_THRESHOLDS['max_avg_response_time']}ms")
-    
-    # Check failure rate
-    failure_rate = stats.total.num_failures / max(stats.total.num_requests, 1)
-    if failure_rate > PERFORMANCE_THRESHOLDS['max_failure_rate']:
-        failures.append(f"Failure rate {failure_rate:.2%} exceeds threshold {PERFORMANCE_THRESHOLDS['max_failure_rate']:.2%}")
-    
-    # Check requests per second
-    if stats.total.current_rps < PERFORMANCE_THRESHOLDS['min_requests_per_second']:
-        failures.append(f"Requests per second {stats.total.current_rps:.2f} below threshold {PERFORMANCE_THRESHOLDS['min_requests_per_second']}")
-    
-    return failures
+# Fail the run (nonzero exit, <csv prefix>_slo.json) when a threshold is breached
+register_slo_gate(PERFORMANCE_THRESHOLDS, 'Load test')
 
 if __name__ == "__main__":
     print("=== Wall-E Load Test Configuration ===")
@@ -6,6 +6,7 @@ Main configuration file for performance testing
 import os
 import json
 import random
+import uuid
 import requests
 from faker import Faker
 from locust import HttpUser, TaskSet, task, between, events
@@ -18,6 +19,9 @@ load_dotenv()
 # Configuration
 fake = Faker()
 
+# Pool of pre-seeded users written by scripts/seed_users.py
+USER_POOL_FILE = os.getenv('LOAD_TEST_POOL_FILE', 'user_pool.json')
+
 # Constant user for external bank transfers
 CONSTANT_BANK_USER = {
     "email": "bank_transfer_user@loadtest.com", 
@@ -50,6 +54,55 @@ def create_constant_bank_user():
         print(f"❌ Error creating constant bank user: {e}")
         return False
 
+class UserPool:
+    """Pre-seeded users with ready access tokens, shared by all Locust users.
+
+    Each virtual user claims its own seeded account and picks transfer
+    recipients among the others, so a run measures wallet paths instead of
+    signups. With several workers (LOAD_TEST_WORKERS), worker N only claims
+    every Nth account so workers don't share senders. Once every account is
+    claimed, further users reuse them from the start.
+    """
+
+    def __init__(self, path):
+        self.users = []
+        self.balance_cents = 0
+        self.next_index = 0
+        if os.path.exists(path):
+            with open(path) as pool_file:
+                pool = json.load(pool_file)
+            self.users = pool.get('users', [])
+            self.balance_cents = pool.get('balance', 0)
+        self.claimable = self.users
+
+    @property
+    def available(self):
+        return len(self.users) > 0
+
+    def partition(self, worker_index, worker_count):
+        """Restrict claims to this worker's share of the pool"""
+        if worker_count > 1:
+            self.claimable = self.users[worker_index::worker_count] or self.users
+
+    def claim(self):
+        """Hand out the next account, round-robin, with its seeded balance"""
+        user = self.claimable[self.next_index % len(self.claimable)]
+        self.next_index += 1
+        return {**user, 'balance': user.get('balance', self.balance_cents)}
+
+    def recipient_for(self, email):
+        """Any other seeded account, from the whole pool"""
+        if len(self.users) < 2:
+            return None
+        while True:
+            recipient = random.choice(self.users)
+            if recipient['email'] != email:
+                return recipient
+
+
+user_pool = UserPool(USER_POOL_FILE)
+
+
 class WalletUser(HttpUser):
     """Base user class for Wall-E wallet testing"""
     
@@ -64,13 +117,26 @@ class WalletUser(HttpUser):
         self.wallet_balance = 0
         self.user_email = None
         self.user_alias = None
+        self.wallet_id = None
     
     def on_start(self):
         """Setup method called when user starts"""
+        if user_pool.available:
+            self.claim_pooled_user()
+            return
         self.register_user()
         if self.auth_token:
             self.login_user()
     
+    def claim_pooled_user(self):
+        """Take a seeded account: no register/login round trips"""
+        pooled = user_pool.claim()
+        self.user_email = pooled['email']
+        self.user_alias = pooled['alias']
+        self.wallet_id = pooled['walletId']
+        self.auth_token = pooled['token']
+        self.wallet_balance = pooled['balance'] / 100
+    
     def register_user(self):
         """Register a new user"""
         self.user_email = fake.email()
@@ -130,6 +196,28 @@ class WalletUser(HttpUser):
                 response.failure(f"Get balance failed: {response.text}")
                 return 0
 
+    def add_money_to_wallet(self, amount):
+        """Manual top-up through the API"""
+        with self.client.post("/wallet/topup/manual",
+            json={"amount": amount, "method": "BANK_ACCOUNT", "sourceIdentifier": "locust"},
+            headers=self.get_headers(),
+            cookies=self.get_cookies(),
+            catch_response=True
+        ) as response:
+            if response.status_code == 201:
+                self.wallet_balance += amount
+                response.success()
+            else:
+                response.failure(f"Manual top-up failed: {response.text}")
+
+    def pick_recipient(self):
+        """Recipient identifier for P2P transfers: a seeded user when available"""
+        if user_pool.available:
+            recipient = user_pool.recipient_for(self.user_email)
+            if recipient:
+                return recipient['alias']
+        return self.create_recipient_user()
+
     def create_recipient_user(self):
         """Create a recipient user for P2P transfers"""
         recipient_email = fake.email()
@@ -230,12 +318,12 @@ class FrequentUserJourney(TaskSet):
         
         with self.client.post("/wallet/topup/debin",
             json={"amount": amount},
-            headers=self.user.get_headers(),
+            headers={**self.user.get_headers(), 'Idempotency-Key': str(uuid.uuid4())},
             cookies=self.user.get_cookies(),
             catch_response=True
         ) as response:
-            if response.status_code == 201:
-                # Get updated balance after successful DEBIN
+            if response.status_code == 202:
+                # DEBIN is accepted and settled asynchronously
                 self.user.get_balance()
                 response.success()
             else:
@@ -255,12 +343,12 @@ class DebinMassiveLoad(TaskSet):
         
         with self.client.post("/wallet/topup/debin",
             json={"amount": amount},
-            headers=self.user.get_headers(),
+            headers={**self.user.get_headers(), 'Idempotency-Key': str(uuid.uuid4())},
             cookies=self.user.get_cookies(),
             catch_response=True
         ) as response:
-            if response.status_code == 201:
-                # Get updated balance after successful DEBIN
+            if response.status_code == 202:
+                # DEBIN is accepted and settled asynchronously
                 self.user.get_balance()
                 response.success()
             else:
@@ -318,6 +406,14 @@ class ExternalBankUser(WalletUser):
     wait_time = between(2, 5)  # Slower pace for external operations
 
 
+# Event handlers
+@events.init.add_listener
+def on_locust_init(environment, **kwargs):
+    """Split the user pool between workers in distributed runs"""
+    worker_index = getattr(environment.runner, 'worker_index', 0) or 0
+    user_pool.partition(worker_index, int(os.getenv('LOAD_TEST_WORKERS', '1')))
+
+
 # Event handlers for custom metrics
 @events.request.add_listener
 def on_request(request_type, name, response_time, response_length, exception, context, **kwargs):
@@ -333,6 +429,11 @@ def on_test_start(environment, **kwargs):
     print(f"Host: {environment.host}")
     print(f"Users: {getattr(environment, 'user_count', 'N/A')}")
     
+    if user_pool.available:
+        print(f"👥 Using {len(user_pool.users)} pre-seeded users from {USER_POOL_FILE}")
+    else:
+        print("👥 No user pool found, users will register and log in")
+    
     # Create constant bank user for external transfers
     print("🏦 Setting up constant bank user...")
     create_constant_bank_user()
@@ -6,7 +6,11 @@ Cleans up test data generated during load testing
 
 import os
 import sys
+import time
+import threading
 import psycopg2
+import psycopg2.errors
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 import argparse
 from dotenv import load_dotenv
@@ -32,111 +36,302 @@ def connect_to_database():
         print(f"Error connecting to database: {e}")
         return None
 
-def cleanup_test_users(conn, hours_ago=1):
-    """Clean up test users created during load testing"""
+# Which users count as test data. LIKE '%...%' cannot use an index, so the
+# users table is scanned once, by a server-side cursor, instead of per chunk.
+TEST_USER_FILTER = """
+    (
+        u.email LIKE '%%@example.%%'
+        OR u.email LIKE '%%test%%'
+        OR u.email LIKE '%%faker%%'
+        OR u.email LIKE '%%locust%%'
+        OR u."createdAt" > %s
+    )
+    AND u.email <> 'system@walle.internal'
+"""
+
+# Deleting a wallet makes Postgres look for transactions that still point
+# at it through each foreign key. Only effectedWalletId is indexed, so
+# without these every deleted wallet costs two scans of "Transaction".
+CLEANUP_INDEXES = {
+    'load_test_cleanup_sender_idx': 'senderWalletId',
+    'load_test_cleanup_receiver_idx': 'receiverWalletId',
+}
+
+MAX_CHUNK_ATTEMPTS = 3
+
+
+class CleanupProgress:
+    """Thread-safe running totals with periodic throughput reports"""
+
+    def __init__(self, report_every=10):
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.report_every = report_every
+        self.chunks = 0
+        self.users = 0
+        self.wallets = 0
+        self.transactions = 0
+
+    def add(self, users, wallets, transactions):
+        with self.lock:
+            self.chunks += 1
+            self.users += users
+            self.wallets += wallets
+            self.transactions += transactions
+            if self.chunks % self.report_every == 0:
+                self.report()
+
+    def report(self):
+        elapsed = max(time.monotonic() - self.started, 0.001)
+        rows = self.users + self.wallets + self.transactions
+        print(f"  {self.chunks} chunks: {self.users} users, "
+              f"{self.transactions} transactions deleted "
+              f"({self.users / elapsed:.0f} users/s, {rows / elapsed:.0f} rows/s)")
+
+
+def ensure_cleanup_indexes(conn):
+    """Index the wallet foreign keys of "Transaction" without blocking writes"""
+    previous = conn.autocommit
+    conn.autocommit = True  # CREATE INDEX CONCURRENTLY can't run in a transaction
     cursor = conn.cursor()
-    
+    try:
+        for name, column in CLEANUP_INDEXES.items():
+            print(f"Ensuring index {name}...")
+            cursor.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" '
+                f'ON "Transaction" ("{column}")'
+            )
+    finally:
+        cursor.close()
+        conn.autocommit = previous
+
+
+def drop_cleanup_indexes(conn):
+    """Drop the helper indexes so they don't slow down inserts afterwards"""
+    previous = conn.autocommit
+    conn.autocommit = True
+    cursor = conn.cursor()
+    try:
+        for name in CLEANUP_INDEXES:
+            cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+    finally:
+        cursor.close()
+        conn.autocommit = previous
+
+
+def delete_user_chunk(conn, user_ids, wallet_ids):
+    """Delete one chunk of users with their wallets and transactions.
+
+    Commits on its own, so locks and WAL stay bounded by the chunk size.
+    Debin requests and balance checkpoints go with their wallet (CASCADE).
+    Two workers can reach the same transfer from both ends and deadlock;
+    the loser is rolled back and retried.
+    """
+    for attempt in range(1, MAX_CHUNK_ATTEMPTS + 1):
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                DELETE FROM "Transaction"
+                WHERE "effectedWalletId" = ANY(%s)
+                OR "senderWalletId" = ANY(%s)
+                OR "receiverWalletId" = ANY(%s)
+            """, (wallet_ids, wallet_ids, wallet_ids))
+            transactions_deleted = cursor.rowcount
+
+            cursor.execute('DELETE FROM "Wallet" WHERE id = ANY(%s)', (wallet_ids,))
+            wallets_deleted = cursor.rowcount
+
+            cursor.execute('DELETE FROM "User" WHERE id = ANY(%s)', (user_ids,))
+            users_deleted = cursor.rowcount
+
+            conn.commit()
+            return users_deleted, wallets_deleted, transactions_deleted
+
+        except (psycopg2.errors.DeadlockDetected,
+                psycopg2.errors.SerializationFailure):
+            conn.rollback()
+            if attempt == MAX_CHUNK_ATTEMPTS:
+                raise
+        except psycopg2.Error:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+
+def cleanup_test_users(conn, hours_ago=1, batch_size=1000, workers=1):
+    """Clean up test users created during load testing, in chunks.
+
+    A server-side cursor streams matching users in id order; each chunk of
+    `batch_size` users is deleted and committed by one of `workers`
+    threads, each on its own connection.
+    """
     # Calculate cutoff time
     cutoff_time = datetime.now() - timedelta(hours=hours_ago)
-    
+
+    progress = CleanupProgress()
+    local = threading.local()
+    connections = []
+    connections_lock = threading.Lock()
+    # Bounds how far the reader runs ahead of the workers
+    in_flight = threading.BoundedSemaphore(workers * 2)
+
+    def worker_connection():
+        if not hasattr(local, 'conn'):
+            local.conn = psycopg2.connect(**DATABASE_CONFIG)
+            with connections_lock:
+                connections.append(local.conn)
+        return local.conn
+
+    def run_chunk(user_ids, wallet_ids):
+        try:
+            progress.add(*delete_user_chunk(worker_connection(), user_ids, wallet_ids))
+        finally:
+            in_flight.release()
+
+    # Named cursor = server-side: rows arrive `itersize` at a time
+    reader = conn.cursor(name='cleanup_test_users')
+    reader.itersize = batch_size
+    failures = 0
+
     try:
-        # Get test users (emails with faker patterns or test patterns)
-        cursor.execute("""
-            SELECT id, email FROM "User" 
-            WHERE (
-                email LIKE '%@example.%' 
-                OR email LIKE '%test%'
-                OR email LIKE '%faker%'
-                OR email LIKE '%locust%'
-                OR "createdAt" > %s
-            )
+        reader.execute(f"""
+            SELECT u.id, w.id
+            FROM "User" u
+            LEFT JOIN "Wallet" w ON w."userId" = u.id
+            WHERE {TEST_USER_FILTER}
+            ORDER BY u.id
         """, (cutoff_time,))
-        
-        test_users = cursor.fetchall()
-        
-        if not test_users:
-            print("No test users found to clean up.")
-            return 0
-        
-        user_ids = [user[0] for user in test_users]
-        emails = [user[1] for user in test_users]
-        
-        print(f"Found {len(test_users)} test users to clean up:")
-        for email in emails[:10]:  # Show first 10
-            print(f"  - {email}")
-        if len(emails) > 10:
-            print(f"  ... and {len(emails) - 10} more")
-        
-        # Delete transactions first (due to foreign key constraints)
-        cursor.execute("""
-            DELETE FROM "Transaction" 
-            WHERE "senderWalletId" IN (
-                SELECT id FROM "Wallet" WHERE "userId" = ANY(%s)
-            ) OR "receiverWalletId" IN (
-                SELECT id FROM "Wallet" WHERE "userId" = ANY(%s)
-            ) OR "effectedWalletId" IN (
-                SELECT id FROM "Wallet" WHERE "userId" = ANY(%s)
-            )
-        """, (user_ids, user_ids, user_ids))
-        
-        transactions_deleted = cursor.rowcount
-        print(f"Deleted {transactions_deleted} transactions")
-        
-        # Delete wallets
-        cursor.execute("""
-            DELETE FROM "Wallet" WHERE "userId" = ANY(%s)
-        """, (user_ids,))
-        
-        wallets_deleted = cursor.rowcount
-        print(f"Deleted {wallets_deleted} wallets")
-        
-        # Delete users
-        cursor.execute("""
-            DELETE FROM "User" WHERE id = ANY(%s)
-        """, (user_ids,))
-        
-        users_deleted = cursor.rowcount
-        print(f"Deleted {users_deleted} users")
-        
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = []
+            while True:
+                rows = reader.fetchmany(batch_size)
+                if not rows:
+                    break
+                user_ids = [row[0] for row in rows]
+                wallet_ids = [row[1] for row in rows if row[1]]
+                in_flight.acquire()
+                futures.append(executor.submit(run_chunk, user_ids, wallet_ids))
+
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except psycopg2.Error as e:
+                    failures += 1
+                    print(f"Error during cleanup chunk: {e}")
+
         conn.commit()
-        return users_deleted
-        
+
     except psycopg2.Error as e:
         print(f"Error during cleanup: {e}")
         conn.rollback()
-        return 0
     finally:
-        cursor.close()
+        reader.close()
+        for worker_conn in connections:
+            worker_conn.close()
 
-def cleanup_old_transactions(conn, days_ago=7):
-    """Clean up old test transactions"""
+    if progress.chunks == 0 and failures == 0:
+        print("No test users found to clean up.")
+        return 0
+
+    progress.report()
+    print(f"Deleted {progress.transactions} transactions")
+    print(f"Deleted {progress.wallets} wallets")
+    print(f"Deleted {progress.users} users")
+    if failures:
+        print(f"{failures} chunks failed and were left in place")
+    return progress.users
+
+def cleanup_old_transactions(conn, days_ago=7, batch_size=1000):
+    """Clean up old test transactions, one committed chunk at a time"""
     cursor = conn.cursor()
     
     cutoff_time = datetime.now() - timedelta(days=days_ago)
+    deleted_count = 0
+    last_id = ''
     
     try:
-        # Delete old transactions with test patterns in description
-        cursor.execute("""
-            DELETE FROM "Transaction" 
-            WHERE "createdAt" < %s 
-            AND (
-                description LIKE '%test%' 
-                OR description LIKE '%Test%'
-                OR description LIKE '%locust%'
-                OR description LIKE '%faker%'
-            )
-        """, (cutoff_time,))
+        # Keyset over the primary key: each chunk resumes where the last
+        # one stopped instead of rescanning rows already kept
+        while True:
+            cursor.execute("""
+                WITH chunk AS (
+                    SELECT id FROM "Transaction"
+                    WHERE id > %s
+                    ORDER BY id
+                    LIMIT %s
+                ), doomed AS (
+                    DELETE FROM "Transaction" t
+                    USING chunk
+                    WHERE t.id = chunk.id
+                    AND t."createdAt" < %s
+                    AND (
+                        t.description LIKE '%%test%%'
+                        OR t.description LIKE '%%Test%%'
+                        OR t.description LIKE '%%locust%%'
+                        OR t.description LIKE '%%faker%%'
+                    )
+                    RETURNING t.id
+                )
+                SELECT (SELECT max(id) FROM chunk), (SELECT count(*) FROM doomed)
+            """, (last_id, batch_size, cutoff_time))
+            last_id, deleted = cursor.fetchone()
+            conn.commit()
+            if last_id is None:
+                break
+            deleted_count += deleted
         
-        deleted_count = cursor.rowcount
         print(f"Deleted {deleted_count} old test transactions")
-        
-        conn.commit()
         return deleted_count
         
     except psycopg2.Error as e:
         print(f"Error cleaning up transactions: {e}")
         conn.rollback()
-        return 0
+        return deleted_count
+    finally:
+        cursor.close()
+
+def truncate_all_data(conn):
+    """Empty every application table; keeps the schema and migration history"""
+    cursor = conn.cursor()
+    
+    try:
+        cursor.execute("""
+            SELECT tablename FROM pg_tables
+            WHERE schemaname = 'public' AND tablename <> '_prisma_migrations'
+        """)
+        tables = [row[0] for row in cursor.fetchall()]
+        if not tables:
+            print("No tables to truncate")
+            return
+        
+        cursor.execute(
+            "TRUNCATE " + ", ".join(f'"{table}"' for table in tables) + " CASCADE"
+        )
+        conn.commit()
+        print(f"Truncated {len(tables)} tables: {', '.join(tables)}")
+        
+    except psycopg2.Error as e:
+        print(f"Error truncating tables: {e}")
+        conn.rollback()
+    finally:
+        cursor.close()
+
+def drop_schema(conn):
+    """Drop and recreate the public schema; run `prisma migrate deploy` after"""
+    cursor = conn.cursor()
+    
+    try:
+        cursor.execute("DROP SCHEMA public CASCADE")
+        cursor.execute("CREATE SCHEMA public")
+        conn.commit()
+        print("Dropped and recreated schema public")
+        print("Run `npx prisma migrate deploy` before starting the API again")
+        
+    except psycopg2.Error as e:
+        print(f"Error dropping schema: {e}")
+        conn.rollback()
     finally:
         cursor.close()
 
@@ -181,15 +376,15 @@ def get_database_stats(conn):
         cursor.execute('SELECT COUNT(*) FROM "Transaction"')
         transaction_count = cursor.fetchone()[0]
         
-        # Get total wallet balance
+        # Get total wallet balance (stored as integer cents, so the sum is exact)
         cursor.execute('SELECT SUM(balance) FROM "Wallet"')
-        total_balance = cursor.fetchone()[0] or 0
+        total_cents = cursor.fetchone()[0] or 0
         
         print("\n=== Database Statistics ===")
         print(f"Users: {user_count}")
         print(f"Wallets: {wallet_count}")
         print(f"Transactions: {transaction_count}")
-        print(f"Total Balance: ${total_balance:.2f}")
+        print(f"Total Balance: ${total_cents / 100:.2f} ({total_cents} cents)")
         
     except psycopg2.Error as e:
         print(f"Error getting database stats: {e}")
@@ -206,9 +401,27 @@ def main():
                        help='Reset system wallet balance to 0')
     parser.add_argument('--stats-only', action='store_true',
                        help='Only show database statistics, no cleanup')
+    parser.add_argument('--batch-size', type=int, default=1000,
+                       help='Users or transactions deleted per committed chunk (default: 1000)')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Parallel connections deleting user chunks (default: 1)')
+    parser.add_argument('--keep-indexes', action='store_true',
+                       help='Keep the helper indexes on "Transaction" after cleanup')
+    parser.add_argument('--truncate', action='store_true',
+                       help='Empty every table instead (disposable load test databases only)')
+    parser.add_argument('--drop-schema', action='store_true',
+                       help='Drop the whole schema instead (disposable load test databases only)')
+    parser.add_argument('--yes', action='store_true',
+                       help='Confirm --truncate or --drop-schema')
     
     args = parser.parse_args()
     
+    if args.batch_size <= 0 or args.workers <= 0:
+        parser.error('--batch-size and --workers must be positive')
+    if (args.truncate or args.drop_schema) and not args.yes:
+        parser.error(f"--truncate/--drop-schema wipe database "
+                     f"'{DATABASE_CONFIG['database']}'; pass --yes to confirm")
+    
     print("=== Wall-E Load Test Data Cleanup ===")
     
     # Connect to database
@@ -220,14 +433,28 @@ def main():
     try:
         if args.stats_only:
             get_database_stats(conn)
+        elif args.drop_schema:
+            drop_schema(conn)
+        elif args.truncate:
+            truncate_all_data(conn)
+            get_database_stats(conn)
         else:
             print(f"Cleaning up test data...")
             
-            # Clean up test users
-            users_cleaned = cleanup_test_users(conn, args.hours)
+            ensure_cleanup_indexes(conn)
+            try:
+                # Clean up test users
+                users_cleaned = cleanup_test_users(
+                    conn, args.hours, args.batch_size, args.workers
+                )
+            finally:
+                if not args.keep_indexes:
+                    drop_cleanup_indexes(conn)
             
             # Clean up old transactions
-            transactions_cleaned = cleanup_old_transactions(conn, args.days)
+            transactions_cleaned = cleanup_old_transactions(
+                conn, args.days, args.batch_size
+            )
             
             # Reset system wallet if requested
             if args.reset_system_wallet:
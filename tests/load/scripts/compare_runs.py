@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Wall-E Load Test Run Comparison
+Compares Locust CSV reports of baseline and candidate runs per endpoint and
+gives a regression verdict that accounts for run-to-run noise
+"""
+
+import os
+import sys
+import csv
+import html
+import math
+import argparse
+import statistics
+
+# key, label, column in _stats.csv / _stats_history.csv, higher is worse,
+# counts towards the verdict
+METRICS = [
+    ('p50_ms', 'p50', '50%', True, False),
+    ('p95_ms', 'p95', '95%', True, True),
+    ('p99_ms', 'p99', '99%', True, True),
+    ('rps', 'RPS', 'Requests/s', False, False),
+    ('failure_rate', 'Fail%', None, True, True),
+]
+
+# Share of requests above each percentile. A percentile is only judged
+# when enough requests lie beyond it; otherwise it is a few outliers.
+TAIL_SHARE = {'p50_ms': 0.50, 'p95_ms': 0.05, 'p99_ms': 0.01}
+
+# Locust's current percentiles cover the last 10 seconds, so consecutive
+# history rows overlap; only one row per window is an independent sample
+HISTORY_WINDOW_S = 10
+
+
+def run_prefix(path):
+    """Accept a CSV prefix or any of the files Locust writes for it"""
+    for suffix in ('_stats_history.csv', '_stats.csv'):
+        if path.endswith(suffix):
+            return path[:-len(suffix)]
+    return path
+
+
+def endpoint_label(row):
+    return f"{row['Type']} {row['Name']}" if row['Type'] else row['Name']
+
+
+def number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None  # 'N/A' before the first request
+
+
+def load_run(prefix):
+    """Per-endpoint figures of one run, plus within-run noise estimates"""
+    endpoints = {}
+    with open(f"{prefix}_stats.csv", newline='') as stats_file:
+        for row in csv.DictReader(stats_file):
+            requests = int(row['Request Count'])
+            failures = int(row['Failure Count'])
+            failure_rate = failures / requests if requests else 0.0
+            endpoints[endpoint_label(row)] = {
+                'requests': requests,
+                'p50_ms': number(row['50%']),
+                'p95_ms': number(row['95%']),
+                'p99_ms': number(row['99%']),
+                'rps': number(row['Requests/s']),
+                'failure_rate': failure_rate,
+            }
+
+    noise = {}
+    for label, figures in endpoints.items():
+        # Binomial standard error of the failure rate
+        if figures['requests']:
+            rate = figures['failure_rate']
+            noise[label] = {'failure_rate': math.sqrt(rate * (1 - rate) / figures['requests'])}
+
+    history_path = f"{prefix}_stats_history.csv"
+    if os.path.exists(history_path):
+        for label, samples in load_history(history_path).items():
+            noise.setdefault(label, {}).update(samples)
+
+    return {'prefix': prefix, 'endpoints': endpoints, 'noise': noise}
+
+
+def load_history(path):
+    """Standard error of each metric from the steady-state history rows.
+
+    Only rows at the run's peak user count are used, so the ramp-up does
+    not count as noise. Per-endpoint rows exist with --csv-full-history;
+    otherwise only the aggregate gets an estimate.
+    """
+    with open(path, newline='') as history_file:
+        rows = list(csv.DictReader(history_file))
+    if not rows:
+        return {}
+
+    peak_users = max(int(row['User Count']) for row in rows)
+    series = {}
+    for row in rows:
+        if int(row['User Count']) != peak_users:
+            continue
+        label = endpoint_label(row)
+        for key, _, column, _, _ in METRICS:
+            value = number(row.get(column)) if column else None
+            if value is not None:
+                series.setdefault(label, {}).setdefault(key, []).append(value)
+
+    estimates = {}
+    for label, metrics in series.items():
+        for key, values in metrics.items():
+            if len(values) < 3:
+                continue
+            independent = max(len(values) / HISTORY_WINDOW_S, 1)
+            estimates.setdefault(label, {})[key] = statistics.stdev(values) / math.sqrt(independent)
+    return estimates
+
+
+def side_summary(runs, label, key):
+    """Mean over a side's runs and the standard error of that mean"""
+    values = [run['endpoints'][label][key] for run in runs
+              if label in run['endpoints'] and run['endpoints'][label][key] is not None]
+    if not values:
+        return None, None
+    mean = statistics.mean(values)
+    if len(values) >= 2:
+        # Repeated runs: the spread between runs is the noise
+        return mean, statistics.stdev(values) / math.sqrt(len(values))
+    # Single run: fall back to the spread within it
+    return mean, runs[0]['noise'].get(label, {}).get(key)
+
+
+def compare(baseline_runs, candidate_runs, options):
+    """Per-endpoint, per-metric deltas with a status and an overall verdict"""
+    labels = [label for label in baseline_runs[0]['endpoints']
+              if any(label in run['endpoints'] for run in candidate_runs)]
+    # Aggregated last, like Locust's own tables
+    labels.sort(key=lambda label: (label == 'Aggregated', label))
+
+    rows = []
+    for label in labels:
+        requests = min(
+            statistics.mean(run['endpoints'][label]['requests']
+                            for run in runs if label in run['endpoints'])
+            for runs in (baseline_runs, candidate_runs)
+        )
+        for key, name, _, higher_is_worse, gated in METRICS:
+            baseline, baseline_noise = side_summary(baseline_runs, label, key)
+            candidate, candidate_noise = side_summary(candidate_runs, label, key)
+            if baseline is None or candidate is None:
+                continue
+
+            delta = candidate - baseline
+            relative = delta / baseline if baseline else (math.inf if delta else 0.0)
+            known = [n for n in (baseline_noise, candidate_noise) if n is not None]
+            noise = math.sqrt(sum(n * n for n in known)) if known else None
+
+            if key == 'failure_rate':
+                large_enough = abs(delta) >= options.min_failure_delta
+            else:
+                large_enough = abs(relative) >= options.min_change
+            # Without any noise estimate only the minimum change applies
+            beyond_noise = noise is None or abs(delta) > options.z * noise
+            worse = delta > 0 if higher_is_worse else delta < 0
+
+            tail_samples = requests * TAIL_SHARE.get(key, 1.0)
+            if requests < options.min_requests or tail_samples < options.min_tail_samples:
+                status = 'low-sample'
+            elif large_enough and beyond_noise:
+                status = 'regression' if worse else 'improvement'
+            else:
+                status = 'unchanged'
+
+            rows.append({
+                'endpoint': label,
+                'metric': name,
+                'key': key,
+                'gated': gated,
+                'baseline': baseline,
+                'candidate': candidate,
+                'delta': delta,
+                'relative': relative,
+                'noise': noise,
+                'status': status,
+            })
+
+    regressions = [row for row in rows if row['gated'] and row['status'] == 'regression']
+    improvements = [row for row in rows if row['gated'] and row['status'] == 'improvement']
+    if regressions:
+        verdict = 'REGRESSION'
+    elif improvements:
+        verdict = 'IMPROVEMENT'
+    else:
+        verdict = 'NO SIGNIFICANT CHANGE'
+
+    return {
+        'baseline': [run['prefix'] for run in baseline_runs],
+        'candidate': [run['prefix'] for run in candidate_runs],
+        'rows': rows,
+        'regressions': regressions,
+        'verdict': verdict,
+    }
+
+
+def format_value(key, value):
+    if value is None:
+        return '-'
+    if key == 'failure_rate':
+        return f"{value:.2%}"
+    if key == 'rps':
+        return f"{value:.1f}"
+    return f"{value:.0f}ms"
+
+
+def format_delta(row):
+    if row['key'] == 'failure_rate':
+        delta = f"{row['delta'] * 100:+.2f}pp"
+    elif row['key'] == 'rps':
+        delta = f"{row['delta']:+.1f}"
+    else:
+        delta = f"{row['delta']:+.0f}ms"
+    # A relative change of a failure rate near zero says little
+    if row['key'] == 'failure_rate' or math.isinf(row['relative']):
+        return delta
+    relative = f" ({row['relative']:+.1%})"
+    return delta + relative
+
+
+def format_noise(row):
+    if row['noise'] is None:
+        return 'n/a'
+    if row['key'] == 'failure_rate':
+        return f"±{row['noise'] * 100:.2f}pp"
+    if row['key'] == 'rps':
+        return f"±{row['noise']:.1f}"
+    return f"±{row['noise']:.0f}ms"
+
+
+def runs_label(prefixes):
+    return f"{len(prefixes)} run" if len(prefixes) == 1 else f"{len(prefixes)} runs"
+
+
+def render_markdown(report, options):
+    lines = [
+        '# Load Test Comparison',
+        '',
+        f"- Baseline ({runs_label(report['baseline'])}): " + ', '.join(f"`{p}`" for p in report['baseline']),
+        f"- Candidate ({runs_label(report['candidate'])}): " + ', '.join(f"`{p}`" for p in report['candidate']),
+        f"- Significant: change ≥ {options.min_change:.0%} "
+        f"(failure rate ≥ {options.min_failure_delta * 100:.1f}pp) "
+        f"and beyond {options.z:g}× the noise; percentiles need "
+        f"{options.min_tail_samples} requests above them",
+        '',
+        f"**Verdict: {report['verdict']}**",
+        '',
+    ]
+    for row in report['regressions']:
+        lines.append(f"- {row['endpoint']} {row['metric']}: "
+                     f"{format_value(row['key'], row['baseline'])} → "
+                     f"{format_value(row['key'], row['candidate'])}")
+    if report['regressions']:
+        lines.append('')
+
+    lines.append('| Endpoint | Metric | Baseline | Candidate | Δ | Noise | Status |')
+    lines.append('|---|---|---:|---:|---:|---:|---|')
+    for row in report['rows']:
+        lines.append(
+            f"| {row['endpoint']} | {row['metric']} "
+            f"| {format_value(row['key'], row['baseline'])} "
+            f"| {format_value(row['key'], row['candidate'])} "
+            f"| {format_delta(row)} | {format_noise(row)} | {row['status']} |"
+        )
+    return '\n'.join(lines) + '\n'
+
+
+STATUS_COLORS = {
+    'regression': '#f8d7da',
+    'improvement': '#d4edda',
+    'unchanged': '#ffffff',
+    'low-sample': '#eeeeee',
+}
+
+
+def render_html(report, options):
+    cells = []
+    for row in report['rows']:
+        cells.append(
+            f"<tr style=\"background:{STATUS_COLORS[row['status']]}\">"
+            f"<td>{html.escape(row['endpoint'])}</td><td>{row['metric']}</td>"
+            f"<td>{format_value(row['key'], row['baseline'])}</td>"
+            f"<td>{format_value(row['key'], row['candidate'])}</td>"
+            f"<td>{html.escape(format_delta(row))}</td>"
+            f"<td>{html.escape(format_noise(row))}</td>"
+            f"<td>{row['status']}</td></tr>"
+        )
+    runs = ''.join(
+        f"<li>{side} ({runs_label(report[side])}): "
+        + ', '.join(f"<code>{html.escape(p)}</code>" for p in report[side]) + '</li>'
+        for side in ('baseline', 'candidate')
+    )
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Load Test Comparison</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; }}
+td, th {{ border: 1px solid #ccc; padding: 4px 8px; text-align: right; }}
+td:first-child, td:nth-child(2), td:last-child {{ text-align: left; }}
+</style>
+</head>
+<body>
+<h1>Load Test Comparison</h1>
+<ul>{runs}</ul>
+<p>Significant: change &ge; {options.min_change:.0%}
+(failure rate &ge; {options.min_failure_delta * 100:.1f}pp) and beyond {options.z:g}&times; the noise;
+percentiles need {options.min_tail_samples} requests above them</p>
+<h2>Verdict: {report['verdict']}</h2>
+<table>
+<tr><th>Endpoint</th><th>Metric</th><th>Baseline</th><th>Candidate</th><th>&Delta;</th><th>Noise</th><th>Status</th></tr>
+{''.join(cells)}
+</table>
+</body>
+</html>
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare Wall-E load test runs')
+    parser.add_argument('--baseline', nargs='+', required=True,
+                        help='CSV prefixes (or _stats.csv files) of the baseline runs')
+    parser.add_argument('--candidate', nargs='+', required=True,
+                        help='CSV prefixes (or _stats.csv files) of the candidate runs')
+    parser.add_argument('--markdown',
+                        help='Write the markdown report here (default: print it)')
+    parser.add_argument('--html',
+                        help='Also write an HTML report here')
+    parser.add_argument('--min-change', type=float, default=0.05,
+                        help='Smallest relative change that can count (default: 0.05)')
+    parser.add_argument('--min-failure-delta', type=float, default=0.005,
+                        help='Smallest failure rate change that can count (default: 0.005)')
+    parser.add_argument('--z', type=float, default=2.0,
+                        help='How many standard errors a change must exceed (default: 2)')
+    parser.add_argument('--min-requests', type=int, default=20,
+                        help='Endpoints with fewer requests are not judged (default: 20)')
+    parser.add_argument('--min-tail-samples', type=int, default=5,
+                        help='Requests needed above a percentile to judge it (default: 5)')
+
+    args = parser.parse_args()
+
+    try:
+        baseline_runs = [load_run(run_prefix(path)) for path in args.baseline]
+        candidate_runs = [load_run(run_prefix(path)) for path in args.candidate]
+    except (OSError, KeyError, ValueError) as e:
+        print(f"Error reading Locust CSV reports: {e}")
+        sys.exit(2)
+
+    report = compare(baseline_runs, candidate_runs, args)
+
+    markdown = render_markdown(report, args)
+    if args.markdown:
+        with open(args.markdown, 'w') as markdown_file:
+            markdown_file.write(markdown)
+        print(f"Markdown report: {args.markdown}")
+    else:
+        print(markdown)
+
+    if args.html:
+        with open(args.html, 'w') as html_file:
+            html_file.write(render_html(report, args))
+        print(f"HTML report: {args.html}")
+
+    print(f"Verdict: {report['verdict']}")
+    # Nonzero so a pipeline can fail on a performance regression
+    sys.exit(1 if report['verdict'] == 'REGRESSION' else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,11 @@ SPAWN_RATE=${LOAD_TEST_SPAWN_RATE:-10}
 DURATION=${LOAD_TEST_DURATION:-10m}
 HOST=${API_HOST:-http://localhost:3000}
 REPORT_DIR=${REPORT_OUTPUT_DIR:-./reports}
+# Users bulk-inserted before the run (0 keeps the existing pool file)
+SEED_USERS=${LOAD_TEST_SEED_USERS:-$USERS}
+POOL_FILE=${LOAD_TEST_POOL_FILE:-${REPORT_DIR}/user_pool.json}
+# CSV prefixes of earlier runs to compare against (space separated, optional)
+BASELINE=${LOAD_TEST_BASELINE:-}
 
 # Colors for output
 RED='\033[0;31m'
@@ -25,6 +30,7 @@ echo -e "  Users: ${USERS}"
 echo -e "  Spawn Rate: ${SPAWN_RATE}"
 echo -e "  Duration: ${DURATION}"
 echo -e "  Host: ${HOST}"
+echo -e "  Seeded Users: ${SEED_USERS}"
 echo -e "  Report Directory: ${REPORT_DIR}"
 echo ""
 
@@ -43,7 +49,16 @@ if ! curl -s "${HOST}/health" > /dev/null 2>&1; then
     echo -e "${RED}Warning: API health check failed. Continuing anyway...${NC}"
 fi
 
-# Run load test
+# Seed users and wallets directly in the database so Locust users start
+# with ready tokens instead of registering and logging in
+if [ "${SEED_USERS}" -gt 0 ]; then
+    echo -e "${BLUE}Seeding ${SEED_USERS} users...${NC}"
+    python3 scripts/seed_users.py --users="${SEED_USERS}" --pool-file="${POOL_FILE}"
+fi
+export LOAD_TEST_POOL_FILE="${POOL_FILE}"
+
+# Run load test; the SLO gate in load_test.py sets the exit code
+set +e
 locust \
     -f load_test.py \
     --host="${HOST}" \
@@ -53,37 +68,63 @@ locust \
     --headless \
     --html="${REPORT_PREFIX}.html" \
     --csv="${REPORT_PREFIX}" \
+    --csv-full-history \
     --loglevel=INFO \
     --logfile="${REPORT_PREFIX}.log"
+LOCUST_EXIT=$?
+set -e
 
-# Check exit code
-if [ $? -eq 0 ]; then
-    echo -e "${GREEN}Load test completed successfully!${NC}"
-    
-    # Display summary
-    echo -e "${BLUE}Report files generated:${NC}"
-    echo -e "  HTML Report: ${REPORT_PREFIX}.html"
-    echo -e "  CSV Stats: ${REPORT_PREFIX}_stats.csv"
-    echo -e "  CSV History: ${REPORT_PREFIX}_stats_history.csv"
-    echo -e "  CSV Failures: ${REPORT_PREFIX}_failures.csv"
-    echo -e "  Log File: ${REPORT_PREFIX}.log"
-    
-    # Run performance validation
-    echo -e "${YELLOW}Running performance validation...${NC}"
-    python3 -c "
-import sys
-sys.path.append('.')
-from load_test import validate_performance_thresholds
-from locust.env import Environment
-
-# This is a simplified validation - in real scenario you'd parse the CSV results
-print('Performance validation would be implemented here')
-print('Check the HTML report for detailed metrics')
-"
-    
-else
-    echo -e "${RED}Load test failed!${NC}"
+SLO_RESULT="${REPORT_PREFIX}_slo.json"
+
+# Display summary
+echo -e "${BLUE}Report files generated:${NC}"
+echo -e "  HTML Report: ${REPORT_PREFIX}.html"
+echo -e "  CSV Stats: ${REPORT_PREFIX}_stats.csv"
+echo -e "  CSV History: ${REPORT_PREFIX}_stats_history.csv"
+echo -e "  CSV Failures: ${REPORT_PREFIX}_failures.csv"
+echo -e "  SLO Result: ${SLO_RESULT}"
+echo -e "  Log File: ${REPORT_PREFIX}.log"
+
+if [ ! -f "${SLO_RESULT}" ]; then
+    echo -e "${RED}Load test failed before producing results (exit code ${LOCUST_EXIT})!${NC}"
     exit 1
 fi
 
-echo -e "${GREEN}Load test execution completed.${NC}" 
\ No newline at end of file
+# Show the SLO verdict per endpoint
+echo -e "${YELLOW}Performance validation:${NC}"
+python3 - "${SLO_RESULT}" <<'PYTHON'
+import sys
+import json
+
+with open(sys.argv[1]) as result_file:
+    result = json.load(result_file)
+
+print(f"{'Endpoint':<45} {'Reqs':>8} {'p50':>7} {'p95':>7} {'p99':>7} {'Fail%':>7}")
+for row in result['endpoints'] + [{**result['total'], 'method': '', 'name': 'Aggregated'}]:
+    label = f"{row['method']} {row['name']}".strip()
+    print(f"{label[:45]:<45} {row['requests']:>8} {row['p50_ms']:>7.0f} "
+          f"{row['p95_ms']:>7.0f} {row['p99_ms']:>7.0f} {row['failure_rate']:>7.2%}")
+for breach in result['breaches']:
+    print(f"  BREACH: {breach['message']}")
+PYTHON
+
+if [ "${LOCUST_EXIT}" -ne 0 ]; then
+    echo -e "${RED}Load test failed: performance thresholds breached!${NC}"
+    exit "${LOCUST_EXIT}"
+fi
+
+# Compare with the baseline runs, if any
+if [ -n "${BASELINE}" ]; then
+    echo -e "${YELLOW}Comparing against baseline...${NC}"
+    # shellcheck disable=SC2086
+    if ! python3 scripts/compare_runs.py \
+        --baseline ${BASELINE} \
+        --candidate "${REPORT_PREFIX}" \
+        --markdown "${REPORT_PREFIX}_comparison.md" \
+        --html "${REPORT_PREFIX}_comparison.html"; then
+        echo -e "${RED}Load test failed: performance regression against baseline!${NC}"
+        exit 1
+    fi
+fi
+
+echo -e "${GREEN}Load test completed successfully, all thresholds met!${NC}"
@@ -6,11 +6,19 @@
 set -e
 
 # Default configuration
+# Ceiling of the step load; the run stops earlier at the breaking point
 USERS=${STRESS_TEST_USERS:-1000}
 SPAWN_RATE=${STRESS_TEST_SPAWN_RATE:-50}
-DURATION=${STRESS_TEST_DURATION:-15m}
+# Hard limit for the whole run. Each step holds 1-5 minutes, so the 20
+# steps up to the default 1000 users take 20 minutes at the very least;
+# a limit that cuts the climb short reports no breaking point at all.
+DURATION=${STRESS_TEST_DURATION:-60m}
+STEP=${STEP_USERS:-50}
 HOST=${API_HOST:-http://localhost:3000}
 REPORT_DIR=${REPORT_OUTPUT_DIR:-./reports}
+# Users bulk-inserted before the run (0 keeps the existing pool file)
+SEED_USERS=${LOAD_TEST_SEED_USERS:-$USERS}
+POOL_FILE=${LOAD_TEST_POOL_FILE:-${REPORT_DIR}/user_pool.json}
 
 # Colors for output
 RED='\033[0;31m'
@@ -25,10 +33,12 @@ echo -e "${RED}WARNING: This test is designed to stress the system to its limits
 echo -e "${RED}Monitor system resources closely during execution.${NC}"
 echo ""
 echo -e "${YELLOW}Configuration:${NC}"
-echo -e "  Users: ${USERS}"
+echo -e "  Max Users: ${USERS} (steps of ${STEP})"
 echo -e "  Spawn Rate: ${SPAWN_RATE}"
-echo -e "  Duration: ${DURATION}"
+echo -e "  Max Duration: ${DURATION}"
 echo -e "  Host: ${HOST}"
+echo -e "  App Workers (CLUSTER_WORKERS): ${CLUSTER_WORKERS:-1}"
+echo -e "  Seeded Users: ${SEED_USERS}"
 echo -e "  Report Directory: ${REPORT_DIR}"
 echo ""
 
@@ -48,6 +58,14 @@ if ! curl -s "${HOST}/health" > /dev/null 2>&1; then
     exit 1
 fi
 
+# Seed users and wallets directly in the database so Locust users start
+# with ready tokens instead of registering and logging in
+if [ "${SEED_USERS}" -gt 0 ]; then
+    echo -e "${BLUE}Seeding ${SEED_USERS} users...${NC}"
+    python3 scripts/seed_users.py --users="${SEED_USERS}" --pool-file="${POOL_FILE}"
+fi
+export LOAD_TEST_POOL_FILE="${POOL_FILE}"
+
 # System resource monitoring setup
 echo -e "${BLUE}Setting up system monitoring...${NC}"
 MONITOR_PID=""
@@ -70,95 +88,60 @@ cleanup() {
 }
 trap cleanup EXIT
 
-# Run stress test with stepped user increase
-echo -e "${PURPLE}Running stress test with stepped increase...${NC}"
-
-# Start with base load
-STEP_USERS=$((USERS / 4))
-STEP_DURATION="3m"
-
-echo -e "${BLUE}Step 1: ${STEP_USERS} users for ${STEP_DURATION}${NC}"
-locust \
-    -f stress_test.py \
-    --host="${HOST}" \
-    --users="${STEP_USERS}" \
-    --spawn-rate="${SPAWN_RATE}" \
-    --run-time="${STEP_DURATION}" \
-    --headless \
-    --html="${REPORT_PREFIX}_step1.html" \
-    --csv="${REPORT_PREFIX}_step1" \
-    --loglevel=INFO \
-    --logfile="${REPORT_PREFIX}_step1.log"
-
-echo -e "${BLUE}Step 2: $((STEP_USERS * 2)) users for ${STEP_DURATION}${NC}"
-locust \
-    -f stress_test.py \
-    --host="${HOST}" \
-    --users="$((STEP_USERS * 2))" \
-    --spawn-rate="${SPAWN_RATE}" \
-    --run-time="${STEP_DURATION}" \
-    --headless \
-    --html="${REPORT_PREFIX}_step2.html" \
-    --csv="${REPORT_PREFIX}_step2" \
-    --loglevel=INFO \
-    --logfile="${REPORT_PREFIX}_step2.log"
-
-echo -e "${BLUE}Step 3: $((STEP_USERS * 3)) users for ${STEP_DURATION}${NC}"
-locust \
-    -f stress_test.py \
-    --host="${HOST}" \
-    --users="$((STEP_USERS * 3))" \
-    --spawn-rate="${SPAWN_RATE}" \
-    --run-time="${STEP_DURATION}" \
-    --headless \
-    --html="${REPORT_PREFIX}_step3.html" \
-    --csv="${REPORT_PREFIX}_step3" \
-    --loglevel=INFO \
-    --logfile="${REPORT_PREFIX}_step3.log"
-
-echo -e "${PURPLE}Final Step: ${USERS} users for ${DURATION}${NC}"
+# Climb in steps until BREAKING_POINT_INDICATORS trip (breaking_point.py)
+echo -e "${PURPLE}Searching for the breaking point...${NC}"
+set +e
+STEP_MAX_USERS="${USERS}" STEP_SPAWN_RATE="${SPAWN_RATE}" STEP_USERS="${STEP}" \
 locust \
-    -f stress_test.py \
+    -f breaking_point.py \
     --host="${HOST}" \
-    --users="${USERS}" \
-    --spawn-rate="${SPAWN_RATE}" \
     --run-time="${DURATION}" \
     --headless \
-    --html="${REPORT_PREFIX}_final.html" \
-    --csv="${REPORT_PREFIX}_final" \
+    --html="${REPORT_PREFIX}.html" \
+    --csv="${REPORT_PREFIX}" \
+    --csv-full-history \
     --loglevel=INFO \
-    --logfile="${REPORT_PREFIX}_final.log"
-
-# Check exit code
-if [ $? -eq 0 ]; then
-    echo -e "${GREEN}Stress test completed!${NC}"
-    
-    # Display summary
-    echo -e "${BLUE}Report files generated:${NC}"
-    echo -e "  Step 1 HTML: ${REPORT_PREFIX}_step1.html"
-    echo -e "  Step 2 HTML: ${REPORT_PREFIX}_step2.html"
-    echo -e "  Step 3 HTML: ${REPORT_PREFIX}_step3.html"
-    echo -e "  Final HTML: ${REPORT_PREFIX}_final.html"
-    echo -e "  System Log: ${REPORT_PREFIX}_system.log"
-    
-    # Run breaking point analysis
-    echo -e "${YELLOW}Running breaking point analysis...${NC}"
-    python3 -c "
-import sys
-sys.path.append('.')
-from stress_test import detect_breaking_point, stress_test_analysis
-from locust.env import Environment
-
-print('Breaking point analysis would be implemented here')
-print('Check the HTML reports for detailed metrics')
-print('System monitoring log: ${REPORT_PREFIX}_system.log')
-"
-    
-else
-    echo -e "${RED}Stress test failed or was interrupted!${NC}"
-    echo -e "${YELLOW}This might indicate the system reached its breaking point.${NC}"
+    --logfile="${REPORT_PREFIX}.log"
+LOCUST_EXIT=$?
+set -e
+
+RESULT="${REPORT_PREFIX}_breaking_point.json"
+if [ "${LOCUST_EXIT}" -ne 0 ] || [ ! -f "${RESULT}" ]; then
+    echo -e "${RED}Stress test failed or was interrupted before completing a step!${NC}"
     exit 1
 fi
 
+# Capacity summary
+echo -e "${YELLOW}Breaking point analysis:${NC}"
+python3 - "${RESULT}" <<'PYTHON'
+import sys
+import json
+
+with open(sys.argv[1]) as result_file:
+    result = json.load(result_file)
+
+print(f"{'Step':>4} {'Users':>6} {'RPS':>8} {'p95':>7} {'p99':>7} {'Fail%':>7} "
+      f"{'CPU%':>5} {'Mem%':>5}  Breaches")
+for step in result['steps']:
+    print(f"{step['step']:>4} {step['users']:>6} {step['rps']:>8.1f} {step['p95_ms']:>7.0f} "
+          f"{step['p99_ms']:>7.0f} {step['failure_rate']:>7.2%} {step['cpu_percent']:>5.0f} "
+          f"{step['memory_percent']:>5.0f}  {', '.join(step['breaches']) or '-'}")
+print()
+if result['breaking_point_reached']:
+    print(f"Breaking point at step {result['breaking_step']}")
+else:
+    print("No breaking point within the user ceiling")
+print(f"Max sustainable users: {result['max_sustainable_users']}")
+print(f"Max sustainable RPS: {result['max_sustainable_rps']:.1f}")
+for indicator, tripped in result['first_tripped'].items():
+    print(f"  {indicator}: first tripped at step {tripped['step']} ({tripped['users']} users)")
+PYTHON
+
+echo -e "${BLUE}Report files generated:${NC}"
+echo -e "  HTML Report: ${REPORT_PREFIX}.html"
+echo -e "  Breaking Point: ${RESULT}"
+echo -e "  CSV History: ${REPORT_PREFIX}_stats_history.csv"
+echo -e "  System Log: ${REPORT_PREFIX}_system.log"
+
 echo -e "${PURPLE}Stress test execution completed.${NC}"
-echo -e "${YELLOW}Review all generated reports to understand system behavior under stress.${NC}" 
\ No newline at end of file
+echo -e "${YELLOW}Correlate the breaking step with the system log and the app's /metrics.${NC}"
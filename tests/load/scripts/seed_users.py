@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Wall-E Load Test User Seeding Script
+Bulk-inserts test users with funded wallets and writes a pool file with
+pre-minted access tokens, so Locust users start without register/login
+"""
+
+import os
+import sys
+import json
+import uuid
+import argparse
+from datetime import datetime, timedelta, timezone
+import jwt
+import psycopg2
+from psycopg2.extras import execute_values
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Database configuration
+DATABASE_CONFIG = {
+    'host': os.getenv('DB_HOST', 'localhost'),
+    'port': os.getenv('DB_PORT', '5432'),
+    'database': os.getenv('DB_NAME', 'walle_db'),
+    'user': os.getenv('DB_USER', 'postgres'),
+    'password': os.getenv('DB_PASSWORD', 'password')
+}
+
+SYSTEM_USER_EMAIL = 'system@walle.internal'
+SEED_PASSWORD = os.getenv('TEST_USER_PASSWORD', 'TestPassword123!')
+# Matched by cleanup_test_data.py ('%locust%' / '%test%')
+SEED_EMAIL_DOMAIN = 'locust.loadtest'
+SEED_DESCRIPTION = 'Load test seed balance'
+PAGE_SIZE = 1000
+
+
+def connect_to_database():
+    """Connect to PostgreSQL database"""
+    try:
+        conn = psycopg2.connect(**DATABASE_CONFIG)
+        return conn
+    except psycopg2.Error as e:
+        print(f"Error connecting to database: {e}")
+        return None
+
+
+def get_system_wallet_id(conn):
+    """The seed balances are booked as deposits from the system wallet"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT w.id FROM "Wallet" w
+            JOIN "User" u ON u.id = w."userId"
+            WHERE u.email = %s
+        """, (SYSTEM_USER_EMAIL,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+    finally:
+        cursor.close()
+
+
+def build_seed_rows(count, run_id):
+    """Generate ids, emails and aliases for the seeded users"""
+    users = []
+    for index in range(count):
+        users.append({
+            'userId': str(uuid.uuid4()),
+            'walletId': str(uuid.uuid4()),
+            'email': f"locust_{run_id}_{index}@{SEED_EMAIL_DOMAIN}",
+            'alias': f"locust_{run_id}_{index}",
+        })
+    return users
+
+
+def insert_seed_users(conn, users, balance_cents, system_wallet_id):
+    """Insert users, wallets and their opening deposits in one transaction.
+
+    Every starting balance gets a matching IN transaction so the ledger and
+    the wallet balance agree, as they would after a real deposit.
+    """
+    cursor = conn.cursor()
+    now = datetime.now(timezone.utc)
+
+    try:
+        execute_values(cursor, """
+            INSERT INTO "User" (id, email, alias, password, "createdAt", "updatedAt")
+            VALUES %s
+        """, [
+            (u['userId'], u['email'], u['alias'], SEED_PASSWORD, now, now)
+            for u in users
+        ], page_size=PAGE_SIZE)
+
+        execute_values(cursor, """
+            INSERT INTO "Wallet" (id, balance, "userId")
+            VALUES %s
+        """, [
+            (u['walletId'], balance_cents, u['userId'])
+            for u in users
+        ], page_size=PAGE_SIZE)
+
+        if balance_cents > 0:
+            execute_values(cursor, """
+                INSERT INTO "Transaction" (
+                    id, amount, type, description, "createdAt",
+                    "senderWalletId", "receiverWalletId", "effectedWalletId"
+                )
+                VALUES %s
+            """, [
+                (str(uuid.uuid4()), balance_cents, 'IN', SEED_DESCRIPTION, now,
+                 system_wallet_id, u['walletId'], u['walletId'])
+                for u in users
+            ], template="(%s, %s, %s::\"TransactionType\", %s, %s, %s, %s, %s)",
+                page_size=PAGE_SIZE)
+
+        conn.commit()
+        return len(users)
+
+    except psycopg2.Error as e:
+        print(f"Error seeding users: {e}")
+        conn.rollback()
+        return 0
+    finally:
+        cursor.close()
+
+
+def mint_tokens(users, secret, ttl_hours):
+    """Sign the same payload AuthService issues on login (HS256)"""
+    issued_at = datetime.now(timezone.utc)
+    expires_at = issued_at + timedelta(hours=ttl_hours)
+    for user in users:
+        user['token'] = jwt.encode({
+            'email': user['email'],
+            'userId': user['userId'],
+            'walletId': user['walletId'],
+            'iat': int(issued_at.timestamp()),
+            'exp': int(expires_at.timestamp()),
+        }, secret, algorithm='HS256')
+    return expires_at
+
+
+def write_pool_file(path, run_id, users, balance_cents, expires_at):
+    """Write the pool Locust workers read their users and recipients from"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as pool_file:
+        json.dump({
+            'runId': run_id,
+            'balance': balance_cents,
+            'expiresAt': expires_at.isoformat(),
+            'users': users,
+        }, pool_file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Seed Wall-E load test users')
+    parser.add_argument('--users', type=int,
+                        default=int(os.getenv('LOAD_TEST_SEED_USERS', '1000')),
+                        help='Number of users to create (default: 1000)')
+    parser.add_argument('--balance', type=float, default=10000.0,
+                        help='Starting balance per wallet (default: 10000.00)')
+    parser.add_argument('--pool-file',
+                        default=os.getenv('LOAD_TEST_POOL_FILE', 'user_pool.json'),
+                        help='Where to write the user pool (default: user_pool.json)')
+    parser.add_argument('--token-ttl-hours', type=int, default=24,
+                        help='Lifetime of the minted access tokens (default: 24)')
+
+    args = parser.parse_args()
+
+    print("=== Wall-E Load Test User Seeding ===")
+
+    secret = os.getenv('JWT_SECRET')
+    if not secret:
+        print("JWT_SECRET must match the API's secret to mint tokens")
+        sys.exit(1)
+
+    if args.users <= 0:
+        print("Nothing to seed")
+        sys.exit(1)
+
+    conn = connect_to_database()
+    if not conn:
+        print("Failed to connect to database")
+        sys.exit(1)
+
+    try:
+        system_wallet_id = get_system_wallet_id(conn)
+        if not system_wallet_id:
+            print("System wallet not found; start the API once so it creates it")
+            sys.exit(1)
+
+        run_id = datetime.now().strftime('%Y%m%d%H%M%S')
+        balance_cents = round(args.balance * 100)
+        users = build_seed_rows(args.users, run_id)
+
+        print(f"Seeding {len(users)} users with ${balance_cents / 100:.2f} each...")
+        seeded = insert_seed_users(conn, users, balance_cents, system_wallet_id)
+        if seeded == 0:
+            sys.exit(1)
+
+        expires_at = mint_tokens(users, secret, args.token_ttl_hours)
+        write_pool_file(args.pool_file, run_id, users, balance_cents, expires_at)
+
+        print(f"Seeded {seeded} users (run {run_id})")
+        print(f"Pool file: {args.pool_file} (tokens valid until {expires_at:%Y-%m-%d %H:%M} UTC)")
+
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Wall-E Load Test SLO Evaluation
+Checks Locust results against latency/throughput thresholds per endpoint
+and writes a machine-readable result for CI
+"""
+
+import os
+import json
+from datetime import datetime, timezone
+from locust import events
+from locust.runners import WorkerRunner
+
+# Endpoints with fewer requests than this are reported but not gated on
+# percentiles: a handful of samples makes p99 just the slowest request
+MIN_SAMPLES_FOR_PERCENTILES = int(os.getenv('SLO_MIN_SAMPLES', '20'))
+
+# What check_thresholds understands; anything else (host CPU and memory)
+# needs samples the request stats don't have and is left to breaking_point.py
+GATED_THRESHOLDS = {
+    'max_avg_response_time',
+    'max_95th_percentile',
+    'max_99th_percentile',
+    'max_failure_rate',
+    'min_requests_per_second',
+}
+
+
+def summarize_entry(entry):
+    """Latency and throughput figures for one Locust stats entry"""
+    return {
+        'name': entry.name,
+        'method': entry.method,
+        'requests': entry.num_requests,
+        'failures': entry.num_failures,
+        'failure_rate': entry.fail_ratio,
+        'rps': entry.total_rps,
+        'avg_ms': entry.avg_response_time,
+        'p50_ms': entry.get_response_time_percentile(0.50),
+        'p95_ms': entry.get_response_time_percentile(0.95),
+        'p99_ms': entry.get_response_time_percentile(0.99),
+    }
+
+
+def check_thresholds(summary, thresholds, aggregate=False):
+    """Breached thresholds for one endpoint (or the aggregate) summary.
+
+    Throughput and failure-rate limits only make sense for the whole run;
+    latency limits apply to every endpoint with enough samples.
+    """
+    breaches = []
+    label = 'Aggregated' if aggregate else f"{summary['method']} {summary['name']}"
+    enough_samples = aggregate or summary['requests'] >= MIN_SAMPLES_FOR_PERCENTILES
+
+    latency_checks = [
+        ('max_avg_response_time', 'avg_ms', 'Average response time'),
+        ('max_95th_percentile', 'p95_ms', '95th percentile'),
+        ('max_99th_percentile', 'p99_ms', '99th percentile'),
+    ]
+    for key, field, description in latency_checks:
+        limit = thresholds.get(key)
+        if limit is None or not summary['requests']:
+            continue
+        if field != 'avg_ms' and not enough_samples:
+            continue
+        if summary[field] > limit:
+            breaches.append({
+                'endpoint': label,
+                'threshold': key,
+                'limit': limit,
+                'value': summary[field],
+                'message': f"{label}: {description} {summary[field]:.0f}ms exceeds {limit}ms",
+            })
+
+    if aggregate:
+        limit = thresholds.get('max_failure_rate')
+        if limit is not None and summary['failure_rate'] > limit:
+            breaches.append({
+                'endpoint': label,
+                'threshold': 'max_failure_rate',
+                'limit': limit,
+                'value': summary['failure_rate'],
+                'message': f"Failure rate {summary['failure_rate']:.2%} exceeds {limit:.2%}",
+            })
+        limit = thresholds.get('min_requests_per_second')
+        if limit is not None and summary['rps'] < limit:
+            breaches.append({
+                'endpoint': label,
+                'threshold': 'min_requests_per_second',
+                'limit': limit,
+                'value': summary['rps'],
+                'message': f"Requests per second {summary['rps']:.2f} below {limit}",
+            })
+
+    return breaches
+
+
+def evaluate(stats, thresholds):
+    """Evaluate a whole run: per-endpoint summaries plus every breach"""
+    endpoints = []
+    breaches = []
+    for entry in sorted(stats.entries.values(), key=lambda e: (e.name, e.method)):
+        summary = summarize_entry(entry)
+        endpoints.append(summary)
+        breaches.extend(check_thresholds(summary, thresholds))
+
+    total = summarize_entry(stats.total)
+    breaches.extend(check_thresholds(total, thresholds, aggregate=True))
+
+    return {
+        'passed': not breaches,
+        'thresholds': thresholds,
+        'skipped': sorted(set(thresholds) - GATED_THRESHOLDS),
+        'total': total,
+        'endpoints': endpoints,
+        'breaches': breaches,
+    }
+
+
+def result_path(environment):
+    """SLO_RESULT_FILE, else next to Locust's CSV output (<prefix>_slo.json)"""
+    path = os.getenv('SLO_RESULT_FILE')
+    if path:
+        return path
+    csv_prefix = getattr(environment.parsed_options, 'csv_prefix', None)
+    if csv_prefix:
+        return f"{csv_prefix}_slo.json"
+    return None
+
+
+def write_result(path, result):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as result_file:
+        json.dump(result, result_file, indent=2)
+
+
+def register_slo_gate(thresholds, test_name):
+    """Evaluate `thresholds` when Locust quits and fail the process on breach.
+
+    Runs on the master (or a standalone runner), where stats cover every
+    worker. The SLOs decide the exit code: a run within max_failure_rate
+    exits 0 even though Locust would otherwise exit 1 on any failed request.
+    """
+    @events.quitting.add_listener
+    def gate(environment, **kwargs):
+        if isinstance(environment.runner, WorkerRunner):
+            return
+        # Shapes that judge each step themselves (breaking_point.py)
+        if getattr(environment.shape_class, 'reports_own_verdict', False):
+            return
+
+        result = evaluate(environment.stats, thresholds)
+        result['test'] = test_name
+        result['finishedAt'] = datetime.now(timezone.utc).isoformat()
+
+        path = result_path(environment)
+        if path:
+            write_result(path, result)
+            print(f"SLO result written to {path}")
+        if result['skipped']:
+            print(f"{test_name}: not evaluated from request stats: {', '.join(result['skipped'])}")
+
+        if result['passed']:
+            print(f"=== {test_name}: all SLOs met ===")
+            environment.process_exit_code = 0
+            return
+
+        print(f"=== {test_name}: {len(result['breaches'])} SLO breaches ===")
+        for breach in result['breaches']:
+            print(f"  - {breach['message']}")
+        environment.process_exit_code = 1
+
+    return gate